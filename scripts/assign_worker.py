@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Assign new leads to reps out of band, in micro-batches.
+
+Replaces the "Auto-assign leads to uploader" workflow (one CODE +
+UPDATE_RECORD execution per created person); reconcile_schema.py --apply
+deactivates it. Webhook events are journaled before they are acknowledged
+and replayed after a crash.
+
+    python scripts/assign_worker.py                               # poll, assign to uploader
+    python scripts/assign_worker.py --policy round-robin
+    python scripts/assign_worker.py --policy capacity --capacity 500 --open-filter '{"tcpaStatus": {"neq": "DNC"}}'
+    python scripts/assign_worker.py --source webhook --port 8787  # Twenty webhook -> http://host:8787/
+    python scripts/assign_worker.py --local --events 50000        # stand-in: no API calls
+
+The uploader policy falls back to --fallback (default round-robin) for
+people created by API keys or non-rep members.
+
+The webhook listener binds to 127.0.0.1 unless --host says otherwise, and
+needs TWENTY_WEBHOOK_SECRET (or --secret) unless --unsigned-webhooks is
+given: an unsigned POST could otherwise get any person reassigned.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+
+from leads.assign import (
+    POLICIES, AssignmentWorker, CapacityPolicy, MemorySink, PollingSource, RoundRobinPolicy,
+    SyntheticSource, TwentySink, UploaderPolicy, WebhookSource, rep_options,
+)
+from twenty import auth, profile
+
+LOCAL_REPS = {
+    "Nathaniel Jenkins": "NATHANIEL_JENKINS",
+    "Jonathan Lindqvist": "JONATHAN_LINDQVIST",
+    "David Edwards": "DAVID_EDWARDS",
+    "Edwin Royal Stewart": "EDWIN_ROYAL_STEWART",
+    "Lou Hallug": "LOU_HALLUG",
+    "Leigh Edwards": "LEIGH_EDWARDS",
+}
+
+
+def build_policy(name, reps, args, local):
+    if name == "uploader":
+        fallback = build_policy(args.fallback, reps, args, local) if args.fallback != "none" else None
+        return UploaderPolicy(reps, fallback=fallback)
+    if name == "round-robin":
+        return RoundRobinPolicy(reps)
+    return CapacityPolicy(reps, capacity=args.capacity, open_filter=args.open_filter,
+                          open_counts=dict.fromkeys(reps.values(), 0) if local else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-band lead assignment worker.")
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="uploader")
+    parser.add_argument("--fallback", choices=["round-robin", "capacity", "none"], default="round-robin",
+                        help="policy for leads the uploader policy can't place")
+    parser.add_argument("--capacity", type=int,
+                        help="max open leads per rep (capacity policy); see --open-filter for what counts as open")
+    parser.add_argument("--open-filter", type=json.loads, metavar="JSON",
+                        help="PersonFilterInput for a rep's open leads (default: every person assigned to the rep)")
+    parser.add_argument("--source", choices=["poll", "webhook"], default="poll")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds between polls")
+    parser.add_argument("--host", default=auth.DEFAULT_HOST,
+                        help=f"webhook listen interface (default {auth.DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=8787, help="webhook listen port")
+    parser.add_argument("--secret", default=os.environ.get("TWENTY_WEBHOOK_SECRET"),
+                        help="webhook signing secret (TWENTY_WEBHOOK_SECRET)")
+    parser.add_argument("--unsigned-webhooks", action="store_true",
+                        help="accept webhook deliveries without a signing secret")
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--max-wait", type=float, default=1.0, help="max seconds to hold a partial batch")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between metric lines")
+    parser.add_argument("--local", action="store_true", help="stand-in mode: synthetic events, no writes")
+    parser.add_argument("--events", type=int, default=10_000, help="synthetic events (--local)")
+    parser.add_argument("--rate", type=float, default=2_000.0, help="synthetic events per second (--local)")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    if args.source == "webhook" and not args.local:
+        problem = auth.check_secret(args)
+        if problem:
+            print(f"[ERROR] {problem}")
+            return 1
+        if not args.secret:
+            print("[WARN] --unsigned-webhooks: anyone who can reach the listener can get leads reassigned")
+
+    if args.local:
+        reps = LOCAL_REPS
+        source = SyntheticSource(reps, total=args.events, rate=args.rate)
+        sink = MemorySink()
+    else:
+        reps = rep_options()
+        if not reps:
+            print("[ERROR] person.assignedRep has no options. Run sync_rep_options.py first.")
+            return 1
+        source = (WebhookSource(host=args.host, port=args.port, secret=args.secret) if args.source == "webhook"
+                  else PollingSource(interval=args.interval))
+        sink = TwentySink()
+
+    policy = build_policy(args.policy, reps, args, args.local)
+    worker = AssignmentWorker(source, policy, sink, batch_size=args.batch_size, max_wait=args.max_wait)
+
+    def stop(signum, frame):
+        worker.stop.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Assigning with policy={args.policy} source={'local' if args.local else args.source} "
+          f"({len(reps)} reps, batches of {args.batch_size})...")
+    metrics = worker.run(report_every=args.report_every)
+
+    print(f"\n[DONE] {metrics.line()}")
+    print(json.dumps(metrics.snapshot()["byRep"], indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Parity check and benchmark for the columnar lead enrichment.
+
+Generates synthetic lead file columns (short and malformed ZIPs, county
+names in any case, blank or comma-formatted square footage, missing
+mortgage balances), checks that leads.enrichment's columnar path agrees
+with its row-at-a-time port of enrichment.ts on every row, then times the
+cell parsing, the columnar calculations and the per-row port. Parsing
+costs more than calculating, which is why enrichment has no result cache.
+
+    python scripts/bench_enrichment.py                  # 1M rows
+    python scripts/bench_enrichment.py --ts             # also check against enrichment.ts itself
+
+--ts runs apps/compass/server/enrichment.ts through tsx, so it needs
+`npm install` in apps/compass.
+"""
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from leads.enrichment import UTILITY_IDS, block_inputs, enrich_block, enrich_columns, enrich_lead
+
+COMPASS_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "apps", "compass"))
+
+# (value, weight): mostly what PropStream emits, plus hand-edited oddities
+ZIP_VALUES = [("28202", 0.25), ("27601", 0.2), ("27909", 0.1), ("27103", 0.1), ("28801", 0.1),
+              ("29401", 0.05), ("27601-1234", 0.05), ("", 0.05), ("282", 0.03), ("28", 0.02),
+              ("N/A", 0.02), (" 27514", 0.03)]
+COUNTY_VALUES = [("Mecklenburg", 0.25), ("Wake", 0.2), ("DURHAM", 0.05), ("guilford", 0.05), ("Forsyth", 0.05),
+                 ("Cabarrus", 0.05), ("Union", 0.05), ("Buncombe", 0.15), ("", 0.1), ("Default", 0.05)]
+
+
+def _draw(rng, weighted, rows):
+    values, weights = zip(*weighted)
+    return np.array(values)[rng.choice(len(values), rows, p=weights)]
+
+
+def _number_cells(rng, values, rows, blank):
+    cells = np.array([f"{v:,.2f}".rstrip("0").rstrip(".") if i % 3 == 0 else f"{v:g}"
+                      for i, v in enumerate(values.tolist())], dtype=object)
+    cells[rng.random(rows) < blank] = ""
+    return cells.astype(str)
+
+
+def synthetic_columns(rows, seed):
+    rng = np.random.default_rng(seed)
+    sqft = rng.lognormal(7.5, 0.4, rows)
+    sqft = np.where(rng.random(rows) < 0.8, np.round(sqft), np.round(sqft, 2))
+    sqft[rng.random(rows) < 0.02] = 0
+    balance = np.round(rng.uniform(0, 400_000, rows), 2)
+    return {
+        "zip": _draw(rng, ZIP_VALUES, rows),
+        "County": _draw(rng, COUNTY_VALUES, rows),
+        "Living Square Feet": _number_cells(rng, sqft, rows, 0.1),
+        "Est. Remaining balance of Open Loans": _number_cells(rng, balance, rows, 0.3),
+    }
+
+
+def _cases(inputs):
+    """Parsed inputs as enrichLead() arguments: NaN (blank cell) -> None."""
+    zips, sqft, counties, balance = (column.tolist() for column in inputs)
+    return [(z, None if math.isnan(s) else s, c, None if math.isnan(b) else b)
+            for z, s, c, b in zip(zips, sqft, counties, balance)]
+
+
+def _expected(cases):
+    out = []
+    for zip_code, sqft, county, balance in cases:
+        result = enrich_lead(zip_code, sqft, county, balance)
+        calc = result["calculations"]
+        out.append((result["utility"]["id"], calc["estimatedValue"], calc["monthlyElectricBill"],
+                    calc["estimatedEquity"]))
+    return out
+
+
+def _columnar(result):
+    return list(zip(result.utility_ids().tolist(), result.estimated_value.tolist(), result.monthly_bill.tolist(),
+                    [None if math.isnan(e) else e for e in result.equity.tolist()]))
+
+
+def _compare(label, got, want):
+    for i, (g, w) in enumerate(zip(got, want)):
+        if g != w:
+            print(f"[FAIL] row {i}: columnar {g} != {label} {w}")
+            return False
+    return True
+
+
+def check_parity(rows, seed):
+    columns = synthetic_columns(rows, seed)
+    inputs = block_inputs(columns, rows)
+    got = _columnar(enrich_columns(*inputs))
+    if not _compare("enrich_lead", got, _expected(_cases(inputs))):
+        return False
+    print(f"[OK] parity on {rows:,} rows: {enrich_columns(*inputs).counts()}")
+    return True
+
+
+TS_DRIVER = """
+import { readFileSync } from "node:fs";
+import { calculateElectricBill, calculateEstimatedEquity, calculateEstimatedValue, lookupUtility } from %s;
+
+const cases = JSON.parse(readFileSync(0, "utf8"));
+const out = cases.map(([zip, sqft, county, balance]) => {
+  const utility = lookupUtility(zip);
+  const area = sqft || 2000;
+  const value = calculateEstimatedValue(area, county || undefined);
+  return [utility.id, value, calculateElectricBill(area, utility), calculateEstimatedEquity(value, balance ?? undefined)];
+});
+process.stdout.write(JSON.stringify(out));
+"""
+
+
+def check_ts(rows, seed):
+    """Parity against enrichment.ts itself; None when tsx isn't installed."""
+    source = os.path.abspath(os.path.join(COMPASS_DIR, "server", "enrichment.ts"))
+    tsx = os.path.join(COMPASS_DIR, "node_modules", ".bin", "tsx")
+    if not os.path.exists(tsx):
+        print(f"[WARN] {tsx} not found; run `npm install` in apps/compass for the enrichment.ts check")
+        return None
+    columns = synthetic_columns(rows, seed)
+    inputs = block_inputs(columns, rows)
+    cases = _cases(inputs)
+    with tempfile.NamedTemporaryFile("w", suffix=".ts", dir=os.path.dirname(source), delete=False) as f:
+        f.write(TS_DRIVER % json.dumps("./" + os.path.basename(source)))
+    try:
+        done = subprocess.run([tsx, f.name], input=json.dumps(cases), capture_output=True, text=True,
+                              cwd=COMPASS_DIR)
+    finally:
+        os.unlink(f.name)
+    if done.returncode:
+        print(f"[FAIL] tsx exited {done.returncode}: {done.stderr.strip()[-500:]}")
+        return False
+    want = [tuple(row) for row in json.loads(done.stdout)]
+    if not _compare("enrichment.ts", _columnar(enrich_columns(*inputs)), want):
+        return False
+    print(f"[OK] enrichment.ts parity on {rows:,} rows")
+    return True
+
+
+def timed(label, rows, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {elapsed:7.3f}s  {rows / elapsed:>14,.0f} rows/s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lead enrichment parity check and benchmark.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows to benchmark")
+    parser.add_argument("--parity-rows", type=int, default=200_000, help="rows to check against enrich_lead")
+    parser.add_argument("--ts", action="store_true", help="also check against enrichment.ts (needs tsx)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not check_parity(args.parity_rows, args.seed):
+        return 1
+    if args.ts and check_ts(min(args.parity_rows, 50_000), args.seed) is False:
+        return 1
+
+    columns = synthetic_columns(args.rows, args.seed + 1)
+    inputs = block_inputs(columns, args.rows)
+    print(f"Benchmark ({args.rows:,} rows, {len(UTILITY_IDS)} utilities):")
+    timed("block_inputs (parse)", args.rows, lambda: block_inputs(columns, args.rows))
+    timed("enrich_columns", args.rows, lambda: enrich_columns(*inputs))
+    timed("enrich_block", args.rows, lambda: enrich_block(columns, args.rows))
+
+    sample = min(args.rows, 200_000)
+    cases = _cases(tuple(column[:sample] for column in inputs))
+    timed("enrich_lead (per row)", sample, lambda: _expected(cases))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Parity check and benchmark for the columnar TCPA classifier.
+
+Generates synthetic PropStream phone/DNC columns (blank cells, stray
+whitespace, lower-case "dnc", DNC flags on empty phones), checks that
+leads.columnar agrees with the row-at-a-time port of classifier.ts on
+every row, then times both.
+
+    python scripts/bench_tcpa.py                 # 2M rows
+    python scripts/bench_tcpa.py --rows 10000000 --parity-rows 500000
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from leads.classifier import calculate_safe_percentage, classify_lead, get_compliance_status
+from leads.columnar import classify_columns, classify_masks, dnc_mask, phone_mask, safe_percentage
+from leads.propstream import PROPSTREAM_PHONE_DNC_PAIRS
+
+# (value, weight): mostly what PropStream emits, plus hand-edited oddities
+PHONE_VALUES = [("", 0.45), ("(704) 555-0100", 0.2), ("7045550101", 0.3),
+                (" 704-555-0102 ", 0.03), ("   ", 0.02)]
+DNC_VALUES = [("", 0.6), ("DNC", 0.35), ("dnc", 0.02), (" DNC ", 0.02), ("Y", 0.01)]
+
+
+def _draw(rng, weighted, rows):
+    values, weights = zip(*weighted)
+    return np.array(values)[rng.choice(len(values), rows, p=weights)]
+
+
+def synthetic_columns(rows, seed):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for pair in PROPSTREAM_PHONE_DNC_PAIRS:
+        columns[pair["phone"]] = _draw(rng, PHONE_VALUES, rows)
+        columns[pair["dnc"]] = _draw(rng, DNC_VALUES, rows)
+    # Some leads have no phones at all, some only the first pair
+    empty = rng.random(rows) < 0.1
+    for pair in PROPSTREAM_PHONE_DNC_PAIRS:
+        columns[pair["phone"]][empty] = ""
+    return columns
+
+
+def check_parity(rows, seed):
+    columns = synthetic_columns(rows, seed)
+    result = classify_columns(columns)
+    levels = result.risk_levels().tolist()
+    statuses = result.compliance_status().tolist()
+    keys = list(columns)
+    analyses = []
+    for i, values in enumerate(zip(*(columns[k].tolist() for k in keys))):
+        expected = classify_lead(dict(zip(keys, values)))
+        analyses.append(expected)
+        got = (levels[i], int(result.dnc_count[i]), int(result.callable_count[i]),
+               int(result.phone_count[i]), statuses[i])
+        want = (expected["riskLevel"], expected["dncCount"], expected["callableCount"],
+                expected["phoneCount"], get_compliance_status(expected["riskLevel"]))
+        if got != want:
+            print(f"[FAIL] row {i}: columnar {got} != classifier {want}")
+            return False
+    if safe_percentage(result.counts()) != calculate_safe_percentage(analyses):
+        print("[FAIL] safe percentage differs")
+        return False
+    print(f"[OK] parity on {rows:,} rows: {result.counts()}")
+    return True
+
+
+def timed(label, rows, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<28} {elapsed:7.3f}s  {rows / elapsed:>14,.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TCPA classifier parity check and benchmark.")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="rows to benchmark")
+    parser.add_argument("--parity-rows", type=int, default=200_000, help="rows to check against classify_lead")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if not check_parity(args.parity_rows, args.seed):
+        return 1
+
+    columns = synthetic_columns(args.rows, args.seed + 1)
+    has_phone = np.column_stack([phone_mask(columns[p["phone"]]) for p in PROPSTREAM_PHONE_DNC_PAIRS])
+    is_dnc = np.column_stack([dnc_mask(columns[p["dnc"]]) for p in PROPSTREAM_PHONE_DNC_PAIRS])
+
+    print(f"Benchmark ({args.rows:,} rows, {len(PROPSTREAM_PHONE_DNC_PAIRS)} phone/DNC pairs):")
+    timed("classify_masks", args.rows, lambda: classify_masks(has_phone, is_dnc))
+    timed("classify_columns (strings)", args.rows, lambda: classify_columns(columns))
+
+    sample = min(args.rows, 200_000)
+    keys = list(columns)
+    rows = [dict(zip(keys, values)) for values in zip(*(columns[k][:sample].tolist() for k in keys))]
+    timed("classify_lead (per row)", sample, lambda: [classify_lead(r) for r in rows])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
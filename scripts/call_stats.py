@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Per-rep call statistics from a local rollup of Twenty callRecords (stats/rollup.py).
+
+    python scripts/call_stats.py sync                    # first run sweeps every record
+    python scripts/call_stats.py sync --rebuild
+    python scripts/call_stats.py serve --port 8788       # JSON API, re-syncs every 30s
+    python scripts/call_stats.py today --rep <workspaceMemberId>
+    python scripts/call_stats.py efficiency --rep <workspaceMemberId> --days 7
+
+The dashboard's getTodayStats()/calculateEfficiencyMetrics() shapes are
+served at /stats/today and /stats/efficiency. Stats are per rep, so the
+server binds to 127.0.0.1 and wants LIDS_SERVICE_TOKEN (or --token) as a
+bearer token.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import time
+
+from stats.rollup import CallRollup, StatsServer
+from twenty import auth, profile
+
+
+def cmd_sync(args):
+    rollup = CallRollup()
+    if args.rebuild:
+        rollup.rebuild()
+    started = time.time()
+    last = [0.0]
+
+    def progress(added):
+        if time.time() - last[0] >= 5.0:
+            last[0] = time.time()
+            print(f"  {added:,} records  ({time.time() - started:.0f}s)")
+
+    added = rollup.sync(page_size=args.page_size, progress=progress)
+    status = rollup.status()
+    print(f"[DONE] {added:,} new records in {time.time() - started:.1f}s "
+          f"({status['records']:,} total, {status['rows']:,} rollup rows, watermark {status['watermark']})")
+    return 0
+
+
+def cmd_serve(args):
+    problem = auth.check_arguments(args)
+    if problem:
+        print(f"[ERROR] {problem}")
+        return 1
+    rollup = CallRollup()
+    print("Syncing before serving...")
+    rollup.sync(page_size=args.page_size)
+    server = StatsServer(rollup, host=args.host, port=args.port, sync_every=args.sync_every,
+                         cors_origin=args.cors_origin, token=args.token)
+
+    def stop(signum, frame):
+        server.stop.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Serving call stats on http://{args.host}:{args.port}/ (sync every {args.sync_every:g}s)")
+    server.serve()
+    return 0
+
+
+def cmd_today(args):
+    print(json.dumps(CallRollup().today_stats(args.rep, args.day), indent=2))
+    return 0
+
+
+def cmd_efficiency(args):
+    print(json.dumps(CallRollup().efficiency(args.rep, args.days), indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-rep call-record rollup.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sync", help="fold new call records into the rollup")
+    p.add_argument("--rebuild", action="store_true", help="drop the rollup and sweep every record")
+    p.add_argument("--page-size", type=int)
+    p.set_defaults(fn=cmd_sync)
+
+    p = sub.add_parser("serve", help="serve the rollup over HTTP")
+    auth.add_arguments(p)
+    p.add_argument("--port", type=int, default=8788)
+    p.add_argument("--sync-every", type=float, default=30.0, help="seconds between syncs (0 = never)")
+    p.add_argument("--page-size", type=int)
+    p.set_defaults(fn=cmd_serve)
+
+    p = sub.add_parser("today", help="getTodayStats() from the rollup")
+    p.add_argument("--rep", help="workspace member id (default: everyone)")
+    p.add_argument("--day", help="YYYY-MM-DD (UTC, default: today)")
+    p.set_defaults(fn=cmd_today)
+
+    p = sub.add_parser("efficiency", help="calculateEfficiencyMetrics() from the rollup")
+    p.add_argument("--rep", required=True, help="workspace member id")
+    p.add_argument("--days", type=int, default=7)
+    p.set_defaults(fn=cmd_efficiency)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+Webhook-fed cache of Twenty records with an SSE change stream.
+
+Twenty pushes record events to POST /webhook; the server keeps people,
+repProgressions and callRecords in memory (persisted to SQLite) and
+serves reads and a Server-Sent Events stream, so dashboards stop polling
+Twenty:
+
+    from cdc import CDCServer, RecordStore, resolve_objects
+
+    objects = resolve_objects(["people", "repProgressions"])
+    store = RecordStore.for_workspace(objects, workspace_key())
+    asyncio.run(CDCServer(store, objects, secret=secret, client=get_client()).serve())
+"""
+
+from .server import CDCServer, resolve_objects, subscribe
+from .store import Change, RecordStore
+
+__all__ = ["CDCServer", "Change", "RecordStore", "resolve_objects", "subscribe"]
@@ -0,0 +1,353 @@
+"""
+asyncio webhook receiver and read/SSE API over a RecordStore.
+
+    POST /webhook                          Twenty webhook deliveries ({object}.created/updated/deleted/...)
+    GET  /records/<plural>[?path=value&limit=&offset=]   {"seq": n, "records": [...]}
+    GET  /records/<plural>/<id>
+    GET  /events[?objects=people,callRecords][&since=n]  text/event-stream
+    GET  /health
+
+Reads need the service token (twenty.auth) and webhooks a valid signature.
+
+Dashboards read once, then subscribe from the returned seq (or let
+EventSource resume with Last-Event-ID). Each SSE event is named after its
+object and carries the Change as JSON:
+
+    id: 1042
+    event: repProgressions
+    data: {"seq": 1042, "object": "repProgressions", "op": "upsert", "id": "...", "record": {...}}
+
+If the change log no longer reaches back to a client's position, it gets
+an `event: reset` with the current seq and should re-read. Slow clients
+whose queue fills up are disconnected and resume the same way.
+
+Webhooks are the only source of changes while running. A catch-up sweep
+(updatedAt >= watermark, plus records soft-deleted since) runs at startup
+and every catch_up_every seconds to cover missed deliveries; an empty
+object is backfilled in full first. Only sweeps move the watermark (to the
+last updatedAt they read), and each sweep starts SWEEP_OVERLAP seconds
+before it to pick up writes that committed late.
+"""
+
+import asyncio
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+from leads.assign import verify_signature
+from twenty.auth import DEFAULT_HOST, verify_token
+from twenty.export import exported_fields, projection
+from twenty.metadata import get_metadata
+from twenty.pagination import iter_changes, rewind
+
+HEARTBEAT = 15.0
+SWEEP_OVERLAP = 300.0
+CLIENT_QUEUE = 1_000
+MAX_HEADER = 64 * 1024
+MAX_BODY = 8 * 1024 * 1024
+
+UPSERT_EVENTS = {"created", "updated", "restored", "upserted"}
+DELETE_EVENTS = {"deleted", "destroyed"}
+
+REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+def resolve_objects(plurals, meta=None):
+    """{plural: (singular, GraphQL projection)} for the cached objects, from workspace metadata."""
+    meta = meta or get_metadata()
+    by_plural = {obj.get("namePlural"): name for name, obj in meta.objects().items()}
+    missing = [p for p in plurals if p not in by_plural]
+    if missing:
+        raise ValueError(f"no object with plural name {', '.join(map(repr, missing))}")
+    return {p: (by_plural[p], projection(exported_fields(meta.fields(by_plural[p])))) for p in plurals}
+
+
+class Subscriber:
+    def __init__(self, objects):
+        self.objects = objects          # set of plural names, or None for all
+        self.queue = asyncio.Queue(maxsize=CLIENT_QUEUE)
+        self.overflowed = False
+        self.task = asyncio.current_task()
+
+    def close(self):
+        try:
+            self.queue.put_nowait(None)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def offer(self, change):
+        if self.objects is not None and change.object not in self.objects:
+            return
+        try:
+            self.queue.put_nowait(change)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class CDCServer:
+    """Serve a RecordStore; `objects` maps plural name -> (singular name, GraphQL projection)."""
+
+    def __init__(self, store, objects, host=DEFAULT_HOST, port=8789, secret=None, client=None,
+                 catch_up_every=900.0, cors_origin=None, token=None):
+        self.store = store
+        self.objects = objects
+        self.plural = {singular: plural for plural, (singular, _) in objects.items()}
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self.client = client
+        self.catch_up_every = catch_up_every
+        self.cors_origin = cors_origin
+        self.token = token
+        self.subscribers = set()
+        self.counts = {"webhooks": 0, "applied": 0, "ignored": 0, "rejected": 0, "swept": 0, "sweepErrors": 0}
+        self.last_sweep = None
+        self.stopping = None
+
+    # Changes
+
+    def publish(self, changes):
+        for change in changes:
+            for subscriber in self.subscribers:
+                subscriber.offer(change)
+
+    def handle_webhook(self, payload):
+        """Apply one delivery. Returns True if it changed the store."""
+        event = payload.get("eventName") or ""
+        singular, _, action = event.partition(".")
+        record = payload.get("record") or {}
+        plural = self.plural.get(singular)
+        if plural is None or not record.get("id") or action not in UPSERT_EVENTS | DELETE_EVENTS:
+            self.counts["ignored"] += 1
+            return False
+        change = self.store.apply(plural, "delete" if action in DELETE_EVENTS else "upsert", record)
+        if change is None:
+            self.counts["ignored"] += 1
+            return False
+        self.counts["applied"] += 1
+        self.publish([change])
+        return True
+
+    async def sweep_object(self, plural):
+        """Backfill (empty object) or catch up one object from Twenty."""
+        singular, fields = self.objects[plural]
+        type_name = singular[0].upper() + singular[1:]
+        since = rewind(self.store.watermark(plural), SWEEP_OVERLAP)
+        passes = [(since, False)] + ([(since, True)] if since else [])
+        for since, deleted in passes:
+            pages = iter_changes(plural, fields, since, deleted, client=self.client, type_name=type_name)
+            while True:
+                nodes = await asyncio.to_thread(next, pages, None)
+                if nodes is None:
+                    break
+                changes = self.store.apply_many(plural, "delete" if deleted else "upsert", nodes)
+                if nodes and not deleted:
+                    # pages come in updatedAt order, so everything before the last one has been read
+                    self.store.advance(plural, max(n.get("updatedAt") or "" for n in nodes))
+                self.counts["swept"] += len(changes)
+                self.publish(changes)
+
+    async def sweep_all(self):
+        for plural in self.objects:
+            try:
+                await self.sweep_object(plural)
+            except Exception as e:  # keep serving what we have; the next sweep retries
+                self.counts["sweepErrors"] += 1
+                print(f"[WARN] sweep of {plural} failed: {e}")
+        self.last_sweep = time.time()
+
+    async def _sweep_loop(self):
+        while True:
+            await self.sweep_all()
+            if not self.catch_up_every:
+                return
+            try:
+                await asyncio.wait_for(self.stopping.wait(), self.catch_up_every)
+                return
+            except asyncio.TimeoutError:
+                pass
+
+    # HTTP
+
+    async def _respond(self, writer, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}", f"Content-Length: {len(payload)}",
+                 "Connection: close"]
+        if body is not None:
+            lines.append("Content-Type: application/json")
+        if self.cors_origin:
+            lines.append(f"Access-Control-Allow-Origin: {self.cors_origin}")
+        lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + payload)
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            request_line, *header_lines = head.decode("latin-1").split("\r\n")
+            parts = request_line.split(" ")
+            if len(parts) != 3:
+                await self._respond(writer, 400, {"error": "bad request line"})
+                return
+            method, target, _ = parts
+            headers = {}
+            for line in header_lines:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().title()] = value.strip()
+            length = int(headers.get("Content-Length") or 0)
+            if length > MAX_BODY:
+                await self._respond(writer, 413, {"error": "body too large"})
+                return
+            body = await reader.readexactly(length) if length else b""
+            await self.route(method, urlparse(target), headers, body, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def route(self, method, url, headers, body, writer):
+        path = url.path.rstrip("/") or "/"
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method == "OPTIONS":
+            await self._respond(writer, 204, headers={"Access-Control-Allow-Methods": "GET, POST",
+                                                      "Access-Control-Allow-Headers": "Authorization, Last-Event-ID, Content-Type"})
+            return
+        if path == "/webhook":
+            if method != "POST":
+                await self._respond(writer, 405, {"error": "POST only"})
+                return
+            self.counts["webhooks"] += 1
+            if not verify_signature(self.secret, body, headers):
+                self.counts["rejected"] += 1
+                await self._respond(writer, 401)
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                await self._respond(writer, 400, {"error": "invalid JSON"})
+                return
+            self.handle_webhook(payload if isinstance(payload, dict) else {})
+            await self._respond(writer, 204)
+            return
+        if method != "GET":
+            await self._respond(writer, 405, {"error": "GET only"})
+            return
+        if path != "/health" and not verify_token(self.token, headers, query):
+            await self._respond(writer, 401, {"error": "missing or wrong token"})
+            return
+        query.pop("token", None)
+        if path == "/events":
+            await self.stream(writer, query, headers)
+            return
+        if path == "/health":
+            await self._respond(writer, 200, dict(self.store.status(), subscribers=len(self.subscribers),
+                                                  counts=self.counts, lastSweep=self.last_sweep))
+            return
+        segments = path.strip("/").split("/")
+        if segments[0] == "records" and len(segments) in (2, 3) and segments[1] in self.objects:
+            if len(segments) == 3:
+                record = self.store.get(segments[1], segments[2])
+                await self._respond(writer, 200 if record else 404, record or {"error": "not found"})
+                return
+            try:
+                limit = int(query.pop("limit")) if "limit" in query else None
+                offset = int(query.pop("offset", 0))
+            except ValueError:
+                await self._respond(writer, 400, {"error": "limit and offset must be integers"})
+                return
+            seq, records = self.store.query(segments[1], query, limit, offset)
+            await self._respond(writer, 200, {"seq": seq, "records": records})
+            return
+        await self._respond(writer, 404, {"error": "not found"})
+
+    async def stream(self, writer, query, headers):
+        objects = set(query["objects"].split(",")) if query.get("objects") else None
+        if objects and not objects <= set(self.objects):
+            await self._respond(writer, 400, {"error": f"unknown objects: {sorted(objects - set(self.objects))}"})
+            return
+        since = headers.get("Last-Event-Id") or query.get("since")
+        lines = ["HTTP/1.1 200 OK", "Content-Type: text/event-stream", "Cache-Control: no-cache",
+                 "Connection: keep-alive", "X-Accel-Buffering: no"]
+        if self.cors_origin:
+            lines.append(f"Access-Control-Allow-Origin: {self.cors_origin}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\nretry: 3000\n\n").encode())
+
+        subscriber = Subscriber(objects)
+        self.subscribers.add(subscriber)   # before replaying, so nothing falls in between
+        try:
+            sent = self.store.seq
+            if since is not None:
+                backlog = self.store.since(int(since)) if since.isdigit() else None
+                if backlog is None:
+                    writer.write(f"event: reset\ndata: {json.dumps({'seq': self.store.seq})}\n\n".encode())
+                else:
+                    for change in backlog:
+                        if objects is None or change.object in objects:
+                            writer.write(_event(change))
+            await writer.drain()
+            while not subscriber.overflowed:
+                try:
+                    change = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT)
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")
+                else:
+                    if change is None:
+                        break
+                    if change.seq <= sent:      # already in the replayed backlog
+                        continue
+                    writer.write(_event(change))
+                await writer.drain()
+        finally:
+            self.subscribers.discard(subscriber)
+
+    # Lifecycle
+
+    async def serve(self):
+        """Serve until stop() is called."""
+        self.stopping = asyncio.Event()
+        server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEADER)
+        sweeper = asyncio.create_task(self._sweep_loop()) if self.client is not None else None
+        async with server:
+            await self.stopping.wait()
+        if sweeper is not None:
+            sweeper.cancel()
+        streams = list(self.subscribers)
+        for subscriber in streams:
+            subscriber.close()
+        await asyncio.gather(*(s.task for s in streams), return_exceptions=True)
+        self.store.commit()
+
+    def stop(self):
+        if self.stopping is not None:
+            self.stopping.set()
+
+
+def _event(change):
+    return f"id: {change.seq}\nevent: {change.object}\ndata: {json.dumps(change.to_json())}\n\n".encode()
+
+
+def subscribe(client, target_url, singulars, secret=None, description="LIDS CDC cache"):
+    """Create or update the Twenty webhook that delivers <object>.* events to target_url."""
+    operations = sorted(f"{name}.*" for name in singulars)
+    body = client.get("/rest/webhooks")
+    existing = next((w for w in (body.get("data") or {}).get("webhooks", []) if w.get("targetUrl") == target_url),
+                    None)
+    if existing is None:
+        payload = {"targetUrl": target_url, "operations": operations, "description": description}
+        if secret:
+            payload["secret"] = secret
+        client.post("/rest/webhooks", json=payload)
+        return "created"
+    if sorted(existing.get("operations") or []) == operations:
+        return "unchanged"
+    client.patch(f"/rest/webhooks/{existing['id']}", json={"operations": operations})
+    return "updated"
@@ -0,0 +1,221 @@
+"""
+Materialized copy of Twenty records, fed by webhooks, with a change log.
+
+Records live in memory for reads and are written through to SQLite so a
+restart does not need a full resync. Every applied change gets a sequence
+number and goes into a bounded in-memory log, which SSE clients replay
+from (Last-Event-ID) after a reconnect.
+
+    store = RecordStore(["people", "repProgressions", "callRecords"])
+    change = store.apply("people", "upsert", record)   # None if stale or unchanged
+    seq, rows = store.query("repProgressions", {"workspaceMemberId": rep})
+"""
+
+import json
+import os
+import sqlite3
+from collections import deque
+
+from twenty.metadata import CACHE_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    object TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (object, id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+LOG_SIZE = 10_000
+
+
+def path_value(record, path):
+    """record["a"]["b"] for "a.b"; None when any step is missing."""
+    value = record
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _text(value):
+    """Query-string form of a value, for equality filters."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class Change:
+    __slots__ = ("seq", "object", "op", "id", "record")
+
+    def __init__(self, seq, object, op, id, record):
+        self.seq = seq
+        self.object = object
+        self.op = op            # "upsert" or "delete"
+        self.id = id
+        self.record = record
+
+    def to_json(self):
+        return {"seq": self.seq, "object": self.object, "op": self.op, "id": self.id, "record": self.record}
+
+
+class RecordStore:
+    """In-memory records per object (plural name) with SQLite write-through.
+
+    Not thread-safe: the CDC server calls it from its event loop only, and
+    sweeps running on worker threads hand their pages back to the loop.
+    """
+
+    def __init__(self, objects, path=None, log_size=LOG_SIZE):
+        self.objects = list(objects)
+        self.path = path
+        self.records = {name: {} for name in self.objects}
+        self.log = deque(maxlen=log_size)
+        self.seq = 0
+        self.watermarks = {}
+        self.db = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.executescript(SCHEMA)
+            self._load()
+
+    @classmethod
+    def for_workspace(cls, objects, key):
+        return cls(objects, os.path.join(CACHE_DIR, f"cdc-cache-{key}.sqlite"))
+
+    def _load(self):
+        for object_name, data in self.db.execute("SELECT object, data FROM records"):
+            if object_name in self.records:
+                record = json.loads(data)
+                self.records[object_name][record["id"]] = record
+        self.seq = int(self.get_state("seq") or 0)
+        self.watermarks = {name: self.get_state(f"watermark:{name}") for name in self.objects}
+
+    # State
+
+    def get_state(self, key, default=None):
+        if self.db is None:
+            return default
+        row = self.db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_state(self, key, value):
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def commit(self):
+        if self.db is not None:
+            self.set_state("seq", self.seq)
+            self.db.commit()
+
+    def watermark(self, object_name):
+        """Latest updatedAt a catch-up sweep has read up to for an object."""
+        return self.watermarks.get(object_name)
+
+    def advance(self, object_name, updated):
+        """Move the watermark forward to updated; only sweeps call this.
+
+        Webhooks don't advance it: a lost delivery older than a later one
+        would then fall below the watermark and no sweep would find it.
+        """
+        if updated and updated > (self.watermarks.get(object_name) or ""):
+            self.watermarks[object_name] = updated
+            self.set_state(f"watermark:{object_name}", updated)
+            self.commit()
+
+    def empty(self, object_name):
+        return not self.records[object_name] and self.watermark(object_name) is None
+
+    # Changes
+
+    def apply(self, object_name, op, record, commit=True):
+        """Apply one upsert/delete. Returns the Change, or None when it is stale or a no-op.
+
+        Upserts merge into the stored record (webhooks for updates may carry
+        only some fields) and are ignored if older than what is stored.
+        """
+        records = self.records[object_name]
+        record_id = record["id"]
+        current = records.get(record_id)
+        updated = record.get("updatedAt")
+        if current is not None and updated and (current.get("updatedAt") or "") > updated:
+            return None
+        if op == "delete" or record.get("deletedAt"):
+            if current is None:
+                return None
+            del records[record_id]
+            if self.db is not None:
+                self.db.execute("DELETE FROM records WHERE object = ? AND id = ?", (object_name, record_id))
+            change_record = None
+            op = "delete"
+        else:
+            merged = dict(current, **record) if current else dict(record)
+            if merged == current:
+                return None
+            records[record_id] = merged
+            if self.db is not None:
+                self.db.execute("INSERT OR REPLACE INTO records (object, id, data) VALUES (?, ?, ?)",
+                                (object_name, record_id, json.dumps(merged)))
+            change_record = merged
+        self.seq += 1
+        change = Change(self.seq, object_name, op, record_id, change_record)
+        self.log.append(change)
+        if commit:
+            self.commit()
+        return change
+
+    def apply_many(self, object_name, op, records):
+        changes = [c for c in (self.apply(object_name, op, r, commit=False) for r in records) if c]
+        self.commit()
+        return changes
+
+    def since(self, seq):
+        """Changes after seq, or None if the log no longer reaches back that far."""
+        if seq > self.seq:     # from a previous store (rebuilt cache)
+            return None
+        if seq == self.seq:
+            return []
+        if not self.log or self.log[0].seq > seq + 1:
+            return None
+        return [c for c in self.log if c.seq > seq]
+
+    # Reads
+
+    def query(self, object_name, filters=None, limit=None, offset=0):
+        """(seq, records) matching equality filters on dotted paths. seq is the
+        point to subscribe from so no change is missed between read and stream."""
+        rows = self.records[object_name].values()
+        if filters:
+            rows = (r for r in rows if all(_text(path_value(r, k)) == v for k, v in filters.items()))
+        rows = list(rows)
+        rows.sort(key=lambda r: r.get("createdAt") or "", reverse=True)
+        end = None if limit is None else offset + limit
+        return self.seq, rows[offset:end]
+
+    def get(self, object_name, record_id):
+        return self.records[object_name].get(record_id)
+
+    def status(self):
+        return {
+            "seq": self.seq,
+            "logFrom": self.log[0].seq if self.log else None,
+            "objects": {name: {"records": len(self.records[name]), "watermark": self.watermark(name)}
+                        for name in self.objects},
+        }
+
+    def close(self):
+        if self.db is not None:
+            self.commit()
+            self.db.close()
+            self.db = None
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Webhook-fed cache of Twenty records with an SSE change stream (cdc/).
+
+    python scripts/cdc_cache.py serve --subscribe https://lids.example.com/cdc/webhook
+    python scripts/cdc_cache.py serve --port 8789 --objects people repProgressions callRecords
+    python scripts/cdc_cache.py subscribe https://lids.example.com/cdc/webhook
+    python scripts/cdc_cache.py status
+
+Replaces per-tab polling (startPeriodicSync() every 5 minutes,
+startAutoSync() every 30s): dashboards read /records/<object> once and
+then follow /events. Twenty is only read for the initial backfill and the
+catch-up sweep (records updated since the last one seen), every
+--catch-up-every seconds.
+
+TWENTY_WEBHOOK_SECRET (or --secret) must match the webhook's secret, and
+readers send LIDS_SERVICE_TOKEN (or --token) as a bearer token; the server
+binds to 127.0.0.1 unless --host says otherwise.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+
+from cdc import CDCServer, RecordStore, resolve_objects, subscribe
+from twenty import auth, profile
+from twenty.client import TwentyError, get_client
+from twenty.metadata import workspace_key
+
+DEFAULT_OBJECTS = ["people", "repProgressions", "callRecords"]
+
+
+def open_store(plurals, rebuild=False):
+    store = RecordStore.for_workspace(plurals, workspace_key())
+    if rebuild:
+        store.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(store.path + suffix):
+                os.remove(store.path + suffix)
+        store = RecordStore.for_workspace(plurals, workspace_key())
+    return store
+
+
+def cmd_serve(args):
+    problem = auth.check_arguments(args, webhooks=True)
+    if problem:
+        print(f"[ERROR] {problem}")
+        return 1
+    client = get_client()
+    try:
+        objects = resolve_objects(args.objects)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    if args.subscribe:
+        try:
+            result = subscribe(client, args.subscribe, [singular for singular, _ in objects.values()], args.secret)
+        except TwentyError as e:
+            print(f"[ERROR] could not register the webhook: {e}")
+            return 1
+        print(f"Webhook {args.subscribe}: {result}")
+    if not args.secret:
+        print("[WARN] --unsigned-webhooks: anyone who can reach /webhook can write to the cache")
+    if not args.token:
+        print("[WARN] --no-auth: records are served to anyone who can reach the port")
+
+    store = open_store(args.objects, args.rebuild)
+    server = CDCServer(store, objects, host=args.host, port=args.port, secret=args.secret, client=client,
+                       catch_up_every=args.catch_up_every, cors_origin=args.cors_origin, token=args.token)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, server.stop)
+        print(f"Serving {', '.join(args.objects)} on http://{args.host}:{args.port}/ "
+              f"(catch-up every {args.catch_up_every:g}s, cache {store.path})")
+        await server.serve()
+
+    try:
+        asyncio.run(run())
+    finally:
+        store.close()
+    print(f"[DONE] {json.dumps(server.counts)}")
+    return 0
+
+
+def cmd_subscribe(args):
+    try:
+        objects = resolve_objects(args.objects)
+        result = subscribe(get_client(), args.url, [singular for singular, _ in objects.values()], args.secret)
+    except (ValueError, TwentyError) as e:
+        print(f"[ERROR] {e}")
+        return 1
+    print(f"[DONE] webhook {args.url}: {result}")
+    return 0
+
+
+def cmd_status(args):
+    store = open_store(args.objects)
+    print(json.dumps(dict(store.status(), path=store.path), indent=2))
+    store.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook-fed Twenty record cache with an SSE change stream.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--objects", nargs="+", default=DEFAULT_OBJECTS, help="plural object names")
+        p.add_argument("--secret", default=os.environ.get("TWENTY_WEBHOOK_SECRET"), help="webhook HMAC secret")
+
+    p = sub.add_parser("serve", help="receive webhooks and serve /records and /events")
+    common(p)
+    auth.add_arguments(p, webhooks=True)
+    p.add_argument("--port", type=int, default=8789)
+    p.add_argument("--catch-up-every", type=float, default=900.0,
+                   help="seconds between catch-up sweeps for missed webhooks (0 = startup only)")
+    p.add_argument("--subscribe", metavar="URL", help="register (or update) the Twenty webhook for URL first")
+    p.add_argument("--rebuild", action="store_true", help="drop the local cache and backfill")
+    p.set_defaults(fn=cmd_serve)
+
+    p = sub.add_parser("subscribe", help="register (or update) the Twenty webhook")
+    common(p)
+    p.add_argument("url", help="public URL of this server's /webhook")
+    p.set_defaults(fn=cmd_subscribe)
+
+    p = sub.add_parser("status", help="records and watermarks in the local cache")
+    p.add_argument("--objects", nargs="+", default=DEFAULT_OBJECTS, help="plural object names")
+    p.set_defaults(fn=cmd_status)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
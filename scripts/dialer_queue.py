@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Prioritized, calling-window-aware dialer queue per rep (leads/dialer.py).
+
+    python scripts/dialer_queue.py serve --port 8793            # /next?rep=DAVID_EDWARDS&n=10&hold=300
+    python scripts/dialer_queue.py next DAVID_EDWARDS -n 20     # one-off: sync, print the next leads
+    python scripts/dialer_queue.py reps                         # dialable / waiting / closed per rep
+
+The dialer asks /next for the rep's next leads instead of loading and
+sorting the whole list, and can POST /calls after each dial so the lead
+starts its cooldown before callRecords are next synced (every
+--sync-every seconds). The queue holds lead names, phones and addresses,
+so the server binds to 127.0.0.1 and wants LIDS_SERVICE_TOKEN (or
+--token) as a bearer token.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import time
+
+from leads.dialer import TIERS, DialerQueue, DialerServer
+from leads.dnc import DncIndex
+from twenty import auth, profile
+
+
+def build_queue(args):
+    queue = DialerQueue(tiers=args.tiers, registry=DncIndex(args.dnc) if args.dnc else None)
+    started = time.time()
+    last = [0.0]
+
+    def progress(seen):
+        if time.time() - last[0] >= 5.0:
+            last[0] = time.time()
+            print(f"  {seen:,} records  ({time.time() - started:.0f}s)")
+
+    queue.sync(page_size=args.page_size, progress=progress)
+    status = queue.status()
+    print(f"Loaded {status['leads']:,} leads ({status['queued']:,} queued for {status['reps']} reps) "
+          f"in {time.time() - started:.1f}s", file=sys.stderr)
+    return queue
+
+
+def cmd_serve(args):
+    problem = auth.check_arguments(args)
+    if problem:
+        print(f"[ERROR] {problem}")
+        return 1
+    queue = build_queue(args)
+    server = DialerServer(queue, host=args.host, port=args.port, sync_every=args.sync_every,
+                          cors_origin=args.cors_origin, token=args.token)
+
+    def stop(signum, frame):
+        server.stop.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Serving the dialer queue on http://{args.host}:{args.port}/next (sync every {args.sync_every:g}s)")
+    server.serve()
+    return 0
+
+
+def cmd_next(args):
+    queue = build_queue(args)
+    leads = queue.next(args.rep, args.n)
+    if args.json:
+        print(json.dumps(leads, indent=2))
+        return 0
+    for lead in leads:
+        print(f"{lead['tier']:<9} {lead['attempts']:>2} {lead['lastDisposition'] or '-':<15} {lead['localTime']} "
+              f"{lead['name'][:28]:<28} {lead['phone']:<12} {lead['city']}, {lead['state']}")
+    print(f"[DONE] {len(leads)} dialable lead(s) for {args.rep}")
+    return 0
+
+
+def cmd_reps(args):
+    queue = build_queue(args)
+    summary = queue.summary()
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    print(f"{'rep':<24} {'dialable':>9} {'waiting':>9} {'closed':>9}")
+    for rep, counts in sorted(summary.items()):
+        print(f"{rep:<24} {counts['dialable']:>9,} {counts['waiting']:>9,} {counts['closed']:>9,}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prioritized dialer queue with TCPA calling windows.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--tiers", nargs="+", default=list(TIERS), help="TCPA tiers to dial, best first")
+        p.add_argument("--dnc", help="DNC index (dnc_index.py) checked when a lead has no tcpaStatus; "
+                       "without it such leads are UNVERIFIED and not dialed")
+        p.add_argument("--page-size", type=int)
+
+    p = sub.add_parser("serve", help="serve /next, /reps and /calls over HTTP")
+    common(p)
+    auth.add_arguments(p)
+    p.add_argument("--port", type=int, default=8793)
+    p.add_argument("--sync-every", type=float, default=15.0, help="seconds between syncs (0 = never)")
+    p.set_defaults(fn=cmd_serve)
+
+    p = sub.add_parser("next", help="print a rep's next dialable leads")
+    common(p)
+    p.add_argument("rep", help="assignedRep value")
+    p.add_argument("-n", type=int, default=10)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(fn=cmd_next)
+
+    p = sub.add_parser("reps", help="queue sizes per rep")
+    common(p)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(fn=cmd_reps)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
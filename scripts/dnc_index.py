@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Build and query the memory-mapped DNC registry index (leads/dnc.py).
+
+    python scripts/dnc_index.py build dnc.idx extracts/*.txt
+    python scripts/dnc_index.py update dnc.idx --add deltas/add-*.txt --delete deltas/del-*.txt
+    python scripts/dnc_index.py lookup dnc.idx "(704) 555-0100" 7045550101
+    python scripts/dnc_index.py stats dnc.idx
+
+update only merges delta files it hasn't seen (tracked in dnc.idx.json),
+so it is safe to point at the whole delta directory every night.
+"""
+
+import argparse
+import sys
+import time
+
+from leads.dnc import DncIndex, build, load_manifest, update
+
+
+def cmd_build(args):
+    started = time.time()
+    manifest = build(args.index, args.sources, args.delete or ())
+    print(f"Built {args.index}: {manifest['count']:,} numbers in {time.time() - started:.1f}s")
+    return 0
+
+
+def cmd_update(args):
+    started = time.time()
+    before = load_manifest(args.index)["count"]
+    manifest, changed = update(args.index, args.add or (), args.delete or ())
+    if not changed:
+        print("No new delta files.")
+        return 0
+    print(f"Updated {args.index}: {before:,} -> {manifest['count']:,} numbers "
+          f"in {time.time() - started:.1f}s")
+    return 0
+
+
+def cmd_lookup(args):
+    index = DncIndex(args.index)
+    listed = index.contains_many(args.phones)
+    for phone, hit in zip(args.phones, listed):
+        print(f"  {'DNC' if hit else 'ok ':<4} {phone}")
+    return 1 if listed.any() else 0
+
+
+def cmd_stats(args):
+    index = DncIndex(args.index)
+    manifest = load_manifest(args.index)
+    print(f"{args.index}: {len(index):,} numbers")
+    for source in manifest["sources"]:
+        print(f"  {source['kind']:<6} {source['path']}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DNC registry index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="build from registry extracts")
+    p.add_argument("index")
+    p.add_argument("sources", nargs="+", help="one number per line")
+    p.add_argument("--delete", nargs="*", help="numbers to leave out")
+    p.set_defaults(fn=cmd_build)
+
+    p = sub.add_parser("update", help="merge delta files")
+    p.add_argument("index")
+    p.add_argument("--add", nargs="*", help="numbers added to the registry")
+    p.add_argument("--delete", nargs="*", help="numbers removed from the registry")
+    p.set_defaults(fn=cmd_update)
+
+    p = sub.add_parser("lookup", help="check numbers (exit 1 if any are listed)")
+    p.add_argument("index")
+    p.add_argument("phones", nargs="+")
+    p.set_defaults(fn=cmd_lookup)
+
+    p = sub.add_parser("stats", help="show size and applied files")
+    p.add_argument("index")
+    p.set_defaults(fn=cmd_stats)
+
+    args = parser.parse_args()
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Rolling 7/30/90-day DPC tiers and a coaching report for every rep (stats/dpc.py).
+
+    python scripts/dpc_report.py --enrollments enrollments.jsonl              # calls from the rollup
+    python scripts/dpc_report.py --enrollments enrollments.jsonl --sync --series tiers.csv
+    python scripts/dpc_report.py --daily daily_metrics.csv --windows 7 30 --days 90
+    python scripts/dpc_report.py --enrollments e.jsonl --as-of 2026-06-30 --report coaching.json
+
+Dials and appointments come from the call-stats rollup (call_stats.py) unless
+a --daily DailyMetricsRecord export already has them. --series writes one row
+per rep, day and window; --report writes the coaching report as JSON.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from stats.dpc import TIERS, TRENDS, History, as_number, compute, day_string
+from twenty import profile
+
+
+def write_series(path, metrics, start):
+    rows = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rep", "day", "window", "dials", "enrollments", "confirmed", "appointments",
+                         "dpe", "ecr", "dpc", "ear", "tier", "trend", "coaching"])
+        for window, m in metrics.items():
+            days = m.dials.shape[1]
+            for r, rep in enumerate(m.reps):
+                for d in range(max(start, 0), days):
+                    writer.writerow([
+                        rep, day_string(m.first_day + d), window,
+                        m.dials[r, d], m.enrollments[r, d], m.confirmed[r, d], m.appointments[r, d],
+                        as_number(m.dpe[r, d]), int(m.ecr[r, d]), as_number(m.dpc[r, d]), int(m.ear[r, d]),
+                        TIERS[m.tier[r, d]], TRENDS[int(m.trend[r, d])], int(m.coaching[:, r, d].sum()),
+                    ])
+                    rows += 1
+    return rows
+
+
+def coaching_report(metrics, history, day):
+    report = []
+    for rep in history.reps:
+        entry = {"rep": rep, "name": history.names.get(rep), "windows": {}}
+        for window, m in metrics.items():
+            entry["windows"][str(window)] = m.at(rep, day)
+        entry["needsCoaching"] = any(w["coaching"]["needed"] for w in entry["windows"].values())
+        report.append(entry)
+    report.sort(key=lambda e: (not e["needsCoaching"], e["name"] or e["rep"]))
+    return {"asOf": day, "reps": report}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Historical DPC/ECR tiers and coaching report.")
+    parser.add_argument("--enrollments", help="EnrollmentRecord export (.jsonl or .csv)")
+    parser.add_argument("--daily", help="DailyMetricsRecord export (.jsonl or .csv)")
+    parser.add_argument("--no-calls", action="store_true", help="don't read dials from the call rollup")
+    parser.add_argument("--sync", action="store_true", help="sync the call rollup first")
+    parser.add_argument("--windows", type=int, nargs="+", default=[7, 30, 90])
+    parser.add_argument("--days", type=int, default=365, help="days of series to write")
+    parser.add_argument("--as-of", help="report day YYYY-MM-DD (default: last day with data)")
+    parser.add_argument("--series", help="write per-day tier series CSV here")
+    parser.add_argument("--report", help="write the coaching report JSON here (default: print a summary)")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    if not args.enrollments and not args.daily:
+        print("[ERROR] Give --enrollments and/or --daily.")
+        return 1
+
+    started = time.time()
+    history = History()
+    if not args.no_calls and not args.daily:
+        from stats.rollup import CallRollup
+
+        rollup = CallRollup()
+        if args.sync:
+            rollup.sync()
+        history.load_rollup(rollup)
+    if args.daily:
+        print(f"Loaded {history.load_daily(args.daily):,} daily rows")
+    if args.enrollments:
+        print(f"Loaded {history.load_enrollments(args.enrollments):,} enrollments")
+    loaded = time.time()
+
+    try:
+        metrics = compute(history, windows=args.windows, end=args.as_of)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    any_window = next(iter(metrics.values()))
+    last_index = any_window.dials.shape[1] - 1
+    day = day_string(any_window.first_day + last_index)
+    print(f"Computed {len(args.windows)} windows x {len(history.reps)} reps x {last_index + 1:,} days "
+          f"in {time.time() - loaded:.2f}s (load {loaded - started:.2f}s)")
+
+    if args.series:
+        rows = write_series(args.series, metrics, last_index + 1 - args.days)
+        print(f"[DONE] {rows:,} series rows -> {args.series}")
+
+    report = coaching_report(metrics, history, day)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"[DONE] coaching report -> {args.report}")
+        return 0
+
+    print(f"\nAs of {day}:")
+    for entry in report["reps"]:
+        tiers = "  ".join(f"{w}d {m['dpcTier']} (DPC {m['dpc']:g}, ECR {m['ecr']}%)"
+                          for w, m in entry["windows"].items())
+        print(f"  {entry['name'] or entry['rep']}: {tiers}")
+        reasons = {r for m in entry["windows"].values() for r in m["coaching"]["reasons"]}
+        for reason in sorted(reasons):
+            print(f"    [WARN] {reason}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Enrich a PropStream lead file with Compass's utility, bill, value and equity estimates.
+
+Runs the enrichment.ts calculations over the file in NumPy blocks (see
+leads/enrichment.py) and writes it back out with utility, utilityRate,
+monthlyElectricBill, estimatedValue and estimatedEquity columns appended.
+
+    python scripts/enrich_leads.py leads.csv                    # -> leads.enriched.csv
+    python scripts/enrich_leads.py leads.csv -o out.csv
+"""
+
+import argparse
+import csv
+import os
+import sys
+import time
+
+from leads.columnar import BLOCK_ROWS, iter_blocks
+from leads.enrichment import INPUT_COLUMNS, UTILITY_IDS, enrich_block
+from twenty import profile
+
+OUTPUT_COLUMNS = ["utility", "utilityRate", "monthlyElectricBill", "estimatedValue", "estimatedEquity"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrich a PropStream CSV with utility, bill, value and equity.")
+    parser.add_argument("csv", help="PropStream export (CSV)")
+    parser.add_argument("-o", "--output", help="default: <file>.enriched.csv")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS, help="rows per NumPy block")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    output = args.output or os.path.splitext(args.csv)[0] + ".enriched.csv"
+
+    rows = 0
+    utilities = dict.fromkeys(UTILITY_IDS, 0)
+    out = writer = None
+    started = time.time()
+    try:
+        for headers, block, columns in iter_blocks(args.csv, args.block_rows, phone_dnc_pairs=(),
+                                                   extra=INPUT_COLUMNS):
+            result = enrich_block(columns, len(block))
+            rows += len(block)
+            for utility, n in result.counts().items():
+                utilities[utility] += n
+            if writer is None:
+                out = open(output, "w", newline="")
+                writer = csv.writer(out)
+                writer.writerow(headers + OUTPUT_COLUMNS)
+            writer.writerows(row + list(values) for row, values in zip(block, result.rows()))
+    except OSError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    finally:
+        if out:
+            out.close()
+
+    elapsed = max(time.time() - started, 1e-9)
+    print(f"{rows:,} leads in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    for utility, n in utilities.items():
+        print(f"  {utility:<16} {n:>10,}")
+    if writer:
+        print(f"[DONE] Wrote {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
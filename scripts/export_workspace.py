@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Export Twenty objects to compressed shards with a manifest (twenty/export.py).
+
+    python scripts/export_workspace.py --out backups/2026-06-30
+    python scripts/export_workspace.py --out backups/2026-06-30 --objects people callRecords --shards 16
+    python scripts/export_workspace.py --out backups/parquet --format parquet --workers 12
+    python scripts/export_workspace.py --out backups/2026-06-30 --verify
+
+Re-running with the same --out resumes: shards already written are kept,
+failed or interrupted ones are exported again. Exit code 1 if any shard
+failed or (with --verify) no longer matches its checksum.
+"""
+
+import argparse
+import datetime
+import sys
+import threading
+import time
+
+from twenty import profile
+from twenty.export import FORMATS, Exporter, check_format, verify
+
+DEFAULT_OBJECTS = ["people", "notes", "callRecords", "repProgressions"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel, resumable export of Twenty objects.")
+    parser.add_argument("--out", default=f"twenty-export-{datetime.date.today().isoformat()}",
+                        help="output directory (default: twenty-export-<date>)")
+    parser.add_argument("--objects", nargs="+", default=DEFAULT_OBJECTS, help="plural object names")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl.zst")
+    parser.add_argument("--shards", type=int, default=8, help="createdAt ranges per object")
+    parser.add_argument("--workers", type=int, default=8, help="shards exported concurrently")
+    parser.add_argument("--page-size", type=int)
+    parser.add_argument("--verify", action="store_true", help="only check files against the manifest")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    if args.verify:
+        problems = verify(args.out)
+        for path, problem in problems:
+            print(f"[ERROR] {path}: {problem}")
+        print(f"[DONE] {'all shards match' if not problems else f'{len(problems)} problem(s)'}")
+        return 1 if problems else 0
+
+    try:
+        check_format(args.format)
+    except ImportError as e:
+        print(f"[ERROR] --format {args.format} needs {e.name} (pip install "
+              f"{'zstandard' if args.format == 'jsonl.zst' else 'pyarrow'})")
+        return 1
+
+    try:
+        exporter = Exporter(args.out, args.objects, fmt=args.format, page_size=args.page_size)
+        started = time.time()
+        exporter.plan(shards=args.shards)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return 1
+    pending = exporter.pending()
+    print(f"Planned in {time.time() - started:.1f}s: {len(pending)} shard(s) to export into {args.out}")
+
+    written = [0]
+    lock = threading.Lock()
+    last = [time.time()]
+
+    def progress(connection, shard, count):
+        with lock:
+            written[0] += count
+            if time.time() - last[0] >= 5.0:
+                last[0] = time.time()
+                rate = written[0] / (time.time() - started)
+                print(f"  {written[0]:,} records ({rate:,.0f}/s)")
+
+    failures = exporter.run(workers=args.workers, progress=progress)
+    for connection, shard, error in failures:
+        print(f"[ERROR] {shard['file']}: {error}")
+
+    for connection, (records, total, done, shards) in exporter.summary().items():
+        note = "" if records == total else f"  [WARN] {total:,} at plan time"
+        print(f"  {connection}: {records:,} records in {done}/{shards} shards{note}")
+    print(f"[DONE] {written[0]:,} records in {time.time() - started:.1f}s"
+          + (f", {len(failures)} shard(s) failed; re-run to resume" if failures else ""))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
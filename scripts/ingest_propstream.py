@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Import a PropStream CSV export into Twenty CRM as Person records.
+
+Streams the file with flat memory, maps PropStream's duplicate DNC columns
+the same way the CSV Import Wizard does, and sends concurrent createPeople
+batches. Safe to re-run: completed batches are journaled to
+<file>.checkpoint and skipped; failed rows go to <file>.failures.jsonl.
+
+Like the wizard, only SAFE leads are imported unless --tiers or --all-tiers
+says otherwise; each person's tcpaStatus records its tier, and DNC numbers
+are never written as phones.
+
+Rows whose phone or email already belongs to a person in Twenty are not
+created; they are listed in <file>.duplicates.jsonl (see leads/dedup.py).
+
+    python scripts/ingest_propstream.py leads.csv --assign-rep DAVID_EDWARDS
+    python scripts/ingest_propstream.py leads.csv --tiers SAFE MODERATE
+    python scripts/ingest_propstream.py leads.csv --workers 8 --batch-size 100
+"""
+
+import argparse
+import sys
+
+from leads.classifier import RISK_LEVELS
+from leads.dedup import DedupIndex
+from leads.ingest import PropStreamIngest
+from twenty import profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import a PropStream CSV into Twenty CRM.")
+    parser.add_argument("csv", help="PropStream export (CSV)")
+    parser.add_argument("--assign-rep", help="assignedRep SELECT value for every lead (e.g. DAVID_EDWARDS)")
+    parser.add_argument("--batch-size", type=int, default=60, help="people per createPeople mutation")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent mutations in flight")
+    parser.add_argument("--upsert", action="store_true", help="use createPeople(upsert: true)")
+    parser.add_argument("--checkpoint", help="checkpoint journal path (default <csv>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="ignore any existing checkpoint")
+    tiers = parser.add_mutually_exclusive_group()
+    tiers.add_argument("--tiers", nargs="+", choices=RISK_LEVELS, default=["SAFE"],
+                       help="TCPA tiers to import (default: SAFE, like the import wizard)")
+    tiers.add_argument("--all-tiers", action="store_true", help="import every row, whatever its TCPA tier")
+    parser.add_argument("--no-dedup", action="store_true", help="create rows even if they match existing people")
+    parser.add_argument("--rebuild-dedup", action="store_true", help="re-sweep all people into the dedup index")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    dedup = None
+    if not args.no_dedup:
+        dedup = DedupIndex()
+        print("Refreshing dedup index from Twenty people...")
+        fetched = dedup.refresh(rebuild=args.rebuild_dedup)
+        print(f"  {len(dedup):,} people indexed ({fetched:,} fetched)")
+
+    ingest = PropStreamIngest(
+        args.csv, checkpoint_path=args.checkpoint, batch_size=args.batch_size,
+        workers=args.workers, assigned_rep=args.assign_rep, upsert=args.upsert, dedup=dedup,
+        tiers=None if args.all_tiers else args.tiers,
+    )
+
+    if args.restart:
+        ingest.checkpoint.reset()
+    elif not ingest.checkpoint.load():
+        print(f"[ERROR] {ingest.checkpoint.path} belongs to a different file or batch size.")
+        print("Use --restart to start over, or --checkpoint to pick another journal.")
+        return 2
+    elif ingest.checkpoint.done:
+        print(f"Resuming: {len(ingest.checkpoint.done)} batches already imported.")
+
+    print(f"Importing {args.csv} ({args.workers} workers, {args.batch_size} per batch, "
+          f"tiers: {'all' if args.all_tiers else ' '.join(args.tiers)})...")
+    stats = ingest.run()
+    print(f"\n[DONE] {stats.line()}")
+    if stats.duplicates or stats.conflicts:
+        print(f"Duplicates and conflicts written to {ingest.duplicates_path}")
+    if stats.failed:
+        print(f"Failed rows written to {ingest.failures_path}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Local lead search over a SQLite FTS5 index synced from Twenty (leads/search.py).
+
+    python scripts/lead_search.py sync                     # first run sweeps every person
+    python scripts/lead_search.py sync --rebuild
+    python scripts/lead_search.py serve --port 8792        # /search?q=..., re-syncs every 60s
+    python scripts/lead_search.py query "jon smi"
+    python scripts/lead_search.py query 0100               # last four of a phone
+
+Search-as-you-type in the dialer and leads pages can call /search instead
+of sending a Twenty GraphQL filter per keystroke. Results are person
+records, so the server binds to 127.0.0.1 and wants LIDS_SERVICE_TOKEN
+(or --token) as a bearer token.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import time
+
+from leads.search import LeadIndex, SearchServer
+from twenty import auth, profile
+
+
+def cmd_sync(args):
+    index = LeadIndex()
+    if args.rebuild:
+        index.rebuild()
+    first = index.status()["watermark"] is None
+    started = time.time()
+    last = [0.0]
+
+    def progress(seen):
+        if time.time() - last[0] >= 5.0:
+            last[0] = time.time()
+            print(f"  {seen:,} people  ({time.time() - started:.0f}s)")
+
+    seen = index.sync(page_size=args.page_size, progress=progress)
+    if first:
+        index.optimize()
+    status = index.status()
+    print(f"[DONE] {seen:,} records read in {time.time() - started:.1f}s "
+          f"({status['leads']:,} leads indexed, watermark {status['watermark']})")
+    return 0
+
+
+def cmd_serve(args):
+    problem = auth.check_arguments(args)
+    if problem:
+        print(f"[ERROR] {problem}")
+        return 1
+    index = LeadIndex()
+    print("Syncing before serving...")
+    index.sync(page_size=args.page_size)
+    server = SearchServer(index, host=args.host, port=args.port, sync_every=args.sync_every,
+                          cors_origin=args.cors_origin, token=args.token)
+
+    def stop(signum, frame):
+        server.stop.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    print(f"Serving lead search on http://{args.host}:{args.port}/search "
+          f"({index.status()['leads']:,} leads, sync every {args.sync_every:g}s)")
+    server.serve()
+    return 0
+
+
+def cmd_query(args):
+    index = LeadIndex()
+    started = time.perf_counter()
+    results = index.search(" ".join(args.text), args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for r in results:
+        print(f"{r['score']:>8.2f} {r['match']:<6} {r['name'][:28]:<28} {r['phone']:<11} "
+              f"{r['email'][:30]:<30} {r['address'][:40]}")
+    print(f"[DONE] {len(results)} result(s) in {elapsed:.1f} ms")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local full-text and fuzzy lead search.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sync", help="index people changed since the last sync")
+    p.add_argument("--rebuild", action="store_true", help="drop the index and sweep every person")
+    p.add_argument("--page-size", type=int)
+    p.set_defaults(fn=cmd_sync)
+
+    p = sub.add_parser("serve", help="serve /search over HTTP")
+    auth.add_arguments(p)
+    p.add_argument("--port", type=int, default=8792)
+    p.add_argument("--sync-every", type=float, default=60.0, help="seconds between syncs (0 = never)")
+    p.add_argument("--page-size", type=int)
+    p.set_defaults(fn=cmd_serve)
+
+    p = sub.add_parser("query", help="search the local index")
+    p.add_argument("text", nargs="+")
+    p.add_argument("--limit", type=int, default=20)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(fn=cmd_query)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
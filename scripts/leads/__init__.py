@@ -0,0 +1,7 @@
+"""
+Lead-list tooling shared by the ingest and screening scripts.
+
+Python ports of the browser-side helpers in
+apps/ads-dashboard/client/src/lib/tcpa/ so large PropStream files can be
+processed headless on the droplet.
+"""
@@ -0,0 +1,587 @@
+"""
+Out-of-band lead assignment (replaces the per-record auto-assign workflow).
+
+The Twenty workflow ran one CODE + UPDATE_RECORD execution per created
+person, so a 50k-row import queued 50k executions and could only assign to
+the uploader. AssignmentWorker instead takes person-created events from a
+source, groups them into micro-batches, asks a policy for each lead's rep
+and writes assignedRep with one updatePeople per rep per batch:
+
+    source  ->  micro-batch  ->  policy  ->  sink (grouped updatePeople)
+
+Sources: PollingSource (unassigned people, oldest first), WebhookSource
+(Twenty person.created webhooks, journaled to SQLite before they are
+acknowledged) and SyntheticSource (stand-in for local testing). Policies: uploader, round-robin and capacity (fewest open leads
+first, optional per-rep cap). People have no open/closed field, so "open"
+is whatever open_filter matches; without one, every assigned person counts.
+"""
+
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
+import os
+import queue
+import random
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from twenty import TwentyError, get_client, get_metadata
+from twenty.auth import DEFAULT_HOST
+from twenty.batch import MutationBatch, Operation
+from twenty.metadata import CACHE_DIR, workspace_key
+from twenty.pagination import iter_pages
+
+ASSIGNED_REP = "assignedRep"
+EVENT_FIELDS = "id createdAt createdBy { name workspaceMemberId }"
+
+
+def parse_time(value):
+    """ISO-8601 timestamp from Twenty -> epoch seconds (now if missing)."""
+    if not value:
+        return time.time()
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def _actor_name(created_by):
+    name = (created_by or {}).get("name")
+    if isinstance(name, dict):
+        name = f"{name.get('firstName') or ''} {name.get('lastName') or ''}"
+    return (name or "").strip() or None
+
+
+class Event:
+    """A person waiting for assignment."""
+
+    __slots__ = ("person_id", "created_at", "uploader", "received_at")
+
+    def __init__(self, person_id, created_at=None, uploader=None, received_at=None):
+        self.person_id = person_id
+        self.created_at = created_at or time.time()
+        self.uploader = uploader
+        self.received_at = received_at or time.time()
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record["id"], parse_time(record.get("createdAt")), _actor_name(record.get("createdBy")))
+
+
+# Reps
+
+def rep_options(meta=None):
+    """{label: value} of the assignedRep SELECT options."""
+    field = (meta or get_metadata()).field("person", ASSIGNED_REP) or {}
+    return {o["label"]: o["value"] for o in field.get("options") or []}
+
+
+def _name_key(name):
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+# Policies
+
+class UploaderPolicy:
+    """Assign to whoever created the record, like the old workflow.
+
+    Uploaders who aren't reps (API keys, imports by admins) go to the
+    fallback policy, or stay unassigned without one.
+    """
+
+    name = "uploader"
+
+    def __init__(self, reps, fallback=None):
+        self.by_name = {_name_key(label): value for label, value in reps.items()}
+        self.by_name.update({_name_key(value): value for value in reps.values()})
+        self.fallback = fallback
+
+    def assign(self, events):
+        assignments, rest = {}, []
+        for event in events:
+            value = self.by_name.get(_name_key(event.uploader)) if event.uploader else None
+            if value:
+                assignments[event.person_id] = value
+            else:
+                rest.append(event)
+        if rest and self.fallback:
+            assignments.update(self.fallback.assign(rest))
+        return assignments
+
+
+class RoundRobinPolicy:
+    name = "round-robin"
+
+    def __init__(self, reps, start=None):
+        values = sorted(set(reps.values()))
+        self._cycle = None
+        if values:
+            # A random start so restarts don't always favour the first rep
+            offset = (random.randrange(len(values)) if start is None else start) % len(values)
+            self._cycle = itertools.cycle(values[offset:] + values[:offset])
+
+    def assign(self, events):
+        if self._cycle is None:
+            return {}
+        return {event.person_id: next(self._cycle) for event in events}
+
+
+def open_lead_counts(reps, client=None, filter=None):
+    """{rep value: people assigned to it and matching filter}, in one aliased totalCount query.
+
+    Without a filter that is every person ever assigned to the rep.
+    """
+    client = client or get_client()
+    values = sorted(set(reps.values()))
+    if not values:
+        return {}
+    variables, fields = {}, []
+    for i, value in enumerate(values):
+        variables[f"f{i}"] = {"and": [{ASSIGNED_REP: {"eq": value}}, filter]} if filter else {ASSIGNED_REP: {"eq": value}}
+        fields.append(f"  r{i}: people(filter: $f{i}) {{ totalCount }}")
+    params = ", ".join(f"$f{i}: PersonFilterInput" for i in range(len(values)))
+    data = client.graphql(f"query OpenLeads({params}) {{\n" + "\n".join(fields) + "\n}", variables)
+    return {value: (data.get(f"r{i}") or {}).get("totalCount", 0) for i, value in enumerate(values)}
+
+
+class CapacityPolicy:
+    """Assign each lead to the rep with the most room.
+
+    Without a capacity that is simply the fewest open leads. capacity is a
+    cap for every rep or a {rep value: cap} dict; reps at their cap get
+    nothing, and leads left over stay unassigned until someone has room.
+    open_filter (a PersonFilterInput, e.g. leads not yet dispositioned)
+    says which assigned people count as open; without it they all do, and
+    capacity caps a rep's total assignments.
+    """
+
+    name = "capacity"
+
+    def __init__(self, reps, open_counts=None, capacity=None, client=None, refresh_every=300, open_filter=None):
+        self.reps = reps
+        self.capacity = capacity
+        self.client = client
+        self.refresh_every = refresh_every
+        self.open_filter = open_filter
+        self._counts = dict(open_counts) if open_counts is not None else None
+        self._counted_at = time.time() if open_counts is not None else 0
+
+    def cap(self, value):
+        if isinstance(self.capacity, dict):
+            return self.capacity.get(value, 0)
+        return self.capacity
+
+    def _load(self):
+        # Counts drift as reps work leads; re-read them periodically
+        if self._counts is None or time.time() - self._counted_at > self.refresh_every:
+            self._counts = open_lead_counts(self.reps, self.client, self.open_filter)
+            self._counted_at = time.time()
+        return self._counts
+
+    def _key(self, value, load):
+        # Negative room when capped, so the heap's minimum is the rep with most room
+        return load - self.cap(value) if self.capacity is not None else load
+
+    def assign(self, events):
+        counts = self._load()
+        heap = [(self._key(v, counts.get(v, 0)), v) for v in sorted(set(self.reps.values()))]
+        heapq.heapify(heap)
+        assignments = {}
+        for event in events:
+            if not heap:
+                break
+            key, value = heap[0]
+            if self.capacity is not None and key >= 0:
+                break  # the rep with the most room is full, so everyone is
+            assignments[event.person_id] = value
+            counts[value] = counts.get(value, 0) + 1
+            heapq.heapreplace(heap, (key + 1, value))
+        return assignments
+
+
+POLICIES = {
+    "uploader": UploaderPolicy,
+    "round-robin": RoundRobinPolicy,
+    "capacity": CapacityPolicy,
+}
+
+
+# Sources. Each yields lists of events (micro-batches) until stop is set.
+
+def _drain(events, batch_size, max_wait, stop, finished=None):
+    """Micro-batch a queue: up to batch_size events, at most max_wait after the first.
+
+    Ends when stop is set, or when finished() says no more events will come.
+    """
+    while not stop.is_set():
+        try:
+            first = events.get(timeout=0.5)
+        except queue.Empty:
+            if finished and finished():
+                return
+            continue
+        batch = [first]
+        deadline = time.monotonic() + max_wait
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(events.get(timeout=remaining))
+            except queue.Empty:
+                break
+        yield batch
+
+
+class PollingSource:
+    """Poll for unassigned people, oldest first.
+
+    The cursor is the createdAt of the oldest person still unassigned, so
+    failed or deferred leads are picked up again and assigned ones drop out
+    of the filter on their own.
+    """
+
+    def __init__(self, client=None, interval=5.0, since=None, lookback=3600):
+        self.client = client or get_client()
+        self.interval = interval
+        self.since = since or (
+            datetime.fromtimestamp(time.time() - lookback, timezone.utc)
+            .isoformat(timespec="milliseconds").replace("+00:00", "Z")
+        )
+
+    def batches(self, batch_size, max_wait, stop):
+        while not stop.is_set():
+            oldest = None
+            try:
+                for nodes, _ in iter_pages(
+                    "people", EVENT_FIELDS,
+                    filter={ASSIGNED_REP: {"is": "NULL"}, "createdAt": {"gte": self.since}},
+                    order_by=[{"createdAt": "AscNullsFirst"}], page_size=batch_size,
+                    client=self.client, prefetch=False,
+                ):
+                    if not nodes:
+                        break
+                    oldest = oldest or nodes[0].get("createdAt")
+                    yield [Event.from_record(n) for n in nodes]
+                    if stop.is_set():
+                        return
+            except TwentyError as e:
+                print(f"  [WARN] poll failed: {e}")
+            if oldest:
+                self.since = oldest
+            stop.wait(self.interval)
+
+
+def verify_signature(secret, body, headers):
+    """Check X-Twenty-Webhook-Signature: HMAC-SHA256 of "<timestamp>:<body>". No secret accepts all."""
+    if not secret:
+        return True
+    timestamp = headers.get("X-Twenty-Webhook-Timestamp", "")
+    signature = headers.get("X-Twenty-Webhook-Signature", "")
+    expected = hmac.new(secret.encode(), f"{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+class EventJournal:
+    """Webhook events received but not yet assigned (SQLite, WAL, synchronous=FULL).
+
+    An event is acknowledged to Twenty only after it is committed here, and
+    removed once its batch has been written, so a crash in between replays
+    it on the next start instead of losing it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS events (person_id TEXT PRIMARY KEY, created_at REAL, "
+                        "uploader TEXT, received_at REAL NOT NULL)")
+
+    @classmethod
+    def for_workspace(cls, key=None):
+        return cls(os.path.join(CACHE_DIR, f"assign-webhooks-{key or workspace_key()}.sqlite"))
+
+    def add(self, event):
+        with self._lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?)",
+                            (event.person_id, event.created_at, event.uploader, event.received_at))
+
+    def pending(self):
+        with self._lock:
+            rows = self.db.execute("SELECT person_id, created_at, uploader, received_at FROM events "
+                                   "ORDER BY received_at").fetchall()
+        return [Event(*row) for row in rows]
+
+    def remove(self, person_ids):
+        with self._lock, self.db:
+            self.db.executemany("DELETE FROM events WHERE person_id = ?", [(i,) for i in person_ids])
+
+    def __len__(self):
+        with self._lock:
+            return self.db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+
+class WebhookSource:
+    """Receive Twenty person.created webhooks on a small HTTP server.
+
+    With a secret, requests must carry a valid X-Twenty-Webhook-Signature
+    (HMAC-SHA256 of "<timestamp>:<body>"). Each event is committed to the
+    EventJournal before the 204; events left there by a previous run are
+    replayed first. Webhooks are not redelivered, so an event stays
+    journaled until its person is written: ones the policy left unassigned
+    (reps at capacity, no fallback) or whose write failed are queued again
+    every retry_every seconds, like the poller re-reads unassigned people.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=8787, secret=None, max_pending=100_000, journal=None,
+                 retry_every=30.0):
+        self.host = host
+        self.port = port
+        self.secret = secret
+        self.retry_every = retry_every
+        self.events = queue.Queue(maxsize=max_pending)
+        self.journal = journal if journal is not None else EventJournal.for_workspace()
+        self.server = None
+
+    def verify(self, body, headers):
+        return verify_signature(self.secret, body, headers)
+
+    def _handler(self):
+        source = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not source.verify(body, self.headers):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                record = payload.get("record") or {}
+                if payload.get("eventName") == "person.created" and record.get("id"):
+                    event = Event.from_record(record)
+                    try:
+                        if source.events.full():
+                            raise queue.Full
+                        source.journal.add(event)
+                        source.events.put_nowait(event)
+                    except (queue.Full, sqlite3.Error):
+                        self.send_response(503)  # Twenty retries failed deliveries
+                        self.end_headers()
+                        return
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def done(self, events, written):
+        """Drop the written people from the journal and retry the rest later."""
+        written = set(written)
+        self.journal.remove([e.person_id for e in events if e.person_id in written])
+        rest = [e for e in events if e.person_id not in written]
+        if rest and self.retry_every is not None:
+            timer = threading.Timer(self.retry_every, self._requeue, (rest,))
+            timer.daemon = True
+            timer.start()
+
+    def _requeue(self, events):
+        for event in events:
+            try:
+                self.events.put_nowait(event)
+            except queue.Full:
+                return  # still journaled; replayed on the next start
+
+    def batches(self, batch_size, max_wait, stop):
+        replay = self.journal.pending()
+        if replay:
+            print(f"  replaying {len(replay):,} webhook event(s) from {self.journal.path}")
+        for i in range(0, len(replay), batch_size):
+            if stop.is_set():
+                return
+            yield replay[i:i + batch_size]
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield from _drain(self.events, batch_size, max_wait, stop)
+        finally:
+            self.server.shutdown()
+
+
+class SyntheticSource:
+    """Stand-in for Twenty: generates person-created events at a fixed rate."""
+
+    def __init__(self, reps, total=10_000, rate=2_000.0, seed=None):
+        self.uploaders = list(reps) + [None]  # None = created via API/import
+        self.total = total
+        self.rate = rate
+        self.random = random.Random(seed)
+        self.events = queue.Queue(maxsize=10_000)
+
+    def _generate(self, stop):
+        started = time.monotonic()
+        for i in range(self.total):
+            if stop.is_set():
+                return
+            due = started + i / self.rate
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.events.put(Event(f"local-{i}", uploader=self.random.choice(self.uploaders)))
+
+    def batches(self, batch_size, max_wait, stop):
+        producer = threading.Thread(target=self._generate, args=(stop,), daemon=True)
+        producer.start()
+        yield from _drain(self.events, batch_size, max_wait, stop,
+                          finished=lambda: not producer.is_alive() and self.events.empty())
+
+
+# Sinks
+
+class TwentySink:
+    """Write assignments as one updatePeople per rep, aliased into one document."""
+
+    def __init__(self, client=None):
+        self.client = client or get_client()
+
+    def write(self, assignments):
+        """Returns (written person ids, {person id: error})."""
+        by_rep = {}
+        for person_id, value in assignments.items():
+            by_rep.setdefault(value, []).append(person_id)
+        # Each update sets a fixed value, so a retry after a timeout or 5xx is harmless
+        batch = MutationBatch(self.client, idempotent=True)
+        results = [
+            (ids, batch.add(Operation(
+                "updatePeople",
+                {"data": ("PersonUpdateInput!", {ASSIGNED_REP: value}),
+                 "filter": ("PersonFilterInput!", {"id": {"in": ids}})},
+                "id", key=value,
+            )))
+            for value, ids in by_rep.items()
+        ]
+        batch.flush()
+        written, failed = [], {}
+        for ids, result in results:
+            if result.ok:
+                written.extend(ids)
+            else:
+                failed.update((person_id, str(result.error)) for person_id in ids)
+        return written, failed
+
+
+class MemorySink:
+    """Records assignments instead of writing them (stand-in mode)."""
+
+    def __init__(self, delay=0.0):
+        self.assignments = {}
+        self.delay = delay
+
+    def write(self, assignments):
+        if self.delay:
+            time.sleep(self.delay)
+        self.assignments.update(assignments)
+        return list(assignments), {}
+
+
+# Metrics
+
+class AssignmentMetrics:
+    """Throughput and event-to-write latency of a worker."""
+
+    def __init__(self, window=10_000):
+        self.started = time.time()
+        self.events = 0
+        self.assigned = 0
+        self.unassigned = 0
+        self.failed = 0
+        self.batches = 0
+        self.by_rep = {}
+        self._latencies = []
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, events, written, failed, assignments):
+        now = time.time()
+        created = {e.person_id: e.created_at for e in events}
+        with self._lock:
+            self.batches += 1
+            self.events += len(events)
+            self.assigned += len(written)
+            self.failed += len(failed)
+            self.unassigned += len(events) - len(assignments)
+            for person_id in written:
+                value = assignments[person_id]
+                self.by_rep[value] = self.by_rep.get(value, 0) + 1
+                self._latencies.append(now - created[person_id])
+            # Keep a bounded window for percentiles
+            if len(self._latencies) > self._window:
+                del self._latencies[:len(self._latencies) - self._window]
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self._latencies)
+            elapsed = max(time.time() - self.started, 1e-9)
+
+            def pct(p):
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else 0.0
+
+            return {
+                "events": self.events, "assigned": self.assigned, "unassigned": self.unassigned,
+                "failed": self.failed, "batches": self.batches, "rate": self.assigned / elapsed,
+                "latencyP50": pct(0.5), "latencyP95": pct(0.95), "latencyMax": latencies[-1] if latencies else 0.0,
+                "byRep": dict(self.by_rep),
+            }
+
+    def line(self):
+        s = self.snapshot()
+        return (f"assigned {s['assigned']:,}  unassigned {s['unassigned']:,}  failed {s['failed']:,}  "
+                f"batches {s['batches']:,}  {s['rate']:,.0f}/s  "
+                f"latency p50 {s['latencyP50']:.2f}s p95 {s['latencyP95']:.2f}s max {s['latencyMax']:.2f}s")
+
+
+class AssignmentWorker:
+    def __init__(self, source, policy, sink, batch_size=200, max_wait=1.0, metrics=None):
+        self.source = source
+        self.policy = policy
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.metrics = metrics or AssignmentMetrics()
+        self.stop = threading.Event()
+
+    def process(self, events):
+        assignments = self.policy.assign(events)
+        written, failed = self.sink.write(assignments) if assignments else ([], {})
+        self.metrics.record(events, written, failed, assignments)
+        return written, failed
+
+    def run(self, report_every=10.0):
+        last_report = time.time()
+        done = getattr(self.source, "done", None)
+        for events in self.source.batches(self.batch_size, self.max_wait, self.stop):
+            written, failed = self.process(events)
+            if done:
+                done(events, written)
+            if report_every and time.time() - last_report >= report_every:
+                print(f"  {self.metrics.line()}")
+                last_report = time.time()
+        return self.metrics
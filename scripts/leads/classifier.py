@@ -0,0 +1,100 @@
+"""
+TCPA 4-Tier Compliance Filter (port of client/src/lib/tcpa/classifier.ts).
+
+- SAFE: 0 DNC, 1+ callable
+- MODERATE: 1 DNC (manual review)
+- DANGEROUS: 2+ DNC (exclude)
+- DNC_DATABASE: 3+ DNC (permanent hold)
+- NO_CONTACT_DATA: No phone numbers
+
+Row-at-a-time, like the TS original. For whole files use leads.columnar.
+"""
+
+import math
+
+from .propstream import PROPSTREAM_PHONE_DNC_PAIRS
+
+RISK_LEVELS = ("SAFE", "MODERATE", "DANGEROUS", "DNC_DATABASE", "NO_CONTACT_DATA")
+
+COMPLIANCE_STATUS = {
+    "SAFE": "verified",
+    "MODERATE": "review",
+    "DANGEROUS": "quarantined",
+    "DNC_DATABASE": "dnc_hold",
+}
+
+# Risk level -> the person tcpaStatus option (SAFE/MODERATE/DANGEROUS/DNC);
+# NO_CONTACT_DATA has no option and leaves the field unset
+TCPA_STATUS = {
+    "SAFE": "SAFE",
+    "MODERATE": "MODERATE",
+    "DANGEROUS": "DANGEROUS",
+    "DNC_DATABASE": "DNC",
+}
+
+RISK_LEVEL_COLORS = {
+    "SAFE": "#52c41a",
+    "MODERATE": "#faad14",
+    "DANGEROUS": "#fa8c16",
+    "DNC_DATABASE": "#ff4d4f",
+}
+
+
+def classify_lead(row, phone_dnc_pairs=PROPSTREAM_PHONE_DNC_PAIRS, registry=None):
+    """Classify one mapped row. Returns a dict shaped like TCPAAnalysis.
+
+    registry (a leads.dnc.DncIndex) also marks numbers on our own DNC list.
+    """
+    callable_numbers, dnc_numbers = [], []
+    for pair in phone_dnc_pairs:
+        phone = (row.get(pair["phone"]) or "").strip()
+        dnc = (row.get(pair["dnc"]) or "").strip().upper()
+        if not phone:
+            continue
+        if dnc == "DNC" or (registry is not None and phone in registry):
+            dnc_numbers.append(phone)
+        else:
+            callable_numbers.append(phone)
+
+    dnc_count = len(dnc_numbers)
+    callable_count = len(callable_numbers)
+    phone_count = dnc_count + callable_count
+
+    if phone_count == 0:
+        risk_level = "NO_CONTACT_DATA"
+    elif dnc_count >= 3:
+        risk_level = "DNC_DATABASE"
+    elif dnc_count >= 2:
+        risk_level = "DANGEROUS"
+    elif dnc_count == 1:
+        risk_level = "MODERATE"
+    elif callable_count >= 1:
+        risk_level = "SAFE"
+    else:
+        risk_level = "NO_CONTACT_DATA"
+
+    return {
+        "riskLevel": risk_level,
+        "dncCount": dnc_count,
+        "callableCount": callable_count,
+        "phoneCount": phone_count,
+        "callableNumbers": callable_numbers,
+        "dncNumbers": dnc_numbers,
+    }
+
+
+def get_compliance_status(risk_level):
+    return COMPLIANCE_STATUS.get(risk_level, "pending")
+
+
+def calculate_safe_percentage(analyses):
+    with_phones = [a for a in analyses if a["phoneCount"] > 0]
+    if not with_phones:
+        return 0
+    safe = sum(1 for a in with_phones if a["riskLevel"] == "SAFE")
+    # Math.round semantics (half up), not Python's round-half-even
+    return math.floor(safe / len(with_phones) * 100 + 0.5)
+
+
+def get_risk_level_color(risk_level):
+    return RISK_LEVEL_COLORS.get(risk_level, "#8c8c8c")
@@ -0,0 +1,179 @@
+"""
+Columnar TCPA classification for whole lead files (NumPy).
+
+classify_lead() walks one row's phone/DNC pairs at a time, which is slow
+when the whole lead base is re-screened after a DNC refresh. Here a block
+of rows becomes two (rows x pairs) boolean matrices:
+
+    has_phone[i, j]   row i has a non-blank phone in pair j
+    is_dnc[i, j]      and that pair's DNC column says "DNC"
+
+Counts are row sums and the tier is a table lookup on the DNC count, so
+the rules stay identical to classifier.ts:
+
+    for block in classify_file("leads.csv"):
+        block.compliance_status()   # array of verified/review/...
+"""
+
+import csv
+from itertools import zip_longest
+
+import numpy as np
+
+from .classifier import RISK_LEVELS, get_compliance_status
+from .propstream import PROPSTREAM_COLUMN_MAP, PROPSTREAM_PHONE_DNC_PAIRS, dedupe_headers
+
+BLOCK_ROWS = 100_000
+
+SAFE, MODERATE, DANGEROUS, DNC_DATABASE, NO_CONTACT_DATA = range(len(RISK_LEVELS))
+
+# Risk code by DNC count (clipped to 3) for rows that have a phone
+_DNC_TIERS = np.array([SAFE, MODERATE, DANGEROUS, DNC_DATABASE], dtype=np.uint8)
+_LEVELS = np.array(RISK_LEVELS)
+_STATUSES = np.array([get_compliance_status(level) for level in RISK_LEVELS])
+_DNC_FOLDED = np.array([ord(c) for c in "dnc"], dtype=np.uint32)
+
+
+class Classification:
+    """Per-row TCPA results for one block, as parallel arrays."""
+
+    def __init__(self, risk, dnc_count, callable_count, phone_count):
+        self.risk = risk                  # uint8 index into RISK_LEVELS
+        self.dnc_count = dnc_count
+        self.callable_count = callable_count
+        self.phone_count = phone_count
+
+    def __len__(self):
+        return len(self.risk)
+
+    def risk_levels(self):
+        return _LEVELS[self.risk]
+
+    def compliance_status(self):
+        return _STATUSES[self.risk]
+
+    def counts(self):
+        """{risk level: rows}"""
+        return dict(zip(RISK_LEVELS, np.bincount(self.risk, minlength=len(RISK_LEVELS)).tolist()))
+
+
+def safe_percentage(counts):
+    """calculateSafePercentage() over summed counts() of one or more blocks."""
+    with_phones = sum(n for level, n in counts.items() if level != "NO_CONTACT_DATA")
+    if not with_phones:
+        return 0
+    return int(np.floor(counts.get("SAFE", 0) / with_phones * 100 + 0.5))
+
+
+def classify_masks(has_phone, is_dnc):
+    """Classify from (rows x pairs) boolean matrices."""
+    phone_count = has_phone.sum(axis=1, dtype=np.int32)
+    dnc_count = (has_phone & is_dnc).sum(axis=1, dtype=np.int32)
+    callable_count = phone_count - dnc_count
+    risk = np.where(phone_count > 0, _DNC_TIERS[np.minimum(dnc_count, 3)], NO_CONTACT_DATA).astype(np.uint8)
+    return Classification(risk, dnc_count, callable_count, phone_count)
+
+
+def _as_text(values):
+    values = np.ascontiguousarray(values, dtype=str)
+    if values.dtype.itemsize == 0:
+        values = values.astype("<U1")
+    return values
+
+
+def _first_codepoint(values):
+    """First character of each cell as uint32 (0 for empty)."""
+    return np.ascontiguousarray(values.view(np.uint32).reshape(len(values), values.dtype.itemsize // 4)[:, 0])
+
+
+def _may_be_space(codepoints):
+    # Superset of str.isspace(): ASCII controls/space, NBSP and the U+1680+ spaces
+    return (codepoints <= 0x20) | (codepoints == 0x85) | (codepoints == 0xA0) | (codepoints >= 0x1680)
+
+
+def phone_mask(values):
+    """True where a phone cell is non-blank after trimming."""
+    values = _as_text(values)
+    first = _first_codepoint(values)
+    mask = first != 0
+    # Only cells starting with whitespace can be blank after trimming
+    check = mask & _may_be_space(first)
+    if check.any():
+        mask[check] = ~np.char.isspace(values[check])
+    return mask
+
+
+def dnc_mask(values):
+    """True where a DNC cell trims and upper-cases to "DNC"."""
+    values = _as_text(values)
+    mask = values == "DNC"
+    # Exports are almost all "" or "DNC"; normalize only the rest
+    other = ~mask & (_first_codepoint(values) != 0)
+    if other.any():
+        stripped = np.char.strip(values[other])
+        three = np.char.str_len(stripped) == 3
+        folded = stripped[three].astype("<U3").view(np.uint32).reshape(-1, 3) | 0x20  # ASCII lower-case
+        hits = np.zeros(len(stripped), dtype=bool)
+        hits[three] = (folded == _DNC_FOLDED).all(axis=1)
+        mask[other] = hits
+    return mask
+
+
+def classify_columns(columns, phone_dnc_pairs=PROPSTREAM_PHONE_DNC_PAIRS, rows=None, registry=None):
+    """Classify {mapped column: array of strings}. Missing columns count as blank.
+
+    With a registry (leads.dnc.DncIndex), listed numbers count as DNC even
+    when the export's flag is blank.
+    """
+    if rows is None:
+        rows = len(next(iter(columns.values()))) if columns else 0
+    has_phone = np.zeros((rows, len(phone_dnc_pairs)), dtype=bool)
+    is_dnc = np.zeros_like(has_phone)
+    for j, pair in enumerate(phone_dnc_pairs):
+        if pair["phone"] in columns:
+            has_phone[:, j] = phone_mask(columns[pair["phone"]])
+        if pair["dnc"] in columns:
+            is_dnc[:, j] = dnc_mask(columns[pair["dnc"]])
+        if registry is not None and pair["phone"] in columns:
+            check = has_phone[:, j] & ~is_dnc[:, j]
+            is_dnc[check, j] = registry.contains_many(np.asarray(columns[pair["phone"]])[check])
+    return classify_masks(has_phone, is_dnc)
+
+
+def iter_blocks(path, block_rows=BLOCK_ROWS, phone_dnc_pairs=PROPSTREAM_PHONE_DNC_PAIRS, extra=()):
+    """Yield (headers, rows, columns) per block of a PropStream CSV.
+
+    rows are the raw csv rows (for pass-through output); columns holds only
+    the phone/DNC columns as string arrays, keyed by mapped name, plus any
+    extra columns (mapped names, or raw headers PropStream has no mapping for).
+    """
+    wanted = {key for pair in phone_dnc_pairs for key in (pair["phone"], pair["dnc"])} | set(extra)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        try:
+            headers = next(reader)
+        except StopIteration:
+            return
+        index = {}
+        for i, header in enumerate(dedupe_headers(headers)):
+            key = PROPSTREAM_COLUMN_MAP.get(header, header)
+            if key in wanted:
+                index[key] = i
+
+        while True:
+            rows = [row for _, row in zip(range(block_rows), reader)]
+            if not rows:
+                return
+            # Transpose once; short rows are padded with blanks
+            transposed = list(zip_longest(*rows, fillvalue=""))
+            columns = {
+                key: np.array(transposed[i] if i < len(transposed) else [""] * len(rows), dtype=str)
+                for key, i in index.items()
+            }
+            yield headers, rows, columns
+
+
+def classify_file(path, block_rows=BLOCK_ROWS, registry=None):
+    """Yield a Classification per block of a PropStream CSV."""
+    for _, rows, columns in iter_blocks(path, block_rows):
+        yield classify_columns(columns, rows=len(rows), registry=registry)
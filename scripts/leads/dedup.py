@@ -0,0 +1,205 @@
+"""
+Local phone/email index of existing Twenty people, for import-time dedup.
+
+Re-importing overlapping PropStream lists used to create duplicate Person
+records. DedupIndex keeps every existing person's normalized E.164 phones
+and lower-cased emails in hash maps, persisted under TWENTY_CACHE_DIR and
+refreshed incrementally by updatedAt:
+
+    index = DedupIndex()
+    index.refresh()                      # first run sweeps all people
+    new, duplicates, conflicts = index.split(batch)
+
+A row is a duplicate when its keys point at one existing person, and a
+conflict when they point at several (phone matches one lead, email another).
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+from twenty import TwentyError, get_client
+from twenty.metadata import CACHE_DIR, workspace_key
+from twenty.pagination import iter_pages
+
+from .phone import normalize_phone
+
+PERSON_FIELDS = (
+    "id updatedAt "
+    "phones { primaryPhoneNumber primaryPhoneCountryCode additionalPhones } "
+    "emails { primaryEmail additionalEmails }"
+)
+
+
+def _phone_key(number, country_code=""):
+    number = (number or "").strip()
+    if not number:
+        return None
+    code = (country_code or "").strip()
+    # Older records store an alpha-2 country instead of a calling code
+    normalized = normalize_phone(code + number if code.startswith("+") else number)
+    return normalized if normalized.startswith("+") else None
+
+
+def _email_key(email):
+    email = (email or "").strip().lower()
+    return email or None
+
+
+def person_keys(person):
+    """Normalized phone and email keys of a Twenty person (record or create payload)."""
+    keys = set()
+    phones = person.get("phones") or {}
+    keys.add(_phone_key(phones.get("primaryPhoneNumber"), phones.get("primaryPhoneCountryCode")))
+    for extra in phones.get("additionalPhones") or []:
+        if isinstance(extra, dict):
+            keys.add(_phone_key(extra.get("number"), extra.get("countryCode")))
+        else:
+            keys.add(_phone_key(extra))
+    emails = person.get("emails") or {}
+    keys.add(_email_key(emails.get("primaryEmail")))
+    for extra in emails.get("additionalEmails") or []:
+        keys.add(_email_key(extra))
+    keys.discard(None)
+    return keys
+
+
+class DedupIndex:
+    """key -> person id for every existing person, plus person id -> keys."""
+
+    def __init__(self, client=None, path=None):
+        self.client = client or get_client()
+        self.path = path or os.path.join(
+            CACHE_DIR, f"people-index-{workspace_key(self.client.api_key, self.client.base_url)}.json"
+        )
+        self.watermark = None
+        self.owners = {}
+        self.people = {}
+        # Keys of rows accepted as new during this run (not persisted)
+        self.reserved = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    # Persistence
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.watermark = snapshot.get("watermark")
+        for person_id, keys in snapshot.get("people", {}).items():
+            self._put(person_id, set(keys))
+
+    def save(self):
+        with self._lock:
+            people = {person_id: sorted(keys) for person_id, keys in self.people.items()}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({
+                "watermark": self.watermark,
+                "savedAt": time.time(),
+                "people": people,
+            }, f)
+        os.replace(tmp, self.path)
+
+    def _put(self, person_id, keys):
+        self._drop(person_id)
+        if not keys:
+            return
+        self.people[person_id] = keys
+        for key in keys:
+            self.owners.setdefault(key, set()).add(person_id)
+
+    def _drop(self, person_id):
+        for key in self.people.pop(person_id, ()):
+            owners = self.owners.get(key)
+            if owners:
+                owners.discard(person_id)
+                if not owners:
+                    del self.owners[key]
+
+    # Refreshing
+
+    def refresh(self, rebuild=False):
+        """Pull people updated since the last refresh (all of them the first time).
+
+        Returns the number of person records read.
+        """
+        if rebuild:
+            self.watermark = None
+            self.owners, self.people = {}, {}
+        started_from = self.watermark
+        seen = 0
+        filter = {"updatedAt": {"gte": started_from}} if started_from else None
+        for nodes, _ in iter_pages("people", PERSON_FIELDS, filter=filter,
+                                   order_by=[{"updatedAt": "AscNullsFirst"}], client=self.client):
+            for person in nodes:
+                self._put(person["id"], person_keys(person))
+                if person.get("updatedAt") and (self.watermark is None or person["updatedAt"] > self.watermark):
+                    self.watermark = person["updatedAt"]
+            seen += len(nodes)
+
+        if started_from:
+            seen += self._drop_deleted(started_from)
+        self.save()
+        return seen
+
+    def _drop_deleted(self, since):
+        """Forget people soft-deleted since the last refresh."""
+        removed = 0
+        try:
+            for nodes, _ in iter_pages("people", "id", filter={"deletedAt": {"gte": since}},
+                                       client=self.client):
+                for person in nodes:
+                    self._drop(person["id"])
+                removed += len(nodes)
+        except TwentyError:
+            pass  # No soft-delete filter on this server; a --rebuild catches deletions
+        return removed
+
+    # Lookups
+
+    def __len__(self):
+        return len(self.people)
+
+    def matches(self, keys):
+        """Existing person ids that share any of the keys."""
+        found = set()
+        for key in keys:
+            found |= self.owners.get(key, set())
+        return found
+
+    def add(self, person_id, payload):
+        """Record a person created by this import so the saved index includes it."""
+        keys = person_keys(payload)
+        with self._lock:
+            self._put(person_id, keys | self.people.get(person_id, set()))
+            for key in keys:
+                self.reserved[key] = person_id
+
+    def split(self, batch):
+        """Split [(row_number, payload)] into new, duplicate and conflict lists.
+
+        duplicates and conflicts are (row_number, payload, person_ids). A row
+        that shares a key with an earlier new row of the same run is a
+        duplicate of that row (person id "row:<n>").
+        """
+        new, duplicates, conflicts = [], [], []
+        with self._lock:
+            for row_number, payload in batch:
+                keys = person_keys(payload)
+                found = self.matches(keys) | {self.reserved[k] for k in keys if k in self.reserved}
+                if not found:
+                    new.append((row_number, payload))
+                    for key in keys:
+                        self.reserved[key] = f"row:{row_number}"
+                elif len(found) == 1:
+                    duplicates.append((row_number, payload, sorted(found)))
+                else:
+                    conflicts.append((row_number, payload, sorted(found)))
+        return new, duplicates, conflicts
@@ -0,0 +1,626 @@
+"""
+Server-side dialer queue: per-rep priority heaps over assigned leads.
+
+pages/dialer.tsx loads the rep's lead list and leaves the order to the
+rep, so dials go to leads that were just attempted or that it is illegal
+to call right now. DialerQueue keeps every assigned lead in its rep's
+queue, scored by:
+
+    TCPA tier         tcpaStatus, or classifier.py over the lead's phones and a DNC registry
+    attempts          callRecords with leadId = the lead
+    last disposition  CALLBACK jumps ahead; NOT_INTERESTED, WRONG_NUMBER and DNC leave
+    calling window    8am-9pm (stricter where state law says so) in the lead's time zone(s)
+
+A rep's queue is one heap per time-zone group plus a heap of leads cooling
+down after an attempt (or held by a client). next() moves leads whose
+cooldown is over, then merges the heads of the groups whose window is
+open, so it costs O(n log leads) for n leads whatever the queue size:
+
+    queue = DialerQueue()
+    queue.sync()                                # people and callRecords, incrementally
+    queue.next("DAVID_EDWARDS", 10, hold=300)   # best 10 dialable leads, held for 5 minutes
+    queue.record_call(lead_id, "NO_ANSWER")     # cooldown until the next sync counts the call
+
+A lead's time zones come from its state (or ZIP prefix). States spanning
+two zones are only dialable when the window is open in both; leads with
+no location wait for the window to be open across the continental US.
+"""
+
+import datetime
+import heapq
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+
+from twenty import get_client, get_metadata
+from twenty.auth import DEFAULT_HOST, verify_token
+from twenty.export import exported_fields, projection
+from twenty.pagination import iter_changes
+
+from .assign import ASSIGNED_REP
+from .classifier import classify_lead
+
+PERSON_FIELDS = ("id", "updatedAt", "createdAt", "name", "phones", "city", "state", "zipCode", "tcpaStatus",
+                 ASSIGNED_REP, "cell1", "cell2", "cell3", "cell4", "landline1", "landline2", "phone1", "phone2")
+PHONE_FIELDS = ("cell1", "cell2", "cell3", "cell4", "landline1", "landline2", "phone1", "phone2")
+CALL_FIELDS = "id createdAt updatedAt disposition leadId"
+
+# TCPA tiers that may be dialed, best first, and the score step between them
+TIERS = ("SAFE", "MODERATE")
+TIER_STEP = 1000
+ATTEMPT_STEP = 10
+MAX_ATTEMPTS = 8
+
+# Tier of a lead with no tcpaStatus when no DNC registry was given to check its numbers
+UNVERIFIED = "UNVERIFIED"
+
+# tcpaStatus values written by the dashboard -> classifier risk levels
+TCPA_STATUS = {"SAFE": "SAFE", "MODERATE": "MODERATE", "DANGEROUS": "DANGEROUS", "DNC": "DNC_DATABASE",
+               "DNC_DATABASE": "DNC_DATABASE", "NO_CONTACT_DATA": "NO_CONTACT_DATA"}
+
+# disposition -> (cooldown seconds before the next dial, score adjustment); None leaves the queue
+DISPOSITIONS = {
+    "CALLBACK": (3600, -500),
+    "NO_ANSWER": (4 * 3600, 0),
+    "VOICEMAIL": (24 * 3600, 5),
+    "CONTACT": (2 * 86400, 20),
+    "NOT_INTERESTED": None,
+    "WRONG_NUMBER": None,
+    "DNC": None,
+}
+DEFAULT_COOLDOWN = (4 * 3600, 0)
+
+# Local calling hours [start, end); state laws stricter than the TCPA's 8am-9pm
+WINDOW = (8, 21)
+STATE_WINDOWS = {"FL": (8, 20), "MD": (8, 20), "OK": (8, 20)}
+
+EASTERN, CENTRAL, MOUNTAIN, PACIFIC = "America/New_York", "America/Chicago", "America/Denver", "America/Los_Angeles"
+CONTINENTAL = (EASTERN, CENTRAL, MOUNTAIN, PACIFIC)
+
+STATE_ZONES = {
+    **{state: (EASTERN,) for state in ("CT", "DC", "DE", "GA", "MA", "MD", "ME", "NC", "NH", "NJ", "NY", "OH",
+                                        "PA", "RI", "SC", "VA", "VT", "WV")},
+    **{state: (EASTERN, CENTRAL) for state in ("FL", "IN", "KY", "MI", "TN")},
+    **{state: (CENTRAL,) for state in ("AL", "AR", "IA", "IL", "LA", "MN", "MO", "MS", "OK", "WI")},
+    **{state: (CENTRAL, MOUNTAIN) for state in ("KS", "ND", "NE", "SD", "TX")},
+    **{state: (MOUNTAIN,) for state in ("CO", "MT", "NM", "UT", "WY")},
+    "AZ": ("America/Phoenix",),
+    "ID": (MOUNTAIN, PACIFIC),
+    "OR": (PACIFIC, MOUNTAIN),
+    "NV": (PACIFIC,),
+    "CA": (PACIFIC,),
+    "WA": (PACIFIC,),
+    "AK": ("America/Anchorage", "America/Adak"),
+    "HI": ("Pacific/Honolulu",),
+    "PR": ("America/Puerto_Rico",),
+    "VI": ("America/St_Thomas",),
+    "GU": ("Pacific/Guam",),
+}
+
+# First three ZIP digits -> state, for leads with a ZIP but no state
+ZIP3_STATES = [
+    (5, 5, "NY"), (6, 7, "PR"), (8, 8, "VI"), (9, 9, "PR"), (10, 27, "MA"), (28, 29, "RI"), (30, 38, "NH"),
+    (39, 49, "ME"), (50, 54, "VT"), (55, 55, "MA"), (56, 59, "VT"), (60, 69, "CT"), (70, 89, "NJ"),
+    (100, 149, "NY"), (150, 196, "PA"), (197, 199, "DE"), (200, 200, "DC"), (201, 201, "VA"), (202, 205, "DC"),
+    (206, 219, "MD"), (220, 246, "VA"), (247, 268, "WV"), (270, 289, "NC"), (290, 299, "SC"), (300, 319, "GA"),
+    (320, 349, "FL"), (350, 369, "AL"), (370, 385, "TN"), (386, 397, "MS"), (398, 399, "GA"), (400, 427, "KY"),
+    (430, 459, "OH"), (460, 479, "IN"), (480, 499, "MI"), (500, 528, "IA"), (530, 549, "WI"), (550, 567, "MN"),
+    (569, 569, "DC"), (570, 577, "SD"), (580, 588, "ND"), (590, 599, "MT"), (600, 629, "IL"), (630, 658, "MO"),
+    (660, 679, "KS"), (680, 693, "NE"), (700, 714, "LA"), (716, 729, "AR"), (730, 732, "OK"), (733, 733, "TX"),
+    (734, 749, "OK"), (750, 799, "TX"), (800, 816, "CO"), (820, 831, "WY"), (832, 838, "ID"), (840, 847, "UT"),
+    (850, 865, "AZ"), (870, 884, "NM"), (885, 885, "TX"), (889, 898, "NV"), (900, 961, "CA"), (967, 968, "HI"),
+    (969, 969, "GU"), (970, 979, "OR"), (980, 994, "WA"), (995, 999, "AK"),
+]
+
+
+def zip_state(zip_code):
+    digits = str(zip_code or "").strip()[:5]
+    if not digits.isdigit():
+        return None
+    prefix = int(digits.zfill(5)[:3])
+    for start, end, state in ZIP3_STATES:
+        if start <= prefix <= end:
+            return state
+    return None
+
+
+def calling_group(state=None, zip_code=None):
+    """(time zones, window) the lead must be inside to be dialed."""
+    state = (state or "").strip().upper()[:2] or None
+    if state not in STATE_ZONES:
+        state = zip_state(zip_code)
+    return STATE_ZONES.get(state, CONTINENTAL), STATE_WINDOWS.get(state, WINDOW)
+
+
+def window_open(group, now=None):
+    """True when local time is inside the window in every zone of the group."""
+    zones, (start, end) = group
+    now = datetime.datetime.now(datetime.timezone.utc) if now is None else now
+    return all(start <= now.astimezone(_zone(name)).hour < end for name in zones)
+
+
+_ZONES = {}
+
+
+def _zone(name):
+    if name not in _ZONES:
+        _ZONES[name] = ZoneInfo(name)
+    return _ZONES[name]
+
+
+def _timestamp(value):
+    if not value:
+        return 0.0
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+def _phone(value):
+    if isinstance(value, dict):
+        return value.get("primaryPhoneNumber") or ""
+    return value or ""
+
+
+def risk_level(person, registry=None):
+    """TCPA tier: the lead's tcpaStatus, else classify_lead() over its phones against the DNC registry.
+
+    People carry no per-number DNC flags, so without tcpaStatus a lead is
+    only cleared by a registry lookup; with no registry it is UNVERIFIED,
+    which is never dialed.
+    """
+    status = TCPA_STATUS.get((person.get("tcpaStatus") or "").strip().upper())
+    if status:
+        return status
+    row = {name: _phone(person.get(name)) for name in ("phones",) + PHONE_FIELDS}
+    if not any(phone.strip() for phone in row.values()):
+        return "NO_CONTACT_DATA"
+    if registry is None:
+        return UNVERIFIED
+    pairs = [{"phone": name, "dnc": None} for name in row]
+    return classify_lead(row, pairs, registry)["riskLevel"]
+
+
+class Lead:
+    __slots__ = ("id", "rep", "tier", "group", "created", "attempts", "disposition", "last_call", "held_until",
+                 "version", "display", "calls")
+
+    def __init__(self, lead_id):
+        self.id = lead_id
+        self.rep = None
+        self.tier = None
+        self.group = None
+        self.created = 0.0
+        self.attempts = 0
+        self.disposition = None
+        self.last_call = 0.0
+        self.held_until = 0.0
+        self.version = 0
+        self.display = None
+        self.calls = set()
+
+    def rule(self):
+        return DISPOSITIONS.get(self.disposition, DEFAULT_COOLDOWN) if self.disposition else (0, 0)
+
+    def dialable(self, tiers):
+        return (self.rep is not None and self.tier in tiers and self.attempts < MAX_ATTEMPTS
+                and self.rule() is not None)
+
+    def ready_at(self):
+        cooldown, _ = self.rule()
+        return max(self.last_call + cooldown if self.last_call else 0.0, self.held_until)
+
+    def score(self, tiers):
+        _, adjust = self.rule()
+        return tiers.index(self.tier) * TIER_STEP + self.attempts * ATTEMPT_STEP + adjust
+
+    def to_dict(self, now=None):
+        zones, _ = self.group
+        local = datetime.datetime.fromtimestamp(now or time.time(), _zone(zones[0]))
+        return dict(self.display, id=self.id, rep=self.rep, tier=self.tier, attempts=self.attempts,
+                    lastDisposition=self.disposition,
+                    lastCallAt=(datetime.datetime.fromtimestamp(self.last_call, datetime.timezone.utc)
+                                .isoformat(timespec="seconds") if self.last_call else None),
+                    timeZone=zones[0], localTime=local.strftime("%H:%M"))
+
+
+class RepQueue:
+    """One rep's leads: a ready heap per calling group and a cooldown heap.
+
+    Updating a lead bumps its version and pushes a new entry; entries with
+    an old version are skipped when they reach the top, and the heaps are
+    rebuilt from their live entries once they have doubled in size.
+    """
+
+    MIN_COMPACT = 1024
+
+    def __init__(self):
+        self.ready = {}      # group -> [(score, last call, created, version, id)]
+        self.waiting = []    # [(ready at, version, id)]
+        self.compact_at = self.MIN_COMPACT
+
+    def __len__(self):
+        return sum(len(heap) for heap in self.ready.values()) + len(self.waiting)
+
+    def push(self, lead, tiers, now):
+        ready_at = lead.ready_at()
+        if ready_at > now:
+            heapq.heappush(self.waiting, (ready_at, lead.version, lead.id))
+        else:
+            heapq.heappush(self.ready.setdefault(lead.group, []),
+                           (lead.score(tiers), lead.last_call, lead.created, lead.version, lead.id))
+
+
+class DialerQueue:
+    """Every rep's dialer queue, kept current from Twenty people and callRecords."""
+
+    def __init__(self, client=None, meta=None, tiers=TIERS, registry=None):
+        self.client = client or get_client()
+        self.meta = meta
+        self.tiers = tuple(tiers)
+        self.registry = registry
+        self.leads = {}
+        self.reps = {}
+        self.people_watermark = None
+        self.calls_watermark = None
+        self.deleted_watermark = None
+        self.last_sync = None
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._open = {}   # group -> (minute, open)
+        self._fields = None
+
+    # Updates
+
+    def _lead(self, lead_id):
+        lead = self.leads.get(lead_id)
+        if lead is None:
+            lead = self.leads[lead_id] = Lead(lead_id)
+        return lead
+
+    def _place(self, lead, now=None):
+        """Invalidate the lead's heap entries and queue it again if it is dialable."""
+        lead.version += 1
+        if lead.dialable(self.tiers) and lead.group is not None:
+            now = time.time() if now is None else now
+            queue = self.reps.setdefault(lead.rep, RepQueue())
+            queue.push(lead, self.tiers, now)
+            if len(queue) > queue.compact_at:
+                self._compact(lead.rep, now)
+
+    def apply_people(self, people):
+        now = time.time()
+        with self._lock:
+            for person in people:
+                lead = self._lead(person["id"])
+                name = person.get("name") or {}
+                lead.rep = person.get(ASSIGNED_REP) or None
+                lead.tier = risk_level(person, self.registry)
+                lead.group = calling_group(person.get("state"), person.get("zipCode"))
+                lead.created = _timestamp(person.get("createdAt"))
+                lead.display = {
+                    "name": f"{name.get('firstName') or ''} {name.get('lastName') or ''}".strip(),
+                    "phone": _phone(person.get("phones")) or next(
+                        (_phone(person.get(f)) for f in PHONE_FIELDS if _phone(person.get(f))), ""),
+                    "city": person.get("city") or "",
+                    "state": person.get("state") or "",
+                    "zipCode": person.get("zipCode") or "",
+                }
+                self._place(lead, now)
+
+    def remove(self, lead_ids):
+        with self._lock:
+            for lead_id in lead_ids:
+                lead = self.leads.pop(lead_id, None)
+                if lead is not None:
+                    lead.version += 1
+
+    def apply_calls(self, calls):
+        """Count call records against their leads (idempotent per record id)."""
+        now = time.time()
+        with self._lock:
+            touched = {}
+            for call in calls:
+                if not call.get("leadId"):
+                    continue
+                lead = self._lead(call["leadId"])
+                if call["id"] in lead.calls:
+                    continue
+                lead.calls.add(call["id"])
+                lead.attempts += 1
+                at = _timestamp(call.get("createdAt"))
+                if at >= lead.last_call:
+                    lead.last_call = at
+                    lead.disposition = (call.get("disposition") or "").upper() or None
+                touched[lead.id] = lead
+            for lead in touched.values():
+                self._place(lead, now)
+
+    def record_call(self, lead_id, disposition, at=None):
+        """A dial the next sync hasn't seen yet: start its cooldown now, without counting it."""
+        now = time.time()
+        with self._lock:
+            lead = self.leads.get(lead_id)
+            if lead is None:
+                return False
+            lead.last_call = now if at is None else at
+            lead.disposition = (disposition or "").upper() or None
+            lead.held_until = 0.0
+            self._place(lead, now)
+            return True
+
+    def hold(self, lead_ids, seconds):
+        """Keep leads out of next() for a while (handed to a dialer, not called yet)."""
+        now = time.time()
+        with self._lock:
+            for lead_id in lead_ids:
+                lead = self.leads.get(lead_id)
+                if lead is not None:
+                    lead.held_until = now + seconds
+                    self._place(lead, now)
+
+    # Queries
+
+    def _window_open(self, group, now):
+        minute = int(now // 60)
+        cached = self._open.get(group)
+        if cached is None or cached[0] != minute:
+            cached = self._open[group] = (minute, window_open(group, datetime.datetime.fromtimestamp(
+                now, datetime.timezone.utc)))
+        return cached[1]
+
+    def _live(self, entry_version, lead_id, rep):
+        lead = self.leads.get(lead_id)
+        return lead is not None and lead.version == entry_version and lead.rep == rep
+
+    def _release(self, queue, rep, now):
+        """Move leads whose cooldown or hold has ended into their group heaps."""
+        while queue.waiting and queue.waiting[0][0] <= now:
+            _, version, lead_id = heapq.heappop(queue.waiting)
+            if self._live(version, lead_id, rep):
+                queue.push(self.leads[lead_id], self.tiers, now)
+
+    def _head(self, heap, rep):
+        """Drop stale entries from the top of a heap; returns the live head or None."""
+        while heap and not self._live(heap[0][3], heap[0][4], rep):
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def next(self, rep, count=10, hold=0.0, now=None):
+        """The rep's best `count` leads that can be dialed now, best first.
+
+        With hold, the returned leads are held for that many seconds so the
+        next call returns different ones; otherwise they stay at the top.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            queue = self.reps.get(rep)
+            if queue is None:
+                return []
+            self._release(queue, rep, now)
+            heads = []
+            for group, heap in queue.ready.items():
+                if self._window_open(group, now) and self._head(heap, rep) is not None:
+                    heads.append((heap[0], group))
+            heapq.heapify(heads)
+            picked = []
+            while heads and len(picked) < count:
+                _, group = heads[0]
+                heap = queue.ready[group]
+                entry = heapq.heappop(heap)
+                picked.append((entry, group))
+                head = self._head(heap, rep)
+                if head is None:
+                    heapq.heappop(heads)
+                else:
+                    heapq.heapreplace(heads, (head, group))
+            leads = [self.leads[entry[4]] for entry, _ in picked]
+            if hold:
+                for lead in leads:
+                    lead.held_until = now + hold
+                    lead.version += 1
+                    heapq.heappush(queue.waiting, (lead.held_until, lead.version, lead.id))
+            else:
+                for entry, group in picked:
+                    heapq.heappush(queue.ready[group], entry)
+            return [lead.to_dict(now) for lead in leads]
+
+    def _compact(self, rep, now):
+        """Rebuild a rep's heaps from their live entries."""
+        old = self.reps[rep]
+        fresh = self.reps[rep] = RepQueue()
+        entries = [(version, lead_id) for heap in old.ready.values() for *_, version, lead_id in heap]
+        entries += [(version, lead_id) for _, version, lead_id in old.waiting]
+        for version, lead_id in entries:
+            if self._live(version, lead_id, rep):
+                fresh.push(self.leads[lead_id], self.tiers, now)
+        fresh.compact_at = max(RepQueue.MIN_COMPACT, 2 * len(fresh))
+
+    def summary(self, now=None):
+        """{rep: {"dialable": leads callable now, "waiting": cooling down or held, "closed": outside their window}}."""
+        now = time.time() if now is None else now
+        with self._lock:
+            reps = {}
+            for lead in self.leads.values():
+                if not lead.dialable(self.tiers) or lead.group is None:
+                    continue
+                counts = reps.setdefault(lead.rep, {"dialable": 0, "waiting": 0, "closed": 0})
+                if lead.ready_at() > now:
+                    counts["waiting"] += 1
+                elif self._window_open(lead.group, now):
+                    counts["dialable"] += 1
+                else:
+                    counts["closed"] += 1
+            return reps
+
+    # Sync
+
+    def fields(self):
+        if self._fields is None:
+            available = exported_fields((self.meta or get_metadata()).fields("person"))
+            self._fields = projection([(name, t) for name, t in available if name in PERSON_FIELDS])
+        return self._fields
+
+    def sync(self, page_size=None, progress=None):
+        """Apply people and callRecords changed since the last sync. Returns records seen."""
+        with self._sync_lock:
+            seen = 0
+            first = self.people_watermark is None
+            started = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            for nodes in iter_changes("callRecords", CALL_FIELDS, self.calls_watermark, page_size=page_size,
+                                      client=self.client):
+                self.apply_calls(nodes)
+                self.calls_watermark = max([self.calls_watermark or ""]
+                                           + [n.get("updatedAt") or "" for n in nodes]) or None
+                seen += len(nodes)
+                if progress:
+                    progress(seen)
+            for nodes in iter_changes("people", self.fields(), self.people_watermark, page_size=page_size,
+                                      client=self.client):
+                self.apply_people(nodes)
+                self.people_watermark = max([self.people_watermark or ""]
+                                            + [n.get("updatedAt") or "" for n in nodes]) or None
+                seen += len(nodes)
+                if progress:
+                    progress(seen)
+            if not first:
+                for nodes in iter_changes("people", "id deletedAt", self.deleted_watermark, deleted=True,
+                                          page_size=page_size, client=self.client):
+                    self.remove(n["id"] for n in nodes)
+                    self.deleted_watermark = max([self.deleted_watermark] + [n.get("deletedAt") or "" for n in nodes])
+                    seen += len(nodes)
+            elif self.deleted_watermark is None:
+                # Nothing deleted before the first sweep is in the queue
+                self.deleted_watermark = started
+            self.last_sync = time.time()
+            return seen
+
+    def status(self):
+        with self._lock:
+            dialable = sum(1 for lead in self.leads.values() if lead.dialable(self.tiers))
+            return {
+                "leads": len(self.leads),
+                "queued": dialable,
+                "reps": len(self.reps),
+                "peopleWatermark": self.people_watermark,
+                "callsWatermark": self.calls_watermark,
+                "lastSync": self.last_sync,
+            }
+
+
+class DialerServer:
+    """JSON API over a DialerQueue.
+
+    GET  /next?rep=<assignedRep>[&n=10][&hold=300]
+    GET  /reps
+    POST /calls     {leadId, disposition} (recordCall() params): cooldown starts now
+    GET  /health
+
+    Everything but /health needs the service token (twenty.auth).
+    """
+
+    def __init__(self, queue, host=DEFAULT_HOST, port=8793, sync_every=15.0, cors_origin=None, token=None):
+        self.queue = queue
+        self.host = host
+        self.port = port
+        self.sync_every = sync_every
+        self.cors_origin = cors_origin
+        self.token = token
+        self.server = None
+        self.stop = threading.Event()
+        self.sync_errors = 0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if server.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", server.cors_origin)
+                    self.send_header("Access-Control-Allow-Headers", "Authorization, Content-Type")
+                if body is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_OPTIONS(self):
+                self._send(204)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                path = url.path.rstrip("/")
+                if path == "/health":
+                    self._send(200, dict(server.queue.status(), syncErrors=server.sync_errors))
+                elif not verify_token(server.token, self.headers, {k: v[-1] for k, v in query.items()}):
+                    self._send(401, {"error": "missing or wrong token"})
+                elif path == "/reps":
+                    self._send(200, server.queue.summary())
+                elif path == "/next":
+                    rep = (query.get("rep") or [""])[0]
+                    try:
+                        count = min(int((query.get("n") or ["10"])[0]), 200)
+                        hold = float((query.get("hold") or ["0"])[0])
+                    except ValueError:
+                        self._send(400, {"error": "n and hold must be numbers"})
+                        return
+                    if not rep:
+                        self._send(400, {"error": "rep is required"})
+                        return
+                    started = time.perf_counter()
+                    leads = server.queue.next(rep, count, hold)
+                    self._send(200, {"rep": rep, "ms": round((time.perf_counter() - started) * 1000, 2),
+                                     "leads": leads})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                if urlparse(self.path).path.rstrip("/") != "/calls":
+                    self._send(404, {"error": "not found"})
+                    return
+                if not verify_token(server.token, self.headers):
+                    self._send(401, {"error": "missing or wrong token"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                except ValueError:
+                    self._send(400, {"error": "expected a JSON object"})
+                    return
+                if not isinstance(body, dict) or not body.get("leadId"):
+                    self._send(400, {"error": "leadId is required"})
+                    return
+                known = server.queue.record_call(body["leadId"], body.get("disposition"))
+                self._send(202 if known else 404, {"leadId": body["leadId"], "queued": known})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _sync_loop(self):
+        while not self.stop.wait(self.sync_every):
+            try:
+                self.queue.sync()
+            except Exception as e:  # keep serving the last good queue
+                self.sync_errors += 1
+                print(f"[WARN] sync failed: {e}")
+
+    def serve(self):
+        """Serve until stop is set, syncing every sync_every seconds."""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        threads = [threading.Thread(target=self.server.serve_forever, daemon=True)]
+        if self.sync_every:
+            threads.append(threading.Thread(target=self._sync_loop, daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            self.stop.wait()
+        finally:
+            self.server.shutdown()
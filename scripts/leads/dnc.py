@@ -0,0 +1,346 @@
+"""
+Memory-mapped Do-Not-Call registry index.
+
+The PropStream DNC flags are only as fresh as the export. This index holds
+our own registry extracts (hundreds of millions of numbers) in a compact
+sorted file that is queried through mmap, so a lookup touches a handful of
+pages and the process stays small:
+
+    registry = DncIndex("dnc.idx")
+    "(704) 555-0100" in registry
+    registry.contains_many(phones)      # numpy bool array
+
+File layout (little-endian):
+
+    magic   8 bytes   b"LIDSDNC1"
+    count   uint64    numbers in the index
+    offsets uint64[1001]  start of each area code's run (offsets[1000] = count)
+    data    uint32[count] 7-digit subscriber numbers, sorted within each area code
+
+Numbers are normalized with the same rules as phone.ts; anything that is
+not a US number is never in the index. A sidecar <index>.json records the
+source and delta files already applied, so update() only merges new ones.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from .phone import normalize_phone
+
+MAGIC = b"LIDSDNC1"
+AREA_CODES = 1000
+SUBSCRIBER = 10_000_000
+HEADER_SIZE = len(MAGIC) + 8 + (AREA_CODES + 1) * 8
+CHUNK_BYTES = 8 << 20
+
+_POWERS = 10 ** np.arange(9, -1, -1, dtype=np.int64)
+
+
+def national_number(phone):
+    """'(704) 555-0100' -> 7045550100, or None if it isn't a US number."""
+    normalized = normalize_phone(phone)
+    if len(normalized) == 12 and normalized.startswith("+1") and normalized[2:].isdigit():
+        return int(normalized[2:])
+    return None
+
+
+def national_numbers(phones):
+    """Vector of national numbers for a batch of phone strings (-1 = not US)."""
+    text = np.asarray(phones, dtype=str)
+    result = np.full(len(text), -1, dtype=np.int64)
+    if not len(text):
+        return result
+    # Registry extracts are plain digits: convert those in bulk, the rest one by one
+    length = np.char.str_len(text)
+    digits = np.char.isdigit(text)
+    plain = digits & (length == 10)
+    result[plain] = text[plain].astype(np.int64)
+    with_one = digits & (length == 11) & (np.char.startswith(text, "1"))
+    result[with_one] = text[with_one].astype(np.int64) - 10 ** 10
+    for i in np.flatnonzero(~(plain | with_one) & (length > 0)):
+        n = national_number(str(text[i]))
+        if n is not None:
+            result[i] = n
+    return result
+
+
+def _parse_fixed_width(chunk):
+    """Parse a chunk of equal-length "NNNNNNNNNN" / "AAA,NNNNNNN" lines in bulk.
+
+    Registry extracts come in this shape, so the digits are read straight
+    from the bytes. Returns None when the chunk doesn't fit, and the caller
+    falls back to per-line normalization.
+    """
+    b = np.frombuffer(chunk, dtype=np.uint8)
+    width = chunk.find(b"\n") + 1
+    if width < 11 or len(b) % width:
+        return None
+    rows = b.reshape(-1, width)
+    if not (rows[:, -1] == 0x0A).all():
+        return None
+    rows = rows[:, :-1]
+    if (rows[:, -1] == 0x0D).all():
+        rows = rows[:, :-1]
+    if rows.shape[1] == 11 and (rows[:, 3] == ord(",")).all():
+        rows = np.delete(rows, 3, axis=1)
+    digits = rows - np.uint8(ord("0"))
+    if not (digits <= 9).all():
+        return None
+    if digits.shape[1] == 11 and (digits[:, 0] == 1).all():
+        digits = digits[:, 1:]
+    if digits.shape[1] != 10:
+        return None
+    return digits @ _POWERS
+
+
+def iter_numbers(path, chunk_bytes=CHUNK_BYTES):
+    """Yield uint64 arrays of national numbers from a one-number-per-line file.
+
+    Accepts plain numbers, formatted numbers and "AAA,NNNNNNN" extract lines;
+    header rows and non-US numbers are skipped.
+    """
+    with open(path, "rb") as f:
+        # The first line on its own, so a header row doesn't knock the first chunk off the fast path
+        chunk = f.readline()
+        while chunk:
+            if not chunk.endswith(b"\n"):
+                chunk += b"\n"
+            numbers = _parse_fixed_width(chunk)
+            if numbers is None:
+                text = chunk.decode("utf-8", errors="replace").replace(",", "")
+                numbers = national_numbers([line.strip() for line in text.splitlines()])
+            yield numbers[numbers >= 0].astype(np.uint64)
+            chunk = f.read(chunk_bytes)
+            chunk += f.readline()  # end on a line boundary
+
+
+def _file_identity(path, kind):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size,
+            "mtime": int(stat.st_mtime), "kind": kind}
+
+
+def _manifest_path(path):
+    return f"{path}.json"
+
+
+def load_manifest(path):
+    try:
+        with open(_manifest_path(path)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"count": 0, "sources": []}
+
+
+class DncIndex:
+    """Read-only view of an index file. Lookups go through mmap."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(len(MAGIC) + 8)
+        if header[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a DNC index")
+        self.count = int(np.frombuffer(header, dtype="<u8", count=1, offset=len(MAGIC))[0])
+        # Offsets are 8 KB; keep them resident. Data stays on disk.
+        self.offsets = np.array(np.memmap(path, dtype="<u8", mode="r", offset=len(MAGIC) + 8,
+                                          shape=(AREA_CODES + 1,)))
+        self.data = (np.memmap(path, dtype="<u4", mode="r", offset=HEADER_SIZE, shape=(self.count,))
+                     if self.count else np.empty(0, dtype="<u4"))
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, phone):
+        return self.contains(phone)
+
+    def area(self, area_code):
+        """Sorted subscriber numbers for one area code (a view onto the mmap)."""
+        return self.data[self.offsets[area_code]:self.offsets[area_code + 1]]
+
+    def contains_number(self, number):
+        area, subscriber = divmod(number, SUBSCRIBER)
+        run = self.area(area)
+        i = np.searchsorted(run, subscriber)
+        return bool(i < len(run) and run[i] == subscriber)
+
+    def contains(self, phone):
+        number = national_number(phone) if isinstance(phone, str) else phone
+        return number is not None and 0 <= number < AREA_CODES * SUBSCRIBER and self.contains_number(number)
+
+    def contains_many(self, phones):
+        """Bool array: which of the phones (strings or national numbers) are listed."""
+        numbers = phones if isinstance(phones, np.ndarray) and phones.dtype.kind in "iu" \
+            else national_numbers(phones)
+        numbers = np.asarray(numbers, dtype=np.int64)
+        result = np.zeros(len(numbers), dtype=bool)
+        valid = np.flatnonzero((numbers >= 0) & (numbers < AREA_CODES * SUBSCRIBER))
+        if not len(valid):
+            return result
+        areas, subscribers = np.divmod(numbers[valid], SUBSCRIBER)
+        # Group by area code so each run is searched once with a vector of keys
+        order = np.argsort(areas, kind="stable")
+        areas, subscribers, valid = areas[order], subscribers[order], valid[order]
+        bounds = np.flatnonzero(np.diff(areas)) + 1
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(areas)]):
+            run = self.area(int(areas[start]))
+            if not len(run):
+                continue
+            keys = subscribers[start:stop]
+            i = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            result[valid[start:stop]] = run[i] == keys
+        return result
+
+    def close(self):
+        # The mapping is released once no views onto it remain
+        self.data = np.empty(0, dtype="<u4")
+
+
+# Building
+
+def _write_index(path, runs):
+    """Write an index from (area_code, sorted uint32 array) runs in area order."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    offsets = np.zeros(AREA_CODES + 1, dtype="<u8")
+    count = 0
+    with os.fdopen(fd, "wb") as f:
+        f.seek(HEADER_SIZE)
+        next_area = 0
+        for area, run in runs:
+            offsets[next_area:area + 1] = count
+            run.astype("<u4", copy=False).tofile(f)
+            count += len(run)
+            next_area = area + 1
+        offsets[next_area:] = count
+        f.seek(0)
+        f.write(MAGIC)
+        f.write(np.array([count], dtype="<u8").tobytes())
+        f.write(offsets.tobytes())
+    os.replace(tmp, path)
+    return count
+
+
+def _sorted_unique(numbers):
+    # Sort-based; np.unique may hash, which is far slower on large integer arrays
+    numbers = np.sort(numbers)
+    if len(numbers):
+        numbers = numbers[np.r_[True, numbers[1:] != numbers[:-1]]]
+    return numbers
+
+
+def _split_by_area(numbers):
+    """Sorted unique numbers -> {area: sorted uint32 subscribers}."""
+    areas, subscribers = np.divmod(numbers, SUBSCRIBER)
+    bounds = np.flatnonzero(np.diff(areas)) + 1
+    return {int(areas[start]): subscribers[start:stop].astype(np.uint32)
+            for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(areas)]) if stop > start}
+
+
+def _partitioned_runs(sources, spill_dir, partitions=10):
+    """External sort: spill numbers by leading area-code digit, then sort each partition."""
+    spills = [os.path.join(spill_dir, f"part-{p}.u8") for p in range(partitions)]
+    per_partition = AREA_CODES * SUBSCRIBER // partitions
+    files = [open(s, "wb") for s in spills]
+    try:
+        for source in sources:
+            for numbers in iter_numbers(source):
+                numbers = numbers[numbers < AREA_CODES * SUBSCRIBER]
+                part = (numbers // per_partition).astype(np.int64)
+                for p in np.flatnonzero(np.bincount(part, minlength=partitions)):
+                    numbers[part == p].tofile(files[p])
+    finally:
+        for f in files:
+            f.close()
+
+    for spill in spills:
+        numbers = _sorted_unique(np.fromfile(spill, dtype=np.uint64))
+        os.remove(spill)
+        yield from sorted(_split_by_area(numbers).items())
+
+
+def _load_numbers(paths):
+    chunks = [n for path in paths for n in iter_numbers(path)]
+    return _sorted_unique(np.concatenate(chunks)) if chunks else np.empty(0, dtype=np.uint64)
+
+
+def build(path, sources, deletes=()):
+    """Build an index from scratch out of registry extract files."""
+    removed = _split_by_area(_load_numbers(deletes))
+    spill_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".dnc-build-")
+    try:
+        runs = (
+            (area, np.setdiff1d(run, removed[area], assume_unique=True) if area in removed else run)
+            for area, run in _partitioned_runs(sources, spill_dir)
+        )
+        count = _write_index(path, runs)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
+
+    manifest = {
+        "count": count,
+        "builtAt": time.time(),
+        "sources": [_file_identity(p, "add") for p in sources]
+                   + [_file_identity(p, "delete") for p in deletes],
+    }
+    _save_manifest(path, manifest)
+    return manifest
+
+
+def update(path, adds=(), deletes=()):
+    """Merge delta files into an existing index, one area code at a time.
+
+    Files already recorded in the manifest are skipped, so a nightly job can
+    pass the whole delta directory every time.
+    """
+    if not os.path.exists(path):
+        return build(path, adds, deletes), True
+    manifest = load_manifest(path)
+    applied = {(s["path"], s["size"], s["mtime"], s["kind"]) for s in manifest["sources"]}
+
+    def new(paths, kind):
+        result = []
+        for p in paths:
+            identity = _file_identity(p, kind)
+            if (identity["path"], identity["size"], identity["mtime"], kind) not in applied:
+                result.append(identity)
+        return result
+
+    new_adds, new_deletes = new(adds, "add"), new(deletes, "delete")
+    if not new_adds and not new_deletes:
+        return manifest, False
+
+    added = _split_by_area(_load_numbers([s["path"] for s in new_adds]))
+    removed = _split_by_area(_load_numbers([s["path"] for s in new_deletes]))
+    base = DncIndex(path)
+    try:
+        def runs():
+            for area in range(AREA_CODES):
+                run = np.asarray(base.area(area), dtype=np.uint32)
+                if area in added:
+                    run = _sorted_unique(np.concatenate((run, added[area])))
+                if area in removed:
+                    run = np.setdiff1d(run, removed[area], assume_unique=True)
+                if len(run):
+                    yield area, run
+
+        # Written to a temp file and swapped in, so readers never see a partial index
+        count = _write_index(path, runs())
+    finally:
+        base.close()
+
+    manifest["count"] = count
+    manifest["builtAt"] = time.time()
+    manifest["sources"].extend(new_adds + new_deletes)
+    _save_manifest(path, manifest)
+    return manifest, True
+
+
+def _save_manifest(path, manifest):
+    with open(_manifest_path(path), "w") as f:
+        json.dump(manifest, f, indent=2)
@@ -0,0 +1,238 @@
+"""
+Lead enrichment (port of apps/compass/server/enrichment.ts), per lead and columnar.
+
+Compass runs enrichLead() one lead at a time when a rep opens it. The
+scalar functions here mirror the TS ones exactly (including Math.round's
+round-half-up); enrich_columns() applies the same rules to a whole block
+of a lead file with NumPy, using tables built once at import:
+
+    UTILITY_BY_ZIP3   int8[1000]  ZIP prefix -> index into UTILITY_IDS
+    county prices     resolved once per distinct county in a block
+
+lookupProperty() is not ported: it returns random placeholder data until
+Compass scrapes real listings. Square footage comes from the lead file
+instead, with enrichLead()'s 2000 sqft fallback.
+
+There is no result cache: the calculations cost less than parsing the
+cells they read, so a lookup keyed on either the parsed or the raw cells
+is no faster than recomputing (see bench_enrichment.py):
+
+    for headers, rows, columns in iter_blocks(path, phone_dnc_pairs=(), extra=INPUT_COLUMNS):
+        result = enrich_block(columns, len(rows))
+        result.estimated_value, result.monthly_bill, result.equity
+"""
+
+import math
+
+import numpy as np
+
+NC_UTILITIES = {
+    "duke_progress": {"id": "duke_progress", "name": "Duke Energy Progress", "ratePerKwh": 0.11,
+                      "avgMonthlyUsage": 1100},
+    "duke_carolinas": {"id": "duke_carolinas", "name": "Duke Energy Carolinas", "ratePerKwh": 0.115,
+                       "avgMonthlyUsage": 1050},
+    "dominion": {"id": "dominion", "name": "Dominion Energy", "ratePerKwh": 0.12, "avgMonthlyUsage": 1000},
+}
+
+# NC zip prefixes to utility mapping
+ZIP_PREFIX_TO_UTILITY = {
+    "280": "duke_carolinas",  # Charlotte
+    "281": "duke_carolinas",
+    "282": "duke_carolinas",
+    "283": "duke_carolinas",
+    "276": "duke_progress",   # Raleigh area
+    "277": "duke_progress",
+    "278": "dominion",        # NE NC
+    "279": "dominion",
+    "270": "duke_progress",   # Winston-Salem
+    "271": "duke_progress",
+    "272": "duke_progress",   # Greensboro
+    "273": "duke_progress",
+    "274": "duke_progress",   # Durham
+    "275": "duke_progress",
+}
+DEFAULT_UTILITY = "duke_progress"
+
+# NC county average price per sqft
+NC_PRICE_PER_SQFT = {
+    "mecklenburg": 220,  # Charlotte
+    "wake": 210,         # Raleigh
+    "durham": 200,
+    "guilford": 160,     # Greensboro
+    "forsyth": 155,      # Winston-Salem
+    "cabarrus": 180,     # Concord
+    "union": 190,        # Monroe
+    "default": 180,
+}
+
+KWH_PER_THOUSAND_SQFT = 900
+DEFAULT_SQFT = 2000
+
+# Lead file columns read for enrichment: mapped "zip" plus PropStream headers
+SQFT_COLUMNS = ("Living Square Feet", "Building Sqft", "Square Feet", "sqft")
+COUNTY_COLUMNS = ("County", "county")
+MORTGAGE_COLUMNS = ("Est. Remaining balance of Open Loans", "Mortgage Balance", "mortgageBalance")
+INPUT_COLUMNS = ("zip",) + SQFT_COLUMNS + COUNTY_COLUMNS + MORTGAGE_COLUMNS
+
+UTILITY_IDS = list(NC_UTILITIES)
+UTILITY_RATES = np.array([NC_UTILITIES[u]["ratePerKwh"] for u in UTILITY_IDS])
+UTILITY_BY_ZIP3 = np.full(1000, UTILITY_IDS.index(DEFAULT_UTILITY), dtype=np.int8)
+for _prefix, _utility in ZIP_PREFIX_TO_UTILITY.items():
+    UTILITY_BY_ZIP3[int(_prefix)] = UTILITY_IDS.index(_utility)
+
+
+def js_round(x):
+    """Math.round: nearest integer, halves toward +infinity."""
+    floor = math.floor(x)
+    return floor + 1 if x - floor >= 0.5 else floor
+
+
+def js_round_array(x):
+    floor = np.floor(x)
+    return np.where(x - floor >= 0.5, floor + 1, floor)
+
+
+# Row-at-a-time port of enrichment.ts
+
+def lookup_utility(zip_code):
+    return NC_UTILITIES[ZIP_PREFIX_TO_UTILITY.get(zip_code[:3], DEFAULT_UTILITY)]
+
+
+def calculate_estimated_value(sqft, county=None):
+    price = (NC_PRICE_PER_SQFT.get(county.lower()) or NC_PRICE_PER_SQFT["default"]) if county \
+        else NC_PRICE_PER_SQFT["default"]
+    return js_round(sqft * price)
+
+
+def calculate_electric_bill(sqft, utility):
+    monthly_kwh = (sqft / 1000) * KWH_PER_THOUSAND_SQFT
+    return js_round(monthly_kwh * utility["ratePerKwh"])
+
+
+def calculate_estimated_equity(estimated_value, mortgage_balance=None):
+    if mortgage_balance is None:
+        return None
+    return estimated_value - mortgage_balance
+
+
+def enrich_lead(zip_code, sqft=None, county=None, mortgage_balance=None):
+    """enrichLead()'s utility and calculations for one lead (the property lookup is the caller's)."""
+    utility = lookup_utility(zip_code)
+    sqft = sqft or DEFAULT_SQFT
+    estimated_value = calculate_estimated_value(sqft, county)
+    return {
+        "utility": utility,
+        "calculations": {
+            "estimatedValue": estimated_value,
+            "monthlyElectricBill": calculate_electric_bill(sqft, utility),
+            "estimatedEquity": calculate_estimated_equity(estimated_value, mortgage_balance),
+        },
+        "source": "calculated",
+    }
+
+
+# Columnar
+
+def parse_numbers(values):
+    """Numbers from lead file cells ("1,850", "$212,000"); NaN where blank or not a number."""
+    cleaned = np.char.strip(np.char.replace(np.char.replace(np.asarray(values, dtype=str), ",", ""), "$", ""))
+    out = np.full(cleaned.shape, np.nan)
+    filled = cleaned != ""
+    try:
+        out[filled] = cleaned[filled].astype(float)
+    except ValueError:
+        for i in np.flatnonzero(filled):
+            try:
+                out[i] = float(cleaned[i])
+            except ValueError:
+                pass
+    return out
+
+
+def county_prices(counties):
+    """Price per sqft for each county cell, looking each distinct county up once."""
+    unique, inverse = np.unique(np.asarray(counties, dtype=str), return_inverse=True)
+    prices = np.array([(NC_PRICE_PER_SQFT.get(c.lower()) or NC_PRICE_PER_SQFT["default"]) if c
+                       else NC_PRICE_PER_SQFT["default"] for c in unique.tolist()], dtype=float)
+    return prices[inverse.reshape(-1)]
+
+
+class Enrichment:
+    """enrichLead() calculations for a block of leads, as arrays."""
+
+    def __init__(self, utility, sqft, estimated_value, monthly_bill, equity):
+        self.utility = utility                   # index into UTILITY_IDS
+        self.sqft = sqft
+        self.estimated_value = estimated_value
+        self.monthly_bill = monthly_bill
+        self.equity = equity                     # NaN without a mortgage balance
+
+    def __len__(self):
+        return len(self.utility)
+
+    def counts(self):
+        """{utility id: leads}"""
+        return dict(zip(UTILITY_IDS, np.bincount(self.utility, minlength=len(UTILITY_IDS)).tolist()))
+
+    def utility_ids(self):
+        return np.array(UTILITY_IDS)[self.utility]
+
+    def rows(self):
+        """Per-lead output cells: utility id, rate, monthly bill, estimated value, equity ("" when unknown)."""
+        rates = UTILITY_RATES[self.utility].tolist()
+        equity = [("" if math.isnan(e) else int(e) if e == int(e) else e) for e in self.equity.tolist()]
+        return zip(self.utility_ids().tolist(), rates, self.monthly_bill.tolist(),
+                   self.estimated_value.tolist(), equity)
+
+
+def resolve_inputs(zips, sqft=None, counties=None, mortgage_balance=None):
+    """Table lookups for a block: (utility index, price per sqft, sqft, mortgage balance) arrays.
+
+    sqft and mortgage_balance are numbers, NaN when missing; a missing or
+    zero sqft becomes DEFAULT_SQFT, as in enrichLead().
+    """
+    zips = np.asarray(zips, dtype=str)
+    n = len(zips)
+    # zip.substring(0, 3): only three-digit prefixes are in the table. Read the
+    # code points directly; short ZIPs are padded with NUL, which isn't a digit.
+    digits = zips.astype("<U3").view(np.uint32).reshape(n, 3).astype(np.int64) - ord("0")
+    known = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    utility = np.full(n, UTILITY_IDS.index(DEFAULT_UTILITY), dtype=np.int8)
+    utility[known] = UTILITY_BY_ZIP3[digits[known] @ np.array([100, 10, 1])]
+
+    price = county_prices(counties) if counties is not None else np.full(n, float(NC_PRICE_PER_SQFT["default"]))
+    sqft = np.full(n, np.nan) if sqft is None else np.asarray(sqft, dtype=float)
+    sqft = np.where(np.isnan(sqft) | (sqft == 0), DEFAULT_SQFT, sqft)
+    balance = np.full(n, np.nan) if mortgage_balance is None else np.asarray(mortgage_balance, dtype=float)
+    return utility, price, sqft, balance
+
+
+def calculate(utility, price, sqft, balance):
+    """calculateEstimatedValue/ElectricBill/EstimatedEquity over resolved inputs."""
+    estimated_value = js_round_array(sqft * price)
+    monthly_kwh = (sqft / 1000) * KWH_PER_THOUSAND_SQFT
+    monthly_bill = js_round_array(monthly_kwh * UTILITY_RATES[utility])
+    equity = estimated_value - balance
+    return Enrichment(utility, sqft, estimated_value.astype(np.int64), monthly_bill.astype(np.int64), equity)
+
+
+def enrich_columns(zips, sqft=None, counties=None, mortgage_balance=None):
+    """enrichLead() over whole columns (see resolve_inputs for the arguments)."""
+    return calculate(*resolve_inputs(zips, sqft, counties, mortgage_balance))
+
+
+def _first(columns, names, n):
+    return next((columns[name] for name in names if name in columns), np.full(n, "", dtype=str))
+
+
+def block_inputs(columns, rows):
+    """(zips, sqft, counties, mortgage balances) from an iter_blocks(extra=INPUT_COLUMNS) block."""
+    return (np.char.strip(_first(columns, ("zip",), rows)),
+            parse_numbers(_first(columns, SQFT_COLUMNS, rows)),
+            np.char.strip(_first(columns, COUNTY_COLUMNS, rows)),
+            parse_numbers(_first(columns, MORTGAGE_COLUMNS, rows)))
+
+
+def enrich_block(columns, rows):
+    """Enrich one iter_blocks() block."""
+    return enrich_columns(*block_inputs(columns, rows))
@@ -0,0 +1,354 @@
+"""
+Streaming PropStream CSV -> Twenty Person ingest.
+
+The file is read row by row; rows are mapped to PersonCreateInput payloads
+and grouped into batches that worker threads send as createPeople mutations.
+A bounded queue between the reader and the workers provides backpressure,
+so memory stays flat no matter how large the file is.
+
+Progress is journaled to a checkpoint file: each completed batch index is
+appended as it finishes, and a rerun with the same file and batch size
+skips those batches.
+
+With a DedupIndex, each batch is split before any API call: rows matching
+an existing person (or an earlier row of the file) are written to the
+duplicates report instead of being created.
+"""
+
+import csv
+import json
+import os
+import queue
+import threading
+import time
+
+from twenty import TwentyError, get_client
+from twenty.batch import WORKSPACE, MutationBatch, Operation
+
+from .classifier import TCPA_STATUS, classify_lead
+from .phone import normalize_phone
+from .propstream import dedupe_headers, map_propstream_row
+
+CREATE_PEOPLE = """
+mutation CreatePeople($data: [PersonCreateInput!]!) {
+    createPeople(data: $data) { id }
+}
+"""
+
+CREATE_PEOPLE_UPSERT = """
+mutation CreatePeople($data: [PersonCreateInput!]!) {
+    createPeople(data: $data, upsert: true) { id }
+}
+"""
+
+
+def iter_propstream_rows(path):
+    """Yield (row_number, mapped_row) from a PropStream CSV, streaming."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        try:
+            headers = dedupe_headers(next(reader))
+        except StopIteration:
+            return
+        for row_number, values in enumerate(reader, start=1):
+            yield row_number, map_propstream_row(dict(zip(headers, values)))
+
+
+def _split_e164(phone):
+    if phone.startswith("+1") and len(phone) == 12:
+        return "+1", phone[2:]
+    return "", phone
+
+
+def person_payload(row, assigned_rep=None, analysis=None):
+    """Map a PropStream row to a PersonCreateInput, or None if it has no name.
+
+    Only callable numbers are written, the first as the primary phone; DNC
+    numbers are left out so nothing dials them. The classifier's risk level
+    goes to tcpaStatus (as one of its options, see TCPA_STATUS), which the
+    dialer and the dashboard read.
+    """
+    first = row.get("first_name", "")
+    last = row.get("last_name", "")
+    if not first and not last:
+        return None
+
+    analysis = analysis or classify_lead(row)
+    data = {"name": {"firstName": first, "lastName": last}}
+    if analysis["riskLevel"] in TCPA_STATUS:
+        data["tcpaStatus"] = TCPA_STATUS[analysis["riskLevel"]]
+
+    phones = [normalize_phone(p) for p in analysis["callableNumbers"]]
+    if phones:
+        code, number = _split_e164(phones[0])
+        data["phones"] = {"primaryPhoneNumber": number, "primaryPhoneCountryCode": code}
+        extra = [{"number": n, "countryCode": c} for c, n in map(_split_e164, phones[1:])]
+        if extra:
+            data["phones"]["additionalPhones"] = extra
+
+    emails = [e for e in (row.get("email_1"), row.get("email_2")) if e]
+    if emails:
+        data["emails"] = {"primaryEmail": emails[0]}
+        if len(emails) > 1:
+            data["emails"]["additionalEmails"] = emails[1:]
+
+    if row.get("company_name"):
+        data["jobTitle"] = row["company_name"]
+    for field, column in (("city", "city"), ("state", "state"), ("zipCode", "zip")):
+        if row.get(column):
+            data[field] = row[column]
+    if assigned_rep:
+        data["assignedRep"] = assigned_rep
+    return data
+
+
+class Checkpoint:
+    """Append-only journal of completed batches for one (file, batch size).
+
+    The first line records the input identity; each later line is one
+    completed batch, flushed as soon as it finishes so a crash loses nothing.
+    """
+
+    def __init__(self, path, source, batch_size, **extra):
+        self.path = path
+        stat = os.stat(source)
+        self.identity = {
+            "source": os.path.abspath(source),
+            "size": stat.st_size,
+            "mtime": int(stat.st_mtime),
+            "batchSize": batch_size,
+            **extra,
+        }
+        self.done = set()
+        self.created = 0
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """Load a matching journal. Returns False if it belongs to other input."""
+        try:
+            with open(self.path) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return True
+        if not lines:
+            return True
+        try:
+            if json.loads(lines[0]) != self.identity:
+                return False
+        except ValueError:
+            return False
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a crash
+            self.done.add(entry["batch"])
+            self.created += entry["created"]
+        return True
+
+    def reset(self):
+        self.done = set()
+        self.created = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def mark(self, index, created):
+        with self._lock:
+            if self._file is None:
+                fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+                self._file = open(self.path, "a")
+                if fresh:
+                    self._file.write(json.dumps(self.identity) + "\n")
+            self.done.add(index)
+            self.created += created
+            self._file.write(json.dumps({"batch": index, "created": created}) + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class IngestStats:
+    def __init__(self):
+        self.rows = 0
+        self.skipped = 0
+        self.screened = 0
+        self.resumed = 0
+        self.created = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.conflicts = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for k, v in counts.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def line(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        line = (f"rows {self.rows:,}  created {self.created:,}  failed {self.failed:,}  "
+                f"skipped {self.skipped:,}  resumed {self.resumed:,}")
+        if self.screened:
+            line += f"  screened out {self.screened:,}"
+        if self.duplicates or self.conflicts:
+            line += f"  duplicates {self.duplicates:,}  conflicts {self.conflicts:,}"
+        return line + f"  ({self.rows / elapsed:,.0f} rows/s)"
+
+
+class PropStreamIngest:
+    """Stream a PropStream CSV into Twenty with concurrent createPeople batches."""
+
+    def __init__(self, path, checkpoint_path=None, batch_size=60, workers=4,
+                 assigned_rep=None, upsert=False, client=None, failures_path=None,
+                 tiers=None, dedup=None, duplicates_path=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.workers = workers
+        self.assigned_rep = assigned_rep
+        self.upsert = upsert
+        self.mutation = CREATE_PEOPLE_UPSERT if upsert else CREATE_PEOPLE
+        self.client = client or get_client()
+        # TCPA tiers to import (None imports every row); batch boundaries depend on it
+        self.tiers = tuple(tiers) if tiers is not None else None
+        self.checkpoint = Checkpoint(checkpoint_path or f"{path}.checkpoint", path, batch_size,
+                                     tiers=sorted(self.tiers) if self.tiers is not None else None)
+        self.failures_path = failures_path or f"{path}.failures.jsonl"
+        self.dedup = dedup
+        self.duplicates_path = duplicates_path or f"{path}.duplicates.jsonl"
+        self.stats = IngestStats()
+        self._failures_lock = threading.Lock()
+
+    def batches(self):
+        """Yield (batch_index, [(row_number, payload)]) for every batch in the file."""
+        batch, index = [], 0
+        for row_number, row in iter_propstream_rows(self.path):
+            self.stats.add(rows=1)
+            analysis = classify_lead(row)
+            if self.tiers is not None and analysis["riskLevel"] not in self.tiers:
+                self.stats.add(screened=1)
+                continue
+            payload = person_payload(row, self.assigned_rep, analysis)
+            if payload is None:
+                self.stats.add(skipped=1)
+                continue
+            batch.append((row_number, payload))
+            if len(batch) == self.batch_size:
+                yield index, batch
+                batch, index = [], index + 1
+        if batch:
+            yield index, batch
+
+    def _record_failures(self, failures):
+        with self._failures_lock, open(self.failures_path, "a") as f:
+            for row_number, error in failures:
+                f.write(json.dumps({"row": row_number, "error": error}) + "\n")
+
+    def _split_duplicates(self, batch):
+        """Drop rows the dedup index already knows; report them. Returns the new rows."""
+        new, duplicates, conflicts = self.dedup.split(batch)
+        if duplicates or conflicts:
+            with self._failures_lock, open(self.duplicates_path, "a") as f:
+                for kind, entries in (("duplicate", duplicates), ("conflict", conflicts)):
+                    for row_number, payload, person_ids in entries:
+                        f.write(json.dumps({"row": row_number, "kind": kind,
+                                            "people": person_ids, "data": payload}) + "\n")
+            self.stats.add(duplicates=len(duplicates), conflicts=len(conflicts))
+        return new
+
+    def _send(self, index, batch):
+        if not batch:
+            self.checkpoint.mark(index, 0)
+            return
+        try:
+            data = self.client.graphql(self.mutation, {"data": [p for _, p in batch]}, idempotent=self.upsert)
+            people = data.get("createPeople") or []
+            created = len(people)
+            failures = []
+            if self.dedup is not None:
+                for (_, payload), person in zip(batch, people):
+                    self.dedup.add(person["id"], payload)
+        except TwentyError as e:
+            if e.retryable:
+                # Transient after client retries - leave unmarked so a rerun picks it up
+                self._record_failures([(n, str(e)) for n, _ in batch])
+                self.stats.add(failed=len(batch))
+                return
+            created, failures, unknown = self._send_individually(batch)
+            if unknown:
+                # Some rows may or may not exist - leave unmarked; the dedup index skips the created ones
+                self._record_failures(failures)
+                self.stats.add(created=created, failed=len(failures))
+                return
+
+        if failures:
+            self._record_failures(failures)
+        self.stats.add(created=created, failed=len(failures))
+        self.checkpoint.mark(index, created)
+
+    def _send_individually(self, batch):
+        """Isolate bad rows: resend the batch as single creates. Returns (created, failures, unknown).
+
+        Each create is its own document: in one aliased document the first
+        failing create would stop the ones after it.
+        """
+        results = MutationBatch(self.client, batch_size=1)
+        pending = [(n, results.add(Operation(
+            "createPerson", {"data": ("PersonCreateInput!", p)}, "id", WORKSPACE, key=n,
+        ))) for n, p in batch]
+        results.flush()
+        created = sum(1 for _, r in pending if r.ok)
+        failures = [(n, str(r.error)) for n, r in pending if not r.ok]
+        if self.dedup is not None:
+            payloads = dict(batch)
+            for n, r in pending:
+                if r.ok:
+                    self.dedup.add(r.data["id"], payloads[n])
+        return created, failures, any(r.unknown for _, r in pending)
+
+    def run(self, progress_every=5.0):
+        """Run the import. Returns IngestStats."""
+        work = queue.Queue(maxsize=self.workers * 2)
+        errors = []
+
+        def worker():
+            while True:
+                item = work.get()
+                if item is None:
+                    return
+                try:
+                    self._send(*item)
+                except Exception as e:  # keep other workers alive; report at the end
+                    errors.append(e)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(self.workers)]
+        for t in threads:
+            t.start()
+
+        last_report = time.time()
+        for index, batch in self.batches():
+            if index in self.checkpoint.done:
+                self.stats.add(resumed=len(batch))
+                continue
+            if self.dedup is not None:
+                batch = self._split_duplicates(batch)
+            work.put((index, batch))  # blocks when workers fall behind
+            if time.time() - last_report >= progress_every:
+                print(f"  {self.stats.line()}")
+                last_report = time.time()
+
+        for _ in threads:
+            work.put(None)
+        for t in threads:
+            t.join()
+        self.checkpoint.close()
+        if self.dedup is not None:
+            self.dedup.save()
+        if errors:
+            raise errors[0]
+        return self.stats
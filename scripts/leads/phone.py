@@ -0,0 +1,38 @@
+"""
+Phone number utilities (port of client/src/lib/tcpa/phone.ts).
+
+Normalize and validate phone numbers for US format.
+"""
+
+import re
+
+_NON_DIGITS = re.compile(r"\D")
+
+
+def normalize_phone(phone):
+    """'(704) 555-0100' -> '+17045550100'. Unrecognized input is returned as-is."""
+    if not phone:
+        return ""
+    digits = _NON_DIGITS.sub("", phone)
+    if len(digits) == 10:
+        return "+1" + digits
+    if len(digits) == 11 and digits.startswith("1"):
+        return "+" + digits
+    return phone
+
+
+def is_valid_phone(phone):
+    if not phone:
+        return True
+    digits = _NON_DIGITS.sub("", phone)
+    return len(digits) == 10 or (len(digits) == 11 and digits.startswith("1"))
+
+
+def format_phone(phone):
+    if not phone:
+        return ""
+    digits = _NON_DIGITS.sub("", phone)
+    local = digits[1:] if len(digits) == 11 and digits.startswith("1") else digits
+    if len(local) != 10:
+        return phone
+    return f"({local[:3]}) {local[3:6]}-{local[6:]}"
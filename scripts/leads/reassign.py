@@ -0,0 +1,220 @@
+"""
+Resumable bulk reassignment of leads between assignedRep values.
+
+Runs in two phases, both journaled so a crash resumes where it stopped:
+
+1. select  - stream matching person ids with cursor pagination and append
+             them to the journal (the selection is frozen, so updates can't
+             shift pages under the cursor);
+2. update  - send batches of ids as grouped updatePeople mutations, a
+             bounded number in flight, marking each batch when it lands.
+
+Targets are spread round-robin by position in the selection, so a resumed
+run sends every lead to the same rep the first run would have.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from twenty import get_client
+from twenty.metadata import CACHE_DIR, workspace_key
+from twenty.pagination import iter_pages
+
+from .assign import ASSIGNED_REP, TwentySink
+
+
+def build_filter(from_reps=None, unassigned=False, state=None, zips=None,
+                 created_after=None, created_before=None):
+    """PersonFilterInput for the leads to move."""
+    clauses = []
+    if unassigned:
+        clauses.append({ASSIGNED_REP: {"is": "NULL"}})
+    elif from_reps:
+        clauses.append({ASSIGNED_REP: {"in": list(from_reps)}})
+    if state:
+        clauses.append({"state": {"eq": state}})
+    if zips:
+        clauses.append({"zipCode": {"in": list(zips)}})
+    if created_after:
+        clauses.append({"createdAt": {"gte": created_after}})
+    if created_before:
+        clauses.append({"createdAt": {"lt": created_before}})
+    return {"and": clauses} if clauses else None
+
+
+class ReassignJournal:
+    """Append-only record of one reassignment: identity, selected ids, finished batches."""
+
+    def __init__(self, path, identity):
+        self.path = path
+        self.identity = identity
+        self.ids = []
+        self.selected = False
+        self.done = set()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """Load a matching journal. Returns False if it belongs to another job."""
+        try:
+            with open(self.path) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return True
+        if not lines:
+            return True
+        try:
+            if json.loads(lines[0]) != self.identity:
+                return False
+        except ValueError:
+            return False
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a crash
+            if "ids" in entry:
+                self.ids.extend(entry["ids"])
+            elif "selected" in entry:
+                self.selected = True
+            elif "batch" in entry:
+                self.done.add(entry["batch"])
+        if not self.selected:
+            # Selection was interrupted; it is cheap to redo from the start
+            self.reset()
+        return True
+
+    def reset(self):
+        self.ids, self.selected, self.done = [], False, set()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _write(self, entry):
+        with self._lock:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, "a")
+                if self._file.tell() == 0:
+                    self._file.write(json.dumps(self.identity) + "\n")
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+
+    def add_ids(self, ids):
+        self.ids.extend(ids)
+        self._write({"ids": ids})
+
+    def mark_selected(self):
+        self.selected = True
+        self._write({"selected": len(self.ids)})
+
+    def mark(self, index):
+        self.done.add(index)
+        self._write({"batch": index})
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class Reassignment:
+    def __init__(self, filter, targets, batch_size=100, concurrency=4, page_size=200,
+                 journal_path=None, client=None):
+        if not targets:
+            raise ValueError("at least one target rep is required")
+        self.filter = filter
+        self.targets = list(targets)
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.page_size = page_size
+        self.client = client or get_client()
+        identity = {"filter": filter, "targets": self.targets, "batchSize": batch_size}
+        digest = hashlib.sha1(json.dumps(identity, sort_keys=True).encode()).hexdigest()[:12]
+        self.journal = ReassignJournal(
+            journal_path or os.path.join(
+                CACHE_DIR, f"reassign-{workspace_key(self.client.api_key, self.client.base_url)}-{digest}.jsonl"
+            ),
+            identity,
+        )
+        self.current = {}   # rep value -> selected leads, for dry-run reports
+        self.updated = 0
+        self.failed = {}
+
+    def target(self, position):
+        return self.targets[position % len(self.targets)]
+
+    def select(self, progress=None, record=True):
+        """Phase 1: stream matching ids into the journal (or just count them)."""
+        if self.journal.selected:
+            return len(self.journal.ids)
+        selected = 0
+        for nodes, _ in iter_pages("people", f"id {ASSIGNED_REP}", filter=self.filter,
+                                   order_by=[{"createdAt": "AscNullsFirst"}],
+                                   page_size=self.page_size, client=self.client):
+            ids = [n["id"] for n in nodes]
+            for n in nodes:
+                rep = n.get(ASSIGNED_REP) or "(unassigned)"
+                self.current[rep] = self.current.get(rep, 0) + 1
+            selected += len(ids)
+            if ids and record:
+                self.journal.add_ids(ids)
+            if progress:
+                progress(selected)
+        if record:
+            self.journal.mark_selected()
+        return selected
+
+    def plan(self, selected):
+        """{target rep: leads it will receive} for a selection of that size."""
+        counts = {}
+        for position in range(selected):
+            counts[self.target(position)] = counts.get(self.target(position), 0) + 1
+        return counts
+
+    def batches(self):
+        ids = self.journal.ids
+        for index, start in enumerate(range(0, len(ids), self.batch_size)):
+            if index not in self.journal.done:
+                yield index, {pid: self.target(start + i) for i, pid in enumerate(ids[start:start + self.batch_size])}
+
+    def _send(self, index, assignments):
+        written, failed = TwentySink(self.client).write(assignments)
+        if not failed:
+            self.journal.mark(index)
+        return written, failed
+
+    def apply(self, progress=None):
+        """Phase 2: send the remaining batches. Returns (updated, failed)."""
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = [pool.submit(self._send, index, assignments) for index, assignments in self.batches()]
+            for future in futures:
+                written, failed = future.result()
+                self.updated += len(written)
+                self.failed.update(failed)
+                if progress:
+                    progress(self.updated, len(self.failed))
+        self.journal.close()
+        if not self.failed:
+            # Finished; the next run with the same filter is a new job
+            self.journal.reset()
+        return self.updated, self.failed
+
+    def run(self, dry_run=False, progress_every=5.0):
+        started = time.time()
+        last = [0.0]
+
+        def report(*counts):
+            if time.time() - last[0] >= progress_every:
+                last[0] = time.time()
+                print(f"  {' / '.join(f'{c:,}' for c in counts)}  ({time.time() - started:.0f}s)")
+
+        selected = self.select(progress=report, record=not dry_run)
+        if not dry_run:
+            self.apply(progress=report)
+        self.journal.close()
+        return selected
@@ -0,0 +1,500 @@
+"""
+Local lead search: SQLite FTS5 over people, synced incrementally from Twenty.
+
+The dialer and leads pages search Twenty with GraphQL filters on every
+keystroke. LeadIndex keeps one row per person (name, address, phones,
+emails) in SQLite with two full-text indexes:
+
+    leads_words   unicode61 tokens with prefix indexes: ranked prefix search
+    leads_grams   trigrams: phone digit substrings ("0100"), substrings
+
+    index = LeadIndex()
+    index.sync()                      # first run sweeps every person
+    index.search("jon smi")           # prefix match on every word
+    index.search("0100")              # phone digits anywhere in a number
+    index.search("jonathn smtih")     # no prefix hit -> corrected to indexed words
+
+sync() follows people by updatedAt (and soft deletes by deletedAt) from
+watermarks, re-reading the records at each watermark; upserts make that
+harmless. Results are ranked by bm25 with name matches weighted highest.
+"""
+
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from twenty import get_client, get_metadata
+from twenty.auth import DEFAULT_HOST, verify_token
+from twenty.export import exported_fields, projection
+from twenty.metadata import CACHE_DIR, workspace_key
+from twenty.pagination import iter_changes
+
+# Person fields folded into each column, when the workspace has them
+# (the PropStream import adds the custom ones; see twentyDataProvider.ts)
+NAME_FIELDS = ("name",)
+ADDRESS_FIELDS = ("street", "address", "city", "state", "zipCode")
+PHONE_FIELDS = ("phones", "cell1", "cell2", "cell3", "cell4", "landline1", "landline2", "phone1", "phone2")
+EMAIL_FIELDS = ("emails", "email1", "email2", "email3")
+SYSTEM_FIELDS = ("id", "updatedAt", "deletedAt")
+
+# bm25 column weights: name, address, phones, emails
+WEIGHTS = (10.0, 3.0, 2.0, 2.0)
+
+# Queries matching at least this many leads skip bm25 ranking (see _ranked)
+CANDIDATES = 500
+VOCABULARY_TTL = 600.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    doc INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    address TEXT NOT NULL DEFAULT '',
+    phones TEXT NOT NULL DEFAULT '',
+    emails TEXT NOT NULL DEFAULT '',
+    display TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS leads_words USING fts5(
+    name, address, phones, emails, content='leads', content_rowid='doc',
+    tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS leads_grams USING fts5(
+    name, address, phones, emails, content='leads', content_rowid='doc', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS leads_insert AFTER INSERT ON leads BEGIN
+    INSERT INTO leads_words (rowid, name, address, phones, emails)
+        VALUES (new.doc, new.name, new.address, new.phones, new.emails);
+    INSERT INTO leads_grams (rowid, name, address, phones, emails)
+        VALUES (new.doc, new.name, new.address, new.phones, new.emails);
+END;
+CREATE TRIGGER IF NOT EXISTS leads_delete AFTER DELETE ON leads BEGIN
+    INSERT INTO leads_words (leads_words, rowid, name, address, phones, emails)
+        VALUES ('delete', old.doc, old.name, old.address, old.phones, old.emails);
+    INSERT INTO leads_grams (leads_grams, rowid, name, address, phones, emails)
+        VALUES ('delete', old.doc, old.name, old.address, old.phones, old.emails);
+END;
+CREATE TRIGGER IF NOT EXISTS leads_update AFTER UPDATE ON leads BEGIN
+    INSERT INTO leads_words (leads_words, rowid, name, address, phones, emails)
+        VALUES ('delete', old.doc, old.name, old.address, old.phones, old.emails);
+    INSERT INTO leads_grams (leads_grams, rowid, name, address, phones, emails)
+        VALUES ('delete', old.doc, old.name, old.address, old.phones, old.emails);
+    INSERT INTO leads_words (rowid, name, address, phones, emails)
+        VALUES (new.doc, new.name, new.address, new.phones, new.emails);
+    INSERT INTO leads_grams (rowid, name, address, phones, emails)
+        VALUES (new.doc, new.name, new.address, new.phones, new.emails);
+END;
+CREATE VIRTUAL TABLE IF NOT EXISTS leads_vocab USING fts5vocab(leads_words, 'row');
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+UPSERT = """
+INSERT INTO leads (id, name, address, phones, emails, display) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (id) DO UPDATE SET
+    name = excluded.name, address = excluded.address, phones = excluded.phones,
+    emails = excluded.emails, display = excluded.display
+WHERE display != excluded.display
+"""
+
+_NON_DIGITS = re.compile(r"\D")
+_WORDS = re.compile(r"\w+", re.UNICODE)
+
+
+# Documents
+
+def _national(phone):
+    """Digits of a US number without the country code, for substring search."""
+    digits = _NON_DIGITS.sub("", str(phone or ""))
+    return digits[1:] if len(digits) == 11 and digits.startswith("1") else digits
+
+
+def person_phones(person):
+    phones = []
+    for name in PHONE_FIELDS:
+        value = person.get(name)
+        if isinstance(value, dict):
+            phones.append(value.get("primaryPhoneNumber"))
+            phones += [p.get("number") for p in value.get("additionalPhones") or [] if isinstance(p, dict)]
+        else:
+            phones.append(value)
+    return list(dict.fromkeys(p for p in map(_national, phones) if p))
+
+
+def person_emails(person):
+    emails = []
+    for name in EMAIL_FIELDS:
+        value = person.get(name)
+        if isinstance(value, dict):
+            emails.append(value.get("primaryEmail"))
+            emails += value.get("additionalEmails") or []
+        else:
+            emails.append(value)
+    return list(dict.fromkeys(str(e).strip().lower() for e in emails if e))
+
+
+def person_address(person):
+    parts = []
+    for name in ADDRESS_FIELDS:
+        value = person.get(name)
+        if isinstance(value, dict):
+            parts += [value.get(k) for k in ("addressStreet1", "addressStreet2", "addressCity", "addressState",
+                                             "addressPostcode")]
+        else:
+            parts.append(value)
+    return ", ".join(dict.fromkeys(str(p).strip() for p in parts if p))
+
+
+def person_name(person):
+    name = person.get("name") or {}
+    if isinstance(name, dict):
+        return f"{name.get('firstName') or ''} {name.get('lastName') or ''}".strip()
+    return str(name)
+
+
+def document(person):
+    """(id, name, address, phones, emails, display JSON) for one person record."""
+    name, address = person_name(person), person_address(person)
+    phones, emails = person_phones(person), person_emails(person)
+    display = {"id": person["id"], "name": name or "Unknown", "phone": phones[0] if phones else "",
+               "email": emails[0] if emails else "", "address": address}
+    return person["id"], name, address, " ".join(phones), " ".join(emails), json.dumps(display)
+
+
+# Queries
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def bigrams(word):
+    padded = f" {word} "
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+def edit_distance(a, b, limit=2):
+    """Optimal string alignment distance (an adjacent swap costs 1); limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class Vocabulary:
+    """Alphabetic index terms, for suggesting corrections of misspelled query words."""
+
+    def __init__(self, terms):
+        self.terms = list(terms)
+        self.postings = {}
+        for i, term in enumerate(self.terms):
+            for gram in bigrams(term):
+                self.postings.setdefault((gram, len(term)), []).append(i)
+        self.loaded = time.time()
+
+    def similar(self, word, limit=8):
+        """Terms within 1 edit (2 for words over four letters), closest first."""
+        max_distance = 1 if len(word) <= 4 else 2
+        grams = bigrams(word)
+        counts = {}
+        for length in range(len(word) - max_distance, len(word) + max_distance + 1):
+            for gram in grams:
+                for i in self.postings.get((gram, length), ()):
+                    counts[i] = counts.get(i, 0) + 1
+        # Each edit changes at most three padded bigrams
+        need = len(grams) - 3 * max_distance
+        scored = []
+        for i, shared in counts.items():
+            if shared >= need:
+                distance = edit_distance(word, self.terms[i], max_distance)
+                if distance <= max_distance:
+                    scored.append((distance, self.terms[i]))
+        scored.sort()
+        return [term for _, term in scored[:limit]]
+
+
+def _now_iso():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+class LeadIndex:
+    """SQLite FTS5 index of people for search-as-you-type."""
+
+    def __init__(self, client=None, path=None, meta=None):
+        self.client = client or get_client()
+        self.meta = meta
+        self.path = path or os.path.join(
+            CACHE_DIR, f"lead-search-{workspace_key(self.client.api_key, self.client.base_url)}.sqlite"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._vocab_lock = threading.Lock()
+        self._vocab = None
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+            db.execute("INSERT INTO leads_words (leads_words, rank) VALUES ('rank', ?)",
+                       (f"bm25({', '.join(map(str, WEIGHTS))})",))
+
+    def _connect(self):
+        """One connection per thread; WAL lets searches run during a sync."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # State
+
+    def _get_state(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_state(db, key, value):
+        db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def status(self):
+        return {
+            "leads": self._connect().execute("SELECT COUNT(*) FROM leads").fetchone()[0],
+            "watermark": self._get_state("watermark"),
+            "deletedWatermark": self._get_state("deletedWatermark"),
+            "lastSync": self._get_state("lastSync"),
+        }
+
+    # Writing
+
+    def apply(self, people):
+        """Index (or re-index) person records. Returns how many changed."""
+        db = self._connect()
+        with db:
+            before = db.total_changes
+            db.executemany(UPSERT, map(document, people))
+            return db.total_changes - before
+
+    def remove(self, ids):
+        with self._connect() as db:
+            db.executemany("DELETE FROM leads WHERE id = ?", ((i,) for i in ids))
+
+    def rebuild(self):
+        with self._sync_lock, self._connect() as db:
+            db.execute("DELETE FROM leads")
+            db.execute("DELETE FROM state")
+
+    def optimize(self):
+        """Merge FTS segments; worth running after a large first sync."""
+        with self._connect() as db:
+            db.execute("INSERT INTO leads_words (leads_words) VALUES ('optimize')")
+            db.execute("INSERT INTO leads_grams (leads_grams) VALUES ('optimize')")
+
+    def fields(self):
+        """GraphQL projection of the indexed person fields this workspace has."""
+        wanted = set(NAME_FIELDS + ADDRESS_FIELDS + PHONE_FIELDS + EMAIL_FIELDS + SYSTEM_FIELDS)
+        available = exported_fields((self.meta or get_metadata()).fields("person"))
+        return projection([(name, field_type) for name, field_type in available if name in wanted])
+
+    def sync(self, page_size=None, progress=None):
+        """Index people updated (and drop people deleted) since the last sync. Returns records seen."""
+        with self._sync_lock:
+            return self._sync(page_size, progress)
+
+    def _sync(self, page_size, progress):
+        db = self._connect()
+        fields = self.fields()
+        watermark = self._get_state("watermark")
+        # Nothing deleted before the first sweep is in the index
+        deleted_watermark = self._get_state("deletedWatermark") or _now_iso()
+        seen = 0
+        for nodes in iter_changes("people", fields, watermark, page_size=page_size, client=self.client):
+            self.apply(nodes)
+            watermark = max([watermark or ""] + [n.get("updatedAt") or "" for n in nodes]) or None
+            with db:
+                self._set_state(db, "watermark", watermark)
+            seen += len(nodes)
+            if progress:
+                progress(seen)
+        for nodes in iter_changes("people", "id deletedAt", deleted_watermark, deleted=True,
+                                  page_size=page_size, client=self.client):
+            self.remove(n["id"] for n in nodes)
+            deleted_watermark = max([deleted_watermark] + [n.get("deletedAt") or "" for n in nodes])
+            seen += len(nodes)
+        with db:
+            self._set_state(db, "deletedWatermark", deleted_watermark)
+            self._set_state(db, "lastSync", time.time())
+        return seen
+
+    # Searching
+
+    def search(self, query, limit=20):
+        """Ranked matches for a search box query: display dicts with "match" and "score".
+
+        Words match as prefixes; a query of digits matches anywhere in a
+        phone number. With no prefix match, words of three or more letters
+        match as substrings, then as misspellings of indexed words.
+        """
+        words = _WORDS.findall(query.lower())
+        if not words:
+            return []
+        digits = _NON_DIGITS.sub("", query)
+        if len(digits) >= 3 and not any(c.isalpha() for c in query):
+            return self._ranked("leads_grams", f"phones : {_quote(digits)}", limit, "phone")
+        results = self._ranked("leads_words", " ".join(_quote(w) + "*" for w in words), limit, "prefix", words)
+        long_words = [w for w in words if len(w) >= 3]
+        if results or not long_words:
+            return results
+        results = self._ranked("leads_grams", " ".join(map(_quote, long_words)), limit, "substring", words)
+        return results or self._fuzzy(words, limit)
+
+    def _ranked(self, table, match, limit, kind, words=()):
+        """bm25-ranked matches. bm25 reads every match to weigh terms, so a
+        query matching CANDIDATES or more rows (a letter or two typed) instead
+        returns the first CANDIDATES with name matches for `words` first."""
+        db = self._connect()
+        join = f"FROM {table} JOIN leads l ON l.doc = {table}.rowid WHERE {table} MATCH ?"
+        rows = db.execute(f"SELECT l.display, l.name {join} LIMIT ?", (match, CANDIDATES)).fetchall()
+        if len(rows) < CANDIDATES:
+            rows = db.execute(f"SELECT l.display, {table}.rank {join} ORDER BY {table}.rank LIMIT ?",
+                              (match, limit)).fetchall()
+            return [dict(json.loads(display), match=kind, score=round(-rank, 3)) for display, rank in rows]
+
+        def name_hits(row):
+            tokens = _WORDS.findall(row[1].lower())
+            return sum(1 for w in words if any(t.startswith(w) for t in tokens))
+
+        rows.sort(key=name_hits, reverse=True)
+        return [dict(json.loads(display), match=kind, score=None) for display, _ in rows[:limit]]
+
+    def vocabulary(self):
+        with self._vocab_lock:
+            if self._vocab is None or time.time() - self._vocab.loaded > VOCABULARY_TTL:
+                terms = self._connect().execute("SELECT term FROM leads_vocab")
+                self._vocab = Vocabulary(term for term, in terms if term.isalpha())
+            return self._vocab
+
+    def _fuzzy(self, words, limit):
+        """Replace each word with the indexed words it is a misspelling of. The last
+        word is still being typed, so it also keeps matching as a prefix."""
+        vocabulary = self.vocabulary()
+        groups = []
+        for i, word in enumerate(words):
+            options = [_quote(t) for t in vocabulary.similar(word)] if len(word) >= 3 else []
+            if i == len(words) - 1 or len(word) < 3:
+                options.append(_quote(word) + "*")
+            if not options:
+                return []
+            groups.append("(" + " OR ".join(options) + ")")
+        return self._ranked("leads_words", " AND ".join(groups), limit, "fuzzy", words)
+
+
+class SearchServer:
+    """Small JSON search API over a LeadIndex.
+
+    GET /search?q=<text>[&limit=20]      needs the service token (twenty.auth)
+    GET /health
+    """
+
+    def __init__(self, index, host=DEFAULT_HOST, port=8792, sync_every=60.0, cors_origin=None, token=None):
+        self.index = index
+        self.host = host
+        self.port = port
+        self.sync_every = sync_every
+        self.cors_origin = cors_origin
+        self.token = token
+        self.server = None
+        self.stop = threading.Event()
+        self.sync_errors = 0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if server.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", server.cors_origin)
+                if body is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_OPTIONS(self):
+                self.send_response(204)
+                if server.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", server.cors_origin)
+                    self.send_header("Access-Control-Allow-Methods", "GET")
+                    self.send_header("Access-Control-Allow-Headers", "Authorization")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                path = url.path.rstrip("/")
+                if path == "/health":
+                    self._send(200, dict(server.index.status(), syncErrors=server.sync_errors))
+                    return
+                if path != "/search":
+                    self._send(404, {"error": "not found"})
+                    return
+                if not verify_token(server.token, self.headers, {k: v[-1] for k, v in query.items()}):
+                    self._send(401, {"error": "missing or wrong token"})
+                    return
+                try:
+                    limit = min(int((query.get("limit") or ["20"])[0]), 100)
+                except ValueError:
+                    self._send(400, {"error": "limit must be an integer"})
+                    return
+                q = (query.get("q") or [""])[0]
+                started = time.perf_counter()
+                try:
+                    results = server.index.search(q, limit)
+                except sqlite3.OperationalError as e:  # malformed MATCH from odd input
+                    self._send(400, {"error": str(e)})
+                    return
+                self._send(200, {"query": q, "ms": round((time.perf_counter() - started) * 1000, 2),
+                                 "results": results})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _sync_loop(self):
+        while not self.stop.wait(self.sync_every):
+            try:
+                self.index.sync()
+            except Exception as e:  # keep serving the last good index
+                self.sync_errors += 1
+                print(f"[WARN] sync failed: {e}")
+
+    def serve(self):
+        """Serve until stop is set, syncing every sync_every seconds."""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        threads = [threading.Thread(target=self.server.serve_forever, daemon=True)]
+        if self.sync_every:
+            threads.append(threading.Thread(target=self._sync_loop, daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            self.stop.wait()
+        finally:
+            self.server.shutdown()
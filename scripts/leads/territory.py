@@ -0,0 +1,661 @@
+"""
+Territory routing: place leads on the map and give each to a rep whose
+territory contains it (NumPy).
+
+Assignment by uploader or round-robin ignores where a lead is, but reps
+work territories. A lead's point is the first of these that is available:
+
+    Latitude/Longitude columns    when the file has them
+    ZIP centroid                  from the centroid table
+    ZIP3 centroid                 mean of the table's ZIPs sharing the first three digits
+    City/State centroid           mean of the table's ZIPs for that city (tables with cities)
+
+Territories are JSON, one entry per assignedRep value; a rep may list ZIPs
+(5 digits, or a 3-digit prefix), circles and polygons ([lat, lon] vertices)
+and an optional cap on open leads:
+
+    {"DAVID_EDWARDS": {"cap": 400,
+                       "zips": ["27601", "276"],
+                       "circles": [{"lat": 35.78, "lon": -78.64, "miles": 25}],
+                       "polygons": [[[35.9, -79.1], [35.9, -78.5], [35.6, -78.5]]]}}
+
+Points are bucketed in a lat/lon grid, so each circle or polygon only tests
+the points in the cells its bounding box covers. Every (lead, rep) match
+gets a distance (0 for a listed ZIP) and assign() gives each lead its
+closest rep with room left, in array passes rather than a loop per lead:
+
+    territories = Territories.load("territories.json")
+    lat, lon, _ = ZipCentroids.load().locate(zips)
+    routing = territories.route(lat, lon, zip_codes(zips))
+    routing.counts()    # {rep: leads}
+"""
+
+import csv
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+
+from twenty import get_client, get_metadata
+from twenty.metadata import CACHE_DIR, workspace_key
+from twenty.pagination import iter_pages
+
+from .assign import TwentySink, open_lead_counts
+from .columnar import BLOCK_ROWS, iter_blocks
+
+EARTH_MILES = 3958.8
+MILES_PER_DEGREE = 69.05
+GRID_DEGREES = 0.25
+UNLIMITED = np.iinfo(np.int64).max
+
+LAT_COLUMNS = ("Latitude", "Lat", "latitude", "lat")
+LON_COLUMNS = ("Longitude", "Lon", "Lng", "longitude", "lon", "lng")
+
+# How a lead got its point
+NO_POINT, FROM_COORDINATES, FROM_ZIP, FROM_ZIP3, FROM_CITY = range(5)
+SOURCES = ("none", "coordinates", "zip", "zip3", "city")
+
+# How a lead was routed
+IN_TERRITORY, NEAREST, FULL, OUTSIDE, UNLOCATED = range(5)
+OUTCOMES = ("territory", "nearest", "full", "outside", "unlocated")
+
+_HEADER_ALIASES = {
+    "zip": ("zip", "zipcode", "zip_code", "postal_code", "zcta", "zcta5", "geoid"),
+    "lat": ("lat", "latitude", "intptlat"),
+    "lon": ("lon", "lng", "long", "longitude", "intptlong"),
+    "city": ("city", "primary_city"),
+    "state": ("state", "state_id", "state_code", "usps"),
+}
+
+
+def default_centroids_path():
+    return os.environ.get("TWENTY_ZIP_CENTROIDS") or os.path.join(CACHE_DIR, "zip-centroids.txt")
+
+
+def zip_codes(values):
+    """5-digit ZIPs as ints (-1 where blank or malformed).
+
+    Accepts ZIP+4 and ZIPs that lost their leading zeros in a spreadsheet.
+    """
+    values = np.char.strip(np.asarray(values, dtype=str))
+    head = np.char.zfill(np.char.partition(values, "-")[..., 0], 5)
+    valid = np.char.isdigit(head) & (np.char.str_len(head) == 5)
+    codes = np.full(values.shape, -1, dtype=np.int64)
+    codes[valid] = head[valid].astype(np.int64)
+    return codes
+
+
+def _floats(values):
+    """Parse a column of numbers as floats, NaN where blank or not a number."""
+    values = np.asarray(values, dtype=str)
+    out = np.full(values.shape, np.nan)
+    for i, value in enumerate(values):
+        if value:
+            try:
+                out[i] = float(value)
+            except ValueError:
+                pass
+    return out
+
+
+def _city_key(city, state):
+    return f"{city.strip().upper()}|{state.strip().upper()}"
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great-circle miles between points (arrays broadcast)."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_MILES * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class ZipCentroids:
+    """ZIP -> (lat, lon) lookup over sorted arrays.
+
+    load() reads any CSV or tab-separated file with ZIP, latitude and
+    longitude columns (e.g. the Census Gazetteer ZCTA file, GEOID /
+    INTPTLAT / INTPTLONG); City and State columns, when present, enable the
+    city fallback.
+    """
+
+    def __init__(self, codes, lat, lon, cities=None):
+        order = np.argsort(codes)
+        self.codes = np.asarray(codes, dtype=np.int64)[order]
+        self.lat = np.asarray(lat, dtype=float)[order]
+        self.lon = np.asarray(lon, dtype=float)[order]
+        self.zip3, inverse = np.unique(self.codes // 100, return_inverse=True)
+        counts = np.bincount(inverse)
+        self.zip3_lat = np.bincount(inverse, self.lat) / counts
+        self.zip3_lon = np.bincount(inverse, self.lon) / counts
+        self.cities = cities or {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or default_centroids_path()
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            sample = f.read(4096)
+            f.seek(0)
+            reader = csv.reader(f, delimiter="\t" if "\t" in sample.splitlines()[0] else ",")
+            headers = [h.strip().lower() for h in next(reader)]
+            index = {}
+            for name, aliases in _HEADER_ALIASES.items():
+                for alias in aliases:
+                    if alias in headers:
+                        index[name] = headers.index(alias)
+                        break
+            missing = [name for name in ("zip", "lat", "lon") if name not in index]
+            if missing:
+                raise ValueError(f"{path}: no {', '.join(missing)} column")
+            codes, lat, lon, cities = [], [], [], {}
+            for row in reader:
+                try:
+                    code, y, x = int(row[index["zip"]]), float(row[index["lat"]]), float(row[index["lon"]])
+                except (ValueError, IndexError):
+                    continue
+                codes.append(code)
+                lat.append(y)
+                lon.append(x)
+                if "city" in index and "state" in index:
+                    cities.setdefault(_city_key(row[index["city"]], row[index["state"]]), []).append((y, x))
+        cities = {key: tuple(np.mean(points, axis=0)) for key, points in cities.items()}
+        return cls(codes, lat, lon, cities)
+
+    def _lookup(self, keys, query):
+        at = np.minimum(np.searchsorted(keys, query), len(keys) - 1)
+        return at, (keys[at] == query) & (query >= 0)
+
+    def locate(self, zips, cities=None, states=None):
+        """(lat, lon, source) arrays for ZIP (and optionally city/state) columns.
+
+        zips may be strings or zip_codes() output. source is one of
+        FROM_ZIP, FROM_ZIP3, FROM_CITY or NO_POINT per lead.
+        """
+        codes = zips if np.issubdtype(np.asarray(zips).dtype, np.integer) else zip_codes(zips)
+        n = len(codes)
+        lat, lon = np.full(n, np.nan), np.full(n, np.nan)
+        source = np.full(n, NO_POINT, dtype=np.uint8)
+        if not len(self.codes):
+            return lat, lon, source
+
+        at, hit = self._lookup(self.codes, codes)
+        lat[hit], lon[hit], source[hit] = self.lat[at[hit]], self.lon[at[hit]], FROM_ZIP
+
+        at, hit = self._lookup(self.zip3, np.where(codes >= 0, codes // 100, -1))
+        hit &= source == NO_POINT
+        lat[hit], lon[hit], source[hit] = self.zip3_lat[at[hit]], self.zip3_lon[at[hit]], FROM_ZIP3
+
+        if self.cities and cities is not None and states is not None:
+            todo = np.flatnonzero(source == NO_POINT)
+            if todo.size:
+                # Look each distinct city up once
+                keys = np.char.add(np.char.add(np.char.upper(np.char.strip(np.asarray(cities, dtype=str)[todo])),
+                                               "|"),
+                                   np.char.upper(np.char.strip(np.asarray(states, dtype=str)[todo])))
+                unique, inverse = np.unique(keys, return_inverse=True)
+                points = np.array([self.cities.get(key, (np.nan, np.nan)) for key in unique]).reshape(-1, 2)
+                found = ~np.isnan(points[inverse, 0])
+                rows = todo[found]
+                lat[rows], lon[rows] = points[inverse[found], 0], points[inverse[found], 1]
+                source[rows] = FROM_CITY
+        return lat, lon, source
+
+
+class GridIndex:
+    """Points bucketed into GRID_DEGREES cells, sorted by cell.
+
+    A bounding-box query is one searchsorted range per grid row it spans.
+    """
+
+    def __init__(self, lat, lon, degrees=GRID_DEGREES):
+        self.degrees = degrees
+        self.width = int(np.ceil(360 / degrees)) + 1
+        located = np.flatnonzero(~np.isnan(lat) & ~np.isnan(lon))
+        cells = self._cells(lat[located], lon[located])
+        order = np.argsort(cells, kind="stable")
+        self.points = located[order]
+        self.cells = cells[order]
+
+    def _row_col(self, lat, lon):
+        return (np.floor((np.asarray(lat) + 90) / self.degrees).astype(np.int64),
+                np.floor((np.asarray(lon) + 180) / self.degrees).astype(np.int64))
+
+    def _cells(self, lat, lon):
+        row, col = self._row_col(lat, lon)
+        return row * self.width + col
+
+    def query(self, south, north, west, east):
+        """Indices of the points in cells overlapping the box (a superset of the points inside it)."""
+        (r0, c0), (r1, c1) = self._row_col(south, west), self._row_col(north, east)
+        rows = np.arange(r0, r1 + 1) * self.width
+        lo = np.searchsorted(self.cells, rows + c0, "left")
+        hi = np.searchsorted(self.cells, rows + c1, "right")
+        if not (hi > lo).any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.points[a:b] for a, b in zip(lo, hi) if b > a])
+
+
+def _inside(lat, lon, vertices):
+    """Ray-casting point-in-polygon, vectorized over the points."""
+    inside = np.zeros(len(lat), dtype=bool)
+    ys, xs = vertices[:, 0], vertices[:, 1]
+    for i in range(len(vertices)):
+        y1, x1, y2, x2 = ys[i - 1], xs[i - 1], ys[i], xs[i]
+        if y1 == y2:
+            continue
+        crosses = (y1 > lat) != (y2 > lat)
+        inside ^= crosses & (lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1))
+    return inside
+
+
+def _edge_miles(lat, lon, vertices):
+    """Miles from each point to a polygon's boundary (0 inside), on a local flat projection."""
+    scale = MILES_PER_DEGREE * np.cos(np.radians(vertices[:, 0].mean()))
+    px, py = lon * scale, lat * MILES_PER_DEGREE
+    xs, ys = vertices[:, 1] * scale, vertices[:, 0] * MILES_PER_DEGREE
+    best = np.full(len(lat), np.inf)
+    for i in range(len(vertices)):
+        x1, y1, x2, y2 = xs[i - 1], ys[i - 1], xs[i], ys[i]
+        dx, dy = x2 - x1, y2 - y1
+        t = np.clip(((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy or 1.0), 0, 1)
+        best = np.minimum(best, np.hypot(px - x1 - t * dx, py - y1 - t * dy))
+    best[_inside(lat, lon, vertices)] = 0
+    return best
+
+
+class Territory:
+    """One rep's ZIPs, circles and polygons."""
+
+    def __init__(self, rep, cap=None, zips=(), circles=(), polygons=()):
+        self.rep = rep
+        self.cap = cap
+        codes = [str(z).strip() for z in zips]
+        bad = [z for z in codes if not z.isdigit() or len(z) not in (3, 5)]
+        if bad:
+            raise ValueError(f"{rep}: ZIPs must be 5 digits or a 3-digit prefix, not {', '.join(bad)}")
+        self.zips = np.array(sorted(int(z) for z in codes if len(z) == 5), dtype=np.int64)
+        self.prefixes = np.array(sorted(int(z) for z in codes if len(z) == 3), dtype=np.int64)
+        self.circles = [(float(c["lat"]), float(c["lon"]), float(c["miles"])) for c in circles]
+        self.polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+        if any(len(p) < 3 for p in self.polygons):
+            raise ValueError(f"{rep}: a polygon needs at least three [lat, lon] vertices")
+        # In-territory distances for a polygon are measured from its vertex centroid
+        self.centers = [tuple(p.mean(axis=0)) for p in self.polygons]
+
+    @classmethod
+    def from_dict(cls, rep, spec):
+        return cls(rep, spec.get("cap"), spec.get("zips") or (), spec.get("circles") or (),
+                   spec.get("polygons") or ())
+
+    def matches(self, lat, lon, codes, grid):
+        """(lead indices, miles) of the leads inside this territory; a lead may repeat."""
+        hits, miles = [], []
+        if self.zips.size or self.prefixes.size:
+            listed = np.flatnonzero((codes >= 0) & (np.isin(codes, self.zips) | np.isin(codes // 100, self.prefixes)))
+            hits.append(listed)
+            miles.append(np.zeros(len(listed)))
+        for y, x, radius in self.circles:
+            dlat = radius / MILES_PER_DEGREE
+            dlon = radius / (MILES_PER_DEGREE * max(np.cos(np.radians(y)), 0.01))
+            near = grid.query(y - dlat, y + dlat, x - dlon, x + dlon)
+            d = haversine(lat[near], lon[near], y, x)
+            hits.append(near[d <= radius])
+            miles.append(d[d <= radius])
+        for vertices, (y, x) in zip(self.polygons, self.centers):
+            (south, west), (north, east) = vertices.min(axis=0), vertices.max(axis=0)
+            near = grid.query(south, north, west, east)
+            near = near[_inside(lat[near], lon[near], vertices)]
+            hits.append(near)
+            miles.append(haversine(lat[near], lon[near], y, x))
+        if not hits:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(hits), np.concatenate(miles)
+
+    def distance(self, lat, lon):
+        """Miles from each point to the nearest circle or polygon edge (0 inside, inf without shapes)."""
+        best = np.full(len(lat), np.inf)
+        for y, x, radius in self.circles:
+            best = np.minimum(best, np.maximum(haversine(lat, lon, y, x) - radius, 0))
+        for vertices in self.polygons:
+            best = np.minimum(best, _edge_miles(lat, lon, vertices))
+        return best
+
+    def to_dict(self):
+        spec = {"cap": self.cap,
+                "zips": [f"{z:05d}" for z in self.zips] + [f"{z:03d}" for z in self.prefixes],
+                "circles": [{"lat": y, "lon": x, "miles": r} for y, x, r in self.circles],
+                "polygons": [p.tolist() for p in self.polygons]}
+        return {key: value for key, value in spec.items() if value or key == "cap" and value is not None}
+
+
+def assign(lead, rep, rank, leads, room):
+    """Give each lead its best-ranked candidate rep that still has room.
+
+    lead/rep/rank describe candidate pairs. Each round every unplaced lead
+    proposes to its next candidate; each rep accepts proposals in rank
+    order up to its remaining room and the rest move on to their next
+    choice. Returns the chosen pair index per lead (-1 for none).
+    """
+    choice = np.full(leads, -1, dtype=np.int64)
+    if not len(lead):
+        return choice
+    order = np.lexsort((rank, lead))
+    lead, rep, rank = lead[order], rep[order], rank[order]
+    pointer = np.searchsorted(lead, np.arange(leads), "left")
+    end = np.searchsorted(lead, np.arange(leads), "right")
+    room = np.array(room, dtype=np.int64)
+    while True:
+        active = np.flatnonzero((choice < 0) & (pointer < end))
+        if not active.size:
+            return choice
+        pairs = pointer[active]
+        by_rep = np.lexsort((rank[pairs], rep[pairs]))
+        pairs, active = pairs[by_rep], active[by_rep]
+        reps = rep[pairs]
+        position = np.arange(len(reps)) - np.searchsorted(reps, reps, "left")
+        accepted = position < room[reps]
+        choice[active[accepted]] = order[pairs[accepted]]
+        room -= np.bincount(reps[accepted], minlength=len(room))
+        pointer[active[~accepted]] += 1
+
+
+class Routing:
+    """Result of Territories.route: a rep (or none) and an outcome per lead."""
+
+    def __init__(self, reps, rep, miles, outcome, source=None):
+        self.reps = reps
+        self.rep = rep
+        self.miles = miles
+        self.outcome = outcome
+        self.source = source
+
+    def __len__(self):
+        return len(self.rep)
+
+    def values(self):
+        """assignedRep value per lead ("" when unrouted)."""
+        names = np.array(list(self.reps) + [""], dtype=object)
+        return names[self.rep]
+
+    def counts(self):
+        counts = np.bincount(self.rep[self.rep >= 0], minlength=len(self.reps))
+        return {rep: int(n) for rep, n in zip(self.reps, counts) if n}
+
+    def outcomes(self):
+        counts = np.bincount(self.outcome, minlength=len(OUTCOMES))
+        return {name: int(n) for name, n in zip(OUTCOMES, counts) if n}
+
+    def sources(self):
+        if self.source is None:
+            return {}
+        counts = np.bincount(self.source, minlength=len(SOURCES))
+        return {name: int(n) for name, n in zip(SOURCES, counts) if n}
+
+
+class Territories:
+    """Every rep's territory, in file order (which breaks ties between overlapping territories)."""
+
+    def __init__(self, territories):
+        self.territories = list(territories)
+        if not self.territories:
+            raise ValueError("no territories defined")
+        self.reps = [t.rep for t in self.territories]
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            spec = json.load(f)
+        return cls(Territory.from_dict(rep, entry) for rep, entry in spec.items())
+
+    def digest(self):
+        spec = {t.rep: t.to_dict() for t in self.territories}
+        return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:12]
+
+    def room(self, open_counts=None):
+        """New leads each rep can take: cap minus open leads (unlimited when uncapped)."""
+        open_counts = open_counts or {}
+        return np.array([UNLIMITED if t.cap is None else max(int(t.cap) - open_counts.get(t.rep, 0), 0)
+                         for t in self.territories], dtype=np.int64)
+
+    def _nearest(self, lat, lon, max_miles):
+        """Candidate pairs to every rep whose territory edge is within max_miles of a lead."""
+        located = np.flatnonzero(~np.isnan(lat))
+        leads, reps, miles = [], [], []
+        for i, territory in enumerate(self.territories):
+            d = territory.distance(lat[located], lon[located])
+            near = d <= max_miles
+            leads.append(located[near])
+            reps.append(np.full(int(near.sum()), i, dtype=np.int64))
+            miles.append(d[near])
+        return np.concatenate(leads), np.concatenate(reps), np.concatenate(miles)
+
+    def route(self, lat, lon, codes=None, room=None, nearest=None, source=None):
+        """Route leads given their points (NaN when unknown) and ZIP codes.
+
+        room caps new leads per rep (see room()); nearest, in miles, lets
+        leads outside every territory (or whose reps are all full) go to the
+        rep whose territory edge is closest, within that distance.
+        """
+        lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+        n = len(lat)
+        codes = np.full(n, -1, dtype=np.int64) if codes is None else np.asarray(codes, dtype=np.int64)
+        room = self.room() if room is None else room
+        grid = GridIndex(lat, lon)
+
+        leads, reps, miles = [], [], []
+        for i, territory in enumerate(self.territories):
+            hit, d = territory.matches(lat, lon, codes, grid)
+            leads.append(hit)
+            reps.append(np.full(len(hit), i, dtype=np.int64))
+            miles.append(d)
+        leads, reps, miles = np.concatenate(leads), np.concatenate(reps), np.concatenate(miles)
+        tier = np.zeros(len(leads), dtype=np.uint8)
+        matched = np.zeros(n, dtype=bool)
+        matched[leads] = True
+        if nearest:
+            extra = self._nearest(lat, lon, nearest)
+            leads = np.concatenate([leads, extra[0]])
+            reps = np.concatenate([reps, extra[1]])
+            miles = np.concatenate([miles, extra[2]])
+            tier = np.concatenate([tier, np.ones(len(extra[0]), dtype=np.uint8)])
+
+        # In-territory candidates rank ahead of any "nearest" fallback
+        choice = assign(leads, reps, miles + tier * 1e6, n, room)
+        chosen = choice >= 0
+        rep = np.full(n, -1, dtype=np.int64)
+        distance = np.full(n, np.nan)
+        rep[chosen], distance[chosen] = reps[choice[chosen]], miles[choice[chosen]]
+
+        outcome = np.full(n, OUTSIDE, dtype=np.uint8)
+        outcome[np.isnan(lat) & ~matched] = UNLOCATED
+        had = np.zeros(n, dtype=bool)
+        had[leads] = True
+        outcome[had & ~chosen] = FULL
+        outcome[chosen] = np.where(tier[choice[chosen]] == 0, IN_TERRITORY, NEAREST)
+        return Routing(self.reps, rep, distance, outcome, source)
+
+
+def locate_columns(columns, centroids):
+    """(lat, lon, codes, source) for one block of iter_blocks() columns."""
+    n = len(next(iter(columns.values()))) if columns else 0
+    empty = np.full(n, "", dtype=str)
+    codes = zip_codes(columns.get("zip", empty))
+    lat, lon, source = (centroids.locate(codes, columns.get("city", empty), columns.get("state", empty))
+                        if centroids is not None else (np.full(n, np.nan), np.full(n, np.nan),
+                                                       np.full(n, NO_POINT, dtype=np.uint8)))
+    lat_column = next((columns[c] for c in LAT_COLUMNS if c in columns), None)
+    lon_column = next((columns[c] for c in LON_COLUMNS if c in columns), None)
+    if lat_column is not None and lon_column is not None:
+        y, x = _floats(lat_column), _floats(lon_column)
+        given = ~np.isnan(y) & ~np.isnan(x) & ((y != 0) | (x != 0))
+        lat[given], lon[given], source[given] = y[given], x[given], FROM_COORDINATES
+    return lat, lon, codes, source
+
+
+def route_file(path, territories, centroids, room=None, nearest=None, block_rows=BLOCK_ROWS):
+    """Route every row of a PropStream CSV in one pass. Returns a Routing (one entry per data row)."""
+    parts = []
+    for _, _, columns in iter_blocks(path, block_rows, phone_dnc_pairs=(),
+                                     extra=("zip", "city", "state") + LAT_COLUMNS + LON_COLUMNS):
+        parts.append(locate_columns(columns, centroids))
+    if not parts:
+        return territories.route(np.empty(0), np.empty(0), room=room)
+    lat, lon, codes, source = (np.concatenate(column) for column in zip(*parts))
+    return territories.route(lat, lon, codes, room=room, nearest=nearest, source=source)
+
+
+def split_file(path, routing, out_dir, block_rows=BLOCK_ROWS):
+    """Write one CSV per rep (plus unrouted.csv) in file order.
+
+    Each part keeps the PropStream headers, so it can be imported with
+    ingest_propstream.py --assign-rep. Returns {rep or "": (path, rows)}.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    writers, written = {}, {}
+    values = routing.values()
+    offset = 0
+    try:
+        for headers, rows, _ in iter_blocks(path, block_rows, phone_dnc_pairs=()):
+            for value, row in zip(values[offset:offset + len(rows)], rows):
+                if value not in writers:
+                    part = os.path.join(out_dir, f"{stem}.{value or 'unrouted'}.csv")
+                    f = open(part, "w", newline="", encoding="utf-8")
+                    writers[value] = (f, csv.writer(f))
+                    writers[value][1].writerow(headers)
+                    written[value] = [part, 0]
+                writers[value][1].writerow(row)
+                written[value][1] += 1
+            offset += len(rows)
+    finally:
+        for f, _ in writers.values():
+            f.close()
+    return {value: tuple(entry) for value, entry in written.items()}
+
+
+def person_fields(meta=None):
+    """Selection for routing people: whichever of city/state/zipCode the workspace has."""
+    meta = meta or get_metadata()
+    return " ".join(["id"] + [name for name in ("city", "state", "zipCode") if meta.field("person", name)])
+
+
+def route_people(territories, centroids, filter=None, room=None, nearest=None, client=None, meta=None,
+                 page_size=None, progress=None):
+    """Route the people matching filter. Returns (person ids, Routing)."""
+    client = client or get_client()
+    ids, zips, cities, states = [], [], [], []
+    for nodes, _ in iter_pages("people", person_fields(meta), filter=filter,
+                               order_by=[{"createdAt": "AscNullsFirst"}], page_size=page_size, client=client):
+        for node in nodes:
+            ids.append(node["id"])
+            zips.append(node.get("zipCode") or "")
+            cities.append(node.get("city") or "")
+            states.append(node.get("state") or "")
+        if progress:
+            progress(len(ids))
+    if not ids:
+        return ids, territories.route(np.empty(0), np.empty(0), room=room)
+    lat, lon, codes, source = locate_columns({"zip": np.array(zips, dtype=str), "city": np.array(cities, dtype=str),
+                                              "state": np.array(states, dtype=str)}, centroids)
+    return ids, territories.route(lat, lon, codes, room=room, nearest=nearest, source=source)
+
+
+def open_room(territories, client=None):
+    """room() after subtracting each capped rep's current open leads."""
+    capped = {t.rep: t.rep for t in territories.territories if t.cap is not None}
+    return territories.room(open_lead_counts(capped, client) if capped else {})
+
+
+class RoutePlan:
+    """Journaled update plan: one line per batch of people for one rep, then a line per applied batch.
+
+    The file is append-only, so apply() after a crash resumes with the
+    batches not yet marked.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.identity = None
+        self.batches = []
+        self.applied = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_workspace(cls, client=None):
+        client = client or get_client()
+        return cls(os.path.join(CACHE_DIR, f"territory-plan-{workspace_key(client.api_key, client.base_url)}.jsonl"))
+
+    def write(self, ids, routing, batch_size=100, **identity):
+        """Replace the plan with the routed people, batch_size per line, grouped by rep."""
+        values = routing.values()
+        by_rep = {}
+        for person_id, value in zip(ids, values):
+            if value:
+                by_rep.setdefault(value, []).append(person_id)
+        self.identity = dict(identity, created=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                             people=sum(len(v) for v in by_rep.values()), counts=routing.counts())
+        self.batches = [(rep, people[start:start + batch_size])
+                        for rep, people in by_rep.items() for start in range(0, len(people), batch_size)]
+        self.applied = set()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as f:
+            f.write(json.dumps(self.identity) + "\n")
+            for index, (rep, people) in enumerate(self.batches):
+                f.write(json.dumps({"batch": index, "rep": rep, "ids": people}) + "\n")
+        return len(self.batches)
+
+    def load(self):
+        """Read the plan and its applied marks. Returns False if there is no plan."""
+        try:
+            with open(self.path) as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return False
+        if not lines:
+            return False
+        self.identity = json.loads(lines[0])
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a crash
+            if "ids" in entry:
+                self.batches.append((entry["rep"], entry["ids"]))
+            elif "applied" in entry:
+                self.applied.add(entry["applied"])
+        return True
+
+    def _mark(self, index):
+        with self._lock, open(self.path, "a") as f:
+            f.write(json.dumps({"applied": index}) + "\n")
+        self.applied.add(index)
+
+    def remaining(self):
+        return [(index, rep, people) for index, (rep, people) in enumerate(self.batches) if index not in self.applied]
+
+    def apply(self, client=None, concurrency=4, progress=None):
+        """Send the unapplied batches as updatePeople. Returns (updated, {person id: error})."""
+        sink = TwentySink(client or get_client())
+        updated, failed = 0, {}
+
+        def send(index, rep, people):
+            written, errors = sink.write({person_id: rep for person_id in people})
+            if not errors:
+                self._mark(index)
+            return written, errors
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = [pool.submit(send, *batch) for batch in self.remaining()]
+            for future in futures:
+                written, errors = future.result()
+                updated += len(written)
+                failed.update(errors)
+                if progress:
+                    progress(updated, len(failed))
+        return updated, failed
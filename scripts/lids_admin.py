@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the admin scripts: lids-admin <command> [args].
+
+    python scripts/lids_admin.py --help                         # list commands
+    python scripts/lids_admin.py reconcile --check
+    python scripts/lids_admin.py -w local sync-reps --force     # [profiles.local] from the config file
+    python scripts/lids_admin.py pipeline "add-fields" "sync-reps --force" "reconcile --apply"
+
+Commands are the existing scripts' main() functions, imported only when
+run, so --help loads nothing beyond argparse. A pipeline runs its steps in
+one process: they share the pooled HTTP session (get_client()) and the
+metadata cache (get_metadata()), so later steps start warm.
+
+Connection settings come from the environment (TWENTY_BASE_URL,
+TWENTY_API_KEY, ...) or from a TOML config file (LIDS_ADMIN_CONFIG, default
+~/.config/lids/admin.toml):
+
+    default = "prod"
+
+    [profiles.prod]
+    base_url = "https://twenty.ripemerchant.host"
+    api_key = "..."
+
+    [profiles.local]
+    base_url = "http://127.0.0.1:8790"
+    api_key = "test"
+    cache_dir = "/tmp/lids-local"
+
+Each key becomes TWENTY_<KEY>. The default profile only fills in settings
+missing from the environment; a profile picked with -w/--workspace (or
+LIDS_PROFILE) overrides them.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+CONFIG_PATH = os.environ.get("LIDS_ADMIN_CONFIG", os.path.join(os.path.expanduser("~"), ".config", "lids", "admin.toml"))
+
+# name -> (module, function, summary). Modules are imported on first use.
+COMMANDS = {
+    "reconcile": ("reconcile_schema", "main", "diff or apply workspace_schema.SPEC (objects, fields, workflows)"),
+    "add-fields": ("add_twenty_fields", "main", "create the Studio custom fields"),
+    "add-lead-field": ("add_lead_assignment_field", "main", "create the person assignedToWorkspaceMemberId field"),
+    "create-relation": ("create_assignment_relation", "create_relation", "create the person -> member relation"),
+    "sync-reps": ("sync_rep_options", "main", "sync workspace members to assignedRep options"),
+    "sync-reps-natural": ("sync_rep_options_natural", "main", "sync-reps with natural-name option values"),
+    "find-field": ("find_field_id", "main", "show the assignedRep field id and options"),
+    "inspect-person": ("inspect_metadata_graphql", "inspect_person_object", "introspect the Person type"),
+    "ingest": ("ingest_propstream", "main", "import a PropStream CSV, skipping duplicates"),
+    "screen": ("screen_leads", "main", "TCPA-classify a lead file"),
+    "dnc": ("dnc_index", "main", "build or query the local DNC index"),
+    "reassign": ("reassign_leads", "main", "bulk-reassign leads between reps (resumable)"),
+    "territories": ("route_territories", "main", "route lead files or people to reps by territory"),
+    "assign-worker": ("assign_worker", "main", "run the lead assignment worker"),
+    "enrich": ("enrich_leads", "main", "add utility, bill, value and equity estimates to a lead file"),
+    "dialer": ("dialer_queue", "main", "per-rep prioritized dialer queue with TCPA calling windows"),
+    "search": ("lead_search", "main", "local full-text and fuzzy lead search: sync, serve, query"),
+    "call-stats": ("call_stats", "main", "per-rep call rollup: sync, serve, today, efficiency"),
+    "dpc": ("dpc_report", "main", "rolling DPC/ECR backfill and coaching report"),
+    "export": ("export_workspace", "main", "parallel, resumable workspace export"),
+    "cdc": ("cdc_cache", "main", "webhook-fed record cache with an SSE change stream"),
+    "relay": ("write_relay", "main", "durable batching relay for call and activity writes"),
+    "standin": ("twenty_standin", "main", "run the local Twenty stand-in server"),
+    "bench-tcpa": ("bench_tcpa", "main", "benchmark the TCPA classifiers"),
+    "bench-enrichment": ("bench_enrichment", "main", "check lead enrichment against enrichment.ts and benchmark it"),
+    "queries": ("query_registry", "main", "schema snapshots, offline query checks and persisted queries"),
+}
+
+
+# Configuration
+
+def load_profiles(path=CONFIG_PATH):
+    """(default profile name or None, {name: {key: value}}) from the TOML config, if present."""
+    if not os.path.exists(path):
+        return None, {}
+    import tomllib
+
+    with open(path, "rb") as f:
+        data = tomllib.load(f)
+    return data.get("default"), data.get("profiles") or {}
+
+
+def env_name(key):
+    key = key.upper()
+    return key if key.startswith("TWENTY_") else f"TWENTY_{key}"
+
+
+def apply_profile(name=None, path=CONFIG_PATH):
+    """Export a profile's settings as TWENTY_* variables. Returns the profile name used."""
+    default, profiles = load_profiles(path)
+    chosen = name or os.environ.get("LIDS_PROFILE")
+    explicit = chosen is not None
+    chosen = chosen or default
+    if chosen is None:
+        return None
+    if chosen not in profiles:
+        raise KeyError(f"no [profiles.{chosen}] in {path}")
+    for key, value in profiles[chosen].items():
+        if explicit or env_name(key) not in os.environ:
+            os.environ[env_name(key)] = str(value)
+    return chosen
+
+
+# Running commands
+
+def run_command(name, argv):
+    """Run one command in-process; returns its exit code."""
+    module_name, function, _ = COMMANDS[name]
+    import importlib
+
+    from twenty.config import ConfigError
+
+    saved = sys.argv
+    sys.argv = [f"lids-admin {name}", *argv]
+    try:
+        result = getattr(importlib.import_module(module_name), function)()
+    except SystemExit as e:
+        result = e.code
+    except ConfigError as e:
+        print(f"[ERROR] {e}")
+        result = 2
+    finally:
+        sys.argv = saved
+    if result is None or isinstance(result, int):
+        return result or 0
+    print(result, file=sys.stderr)  # sys.exit("message")
+    return 1
+
+
+def run_pipeline(steps, keep_going=False):
+    import shlex
+
+    parsed = []
+    for step in steps:
+        words = shlex.split(step)
+        if not words or words[0] not in COMMANDS:
+            print(f"[ERROR] unknown pipeline step {step!r}")
+            return 2
+        parsed.append((words[0], words[1:]))
+
+    status = 0
+    for i, (name, argv) in enumerate(parsed, 1):
+        print(f"\n[step {i}/{len(parsed)}] {name} {' '.join(argv)}".rstrip())
+        started = time.perf_counter()
+        try:
+            code = run_command(name, argv)
+        except Exception as e:  # a failing step shouldn't hide the timing summary
+            print(f"[ERROR] {name}: {type(e).__name__}: {e}")
+            code = 1
+        print(f"[step {i}/{len(parsed)}] {name} exited {code} in {time.perf_counter() - started:.2f}s")
+        if code:
+            status = status or code
+            if not keep_going:
+                break
+    return status
+
+
+def show_config(profile_name):
+    from twenty import config
+
+    key = config.API_KEY or ""
+    print(f"profile   {profile_name or '(environment only)'}")
+    print(f"config    {CONFIG_PATH}{'' if os.path.exists(CONFIG_PATH) else ' (missing)'}")
+    print(f"base_url  {config.BASE_URL or '(not set)'}")
+    print(f"api_key   {key[:6]}...{key[-4:]}" if len(key) > 12 else f"api_key   {'(short)' if key else '(not set)'}")
+    print(f"cache_dir {os.environ.get('TWENTY_CACHE_DIR', '(default)')}")
+    print(f"pool      {config.POOL_SIZE} connections, {config.MAX_RETRIES} retries, {config.TIMEOUT:g}s timeout")
+    return 0
+
+
+def main():
+    width = max(len(name) for name in COMMANDS)
+    epilog = "commands:\n" + "\n".join(f"  {name:<{width}}  {summary}" for name, (_, _, summary) in COMMANDS.items())
+    epilog += (f"\n  {'pipeline':<{width}}  run quoted steps in one process, e.g. pipeline \"add-fields\" \"sync-reps\""
+               f"\n  {'config':<{width}}  show the effective connection settings"
+               "\n\nRun `lids-admin <command> --help` for a command's own options.")
+    parser = argparse.ArgumentParser(prog="lids-admin", description="LIDS admin tooling for Twenty CRM.",
+                                     epilog=epilog, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-w", "--workspace", help="profile from the config file (default: its `default`)")
+    parser.add_argument("--keep-going", action="store_true", help="pipeline: run later steps after a failure")
+    parser.add_argument("--profile", action="store_true", help="print a per-operation table of Twenty calls on exit")
+    parser.add_argument("--profile-out", metavar="PATH", help="also write it as JSON (or Prometheus text for *.prom)")
+    parser.add_argument("command", nargs="?", help=argparse.SUPPRESS)
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.command is None:
+        parser.print_help()
+        return 2
+    if args.command not in COMMANDS and args.command not in ("pipeline", "config"):
+        print(f"[ERROR] unknown command {args.command!r} (see lids-admin --help)")
+        return 2
+
+    try:
+        profile_name = apply_profile(args.workspace)
+    except (KeyError, ValueError) as e:  # tomllib.TOMLDecodeError is a ValueError
+        print(f"[ERROR] {e.args[0] if isinstance(e, KeyError) else e}")
+        return 2
+
+    if args.profile or args.profile_out:
+        from twenty import profile
+
+        profile.enable(args.profile, args.profile_out)
+
+    if args.command == "config":
+        return show_config(profile_name)
+    if args.command == "pipeline":
+        if not args.args:
+            print("[ERROR] pipeline needs at least one quoted step")
+            return 2
+        return run_pipeline(args.args, keep_going=args.keep_going)
+    return run_command(args.command, args.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Schema snapshots, offline query checks and the persisted query registry.
+
+    python scripts/query_registry.py snapshot                 # introspect /graphql once, save it
+    python scripts/query_registry.py diff                     # live schema vs the snapshot (one request)
+    python scripts/query_registry.py diff old.json new.json   # two snapshots, no network
+    python scripts/query_registry.py check                    # validate every catalog query
+    python scripts/query_registry.py register                 # check, then send them by hash from now on
+    python scripts/query_registry.py project Person name phones.primaryPhoneNumber zipCode
+
+The catalog below holds the documents the scripts and sync jobs send,
+built with the same code they use (page queries, projections, mutations).
+`check` validates them against the saved snapshot (twenty.introspection)
+and exits 1 on any error, so a field renamed in the workspace shows up
+here rather than as a GraphQL error mid-sync. `register` records the valid
+ones in the persisted query registry (twenty.persisted); TwentyClient then
+sends them as a sha256 hash and keeps the text as fallback.
+
+Documents that depend on workspace metadata (projections intersected with
+the fields an object has) are built from the metadata cache, so re-run
+`register` after a schema change; anything not registered is sent as text.
+"""
+
+import argparse
+import json
+import sys
+
+from twenty import TwentyError, get_client, get_metadata, profile
+from twenty.introspection import ENDPOINTS, SchemaSnapshot, snapshot_path
+from twenty.pagination import MEMBER_FIELDS, build_page_query
+from twenty.persisted import QueryRegistry, extension, hash_accepted, query_hash, rejects_missing_query
+
+SHOW_CHANGES = 40
+
+
+def catalog(meta):
+    """[(name, endpoint, document)] for the queries the scripts send."""
+    from cdc.server import resolve_objects
+    from cdc_cache import DEFAULT_OBJECTS
+    from leads import assign, dedup, ingest, territory
+    from leads.dialer import CALL_FIELDS as DIALER_CALL_FIELDS, DialerQueue
+    from leads.search import LeadIndex
+    from relay.server import RECORD_OBJECTS, Flusher
+    from stats.rollup import CALL_FIELDS as ROLLUP_CALL_FIELDS
+    from twenty.schema import ACTIVE_VERSIONS_QUERY, DEACTIVATE_VERSION, WORKFLOWS_QUERY
+
+    pages = [
+        ("dedup.people", "people", dedup.PERSON_FIELDS),
+        ("people.ids", "people", "id"),
+        ("people.deleted", "people", "id deletedAt"),
+        ("dialer.people", "people", DialerQueue(meta=meta).fields()),
+        ("dialer.calls", "callRecords", DIALER_CALL_FIELDS),
+        ("search.people", "people", LeadIndex(meta=meta).fields()),
+        ("territory.people", "people", territory.person_fields(meta)),
+        ("assign.events", "people", assign.EVENT_FIELDS),
+        ("reassign.people", "people", f"id {assign.ASSIGNED_REP}"),
+        ("rollup.calls", "callRecords", ROLLUP_CALL_FIELDS),
+        ("members", "workspaceMembers", MEMBER_FIELDS),
+    ]
+    entries = [(name, "/graphql", build_page_query(connection, fields)) for name, connection, fields in pages]
+    for plural, (singular, fields) in resolve_objects(DEFAULT_OBJECTS, meta).items():
+        entries.append((f"records.{plural}", "/graphql",
+                        build_page_query(plural, fields, singular[0].upper() + singular[1:])))
+    flusher = Flusher(None, meta=meta)
+    entries += [(f"relay.{plural}", "/graphql", flusher.mutation(plural)) for plural in RECORD_OBJECTS]
+    entries += [
+        ("ingest.create", "/graphql", ingest.CREATE_PEOPLE),
+        ("ingest.upsert", "/graphql", ingest.CREATE_PEOPLE_UPSERT),
+        ("schema.workflows", "/graphql", WORKFLOWS_QUERY),
+        ("schema.activeVersions", "/graphql", ACTIVE_VERSIONS_QUERY),
+        ("schema.deactivateVersion", "/graphql", DEACTIVATE_VERSION),
+    ]
+    return entries
+
+
+def load_snapshots(endpoints):
+    snapshots = {}
+    for endpoint in endpoints:
+        snapshot = SchemaSnapshot.load_default(endpoint)
+        if snapshot is None:
+            print(f"[WARN] No {endpoint} snapshot at {snapshot_path(endpoint)}; run `query_registry.py snapshot`")
+        else:
+            snapshots[endpoint] = snapshot
+    return snapshots
+
+
+def validate_catalog(args):
+    """(valid entries with their schema digest, error count), printing one line per document."""
+    try:
+        entries = catalog(get_metadata())
+    except (TwentyError, ValueError) as e:
+        print(f"[ERROR] Building the catalog needs workspace metadata: {e}")
+        return None, 1
+    snapshots = load_snapshots(sorted({endpoint for _, endpoint, _ in entries}))
+    valid, failed = [], 0
+    for name, endpoint, text in entries:
+        snapshot = snapshots.get(endpoint)
+        if snapshot is None:
+            continue
+        errors = snapshot.validate(text)
+        if errors:
+            failed += 1
+            print(f"  [FAIL] {name}")
+            for error in errors:
+                print(f"         {error}")
+        else:
+            valid.append((name, endpoint, text, snapshot.digest))
+            if args.verbose:
+                print(f"  [OK]   {name:<24} {len(text.encode()):>5} bytes")
+    checked = len(valid) + failed
+    print(f"{checked} of {len(entries)} documents checked: {len(valid)} valid, {failed} with errors")
+    return valid, failed
+
+
+def print_changes(changes, label, limit=SHOW_CHANGES):
+    if not changes:
+        print(f"No schema changes ({label}).")
+        return
+    counts = {symbol: sum(1 for s, _ in changes if s == symbol) for symbol in "+-~"}
+    print(f"{len(changes)} schema changes ({label}): {counts['+']} added, {counts['-']} removed, "
+          f"{counts['~']} changed")
+    for symbol, text in changes[:limit]:
+        print(f"  {symbol} {text}")
+    if len(changes) > limit:
+        print(f"  ... {len(changes) - limit} more (--all to list them)")
+
+
+def selected_endpoints(args):
+    return list(ENDPOINTS.values()) if args.endpoint == "all" else [ENDPOINTS[args.endpoint]]
+
+
+def cmd_snapshot(args):
+    for endpoint in selected_endpoints(args):
+        previous = SchemaSnapshot.load_default(endpoint)
+        try:
+            snapshot = SchemaSnapshot.fetch(endpoint=endpoint)
+        except TwentyError as e:
+            print(f"[ERROR] Introspecting {endpoint} failed: {e}")
+            return 1
+        snapshot.save()
+        print(f"[DONE] {endpoint}: {len(snapshot.types):,} types, digest {snapshot.digest} -> {snapshot.path}")
+        if previous is not None:
+            print_changes(previous.diff(snapshot), "since the previous snapshot")
+    return 0
+
+
+def cmd_diff(args):
+    limit = sys.maxsize if args.all else SHOW_CHANGES
+    if args.paths:
+        if len(args.paths) != 2:
+            print("[ERROR] diff takes no paths (live vs saved) or two snapshot files.")
+            return 1
+        try:
+            old, new = (SchemaSnapshot.load(path) for path in args.paths)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[ERROR] {e}")
+            return 1
+        changes = old.diff(new)
+        print_changes(changes, f"{args.paths[0]} -> {args.paths[1]}", limit)
+        return 1 if changes else 0
+
+    drift = False
+    for endpoint in selected_endpoints(args):
+        saved = SchemaSnapshot.load_default(endpoint)
+        if saved is None:
+            print(f"[ERROR] No {endpoint} snapshot yet; run `query_registry.py snapshot` first.")
+            return 1
+        try:
+            live = SchemaSnapshot.fetch(endpoint=endpoint)
+        except TwentyError as e:
+            print(f"[ERROR] Introspecting {endpoint} failed: {e}")
+            return 1
+        changes = saved.diff(live)
+        drift = drift or bool(changes)
+        print_changes(changes, f"{endpoint}, snapshot vs live", limit)
+        if changes and args.update:
+            live.save()
+            print(f"[DONE] Snapshot updated -> {live.path}")
+    return 1 if drift and not args.update else 0
+
+
+def cmd_check(args):
+    valid, failed = validate_catalog(args)
+    return 1 if failed or valid is None else 0
+
+
+def probe(client, registry, endpoint):
+    """Ask the server whether it takes persisted queries; records and returns True/False."""
+    text = "query Probe { __typename }"
+    digest = query_hash(text)
+    try:
+        body = client.request("POST", endpoint, json={"operationName": "Probe", "extensions": extension(digest)})
+    except TwentyError as e:
+        if not rejects_missing_query(e):
+            raise
+        registry.mark(endpoint, False)
+        return False
+    supported = hash_accepted(body)
+    registry.mark(endpoint, supported)
+    return supported
+
+
+def cmd_register(args):
+    valid, failed = validate_catalog(args)
+    if valid is None:
+        return 1
+    if failed and not args.partial:
+        print("[ERROR] Fix the documents above first (or --partial to register only the valid ones).")
+        return 1
+    client = get_client()
+    registry = QueryRegistry.for_client(client)
+    registry.replace(valid)
+    registry.save()
+
+    text_bytes = sum(len(json.dumps({"query": text}).encode()) for _, _, text, _ in valid)
+    hash_bytes = sum(len(json.dumps({"operationName": "Page", "extensions": extension(query_hash(text))}).encode())
+                     for _, _, text, _ in valid)
+    print(f"[DONE] {len(valid)} documents registered -> {registry.path}")
+    if valid:
+        print(f"  request envelope: {text_bytes / len(valid):,.0f} bytes as text, "
+              f"{hash_bytes / len(valid):,.0f} bytes by hash (average)")
+
+    if not args.no_probe:
+        for endpoint in sorted({endpoint for _, endpoint, _, _ in valid}):
+            try:
+                supported = probe(client, registry, endpoint)
+            except TwentyError as e:
+                print(f"[WARN] Probing {endpoint} failed ({e}); it will be tried on first use.")
+                continue
+            if supported:
+                print(f"  {endpoint}: persisted queries supported, registered documents are sent by hash")
+            else:
+                print(f"  [WARN] {endpoint} does not accept persisted queries; documents stay validated "
+                      f"but are sent as text")
+    return 0
+
+
+def cmd_list(args):
+    registry = QueryRegistry.for_client(get_client())
+    if not len(registry):
+        print(f"No registered queries in {registry.path}; run `query_registry.py register`.")
+        return 0
+    support = {True: "supported", False: "not supported"}
+    for endpoint, state in sorted(registry.endpoints.items()):
+        print(f"{endpoint}: persisted queries {support.get(state['supported'], 'untested')}")
+    for digest, entry in sorted(registry.queries.items(), key=lambda item: item[1]["name"]):
+        print(f"  {entry['name']:<24} {entry['endpoint']:<10} {digest[:12]}  {len(entry['query'].encode()):>5} bytes")
+    return 0
+
+
+def cmd_project(args):
+    snapshot = SchemaSnapshot.load_default(ENDPOINTS[args.endpoint])
+    if snapshot is None:
+        print("[ERROR] No snapshot yet; run `query_registry.py snapshot` first.")
+        return 1
+    if snapshot.type(args.type) is None:
+        print(f"[ERROR] No type {args.type!r} in the snapshot.")
+        return 1
+    selection, missing = snapshot.projection(args.type, args.paths)
+    for path in missing:
+        print(f"[WARN] {args.type} has no {path}", file=sys.stderr)
+    print(selection)
+    return 1 if missing else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Schema snapshots, query checks and persisted queries.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def endpoint_option(p, default="graphql", choices=("graphql", "metadata", "all")):
+        p.add_argument("--endpoint", choices=choices, default=default, help=f"default: {default}")
+
+    p = sub.add_parser("snapshot", help="introspect the workspace schema and save it")
+    endpoint_option(p)
+    p.set_defaults(fn=cmd_snapshot)
+
+    p = sub.add_parser("diff", help="schema drift: live vs snapshot, or between two snapshot files")
+    p.add_argument("paths", nargs="*", metavar="SNAPSHOT")
+    endpoint_option(p)
+    p.add_argument("--update", action="store_true", help="save the live schema as the new snapshot")
+    p.add_argument("--all", action="store_true", help="list every change")
+    p.set_defaults(fn=cmd_diff)
+
+    p = sub.add_parser("check", help="validate the catalog queries against the snapshot")
+    p.add_argument("-v", "--verbose", action="store_true", help="list valid documents too")
+    p.set_defaults(fn=cmd_check)
+
+    p = sub.add_parser("register", help="check, then register the catalog as persisted queries")
+    p.add_argument("-v", "--verbose", action="store_true", help="list valid documents too")
+    p.add_argument("--partial", action="store_true", help="register the valid documents even if some fail")
+    p.add_argument("--no-probe", action="store_true", help="don't ask the server whether it supports them")
+    p.set_defaults(fn=cmd_register)
+
+    p = sub.add_parser("list", help="show the registered queries")
+    p.set_defaults(fn=cmd_list)
+
+    p = sub.add_parser("project", help="minimal selection for field paths of a type")
+    p.add_argument("type", help="GraphQL type, e.g. Person")
+    p.add_argument("paths", nargs="+", metavar="FIELD", help="field or dotted path (phones.primaryPhoneNumber)")
+    endpoint_option(p, choices=("graphql", "metadata"))
+    p.set_defaults(fn=cmd_project)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
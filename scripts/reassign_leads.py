@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Move leads between reps in bulk (assignedRep on Person).
+
+Selects leads by current rep, state, ZIP and createdAt range, then updates
+them in batched mutations with a bounded number in flight. Progress is
+journaled under TWENTY_CACHE_DIR: re-running the same command after a
+crash picks up where it stopped.
+
+    python scripts/reassign_leads.py --from LOU_HALLUG --to DAVID_EDWARDS --dry-run
+    python scripts/reassign_leads.py --from LOU_HALLUG --to DAVID_EDWARDS LEIGH_EDWARDS
+    python scripts/reassign_leads.py --unassigned --state NC --zip 27601 27603 --to DAVID_EDWARDS
+    python scripts/reassign_leads.py --from LOU_HALLUG --created-after 2026-01-01 --to LEIGH_EDWARDS
+
+With several --to reps, leads are split between them evenly.
+"""
+
+import argparse
+import sys
+import time
+
+from leads.assign import rep_options
+from leads.reassign import Reassignment, build_filter
+from twenty import profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-reassign leads between reps.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--from", dest="from_reps", nargs="+", metavar="REP", help="current assignedRep value(s)")
+    source.add_argument("--unassigned", action="store_true", help="leads with no assignedRep")
+    parser.add_argument("--to", nargs="+", required=True, metavar="REP", help="new assignedRep value(s)")
+    parser.add_argument("--state", help="state code, e.g. NC")
+    parser.add_argument("--zip", nargs="+", dest="zips", help="ZIP codes")
+    parser.add_argument("--created-after", help="ISO date/time (inclusive)")
+    parser.add_argument("--created-before", help="ISO date/time (exclusive)")
+    parser.add_argument("--batch-size", type=int, default=100, help="leads per updatePeople")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches in flight")
+    parser.add_argument("--dry-run", action="store_true", help="count what would move, change nothing")
+    parser.add_argument("--restart", action="store_true", help="discard the journal for this job")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    valid = set(rep_options().values())
+    unknown = [r for r in args.to + (args.from_reps or []) if r not in valid]
+    if unknown:
+        print(f"[ERROR] Not assignedRep options: {', '.join(unknown)}")
+        print(f"        Valid values: {', '.join(sorted(valid))}")
+        return 1
+
+    lead_filter = build_filter(args.from_reps, args.unassigned, args.state, args.zips,
+                               args.created_after, args.created_before)
+    if lead_filter is None and not args.dry_run:
+        print("[ERROR] No filter given; refusing to reassign every lead. Use --dry-run to count them.")
+        return 1
+
+    job = Reassignment(lead_filter, args.to, batch_size=args.batch_size, concurrency=args.concurrency)
+    if args.restart:
+        job.journal.reset()
+    elif not job.journal.load():
+        print(f"[ERROR] {job.journal.path} belongs to a different job. Use --restart.")
+        return 1
+    if job.journal.selected:
+        print(f"Resuming: {len(job.journal.ids):,} leads selected, {len(job.journal.done):,} batches done.")
+
+    started = time.time()
+    print("Selecting leads..." if not job.journal.selected else "Updating leads...")
+    selected = job.run(dry_run=args.dry_run)
+
+    if args.dry_run:
+        print(f"\n[DRY RUN] {selected:,} leads match.")
+        for rep, n in sorted(job.current.items()):
+            print(f"  from {rep:<24} {n:>8,}")
+        for rep, n in sorted(job.plan(selected).items()):
+            print(f"  to   {rep:<24} {n:>8,}")
+        return 0
+
+    print(f"\n[DONE] {job.updated:,} leads reassigned this run ({selected:,} selected) in {time.time() - started:.1f}s")
+    if job.failed:
+        print(f"[WARN] {len(job.failed):,} failed; re-run the same command to retry them.")
+        for person_id, error in list(job.failed.items())[:5]:
+            print(f"  {person_id}: {error}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Reconcile the Twenty CRM workspace with workspace_schema.py.
+
+Fetches current metadata once, prints the minimal plan, and (with --apply)
+creates/updates objects, fields, relations and workflows in dependency order.
+
+    python scripts/reconcile_schema.py            # plan only
+    python scripts/reconcile_schema.py --check    # exit 1 if the workspace drifted
+    python scripts/reconcile_schema.py --apply    # plan, then apply
+"""
+
+import argparse
+import sys
+
+from sync_rep_options import build_options, get_workspace_members
+from twenty import TwentyError, profile
+from twenty.schema import Reconciler
+from workspace_schema import SPEC
+
+OPTION_SOURCES = {
+    "workspaceMembers": lambda: build_options(get_workspace_members()),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="apply the plan")
+    parser.add_argument("--check", action="store_true", help="exit 1 if changes are needed")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent non-batched changes")
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+    reconciler = Reconciler(SPEC, option_sources=OPTION_SOURCES, workers=args.workers)
+    try:
+        plan = reconciler.plan()
+    except TwentyError as e:
+        print(f"[ERROR] Could not read workspace metadata: {e}")
+        return 2
+
+    plan.print()
+    if args.check:
+        return 1 if plan else 0
+    if not args.apply or not plan.actionable:
+        return 0
+
+    print("\nApplying...")
+    failed = reconciler.apply(plan)
+    if failed:
+        print(f"\n[FAILED] {len(failed)} change(s) failed.")
+        return 1
+    print("\n[DONE] Workspace matches the spec.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""
+Write-coalescing relay between the dashboards and Twenty.
+
+Calls and activity notes are acknowledged as soon as they are committed
+to a local SQLite queue, then sent to Twenty in batched, idempotent
+create<Plural>(upsert: true) mutations:
+
+    from relay import Flusher, RelayServer, WriteQueue
+
+    queue = WriteQueue.for_workspace(workspace_key())
+    RelayServer(queue, Flusher(queue, batch_size=60, max_wait=2.0)).serve()
+"""
+
+from .queue import WriteQueue, record_id
+from .server import Flusher, RelayServer, activity_note, call_title
+
+__all__ = ["Flusher", "RelayServer", "WriteQueue", "activity_note", "call_title", "record_id"]
@@ -0,0 +1,200 @@
+"""
+Durable queue of pending Twenty creates (SQLite, WAL, synchronous=FULL).
+
+A write is acknowledged only after its row is committed, so once a rep
+gets an ack the disposition survives a relay crash or a Twenty outage.
+Each write carries an idempotency key; the Twenty record id is derived
+from it, and flushes use create<Plural>(upsert: true), so a retried or
+re-submitted write lands on the same record instead of a duplicate.
+
+    queue = WriteQueue("relay.sqlite")
+    seq, record_id, duplicate = queue.enqueue("notes", {"title": "Call - NI"}, key="tab-3:call-17")
+    for object_name, rows in queue.due(batch_size=60):
+        ...
+        queue.done([seq for seq, _, _ in rows])
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from twenty.metadata import CACHE_DIR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS writes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL UNIQUE,
+    object TEXT NOT NULL,
+    data TEXT NOT NULL,
+    depends INTEGER,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_at REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    done_at REAL,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS writes_due ON writes (status, next_at);
+CREATE INDEX IF NOT EXISTS writes_object ON writes (status, object, seq);
+"""
+
+# Objects with pending writes, one index seek each instead of a scan of the backlog
+PENDING_OBJECTS = """
+WITH RECURSIVE objects(name) AS (
+    SELECT MIN(object) FROM writes WHERE status = 'pending'
+    UNION ALL
+    SELECT (SELECT MIN(object) FROM writes WHERE status = 'pending' AND object > name) FROM objects
+    WHERE name IS NOT NULL
+)
+SELECT name FROM objects WHERE name IS NOT NULL
+"""
+
+# Namespace for record ids derived from idempotency keys
+ID_NAMESPACE = uuid.UUID("6f1c8a52-3b1e-4f7c-9a0d-2c5e8b7d4e10")
+
+RETRY_BASE = 2.0
+RETRY_MAX = 300.0
+
+
+def record_id(key):
+    """Twenty record id for an idempotency key (stable across retries and restarts)."""
+    return str(uuid.uuid5(ID_NAMESPACE, key))
+
+
+def backoff(attempts, base=RETRY_BASE, cap=RETRY_MAX):
+    return min(base * 2 ** max(attempts - 1, 0), cap)
+
+
+class WriteQueue:
+    """Pending writes in enqueue order. Safe to share between threads."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.executescript(SCHEMA)
+
+    @classmethod
+    def for_workspace(cls, key):
+        return cls(os.path.join(CACHE_DIR, f"write-relay-{key}.sqlite"))
+
+    def enqueue(self, object_name, data, key=None, depends=None, dependents=()):
+        """Persist one create. Returns (seq, record id, duplicate).
+
+        The record id is set on data; a key seen before returns the
+        original write (duplicate=True) without queueing it again.
+        dependents are (object, data, key) writes that wait for this one
+        (e.g. a note's noteTarget); they commit in the same transaction,
+        so an ack never covers half of the pair.
+        """
+        with self._lock, self.db:
+            seq, record, duplicate = self._insert(object_name, data, key, depends)
+            for child_object, child_data, child_key in dependents:
+                self._insert(child_object, child_data, child_key, seq)
+        return seq, record, duplicate
+
+    def _insert(self, object_name, data, key, depends):
+        key = key or str(uuid.uuid4())
+        data = dict(data, id=record_id(key))
+        cursor = self.db.execute(
+            "INSERT OR IGNORE INTO writes (key, object, data, depends, created_at) VALUES (?, ?, ?, ?, ?)",
+            (key, object_name, json.dumps(data), depends, time.time()),
+        )
+        if cursor.rowcount:
+            return cursor.lastrowid, data["id"], False
+        seq, = self.db.execute("SELECT seq FROM writes WHERE key = ?", (key,)).fetchone()
+        return seq, data["id"], True
+
+    def due(self, batch_size=60, now=None):
+        """[(object, [(seq, attempts, data)])] ready to send, oldest first, at most batch_size per object.
+
+        A write whose `depends` is still pending (e.g. a noteTarget whose
+        note has not been created yet) waits for it. Each object is read
+        with its own LIMIT, so a deep backlog costs a batch per flush, not
+        a scan and decode of everything pending.
+        """
+        now = time.time() if now is None else now
+        batches = []
+        with self._lock:
+            for object_name, in self.db.execute(PENDING_OBJECTS).fetchall():
+                rows = self.db.execute(
+                    """
+                    SELECT w.seq, w.attempts, w.data FROM writes w INDEXED BY writes_object
+                    WHERE w.status = 'pending' AND w.object = ? AND w.next_at <= ?
+                      AND NOT EXISTS (SELECT 1 FROM writes d WHERE d.seq = w.depends AND d.status != 'done')
+                    ORDER BY w.seq LIMIT ?
+                    """,
+                    (object_name, now, batch_size),
+                ).fetchall()
+                if rows:
+                    batches.append((object_name, rows))
+        return [(object_name, [(seq, attempts, json.loads(data)) for seq, attempts, data in rows])
+                for object_name, rows in sorted(batches, key=lambda b: b[1][0][0])]
+
+    def done(self, seqs):
+        self._update(seqs, "UPDATE writes SET status = 'done', done_at = ?, error = NULL WHERE seq = ?",
+                     time.time())
+
+    def retry(self, seqs, error, delay=None):
+        """Count a failed attempt and schedule the next one with exponential backoff."""
+        now = time.time()
+        with self._lock, self.db:
+            for seq in seqs:
+                attempts, = self.db.execute("SELECT attempts FROM writes WHERE seq = ?", (seq,)).fetchone()
+                self.db.execute("UPDATE writes SET attempts = ?, next_at = ?, error = ? WHERE seq = ?",
+                                (attempts + 1, now + (delay or backoff(attempts + 1)), str(error), seq))
+
+    def fail(self, seqs, errors):
+        """Park writes Twenty rejected outright; they wait for `requeue`."""
+        with self._lock, self.db:
+            for seq, error in zip(seqs, errors):
+                self.db.execute("UPDATE writes SET status = 'failed', attempts = attempts + 1, error = ? "
+                                "WHERE seq = ?", (str(error), seq))
+
+    def requeue(self, object_name=None):
+        """Move failed writes back to pending. Returns how many."""
+        sql = "UPDATE writes SET status = 'pending', next_at = 0 WHERE status = 'failed'"
+        with self._lock, self.db:
+            if object_name:
+                return self.db.execute(sql + " AND object = ?", (object_name,)).rowcount
+            return self.db.execute(sql).rowcount
+
+    def _update(self, seqs, sql, value):
+        with self._lock, self.db:
+            self.db.executemany(sql, [(value, seq) for seq in seqs])
+
+    def prune(self, older_than):
+        """Delete writes completed more than older_than seconds ago."""
+        with self._lock, self.db:
+            return self.db.execute("DELETE FROM writes WHERE status = 'done' AND done_at < ?",
+                                   (time.time() - older_than,)).rowcount
+
+    def failures(self, limit=20):
+        with self._lock:
+            rows = self.db.execute("SELECT seq, key, object, attempts, error FROM writes WHERE status = 'failed' "
+                                   "ORDER BY seq LIMIT ?", (limit,)).fetchall()
+        return [{"seq": s, "key": k, "object": o, "attempts": a, "error": e} for s, k, o, a, e in rows]
+
+    def status(self):
+        with self._lock:
+            counts = dict(self.db.execute("SELECT status, COUNT(*) FROM writes GROUP BY status").fetchall())
+            oldest = self.db.execute("SELECT MIN(created_at) FROM writes WHERE status = 'pending'").fetchone()[0]
+            retrying = self.db.execute("SELECT COUNT(*) FROM writes WHERE status = 'pending' AND attempts > 0"
+                                       ).fetchone()[0]
+        return {
+            "pending": counts.get("pending", 0),
+            "retrying": retrying,
+            "failed": counts.get("failed", 0),
+            "done": counts.get("done", 0),
+            "oldestPendingSeconds": round(time.time() - oldest, 1) if oldest else None,
+        }
+
+    def close(self):
+        with self._lock:
+            self.db.close()
@@ -0,0 +1,270 @@
+"""
+HTTP front-end and flusher for the write relay.
+
+    POST /calls                 recordCall() params: {name, duration, disposition, xpAwarded, leadId}
+    POST /activities            a syncPendingActivities() activity: {type, content, metadata, leadId}
+    POST /records/<plural>      raw create input for callRecords or notes
+    GET  /health
+
+POSTs need the service token (twenty.auth) as a bearer token.
+
+Each POST is committed to the WriteQueue and answered 202 with the Twenty
+id the record will have, before anything is sent to Twenty. An
+Idempotency-Key header (or "idempotencyKey" in the body) makes client
+retries safe: the same key returns the original ack. Calls and
+activities become a note titled the way the dashboard's code titles them,
+plus a noteTarget linking it to the lead.
+
+The Flusher sends queued writes as one create<Plural>(data: [...],
+upsert: true) per object when batch_size are waiting or every max_wait
+seconds. Throttling, 5xx and network errors back off and retry; a batch
+Twenty rejects is re-sent one record at a time so only the bad records
+are parked as failed.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from twenty import TwentyError, get_client
+from twenty.auth import DEFAULT_HOST, verify_token
+from twenty.batch import WORKSPACE, Operation, run_batched
+from twenty.metadata import get_metadata
+
+from .queue import record_id
+
+RECORD_OBJECTS = ("callRecords", "notes")
+
+ACTIVITY_LABELS = {"call": "Call", "sms": "SMS", "email": "Email", "note": "Note", "voicemail": "Voicemail"}
+
+
+# Payloads
+
+def call_title(params):
+    """recordCall()'s note title: "Call - DISPOSITION | m:ss | Lead"."""
+    duration = int(params.get("duration") or 0)
+    return f"Call - {str(params.get('disposition') or '').upper()} | {duration // 60}:{duration % 60:02d} | " \
+           f"{params.get('name') or ''}"
+
+
+def activity_note(activity):
+    """syncPendingActivities()'s note: (title, markdown body)."""
+    metadata = activity.get("metadata") or {}
+    kind = activity.get("type") or "note"
+    title = f"{ACTIVITY_LABELS.get(kind, kind)} - {metadata.get('disposition') or 'Logged'}"
+    body = activity.get("content") or ""
+    if metadata.get("transcription"):
+        body += f"\n\n--- Transcription ---\n{metadata['transcription']}"
+    return title, body
+
+
+def note_input(title, body=None):
+    data = {"title": title}
+    if body:
+        data["bodyV2"] = {"markdown": body}
+    return data
+
+
+def _type_name(singular):
+    return singular[0].upper() + singular[1:]
+
+
+class Flusher:
+    """Drain a WriteQueue into Twenty in batches."""
+
+    def __init__(self, queue, client=None, meta=None, batch_size=60, max_wait=2.0, keep=86_400.0):
+        self.queue = queue
+        self.client = client or get_client()
+        self.meta = meta
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.keep = keep
+        self.wake = threading.Event()
+        self.unsent = 0
+        self.counts = {"batches": 0, "sent": 0, "retried": 0, "failed": 0}
+        self.last_error = None
+        self._singular = {}
+
+    def notify(self, count=1):
+        """Called after enqueueing; wakes the flusher early once a full batch is waiting."""
+        self.unsent += count
+        if self.unsent >= self.batch_size:
+            self.wake.set()
+
+    def singular(self, plural):
+        if plural not in self._singular:
+            meta = self.meta or get_metadata()
+            for name, obj in meta.objects().items():
+                self._singular[obj.get("namePlural")] = name
+            if plural not in self._singular:
+                raise ValueError(f"no object with plural name {plural!r}")
+        return self._singular[plural]
+
+    def mutation(self, plural):
+        return (f"mutation Relay($data: [{_type_name(self.singular(plural))}CreateInput!]!) "
+                f"{{ create{_type_name(plural)}(data: $data, upsert: true) {{ id }} }}")
+
+    def send(self, plural, rows):
+        """Send one object's batch; returns the number of records written."""
+        seqs = [seq for seq, _, _ in rows]
+        self.counts["batches"] += 1
+        try:
+            self.client.graphql(self.mutation(plural), {"data": [data for _, _, data in rows]}, idempotent=True)
+        except TwentyError as e:
+            self.last_error = str(e)
+            if e.retryable:
+                self.queue.retry(seqs, e)
+                self.counts["retried"] += len(seqs)
+                return 0
+            return self._send_individually(plural, rows)
+        self.queue.done(seqs)
+        self.counts["sent"] += len(seqs)
+        return len(seqs)
+
+    def _send_individually(self, plural, rows):
+        singular = self.singular(plural)
+        results = run_batched([
+            Operation(f"create{_type_name(singular)}",
+                      {"data": (f"{_type_name(singular)}CreateInput!", data), "upsert": ("Boolean", True)},
+                      "id", WORKSPACE, key=seq)
+            for seq, _, data in rows
+        ], client=self.client, batch_size=1, idempotent=True)
+        done = [r.operation.key for r in results if r.ok]
+        retry = [r for r in results if not r.ok and r.error.retryable]
+        failed = [r for r in results if not r.ok and not r.error.retryable]
+        self.queue.done(done)
+        for r in retry:
+            self.queue.retry([r.operation.key], r.error)
+        self.queue.fail([r.operation.key for r in failed], [r.error for r in failed])
+        self.counts["sent"] += len(done)
+        self.counts["retried"] += len(retry)
+        self.counts["failed"] += len(failed)
+        return len(done)
+
+    def flush(self):
+        """Send everything due, including writes unblocked by this flush. Returns records written."""
+        self.unsent = 0
+        written = 0
+        while True:
+            batches = self.queue.due(self.batch_size)
+            sent = sum(self.send(plural, rows) for plural, rows in batches)
+            written += sent
+            if not sent:
+                return written
+
+    def run(self, stop):
+        """Flush every max_wait seconds (sooner on notify) until stop is set, then once more."""
+        last_prune = 0.0
+        while not stop.is_set():
+            self.wake.wait(self.max_wait)
+            self.wake.clear()
+            try:
+                self.flush()
+                if time.time() - last_prune >= 3600:
+                    self.queue.prune(self.keep)
+                    last_prune = time.time()
+            except Exception as e:  # writes stay queued; the next cycle retries
+                self.last_error = str(e)
+                print(f"[WARN] flush failed: {e}")
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"[WARN] final flush failed, writes stay queued: {e}")
+
+
+class RelayServer:
+    """Accept writes over HTTP, queue them durably and flush them in the background."""
+
+    def __init__(self, queue, flusher, host=DEFAULT_HOST, port=8791, cors_origin=None, token=None):
+        self.queue = queue
+        self.flusher = flusher
+        self.host = host
+        self.port = port
+        self.cors_origin = cors_origin
+        self.token = token
+        self.server = None
+        self.stop = threading.Event()
+
+    def accept(self, path, body, key=None):
+        """Queue one request; returns the ack body. Raises ValueError for bad input."""
+        if not isinstance(body, dict):
+            raise ValueError("expected a JSON object")
+        body = dict(body)
+        key = key or body.pop("idempotencyKey", None)
+        if path == "/calls":
+            note, person_id = note_input(call_title(body)), body.get("leadId")
+        elif path == "/activities":
+            note, person_id = note_input(*activity_note(body)), body.get("leadId")
+        elif path.startswith("/records/") and path[len("/records/"):] in RECORD_OBJECTS:
+            seq, new_id, duplicate = self.queue.enqueue(path[len("/records/"):], body, key)
+            self.flusher.notify()
+            return {"id": new_id, "seq": seq, "duplicate": duplicate}
+        else:
+            raise LookupError(path)
+
+        key = key or str(uuid.uuid4())
+        target = [("noteTargets", {"noteId": record_id(key), "personId": person_id}, f"{key}:target")]
+        seq, note_id, duplicate = self.queue.enqueue("notes", note, key, dependents=target if person_id else ())
+        self.flusher.notify(2 if person_id else 1)
+        return {"id": note_id, "seq": seq, "duplicate": duplicate}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if server.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", server.cors_origin)
+                    self.send_header("Access-Control-Allow-Headers", "Authorization, Content-Type, Idempotency-Key")
+                if body is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_OPTIONS(self):
+                self._send(204)
+
+            def do_GET(self):
+                if urlparse(self.path).path.rstrip("/") == "/health":
+                    self._send(200, dict(server.queue.status(), counts=server.flusher.counts,
+                                         lastError=server.flusher.last_error))
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def do_POST(self):
+                path = urlparse(self.path).path.rstrip("/")
+                if not verify_token(server.token, self.headers):
+                    self._send(401, {"error": "missing or wrong token"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                    self._send(202, server.accept(path, body, self.headers.get("Idempotency-Key")))
+                except LookupError:
+                    self._send(404, {"error": "not found"})
+                except ValueError as e:
+                    self._send(400, {"error": str(e)})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def serve(self):
+        """Serve until stop is set; queued writes are flushed once more on the way out."""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        threads = [threading.Thread(target=self.server.serve_forever, daemon=True),
+                   threading.Thread(target=self.flusher.run, args=(self.stop,))]
+        for t in threads:
+            t.start()
+        try:
+            self.stop.wait()
+        finally:
+            self.server.shutdown()
+            self.flusher.wake.set()
+            threads[1].join()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Route leads to reps by territory (leads/territory.py).
+
+    python scripts/route_territories.py file leads.csv --territories territories.json
+    python scripts/route_territories.py file leads.csv --territories territories.json --nearest 30 --out-dir routed/
+    python scripts/route_territories.py plan --territories territories.json --unassigned --state NC
+    python scripts/route_territories.py apply
+
+`file` splits a PropStream CSV into one file per rep (import each with
+ingest_propstream.py --assign-rep REP). `plan` routes people already in
+Twenty and writes a batched update plan; `apply` sends it, resuming after a
+crash. Caps count the leads each rep already has open.
+
+ZIPs are placed with a centroid table: --centroids or TWENTY_ZIP_CENTROIDS,
+default zip-centroids.txt in the metadata cache directory (the Census
+Gazetteer ZCTA file works as downloaded, once unzipped).
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from leads.assign import rep_options
+from leads.reassign import build_filter
+from leads.territory import RoutePlan, Territories, ZipCentroids, default_centroids_path, open_room, route_file, \
+    route_people, split_file
+from twenty import profile
+
+
+def load_inputs(args):
+    """(territories, centroids), or None after printing why not."""
+    try:
+        territories = Territories.load(args.territories)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {args.territories}: {e}")
+        return None
+    path = args.centroids or default_centroids_path()
+    try:
+        centroids = ZipCentroids.load(path)
+    except OSError:
+        print(f"[WARN] no ZIP centroid table at {path}: only coordinates and listed ZIPs can be routed")
+        centroids = None
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return None
+    return territories, centroids
+
+
+def check_reps(territories):
+    valid = set(rep_options().values())
+    unknown = [rep for rep in territories.reps if rep not in valid]
+    if unknown:
+        print(f"[ERROR] Not assignedRep options: {', '.join(unknown)}")
+        print(f"        Valid values: {', '.join(sorted(valid))}")
+        return False
+    return True
+
+
+def report(routing, elapsed):
+    print(f"Routed {len(routing):,} leads in {elapsed:.2f}s")
+    for name, n in routing.sources().items():
+        print(f"  located by {name:<12} {n:>9,}")
+    for name, n in routing.outcomes().items():
+        print(f"  {name:<23} {n:>9,}")
+    for rep, n in sorted(routing.counts().items()):
+        print(f"  -> {rep:<20} {n:>9,}")
+
+
+def cmd_file(args):
+    inputs = load_inputs(args)
+    if inputs is None:
+        return 1
+    territories, centroids = inputs
+    room = None
+    if not args.ignore_open:
+        if not check_reps(territories):
+            return 1
+        room = open_room(territories)
+
+    started = time.time()
+    routing = route_file(args.path, territories, centroids, room=room, nearest=args.nearest)
+    report(routing, time.time() - started)
+    if args.dry_run:
+        return 0
+
+    out_dir = args.out_dir or os.path.splitext(args.path)[0] + "-routed"
+    parts = split_file(args.path, routing, out_dir)
+    print(f"\n[DONE] {len(parts)} file(s) in {out_dir}")
+    for rep, (path, rows) in sorted(parts.items()):
+        hint = f"  ingest: python scripts/ingest_propstream.py {path} --assign-rep {rep}" if rep else ""
+        print(f"  {os.path.basename(path):<40} {rows:>9,}{hint}")
+    return 0
+
+
+def cmd_plan(args):
+    inputs = load_inputs(args)
+    if inputs is None or not check_reps(inputs[0]):
+        return 1
+    territories, centroids = inputs
+    lead_filter = build_filter(args.from_reps, args.unassigned, args.state, args.zips)
+    if lead_filter is None:
+        print("[ERROR] No filter given; use --unassigned or --from to pick the leads to route.")
+        return 1
+
+    started = time.time()
+    last = [0.0]
+
+    def progress(read):
+        if time.time() - last[0] >= 5.0:
+            last[0] = time.time()
+            print(f"  {read:,} people  ({time.time() - started:.0f}s)")
+
+    ids, routing = route_people(territories, centroids, lead_filter, room=open_room(territories),
+                                nearest=args.nearest, page_size=args.page_size, progress=progress)
+    report(routing, time.time() - started)
+    plan = RoutePlan(args.plan) if args.plan else RoutePlan.for_workspace()
+    batches = plan.write(ids, routing, args.batch_size, territories=territories.digest(), filter=lead_filter)
+    print(f"\n[DONE] {plan.identity['people']:,} updates in {batches:,} batches -> {plan.path}")
+    print("       run `route_territories.py apply` to send them")
+    return 0
+
+
+def cmd_apply(args):
+    plan = RoutePlan(args.plan) if args.plan else RoutePlan.for_workspace()
+    if not plan.load():
+        print(f"[ERROR] No plan at {plan.path}; run `route_territories.py plan` first.")
+        return 1
+    remaining = plan.remaining()
+    if not remaining:
+        print(f"[DONE] All {len(plan.batches):,} batches in {plan.path} were already applied.")
+        return 0
+    print(f"Applying {len(remaining):,} of {len(plan.batches):,} batches (plan from {plan.identity['created']})...")
+    started = time.time()
+    last = [0.0]
+
+    def progress(updated, failed):
+        if time.time() - last[0] >= 5.0:
+            last[0] = time.time()
+            print(f"  {updated:,} / {failed:,}  ({time.time() - started:.0f}s)")
+
+    updated, failed = plan.apply(concurrency=args.concurrency, progress=progress)
+    print(f"\n[DONE] {updated:,} leads assigned in {time.time() - started:.1f}s")
+    if failed:
+        print(f"[WARN] {len(failed):,} failed; re-run apply to retry them.")
+        for person_id, error in list(failed.items())[:5]:
+            print(f"  {person_id}: {error}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route leads to reps by territory.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def common(p):
+        p.add_argument("--territories", required=True, help="territories JSON ({rep: {cap, zips, circles, polygons}})")
+        p.add_argument("--centroids", help="ZIP centroid table (CSV or Census Gazetteer)")
+        p.add_argument("--nearest", type=float, metavar="MILES",
+                       help="send leads outside every territory (or whose reps are full) "
+                            "to the closest territory within MILES")
+
+    p = sub.add_parser("file", help="split a PropStream CSV into one file per rep")
+    common(p)
+    p.add_argument("path")
+    p.add_argument("--out-dir", help="default: <file>-routed/")
+    p.add_argument("--ignore-open", action="store_true",
+                   help="don't read open lead counts from Twenty (caps apply to this file alone)")
+    p.add_argument("--dry-run", action="store_true", help="report the routing, write nothing")
+    p.set_defaults(fn=cmd_file)
+
+    p = sub.add_parser("plan", help="route people in Twenty and write an update plan")
+    common(p)
+    source = p.add_mutually_exclusive_group()
+    source.add_argument("--from", dest="from_reps", nargs="+", metavar="REP", help="current assignedRep value(s)")
+    source.add_argument("--unassigned", action="store_true", help="leads with no assignedRep")
+    p.add_argument("--state", help="state code, e.g. NC")
+    p.add_argument("--zip", nargs="+", dest="zips", help="ZIP codes")
+    p.add_argument("--batch-size", type=int, default=100, help="leads per updatePeople")
+    p.add_argument("--page-size", type=int)
+    p.add_argument("--plan", help="plan file (default: territory-plan-<workspace>.jsonl in the cache)")
+    p.set_defaults(fn=cmd_plan)
+
+    p = sub.add_parser("apply", help="send the update plan in batches (resumable)")
+    p.add_argument("--plan", help="plan file (default: territory-plan-<workspace>.jsonl in the cache)")
+    p.add_argument("--concurrency", type=int, default=4, help="batches in flight")
+    p.set_defaults(fn=cmd_apply)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Re-screen a PropStream lead file against the TCPA tiers.
+
+Classifies the file in NumPy blocks (see leads/columnar.py) and prints the
+tier breakdown. With -o, writes the file back out with riskLevel, dncCount,
+callableCount and complianceStatus columns appended.
+
+    python scripts/screen_leads.py leads.csv
+    python scripts/screen_leads.py leads.csv -o leads.screened.csv
+    python scripts/screen_leads.py leads.csv --registry dnc.idx
+"""
+
+import argparse
+import csv
+import sys
+import time
+
+from leads.classifier import RISK_LEVELS
+from leads.columnar import BLOCK_ROWS, classify_columns, iter_blocks, safe_percentage
+
+OUTPUT_COLUMNS = ["riskLevel", "dncCount", "callableCount", "complianceStatus"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Classify a PropStream CSV by TCPA risk tier.")
+    parser.add_argument("csv", help="PropStream export (CSV)")
+    parser.add_argument("-o", "--output", help="write the rows with TCPA columns appended")
+    parser.add_argument("--registry", help="DNC registry index (see dnc_index.py); listed numbers count as DNC")
+    parser.add_argument("--block-rows", type=int, default=BLOCK_ROWS, help="rows per NumPy block")
+    args = parser.parse_args()
+
+    registry = None
+    if args.registry:
+        from leads.dnc import DncIndex
+        registry = DncIndex(args.registry)
+
+    totals = dict.fromkeys(RISK_LEVELS, 0)
+    out = writer = None
+    started = time.time()
+    try:
+        for headers, rows, columns in iter_blocks(args.csv, args.block_rows):
+            result = classify_columns(columns, rows=len(rows), registry=registry)
+            for level, n in result.counts().items():
+                totals[level] += n
+            if args.output:
+                if writer is None:
+                    out = open(args.output, "w", newline="")
+                    writer = csv.writer(out)
+                    writer.writerow(headers + OUTPUT_COLUMNS)
+                writer.writerows(
+                    row + [level, dnc, callable_, status]
+                    for row, level, dnc, callable_, status in zip(
+                        rows, result.risk_levels().tolist(), result.dnc_count.tolist(),
+                        result.callable_count.tolist(), result.compliance_status().tolist(),
+                    )
+                )
+    finally:
+        if out:
+            out.close()
+
+    rows = sum(totals.values())
+    elapsed = max(time.time() - started, 1e-9)
+    print(f"{rows:,} leads in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+    for level in RISK_LEVELS:
+        print(f"  {level:<16} {totals[level]:>10,}")
+    print(f"  Safe: {safe_percentage(totals)}% of leads with phones")
+    if args.output:
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
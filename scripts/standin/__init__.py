@@ -0,0 +1,18 @@
+"""
+Local Twenty CRM stand-in for offline integration and load tests.
+
+Implements the subset of Twenty the scripts use (GraphQL records,
+metadata and workflow mutations, introspection, REST metadata and
+records) against an in-memory workspace, with injectable latency,
+errors and 429s, and per-operation request counters:
+
+    from standin import StandinServer
+
+    with StandinServer(latency=0.02) as server:
+        ...  # point TWENTY_BASE_URL (or a TwentyClient) at server.url
+"""
+
+from .server import Counters, Faults, StandinServer
+from .workspace import Workspace, WorkspaceError
+
+__all__ = ["Counters", "Faults", "StandinServer", "Workspace", "WorkspaceError"]
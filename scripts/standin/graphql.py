@@ -0,0 +1,462 @@
+"""
+GraphQL execution against a Workspace, for both /graphql and /metadata.
+
+Root fields follow Twenty's generated API: a connection per object
+(people, callRecords, ...), a single-record query per object (person),
+create/update/delete mutations in singular and plural form, the workflow
+step mutations the provisioning scripts use, and enough introspection
+(__type, __schema) for schema inspection tools.
+
+Errors are reported per root field with path [alias]. As in Twenty, every
+mutation field and connection is non-null, so an error in one of them
+nulls the whole of data; mutation fields run serially and the ones after
+a failure are not executed. Only nullable fields (a single-record query,
+__type) fail on their own and leave the rest of the document intact.
+"""
+
+import hashlib
+import re
+import uuid
+
+from twenty.gql import GraphQLSyntaxError, arguments, parse
+
+from .workspace import MAX_PAGE_SIZE, WorkspaceError, decode_cursor, encode_cursor, matches
+
+# Twenty field type -> (GraphQL type name, kind)
+SCALARS = {
+    "UUID": ("UUID", "SCALAR"),
+    "TEXT": ("String", "SCALAR"),
+    "NUMBER": ("Float", "SCALAR"),
+    "NUMERIC": ("BigFloat", "SCALAR"),
+    "BOOLEAN": ("Boolean", "SCALAR"),
+    "DATE_TIME": ("DateTime", "SCALAR"),
+    "DATE": ("Date", "SCALAR"),
+    "POSITION": ("Position", "SCALAR"),
+    "RAW_JSON": ("RawJSONScalar", "SCALAR"),
+    "RICH_TEXT_V2": ("RichTextV2", "OBJECT"),
+    "FULL_NAME": ("FullName", "OBJECT"),
+    "EMAILS": ("Emails", "OBJECT"),
+    "PHONES": ("Phones", "OBJECT"),
+    "ADDRESS": ("Address", "OBJECT"),
+    "LINKS": ("Links", "OBJECT"),
+    "CURRENCY": ("Currency", "OBJECT"),
+    "ACTOR": ("Actor", "OBJECT"),
+    "RELATION": ("UUID", "SCALAR"),
+}
+
+# Composite field types and their subfields (name, GraphQL scalar)
+COMPOSITES = {
+    "FullName": (("firstName", "String"), ("lastName", "String")),
+    "Emails": (("primaryEmail", "String"), ("additionalEmails", "RawJSONScalar")),
+    "Phones": (("primaryPhoneNumber", "String"), ("primaryPhoneCountryCode", "String"),
+               ("primaryPhoneCallingCode", "String"), ("additionalPhones", "RawJSONScalar")),
+    "Address": (("addressStreet1", "String"), ("addressStreet2", "String"), ("addressCity", "String"),
+                ("addressState", "String"), ("addressPostcode", "String"), ("addressCountry", "String"),
+                ("addressLat", "Float"), ("addressLng", "Float")),
+    "Links": (("primaryLinkUrl", "String"), ("primaryLinkLabel", "String"), ("secondaryLinks", "RawJSONScalar")),
+    "Currency": (("amountMicros", "BigFloat"), ("currencyCode", "String")),
+    "Actor": (("source", "String"), ("workspaceMemberId", "UUID"), ("name", "String"),
+              ("context", "RawJSONScalar")),
+    "RichTextV2": (("blocknote", "String"), ("markdown", "String")),
+}
+
+_MUTATION = re.compile(r"^(create|update|delete|destroy|restore)([A-Z]\w*)$")
+
+
+def _lower_first(name):
+    return name[:1].lower() + name[1:]
+
+
+def _type_ref(name, kind="SCALAR", non_null=False, list_of=False):
+    ref = {"kind": kind, "name": name, "ofType": None}
+    if list_of:
+        ref = {"kind": "LIST", "name": None, "ofType": {"kind": "NON_NULL", "name": None, "ofType": ref}}
+    if non_null:
+        ref = {"kind": "NON_NULL", "name": None, "ofType": ref}
+    return ref
+
+
+def _field_def(name, type_ref, args=(), description=None):
+    return {"name": name, "description": description, "args": list(args), "type": type_ref,
+            "isDeprecated": False, "deprecationReason": None}
+
+
+def _arg(name, type_ref):
+    return {"name": name, "description": None, "type": type_ref, "defaultValue": None}
+
+
+def _type(kind, name, fields=None, description=None, enum_values=None, input_fields=None):
+    return {"kind": kind, "name": name, "description": description, "fields": fields,
+            "inputFields": input_fields, "interfaces": [] if kind == "OBJECT" else None,
+            "enumValues": enum_values, "possibleTypes": None}
+
+
+class Executor:
+    """Runs GraphQL documents for one endpoint ("/graphql" or "/metadata")."""
+
+    def __init__(self, workspace, endpoint="/graphql", persisted_queries=False):
+        self.workspace = workspace
+        self.endpoint = endpoint
+        self.persisted = {} if persisted_queries else None   # sha256 -> document text
+
+    def resolve_persisted(self, body):
+        """Apply the Automatic Persisted Queries extension: (body with query text, None) or (None, error response)."""
+        extension = (body.get("extensions") or {}).get("persistedQuery") if isinstance(body, dict) else None
+        if not extension or self.persisted is None:
+            return body, None
+        digest = extension.get("sha256Hash")
+        if body.get("query"):
+            if hashlib.sha256(body["query"].encode()).hexdigest() != digest:
+                return None, (400, {"errors": [{"message": "provided sha does not match query",
+                                                "extensions": {"code": "PERSISTED_QUERY_HASH_MISMATCH"}}]},
+                              "persisted mismatch")
+            self.persisted[digest] = body["query"]
+            return body, None
+        if digest not in self.persisted:
+            return None, (200, {"errors": [{"message": "PersistedQueryNotFound",
+                                            "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}]}, "persisted miss")
+        return dict(body, query=self.persisted[digest]), None
+
+    def execute(self, body):
+        """Returns (status, response body, operation label)."""
+        body, error = self.resolve_persisted(body or {})
+        if error:
+            return error
+        try:
+            document = parse((body or {}).get("query") or "")
+            operation = document.operation(body.get("operationName"))
+            variables = operation.resolve_variables(body.get("variables") or {})
+        except GraphQLSyntaxError as e:
+            return 400, {"errors": [{"message": str(e), "extensions": {"code": "GRAPHQL_PARSE_FAILED"}}]}, "invalid"
+
+        root = "Mutation" if operation.kind == "mutation" else "Query"
+        fields = list(operation.fields())
+        label = f"{operation.kind} {','.join(sorted({f.name for f in fields}))}"
+        data, errors = {}, []
+        for field in fields:
+            try:
+                with self.workspace.lock:
+                    data[field.key] = self.resolve_root(operation, field, arguments(field, variables), root)
+            except (WorkspaceError, GraphQLSyntaxError) as e:
+                data[field.key] = None
+                errors.append({
+                    "message": str(e),
+                    "path": [field.key],
+                    "extensions": {"code": getattr(e, "code", "GRAPHQL_VALIDATION_FAILED")},
+                })
+                if not self.nullable_root(root, field.name):
+                    data = None    # null propagates to the root
+                    if root == "Mutation":
+                        break      # serial execution stops at the failed field
+        response = {"data": data}
+        if errors:
+            response["errors"] = errors
+        return 200, response, label
+
+    def nullable_root(self, root, name):
+        """False for root fields typed non-null: every mutation, connections, __schema and __typename."""
+        if root == "Mutation" or name in ("__schema", "__typename"):
+            return False
+        return self.endpoint == "/graphql" and name not in self.workspace.plurals
+
+    # Rendering
+
+    def render(self, operation, value, selections, type_name=None, model=None):
+        if selections is None or value is None:
+            return value
+        if isinstance(value, list):
+            return [self.render(operation, v, selections, type_name, model) for v in value]
+        out = {}
+        for field in operation.fields(selections, type_name):
+            if field.name == "__typename":
+                out[field.key] = type_name
+                continue
+            if model is not None and field.name not in model.fields:
+                raise WorkspaceError(f'Cannot query field "{field.name}" on type "{type_name}".',
+                                     code="GRAPHQL_VALIDATION_FAILED")
+            out[field.key] = self.render(operation, value.get(field.name) if isinstance(value, dict) else None,
+                                         field.selections)
+        return out
+
+    def render_record(self, operation, record, field, model):
+        return self.render(operation, record, field.selections, model.type_name, model)
+
+    def render_connection(self, operation, field, model, edges, page_info, total):
+        out = {}
+        for sub in operation.fields(field.selections or [], f"{model.type_name}Connection"):
+            if sub.name == "edges":
+                rendered = []
+                for record, cursor in edges:
+                    edge = {}
+                    for part in operation.fields(sub.selections or [], f"{model.type_name}Edge"):
+                        if part.name == "node":
+                            edge[part.key] = self.render_record(operation, record, part, model)
+                        elif part.name == "cursor":
+                            edge[part.key] = cursor
+                        elif part.name == "__typename":
+                            edge[part.key] = f"{model.type_name}Edge"
+                    rendered.append(edge)
+                out[sub.key] = rendered
+            elif sub.name == "pageInfo":
+                out[sub.key] = self.render(operation, page_info, sub.selections, "PageInfo")
+            elif sub.name == "totalCount":
+                out[sub.key] = total
+            elif sub.name == "__typename":
+                out[sub.key] = f"{model.type_name}Connection"
+            else:
+                raise WorkspaceError(f'Cannot query field "{sub.name}" on type "{model.type_name}Connection".',
+                                     code="GRAPHQL_VALIDATION_FAILED")
+        return out
+
+    # Resolvers
+
+    def resolve_root(self, operation, field, args, root):
+        if field.name == "__typename":
+            return root
+        if field.name == "__type":
+            return self.render(operation, self.introspect_type(args.get("name")), field.selections)
+        if field.name == "__schema":
+            return self.render(operation, self.introspect_schema(), field.selections)
+        if self.endpoint == "/metadata":
+            return self.resolve_metadata(operation, field, args)
+        if root == "Mutation":
+            return self.resolve_mutation(operation, field, args)
+        return self.resolve_query(operation, field, args)
+
+    def resolve_query(self, operation, field, args):
+        ws = self.workspace
+        if field.name == "currentWorkspaceMember":
+            return None  # API keys are not workspace members
+        if field.name in ws.plurals:
+            model = ws.model(field.name)
+            first = args.get("first")
+            if first is not None and first > MAX_PAGE_SIZE:
+                raise WorkspaceError(f"Cannot request more than {MAX_PAGE_SIZE} records")
+            edges, info, total = ws.page(model.name, first=first, after=args.get("after"),
+                                         last=args.get("last"), before=args.get("before"),
+                                         filter=args.get("filter"), order_by=args.get("orderBy"))
+            return self.render_connection(operation, field, model, edges, info, total)
+        if field.name in ws.objects:
+            model = ws.model(field.name)
+            records = ws.select(model.name, args.get("filter"))
+            return self.render_record(operation, records[0], field, model) if records else None
+        raise WorkspaceError(f'Cannot query field "{field.name}" on type "Query".',
+                             code="GRAPHQL_VALIDATION_FAILED")
+
+    def resolve_mutation(self, operation, field, args):
+        ws = self.workspace
+        special = getattr(self, f"mutation_{field.name}", None)
+        if special is not None:
+            return special(operation, field, args)
+        match = _MUTATION.match(field.name)
+        if match:
+            verb, noun = match.group(1), _lower_first(match.group(2))
+            if noun in ws.objects:
+                model = ws.model(noun)
+                if verb == "create":
+                    record = ws.create(noun, args.get("data") or {}, upsert=bool(args.get("upsert")))
+                elif verb == "update":
+                    record = ws.update(noun, args.get("id"), args.get("data") or {})
+                elif verb in ("delete", "destroy"):
+                    record = ws.delete(noun, args.get("id"))
+                else:
+                    record = ws.update(noun, args.get("id"), {"deletedAt": None})
+                return self.render_record(operation, record, field, model)
+            if noun in ws.plurals:
+                model = ws.model(noun)
+                if verb == "create":
+                    records = ws.create_many(model.name, args.get("data") or [], upsert=bool(args.get("upsert")))
+                elif verb == "update":
+                    records = ws.update_many(model.name, args.get("data") or {}, args.get("filter"))
+                elif verb in ("delete", "destroy"):
+                    records = ws.delete_many(model.name, args.get("filter"))
+                else:
+                    records = [ws.update(model.name, r["id"], {"deletedAt": None})
+                               for r in ws.select(model.name, args.get("filter"))]
+                return [self.render_record(operation, r, field, model) for r in records]
+        raise WorkspaceError(f'Cannot query field "{field.name}" on type "Mutation".',
+                             code="GRAPHQL_VALIDATION_FAILED")
+
+    # Workflow mutations (not generated per object)
+
+    def _version(self, version_id):
+        version = self.workspace.get("workflowVersion", version_id)
+        if version is None:
+            raise WorkspaceError(f"Workflow version {version_id} not found", code="NOT_FOUND")
+        return version
+
+    def mutation_createWorkflowVersionStep(self, operation, field, args):
+        data = args.get("input") or {}
+        version = self._version(data.get("workflowVersionId"))
+        if version.get("status") != "DRAFT":
+            raise WorkspaceError("Only draft workflow versions can be edited")
+        step_type = data.get("stepType")
+        if not step_type:
+            raise WorkspaceError("stepType is required")
+        step = {
+            "id": str(uuid.uuid4()),
+            "name": step_type.replace("_", " ").title(),
+            "type": step_type,
+            "valid": False,
+            "settings": {"input": {}, "outputSchema": {}, "errorHandlingOptions": {
+                "retryOnFailure": {"value": False}, "continueOnFailure": {"value": False}}},
+            "position": data.get("position"),
+            "nextStepIds": [],
+        }
+        steps = list(version.get("steps") or [])
+        parent = data.get("parentStepId")
+        for existing in steps:
+            if existing.get("id") == parent:
+                existing["nextStepIds"] = list(existing.get("nextStepIds") or []) + [step["id"]]
+        steps.append(step)
+        self.workspace.update("workflowVersion", version["id"], {"steps": steps})
+        return self.render(operation, step, field.selections)
+
+    def mutation_activateWorkflowVersion(self, operation, field, args):
+        version = self._version(args.get("workflowVersionId"))
+        if not version.get("trigger"):
+            raise WorkspaceError("Workflow version has no trigger")
+        for other in self.workspace.select("workflowVersion", {"workflowId": {"eq": version.get("workflowId")}}):
+            if other["status"] == "ACTIVE" and other["id"] != version["id"]:
+                self.workspace.update("workflowVersion", other["id"], {"status": "DEACTIVATED"})
+        record = self.workspace.update("workflowVersion", version["id"], {"status": "ACTIVE"})
+        if version.get("workflowId"):
+            self.workspace.update("workflow", version["workflowId"], {"lastPublishedVersionId": version["id"]})
+        return self.render(operation, record, field.selections) if field.selections else True
+
+    def mutation_deactivateWorkflowVersion(self, operation, field, args):
+        version = self._version(args.get("workflowVersionId"))
+        record = self.workspace.update("workflowVersion", version["id"], {"status": "DEACTIVATED"})
+        return self.render(operation, record, field.selections) if field.selections else True
+
+    # /metadata
+
+    def resolve_metadata(self, operation, field, args):
+        ws = self.workspace
+        data = args.get("input") or {}
+        if field.name == "createOneObject":
+            return self.render(operation, ws.create_object(data.get("object") or {}), field.selections)
+        if field.name == "createOneField":
+            return self.render(operation, ws.create_field(data.get("field") or {}), field.selections)
+        if field.name == "updateOneField":
+            return self.render(operation, ws.update_field(data.get("id"), data.get("update") or {}),
+                               field.selections)
+        if field.name == "deleteOneField":
+            return self.render(operation, ws.delete_field(data.get("id")), field.selections)
+        if field.name in ("objects", "fields"):
+            nodes = ws.list_objects() if field.name == "objects" else ws.list_fields()
+            if args.get("filter"):
+                nodes = [n for n in nodes if matches(n, args["filter"])]
+            paging = args.get("paging") or {}
+            start = decode_cursor(paging["after"])[1] + 1 if paging.get("after") else 0
+            end = start + (paging.get("first") or len(nodes))
+            page = nodes[start:end]
+            connection = {
+                "edges": [{"node": n, "cursor": encode_cursor(n["id"], start + i)} for i, n in enumerate(page)],
+                "totalCount": len(nodes),
+                "pageInfo": {
+                    "hasNextPage": end < len(nodes),
+                    "hasPreviousPage": start > 0,
+                    "startCursor": encode_cursor(page[0]["id"], start) if page else None,
+                    "endCursor": encode_cursor(page[-1]["id"], start + len(page) - 1) if page else None,
+                },
+            }
+            return self.render(operation, connection, field.selections)
+        raise WorkspaceError(f'Cannot query field "{field.name}" on type "Query".',
+                             code="GRAPHQL_VALIDATION_FAILED")
+
+    # Introspection
+
+    def _object_type(self, model):
+        fields = []
+        for f in model.fields.values():
+            if f["type"] in ("SELECT", "MULTI_SELECT"):
+                ref = _type_ref(f"{model.type_name}{f['name'][0].upper()}{f['name'][1:]}Enum", "ENUM",
+                                list_of=f["type"] == "MULTI_SELECT")
+            else:
+                name, kind = SCALARS.get(f["type"], ("String", "SCALAR"))
+                ref = _type_ref(name, kind, non_null=f["name"] == "id")
+            fields.append(_field_def(f["name"], ref, description=f.get("description")))
+        return _type("OBJECT", model.type_name, fields, description=model.metadata.get("description"))
+
+    def _types(self):
+        ws = self.workspace
+        types, query, mutation = [], [], []
+        page_args = [
+            _arg("first", _type_ref("Int")), _arg("after", _type_ref("String")),
+            _arg("last", _type_ref("Int")), _arg("before", _type_ref("String")),
+        ]
+        for model in ws.objects.values():
+            t = model.type_name
+            types.append(self._object_type(model))
+            for f in model.fields.values():
+                if f["type"] in ("SELECT", "MULTI_SELECT"):
+                    types.append(_type("ENUM", f"{t}{f['name'][0].upper()}{f['name'][1:]}Enum", enum_values=[
+                        {"name": o.get("value"), "description": o.get("label"), "isDeprecated": False,
+                         "deprecationReason": None} for o in f.get("options") or []]))
+            types.append(_type("OBJECT", f"{t}Edge", [
+                _field_def("node", _type_ref(t, "OBJECT", non_null=True)),
+                _field_def("cursor", _type_ref("ConnectionCursor", non_null=True)),
+            ]))
+            types.append(_type("OBJECT", f"{t}Connection", [
+                _field_def("edges", _type_ref(f"{t}Edge", "OBJECT", non_null=True, list_of=True)),
+                _field_def("pageInfo", _type_ref("PageInfo", "OBJECT", non_null=True)),
+                _field_def("totalCount", _type_ref("Int", non_null=True)),
+            ]))
+            for suffix in ("CreateInput", "UpdateInput", "FilterInput", "OrderByInput"):
+                types.append(_type("INPUT_OBJECT", f"{t}{suffix}", input_fields=[
+                    _arg(f["name"], _type_ref("String")) for f in model.fields.values()]))
+            filter_arg = _arg("filter", _type_ref(f"{t}FilterInput", "INPUT_OBJECT"))
+            order_arg = _arg("orderBy", _type_ref(f"{t}OrderByInput", "INPUT_OBJECT", list_of=True))
+            query.append(_field_def(model.plural, _type_ref(f"{t}Connection", "OBJECT", non_null=True),
+                                    page_args + [filter_arg, order_arg]))
+            query.append(_field_def(model.name, _type_ref(t, "OBJECT"), [filter_arg]))
+            id_arg = _arg("id", _type_ref("UUID", non_null=True))
+            create_arg = _arg("data", _type_ref(f"{t}CreateInput", "INPUT_OBJECT", non_null=True))
+            update_arg = _arg("data", _type_ref(f"{t}UpdateInput", "INPUT_OBJECT", non_null=True))
+            plural = model.plural[0].upper() + model.plural[1:]
+            mutation += [
+                _field_def(f"create{t}", _type_ref(t, "OBJECT", non_null=True), [create_arg, _arg("upsert", _type_ref("Boolean"))]),
+                _field_def(f"create{plural}", _type_ref(t, "OBJECT", non_null=True, list_of=True), [
+                    _arg("data", _type_ref(f"{t}CreateInput", "INPUT_OBJECT", list_of=True)),
+                    _arg("upsert", _type_ref("Boolean"))]),
+                _field_def(f"update{t}", _type_ref(t, "OBJECT", non_null=True), [id_arg, update_arg]),
+                _field_def(f"update{plural}", _type_ref(t, "OBJECT", non_null=True, list_of=True), [update_arg, filter_arg]),
+                _field_def(f"delete{t}", _type_ref(t, "OBJECT", non_null=True), [id_arg]),
+                _field_def(f"delete{plural}", _type_ref(t, "OBJECT", non_null=True, list_of=True), [filter_arg]),
+            ]
+        query.append(_field_def("currentWorkspaceMember", _type_ref("WorkspaceMember", "OBJECT")))
+        version_arg = _arg("workflowVersionId", _type_ref("UUID", non_null=True))
+        mutation += [
+            _field_def("createWorkflowVersionStep", _type_ref("WorkflowAction", "OBJECT", non_null=True), [
+                _arg("input", _type_ref("CreateWorkflowVersionStepInput", "INPUT_OBJECT", non_null=True))]),
+            _field_def("activateWorkflowVersion", _type_ref("Boolean", non_null=True), [version_arg]),
+            _field_def("deactivateWorkflowVersion", _type_ref("Boolean", non_null=True), [version_arg]),
+        ]
+        types.append(_type("OBJECT", "PageInfo", [
+            _field_def("hasNextPage", _type_ref("Boolean")), _field_def("hasPreviousPage", _type_ref("Boolean")),
+            _field_def("startCursor", _type_ref("ConnectionCursor")),
+            _field_def("endCursor", _type_ref("ConnectionCursor")),
+        ]))
+        types += [_type("OBJECT", name, [_field_def(f, _type_ref(scalar)) for f, scalar in subfields])
+                  for name, subfields in COMPOSITES.items()]
+        types.append(_type("OBJECT", "Query", query))
+        types.append(_type("OBJECT", "Mutation", mutation))
+        scalars = {name for name, kind in SCALARS.values() if kind == "SCALAR"} | {"Int", "ConnectionCursor"}
+        types += [_type("SCALAR", name) for name in sorted(scalars)]
+        return types
+
+    def introspect_type(self, name):
+        for t in self._types():
+            if t["name"] == name:
+                return t
+        return None
+
+    def introspect_schema(self):
+        return {
+            "queryType": {"name": "Query"},
+            "mutationType": {"name": "Mutation"},
+            "subscriptionType": None,
+            "types": self._types(),
+            "directives": [],
+        }
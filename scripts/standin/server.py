@@ -0,0 +1,480 @@
+"""
+HTTP front end for the stand-in: /graphql, /metadata and /rest, plus faults and counters.
+
+    with StandinServer(latency=0.05, throttle_rate=0.02) as server:
+        client = TwentyClient(base_url=server.url, api_key="test")
+        ...
+        print(server.counters.snapshot())
+
+Fault injection runs before a request is handled, in this order: the
+--max-rps token bucket and random 429s (with Retry-After), random 5xx
+errors, then latency. Control endpoints under /_standin/ are never
+faulted or counted:
+
+    GET  /_standin/stats      request counters per operation
+    POST /_standin/reset      zero the counters
+    GET  /_standin/faults     current fault settings (POST a JSON object to change them)
+    GET  /_standin/snapshot   the whole workspace as JSON
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .graphql import Executor
+from .workspace import Workspace, WorkspaceError, decode_cursor, encode_cursor
+
+REST_LIMIT = 60
+METADATA_LIMIT = 1000
+
+_REST_TERM = re.compile(r"^(?P<path>[\w.]+)\[(?P<op>\w+)\][:=](?P<value>.*)$", re.DOTALL)
+
+
+class Faults:
+    """Injected latency, errors and throttling. All rates are probabilities per request."""
+
+    FIELDS = ("latency", "jitter", "error_rate", "error_status", "throttle_rate", "max_rps", "retry_after")
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 throttle_rate=0.0, max_rps=None, retry_after=1.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = float(max_rps or 0)
+        self._refilled = time.monotonic()
+
+    def settings(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def update(self, values):
+        with self._lock:
+            for name in self.FIELDS:
+                if name in values:
+                    setattr(self, name, values[name])
+            self._tokens = float(self.max_rps or 0)
+
+    def _over_rate(self):
+        if not self.max_rps:
+            return False
+        now = time.monotonic()
+        self._tokens = min(float(self.max_rps), self._tokens + (now - self._refilled) * self.max_rps)
+        self._refilled = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    def decide(self):
+        """(status or None, delay seconds) for one request."""
+        with self._lock:
+            if self._over_rate() or self._random.random() < self.throttle_rate:
+                return 429, 0.0
+            if self._random.random() < self.error_rate:
+                return self.error_status, 0.0
+            delay = self.latency + (self._random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+            return None, max(0.0, delay)
+
+
+class Counters:
+    """Per-operation request counts, statuses and service times."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.requests = 0
+            self.statuses = {}
+            self.injected = {"throttled": 0, "errors": 0, "delayed": 0}
+            self.operations = {}
+
+    def record(self, key, status, elapsed, injected=None):
+        with self._lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            if injected:
+                self.injected[injected] += 1
+            entry = self.operations.setdefault(key, {"count": 0, "statuses": {}, "totalMs": 0.0, "maxMs": 0.0})
+            entry["count"] += 1
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["totalMs"] += elapsed * 1000
+            entry["maxMs"] = max(entry["maxMs"], elapsed * 1000)
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            return {
+                "seconds": round(elapsed, 3),
+                "requests": self.requests,
+                "requestsPerSecond": round(self.requests / elapsed, 1),
+                "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+                "injected": dict(self.injected),
+                "operations": {
+                    key: dict(entry, statuses={str(k): v for k, v in entry["statuses"].items()},
+                              totalMs=round(entry["totalMs"], 1), maxMs=round(entry["maxMs"], 1),
+                              meanMs=round(entry["totalMs"] / entry["count"], 2))
+                    for key, entry in sorted(self.operations.items())
+                },
+            }
+
+    def line(self):
+        s = self.snapshot()
+        statuses = " ".join(f"{k}:{v}" for k, v in s["statuses"].items())
+        return f"requests {s['requests']:,} ({s['requestsPerSecond']:,}/s)  {statuses}".rstrip()
+
+
+# REST helpers
+
+def _split_top(text, sep=","):
+    """Split on sep outside brackets, parentheses and quotes."""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "\"'":
+            quote = ch
+        elif ch in "([":
+            depth += 1
+        elif ch in ")]":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _rest_value(text):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_rest_value(v) for v in _split_top(text[1:-1])]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    return text
+
+
+def parse_rest_filter(text):
+    """Twenty REST filter (`name[eq]:"x",and(a[gte]:1,b[is]:NULL)`) -> GraphQL-style filter."""
+    clauses = []
+    for term in _split_top(text or ""):
+        for combinator in ("and", "or", "not"):
+            if term.startswith(f"{combinator}(") and term.endswith(")"):
+                inner = [parse_rest_filter(t) for t in _split_top(term[len(combinator) + 1:-1])]
+                clauses.append({combinator: inner[0] if combinator == "not" else inner})
+                break
+        else:
+            match = _REST_TERM.match(term)
+            if match is None:
+                raise WorkspaceError(f"Invalid filter: {term}")
+            condition = {match.group("op"): _rest_value(match.group("value"))}
+            for key in reversed(match.group("path").split(".")):
+                condition = {key: condition}
+            clauses.append(condition)
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"and": clauses}
+
+
+def _coerce(filter, types):
+    """Convert REST filter strings to the types of the fields they compare against."""
+    if isinstance(filter, list):
+        return [_coerce(f, types) for f in filter]
+    if not isinstance(filter, dict):
+        return filter
+    out = {}
+    for key, condition in filter.items():
+        if key in ("and", "or", "not"):
+            out[key] = _coerce(condition, types)
+        elif isinstance(condition, dict) and not any(isinstance(v, dict) for v in condition.values()):
+            field_type = types.get(key)
+            out[key] = {op: (value if op == "is" else _convert(value, field_type))
+                        for op, value in condition.items()}
+        else:
+            out[key] = condition
+    return out
+
+
+def _convert(value, field_type):
+    if isinstance(value, list):
+        return [_convert(v, field_type) for v in value]
+    if field_type in ("NUMBER", "NUMERIC", "POSITION"):
+        try:
+            return float(value) if "." in value else int(value)
+        except (TypeError, ValueError):
+            return value
+    if field_type == "BOOLEAN" and value in ("true", "false"):
+        return value == "true"
+    if value == "NULL":
+        return None
+    return value
+
+
+def _rest_order(text):
+    """order_by=createdAt[DescNullsLast],name.firstName -> GraphQL orderBy list."""
+    order = []
+    for term in _split_top(text or ""):
+        match = re.match(r"^([\w.]+)(?:\[(\w+)\])?$", term)
+        if match is None:
+            raise WorkspaceError(f"Invalid order_by: {term}")
+        direction = match.group(2) or "AscNullsFirst"
+        item = direction
+        for key in reversed(match.group(1).split(".")):
+            item = {key: item}
+        order.append(item)
+    return order or None
+
+
+class StandinServer:
+    """Threaded stand-in Twenty server. port=0 picks a free port (see .url)."""
+
+    def __init__(self, workspace=None, host="127.0.0.1", port=0, api_key=None, faults=None,
+                 persisted_queries=False, **fault_settings):
+        self.workspace = workspace or Workspace()
+        self.host = host
+        self.port = port
+        self.api_key = api_key
+        self.faults = faults or Faults(**fault_settings)
+        self.counters = Counters()
+        self.executors = {path: Executor(self.workspace, path, persisted_queries)
+                          for path in ("/graphql", "/metadata")}
+        self.server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host = "127.0.0.1" if self.host in ("0.0.0.0", "") else self.host
+        return f"http://{host}:{self.port}"
+
+    def start(self):
+        """Serve on a background thread and return self."""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # Routing
+
+    def handle(self, method, path, query, body):
+        """Returns (status, body, counter key). Raises WorkspaceError for 4xx."""
+        if path in self.executors and method == "POST":
+            status, response, label = self.executors[path].execute(body if isinstance(body, dict) else {})
+            return status, response, f"{path} {label}"
+        if path.startswith("/rest/metadata/"):
+            return self.handle_metadata(method, path[len("/rest/metadata/"):].strip("/").split("/"), query, body)
+        if path.startswith("/rest/"):
+            return self.handle_records(method, path[len("/rest/"):].strip("/").split("/"), query, body)
+        raise WorkspaceError(f"Cannot {method} {path}", code="NOT_FOUND", status=404)
+
+    @staticmethod
+    def _paginate(items, query, default_limit):
+        limit = int(query.get("limit", default_limit))
+        start = 0
+        if query.get("starting_after"):
+            start = decode_cursor(query["starting_after"])[1] + 1
+        page = items[start:start + limit]
+        end = start + len(page)
+        info = {
+            "hasNextPage": end < len(items),
+            "startCursor": encode_cursor(page[0]["id"], start) if page else None,
+            "endCursor": encode_cursor(page[-1]["id"], end - 1) if page else None,
+        }
+        return page, info
+
+    def handle_metadata(self, method, parts, query, body):
+        ws = self.workspace
+        kind = parts[0]
+        key = f"{method} /rest/metadata/{kind}" + ("/:id" if len(parts) > 1 else "")
+        if kind not in ("objects", "fields"):
+            raise WorkspaceError(f"Cannot {method} /rest/metadata/{kind}", code="NOT_FOUND", status=404)
+        singular = kind[:-1]
+        with ws.lock:
+            if len(parts) == 1 and method == "GET":
+                items = ws.list_objects() if kind == "objects" else ws.list_fields()
+                filter = parse_rest_filter(query.get("filter"))
+                if filter:
+                    from .workspace import matches
+                    types = {k: "BOOLEAN" for k in ("isCustom", "isActive", "isSystem", "isNullable")}
+                    items = [i for i in items if matches(i, _coerce(filter, types))]
+                page, info = self._paginate(items, query, METADATA_LIMIT)
+                return 200, {"data": {kind: page}, "pageInfo": info, "totalCount": len(items)}, key
+            if len(parts) == 1 and method == "POST":
+                created = ws.create_object(body or {}) if kind == "objects" else ws.create_field(body or {})
+                return 201, {"data": {f"createOne{singular.title()}": created}}, key
+            if kind == "fields" and len(parts) == 2:
+                entry = ws.fields_by_id.get(parts[1])
+                if method == "GET":
+                    if entry is None:
+                        raise WorkspaceError("Field does not exist", code="NOT_FOUND", status=404)
+                    return 200, {"data": {"field": entry[1]}}, key
+                if method == "PATCH":
+                    return 200, {"data": {"updateOneField": ws.update_field(parts[1], body or {})}}, key
+                if method == "DELETE":
+                    return 200, {"data": {"deleteOneField": ws.delete_field(parts[1])}}, key
+            if kind == "objects" and len(parts) == 2 and method == "GET":
+                model = ws.object_by_id(parts[1])
+                if model is None:
+                    raise WorkspaceError("Object does not exist", code="NOT_FOUND", status=404)
+                return 200, {"data": {"object": dict(model.metadata, fields=list(model.fields.values()))}}, key
+        raise WorkspaceError(f"Cannot {method} {key.split(' ', 1)[1]}", code="NOT_FOUND", status=404)
+
+    def handle_records(self, method, parts, query, body):
+        ws = self.workspace
+        batch = parts[0] == "batch"
+        if batch:
+            parts = parts[1:]
+        model = ws.model(parts[0]) if parts and parts[0] in ws.plurals else None
+        if model is None:
+            raise WorkspaceError(f"Object {'/'.join(parts)} does not exist", code="NOT_FOUND", status=404)
+        key = f"{method} /rest/{'batch/' if batch else ''}{model.plural}" + ("/:id" if len(parts) > 1 else "")
+        t = model.type_name
+        with ws.lock:
+            if len(parts) == 1 and method == "GET":
+                types = {name: f["type"] for name, f in model.fields.items()}
+                filter = _coerce(parse_rest_filter(query.get("filter")), types)
+                limit = min(int(query.get("limit", REST_LIMIT)), 200)
+                edges, info, total = ws.page(model.name, first=limit, after=query.get("starting_after"),
+                                             before=query.get("ending_before"), filter=filter,
+                                             order_by=_rest_order(query.get("order_by")))
+                return 200, {"data": {model.plural: [r for r, _ in edges]}, "pageInfo": info,
+                             "totalCount": total}, key
+            if len(parts) == 1 and method == "POST":
+                upsert = query.get("upsert") == "true"
+                if batch:
+                    records = ws.create_many(model.name, body or [], upsert=upsert)
+                    plural = model.plural[0].upper() + model.plural[1:]
+                    return 201, {"data": {f"create{plural}": records}}, key
+                return 201, {"data": {f"create{t}": ws.create(model.name, body or {}, upsert=upsert)}}, key
+            if len(parts) == 2:
+                if method == "GET":
+                    record = ws.get(model.name, parts[1])
+                    if record is None:
+                        raise WorkspaceError(f"Record {parts[1]} not found", code="NOT_FOUND", status=404)
+                    return 200, {"data": {model.name: record}}, key
+                if method == "PATCH":
+                    return 200, {"data": {f"update{t}": ws.update(model.name, parts[1], body or {})}}, key
+                if method == "DELETE":
+                    return 200, {"data": {f"delete{t}": {"id": ws.delete(model.name, parts[1])["id"]}}}, key
+        raise WorkspaceError(f"Cannot {method} {key.split(' ', 1)[1]}", code="NOT_FOUND", status=404)
+
+    def control(self, method, path, body):
+        action = path[len("/_standin/"):]
+        if action == "stats":
+            return 200, self.counters.snapshot()
+        if action == "reset" and method == "POST":
+            self.counters.reset()
+            return 200, {"ok": True}
+        if action == "faults":
+            if method == "POST":
+                self.faults.update(body or {})
+            return 200, self.faults.settings()
+        if action == "snapshot":
+            return 200, self.workspace.snapshot()
+        return 404, {"error": f"unknown control endpoint {path}"}
+
+    def _authorized(self, header):
+        if not header or not header.startswith("Bearer ") or not header[7:].strip():
+            return False
+        return self.api_key is None or header[7:].strip() == self.api_key
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like the real host
+
+            def _send(self, status, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _dispatch(self, method):
+                started = time.monotonic()
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    body = None
+
+                if url.path.startswith("/_standin/"):
+                    self._send(*server.control(method, url.path, body))
+                    return
+
+                route = url.path.rstrip("/") or "/"
+                if not server._authorized(self.headers.get("Authorization")):
+                    self._send(401, {"statusCode": 401, "error": "Unauthorized", "messages": ["Unauthorized"]})
+                    server.counters.record(f"{method} {route}", 401, time.monotonic() - started)
+                    return
+
+                status, delay = server.faults.decide()
+                if status is not None:
+                    injected = "throttled" if status == 429 else "errors"
+                    headers = {"Retry-After": f"{server.faults.retry_after:g}"} if status == 429 else None
+                    message = "Too Many Requests" if status == 429 else "Injected failure"
+                    self._send(status, {"statusCode": status, "error": message, "messages": [message]}, headers)
+                    server.counters.record(f"{method} {route}", status, time.monotonic() - started, injected)
+                    return
+                if delay:
+                    time.sleep(delay)
+
+                query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                try:
+                    status, response, key = server.handle(method, route, query, body)
+                except WorkspaceError as e:
+                    status, key = e.status, f"{method} {route}"
+                    response = {"statusCode": e.status, "error": e.code, "messages": [str(e)]}
+                except (TypeError, ValueError) as e:
+                    status, key = 400, f"{method} {route}"
+                    response = {"statusCode": 400, "error": "BadRequestException", "messages": [str(e)]}
+                self._send(status, response)
+                server.counters.record(key, status, time.monotonic() - started, "delayed" if delay else None)
+
+            def do_GET(self):
+                self._dispatch("GET")
+
+            def do_POST(self):
+                self._dispatch("POST")
+
+            def do_PATCH(self):
+                self._dispatch("PATCH")
+
+            def do_DELETE(self):
+                self._dispatch("DELETE")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
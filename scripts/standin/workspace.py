@@ -0,0 +1,659 @@
+"""
+In-memory Twenty workspace: object/field metadata plus records.
+
+Holds just enough of Twenty's data model for the scripts in scripts/ to
+run unchanged: standard objects (person, workspaceMember, workflow, ...),
+the custom objects the apps use (callRecord, repProgression), composite
+field defaults, GraphQL-style filters, orderBy with null placement,
+keyset cursors, soft deletes and SELECT option validation.
+
+    workspace = Workspace()
+    workspace.seed(people=10_000, call_records=50_000)
+    nodes, page_info, total = workspace.page("person", first=60, filter={...})
+"""
+
+import base64
+import copy
+import datetime
+import json
+import random
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
+# Field types whose values are objects; missing values default to these
+COMPOSITE_DEFAULTS = {
+    "FULL_NAME": {"firstName": "", "lastName": ""},
+    "EMAILS": {"primaryEmail": "", "additionalEmails": None},
+    "PHONES": {"primaryPhoneNumber": "", "primaryPhoneCountryCode": "", "primaryPhoneCallingCode": "",
+               "additionalPhones": None},
+    "ADDRESS": {"addressStreet1": "", "addressStreet2": "", "addressCity": "", "addressState": "",
+                "addressPostcode": "", "addressCountry": "", "addressLat": None, "addressLng": None},
+    "LINKS": {"primaryLinkUrl": "", "primaryLinkLabel": "", "secondaryLinks": None},
+    "CURRENCY": {"amountMicros": None, "currencyCode": ""},
+    "ACTOR": {"source": "API", "workspaceMemberId": None, "name": "", "context": {}},
+}
+
+SYSTEM_FIELDS = [
+    ("id", "Id", "UUID"),
+    ("createdAt", "Creation date", "DATE_TIME"),
+    ("updatedAt", "Last update", "DATE_TIME"),
+    ("deletedAt", "Deleted at", "DATE_TIME"),
+    ("createdBy", "Created by", "ACTOR"),
+    ("position", "Position", "POSITION"),
+]
+
+# (nameSingular, namePlural, isCustom, [(name, label, type)])
+STANDARD_OBJECTS = [
+    ("person", "people", False, [
+        ("name", "Name", "FULL_NAME"), ("emails", "Emails", "EMAILS"), ("phones", "Phones", "PHONES"),
+        ("city", "City", "TEXT"), ("jobTitle", "Job Title", "TEXT"), ("avatarUrl", "Avatar", "TEXT"),
+    ]),
+    ("company", "companies", False, [
+        ("name", "Name", "TEXT"), ("domainName", "Domain", "LINKS"), ("address", "Address", "ADDRESS"),
+    ]),
+    ("workspaceMember", "workspaceMembers", False, [
+        ("name", "Name", "FULL_NAME"), ("userEmail", "User Email", "TEXT"), ("userId", "User Id", "UUID"),
+        ("colorScheme", "Color Scheme", "TEXT"), ("locale", "Language", "TEXT"),
+    ]),
+    ("note", "notes", False, [("title", "Title", "TEXT"), ("bodyV2", "Body", "RICH_TEXT_V2")]),
+    ("noteTarget", "noteTargets", False, [("noteId", "Note", "UUID"), ("personId", "Person", "UUID")]),
+    ("workflow", "workflows", False, [
+        ("name", "Name", "TEXT"), ("lastPublishedVersionId", "Last published version", "TEXT"),
+        ("statuses", "Statuses", "MULTI_SELECT"),
+    ]),
+    ("workflowVersion", "workflowVersions", False, [
+        ("name", "Name", "TEXT"), ("workflowId", "Workflow", "UUID"), ("status", "Status", "SELECT"),
+        ("trigger", "Trigger", "RAW_JSON"), ("steps", "Steps", "RAW_JSON"),
+    ]),
+    # Custom objects the dashboard writes to (twentyStatsApi.ts)
+    ("callRecord", "callRecords", True, [
+        ("name", "Name", "TEXT"), ("duration", "Duration", "NUMBER"), ("disposition", "Disposition", "TEXT"),
+        ("xpAwarded", "XP Awarded", "NUMBER"), ("wasSubThirty", "Sub 30s", "BOOLEAN"),
+        ("wasTwoPlusMin", "2+ Minutes", "BOOLEAN"), ("leadId", "Lead", "TEXT"),
+    ]),
+    ("repProgression", "repProgressions", True, [
+        ("name", "Name", "TEXT"), ("workspaceMemberId", "Workspace Member", "TEXT"),
+        ("totalXp", "Total XP", "NUMBER"), ("currentLevel", "Current Level", "NUMBER"),
+        ("currentRank", "Current Rank", "TEXT"), ("closedDeals", "Closed Deals", "NUMBER"),
+        ("badges", "Badges", "TEXT"), ("streakDays", "Streak Days", "NUMBER"),
+        ("efficiencyMetrics", "Efficiency Metrics", "TEXT"), ("lastActivityDate", "Last Activity", "DATE_TIME"),
+    ]),
+]
+
+# Custom person fields the lead tooling filters on (reassign_leads.py, dialer_queue.py)
+PERSON_CUSTOM_FIELDS = [("state", "State", "TEXT"), ("zipCode", "Zip Code", "TEXT"),
+                        ("tcpaStatus", "TCPA Status", "TEXT")]
+
+WORKFLOW_VERSION_STATUSES = ["DRAFT", "ACTIVE", "DEACTIVATED", "ARCHIVED"]
+
+SEED_MEMBERS = [
+    "Nathaniel Jenkins", "Jonathan Lindqvist", "David Edwards",
+    "Edwin Royal Stewart", "Lou Hallug", "Leigh Edwards",
+]
+
+OPERATORS = {"eq", "neq", "in", "is", "gt", "gte", "lt", "lte", "like", "ilike",
+             "startsWith", "containsAny", "containsIlike"}
+
+DIRECTIONS = {"AscNullsFirst", "AscNullsLast", "DescNullsFirst", "DescNullsLast"}
+
+MAX_PAGE_SIZE = 200
+
+
+class WorkspaceError(Exception):
+    """A request the real server would reject; message mirrors Twenty's where it matters."""
+
+    def __init__(self, message, code="BAD_USER_INPUT", status=400):
+        super().__init__(message)
+        self.code = code
+        self.status = status
+
+
+def now_iso():
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def snake_value(label):
+    return re.sub(r"[^a-zA-Z0-9\s]", "", label).upper().replace(" ", "_")
+
+
+def _like(pattern, value, flags=0):
+    regex = "^" + ".*".join(re.escape(part) for part in pattern.split("%")) + "$"
+    return re.match(regex, value, flags | re.DOTALL) is not None
+
+
+def _compare(op, value, expected):
+    if op == "is":
+        return (value is None) == (str(expected).upper() == "NULL")
+    if op == "eq":
+        return value == expected
+    if op == "neq":
+        return value != expected
+    if op == "in":
+        return value in (expected or [])
+    if value is None or expected is None:
+        return False
+    if op in ("like", "ilike", "containsIlike", "startsWith"):
+        if not isinstance(value, str):
+            return False
+        if op == "startsWith":
+            return value.startswith(expected)
+        if op == "containsIlike":
+            return _like(f"%{expected.strip('%')}%", value, re.IGNORECASE)
+        return _like(expected, value, re.IGNORECASE if op == "ilike" else 0)
+    if op == "containsAny":
+        return bool(set(value or []) & set(expected))
+    try:
+        return {"gt": value > expected, "gte": value >= expected,
+                "lt": value < expected, "lte": value <= expected}[op]
+    except TypeError:
+        return False
+
+
+def matches(record, filter):
+    """Evaluate a Twenty GraphQL filter ({field: {op: value}}, and/or/not, nested composites)."""
+    for key, condition in (filter or {}).items():
+        if key == "and":
+            if not all(matches(record, f) for f in condition or []):
+                return False
+        elif key == "or":
+            if condition and not any(matches(record, f) for f in condition):
+                return False
+        elif key == "not":
+            if matches(record, condition):
+                return False
+        elif isinstance(condition, dict) and condition and set(condition) <= OPERATORS:
+            value = record.get(key)
+            if not all(_compare(op, value, expected) for op, expected in condition.items()):
+                return False
+        elif isinstance(condition, dict):
+            nested = record.get(key)
+            if not matches(nested if isinstance(nested, dict) else {}, condition):
+                return False
+    return True
+
+
+def _mentions(filter, name):
+    if isinstance(filter, dict):
+        return name in filter or any(_mentions(v, name) for v in filter.values())
+    if isinstance(filter, list):
+        return any(_mentions(v, name) for v in filter)
+    return False
+
+
+def _order_terms(order_by, prefix=()):
+    """Flatten orderBy ([{createdAt: AscNullsFirst}, {name: {firstName: Asc}}]) to (path, direction)."""
+    items = order_by if isinstance(order_by, list) else [order_by] if order_by else []
+    for item in items:
+        for key, direction in item.items():
+            if isinstance(direction, dict):
+                yield from _order_terms([direction], prefix + (key,))
+            else:
+                if direction not in DIRECTIONS:
+                    raise WorkspaceError(f'Invalid order direction "{direction}".')
+                yield prefix + (key,), direction
+
+
+def _path_value(record, path):
+    for key in path:
+        record = record.get(key) if isinstance(record, dict) else None
+    return record
+
+
+def encode_cursor(record_id, position):
+    return base64.b64encode(json.dumps({"id": record_id, "position": position}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        data = json.loads(base64.b64decode(cursor))
+        return data["id"], int(data["position"])
+    except (ValueError, KeyError, TypeError):
+        raise WorkspaceError("Invalid cursor") from None
+
+
+class ObjectModel:
+    """One object's metadata and records."""
+
+    def __init__(self, metadata, fields):
+        self.metadata = metadata
+        self.fields = fields            # name -> field metadata
+        self.records = OrderedDict()    # id -> record
+
+    @property
+    def name(self):
+        return self.metadata["nameSingular"]
+
+    @property
+    def plural(self):
+        return self.metadata["namePlural"]
+
+    @property
+    def type_name(self):
+        return self.name[0].upper() + self.name[1:]
+
+
+class Workspace:
+    """Thread-safe in-memory workspace. Every public method takes the lock."""
+
+    def __init__(self, members=SEED_MEMBERS, schema=True):
+        self.lock = threading.RLock()
+        self.objects = {}         # nameSingular -> ObjectModel
+        self.plurals = {}         # namePlural -> nameSingular
+        self.fields_by_id = {}
+        self.version = 0
+        self._views = OrderedDict()
+        for name, plural, custom, fields in STANDARD_OBJECTS:
+            self.create_object({"nameSingular": name, "namePlural": plural,
+                                "labelSingular": name, "labelPlural": plural}, custom=custom, standard_fields=fields)
+        self.objects["workflowVersion"].fields["status"]["options"] = [
+            {"value": s, "label": s.title(), "position": i, "color": "gray"}
+            for i, s in enumerate(WORKFLOW_VERSION_STATUSES)
+        ]
+        for name, label, field_type in PERSON_CUSTOM_FIELDS:
+            self.create_field({"objectMetadataId": self.objects["person"].metadata["id"],
+                               "name": name, "label": label, "type": field_type})
+        for member in members:
+            first, _, last = member.partition(" ")
+            self.create("workspaceMember", {
+                "name": {"firstName": first, "lastName": last},
+                "userEmail": f"{first.lower()}{last[:1].lower()}@example.com",
+            })
+        if schema:
+            self.apply_spec()
+
+    # Metadata
+
+    def create_object(self, data, custom=True, standard_fields=()):
+        with self.lock:
+            name = data.get("nameSingular")
+            if not name or not data.get("namePlural"):
+                raise WorkspaceError("nameSingular and namePlural are required")
+            if name in self.objects or data["namePlural"] in self.plurals:
+                raise WorkspaceError(f'Object "{name}" already exists')
+            metadata = {
+                "id": str(uuid.uuid4()),
+                "nameSingular": name,
+                "namePlural": data["namePlural"],
+                "labelSingular": data.get("labelSingular") or name,
+                "labelPlural": data.get("labelPlural") or data["namePlural"],
+                "description": data.get("description"),
+                "icon": data.get("icon"),
+                "isCustom": custom,
+                "isActive": True,
+                "isSystem": False,
+                "createdAt": now_iso(),
+                "updatedAt": now_iso(),
+            }
+            model = ObjectModel(metadata, {})
+            self.objects[name] = model
+            self.plurals[metadata["namePlural"]] = name
+            for field_name, label, field_type in list(SYSTEM_FIELDS) + list(standard_fields):
+                self._add_field(model, {"name": field_name, "label": label, "type": field_type},
+                                custom=False)
+            if custom and "name" not in model.fields:
+                self._add_field(model, {"name": "name", "label": "Name", "type": "TEXT"}, custom=False)
+            self._changed()
+            return metadata
+
+    def _add_field(self, model, data, custom=True):
+        field = {
+            "id": str(uuid.uuid4()),
+            "objectMetadataId": model.metadata["id"],
+            "name": data["name"],
+            "label": data.get("label") or data["name"],
+            "type": data["type"],
+            "description": data.get("description"),
+            "icon": data.get("icon"),
+            "isCustom": custom,
+            "isActive": True,
+            "isSystem": data["name"] in ("id", "position", "createdBy"),
+            "isNullable": True,
+            "defaultValue": data.get("defaultValue"),
+            "options": data.get("options"),
+            "settings": data.get("settings"),
+            "createdAt": now_iso(),
+            "updatedAt": now_iso(),
+        }
+        model.fields[field["name"]] = field
+        self.fields_by_id[field["id"]] = (model, field)
+        return field
+
+    def object_by_id(self, object_id):
+        for model in self.objects.values():
+            if model.metadata["id"] == object_id:
+                return model
+        return None
+
+    def create_field(self, data):
+        with self.lock:
+            model = self.object_by_id(data.get("objectMetadataId"))
+            if model is None:
+                raise WorkspaceError("Object metadata does not exist", code="NOT_FOUND", status=404)
+            if not data.get("name") or not data.get("type"):
+                raise WorkspaceError("name and type are required")
+            if data["name"] in model.fields:
+                raise WorkspaceError(f'Field "{data["name"]}" already exists on {model.name}')
+            if data["type"] == "RELATION":
+                payload = data.get("relationCreationPayload") or {}
+                if self.object_by_id(payload.get("targetObjectMetadataId")) is None:
+                    raise WorkspaceError("Relation target object does not exist")
+            field = self._add_field(model, data)
+            self._changed()
+            return field
+
+    def update_field(self, field_id, update):
+        with self.lock:
+            entry = self.fields_by_id.get(field_id)
+            if entry is None:
+                raise WorkspaceError("Field does not exist", code="NOT_FOUND", status=404)
+            model, field = entry
+            if "type" in update and update["type"] != field["type"]:
+                raise WorkspaceError("Cannot change field type")
+            for key in ("label", "description", "icon", "options", "defaultValue", "isActive", "settings"):
+                if key in update:
+                    field[key] = update[key]
+            field["updatedAt"] = now_iso()
+            if field["type"] in ("SELECT", "MULTI_SELECT") and "options" in update:
+                allowed = {o.get("value") for o in field["options"] or []}
+                for record in model.records.values():
+                    if record.get(field["name"]) not in allowed:
+                        record[field["name"]] = None  # retired option values are cleared
+            self._changed()
+            return field
+
+    def delete_field(self, field_id):
+        with self.lock:
+            entry = self.fields_by_id.pop(field_id, None)
+            if entry is None:
+                raise WorkspaceError("Field does not exist", code="NOT_FOUND", status=404)
+            model, field = entry
+            del model.fields[field["name"]]
+            for record in model.records.values():
+                record.pop(field["name"], None)
+            self._changed()
+            return field
+
+    def list_objects(self):
+        with self.lock:
+            return [dict(m.metadata, fields=list(m.fields.values())) for m in self.objects.values()]
+
+    def list_fields(self):
+        with self.lock:
+            return [f for m in self.objects.values() for f in m.fields.values()]
+
+    def apply_spec(self, spec=None):
+        """Create the custom objects and fields of workspace_schema.SPEC (rep options from members)."""
+        if spec is None:
+            from workspace_schema import SPEC as spec
+        with self.lock:
+            for obj in spec.get("objects", []):
+                if not obj.get("standard") and obj["nameSingular"] not in self.objects:
+                    self.create_object({k: v for k, v in obj.items() if k != "standard"})
+            for object_name, entries in spec.get("fields", {}).items():
+                model = self.objects[object_name]
+                for entry in entries:
+                    field = dict(entry) if isinstance(entry, dict) else dict(
+                        zip(("name", "label", "type", "description", "icon"), entry))
+                    if field["name"] in model.fields:
+                        continue
+                    if isinstance(field.get("options"), str):
+                        field["options"] = self.member_options()
+                    field["objectMetadataId"] = model.metadata["id"]
+                    self.create_field(field)
+
+    def member_options(self):
+        labels = sorted(f"{m['name']['firstName']} {m['name']['lastName']}".strip()
+                        for m in self.objects["workspaceMember"].records.values())
+        return [{"label": label, "value": snake_value(label), "color": "gray", "position": i}
+                for i, label in enumerate(labels)]
+
+    # Records
+
+    def model(self, name):
+        model = self.objects.get(name) or self.objects.get(self.plurals.get(name, ""))
+        if model is None:
+            raise WorkspaceError(f'Object "{name}" does not exist', code="NOT_FOUND", status=404)
+        return model
+
+    def _changed(self):
+        self.version += 1
+        self._views.clear()
+
+    def _check_fields(self, model, data):
+        for key, value in data.items():
+            field = model.fields.get(key)
+            if field is None:
+                raise WorkspaceError(f'Field "{key}" does not exist on object "{model.name}"')
+            if field["type"] == "SELECT" and value is not None and field.get("options") is not None:
+                if value not in {o.get("value") for o in field["options"]}:
+                    raise WorkspaceError(f'Value "{value}" is not a valid option for field "{key}"')
+
+    def _prepare(self, model, data):
+        data = dict(data)
+        for key, value in list(data.items()):
+            # Relation inputs: {"workflow": {"connect": {"id": ...}}} -> workflowId
+            if isinstance(value, dict) and "connect" in value and key not in model.fields:
+                data.pop(key)
+                data[f"{key}Id"] = (value["connect"] or {}).get("id")
+        self._check_fields(model, data)
+        for key, value in data.items():
+            field_type = model.fields[key]["type"]
+            if field_type in COMPOSITE_DEFAULTS and isinstance(value, dict):
+                data[key] = dict(COMPOSITE_DEFAULTS[field_type], **value)
+        return data
+
+    def create(self, name, data, actor=None, upsert=False):
+        with self.lock:
+            model = self.model(name)
+            data = self._prepare(model, data)
+            record_id = data.get("id") or str(uuid.uuid4())
+            if record_id in model.records:
+                if not upsert:
+                    raise WorkspaceError(f"Record {record_id} already exists")
+                return self._update(model, record_id, data)
+            timestamp = now_iso()
+            record = {}
+            for field_name, field in model.fields.items():
+                default = COMPOSITE_DEFAULTS.get(field["type"])
+                record[field_name] = copy.deepcopy(default) if default is not None else None
+            record.update(id=record_id, createdAt=timestamp, updatedAt=timestamp,
+                          position=len(model.records))
+            record["createdBy"] = dict(COMPOSITE_DEFAULTS["ACTOR"], **(actor or {"name": "Stand-in API key"}))
+            if model.name == "workflowVersion":
+                record.update(status="DRAFT", steps=[])
+            record.update(data)
+            model.records[record_id] = record
+            self._changed()
+            return record
+
+    def create_many(self, name, items, actor=None, upsert=False):
+        """All-or-nothing batch create, like createPeople."""
+        with self.lock:
+            model = self.model(name)
+            for data in items:
+                self._prepare(model, data)
+            return [self.create(name, data, actor, upsert) for data in items]
+
+    def _update(self, model, record_id, data):
+        record = model.records.get(record_id)
+        if record is None or record.get("deletedAt"):
+            raise WorkspaceError(f"Record {record_id} not found", code="NOT_FOUND", status=404)
+        record.update(data)
+        record["updatedAt"] = now_iso()
+        self._changed()
+        return record
+
+    def update(self, name, record_id, data):
+        with self.lock:
+            model = self.model(name)
+            return self._update(model, record_id, self._prepare(model, data))
+
+    def update_many(self, name, data, filter):
+        with self.lock:
+            model = self.model(name)
+            data = self._prepare(model, data)
+            targets = [r["id"] for r in self.select(name, filter)]
+            return [self._update(model, record_id, data) for record_id in targets]
+
+    def delete(self, name, record_id):
+        """Soft delete, like Twenty's deleteX mutations."""
+        with self.lock:
+            model = self.model(name)
+            return self._update(model, record_id, {"deletedAt": now_iso()})
+
+    def delete_many(self, name, filter):
+        with self.lock:
+            model = self.model(name)
+            stamp = now_iso()
+            return [self._update(model, r["id"], {"deletedAt": stamp}) for r in self.select(name, filter)]
+
+    def get(self, name, record_id):
+        with self.lock:
+            record = self.model(name).records.get(record_id)
+            return None if record is None or record.get("deletedAt") else record
+
+    # Querying
+
+    def _validate_filter(self, model, filter):
+        for key, condition in (filter or {}).items():
+            if key in ("and", "or"):
+                for f in condition or []:
+                    self._validate_filter(model, f)
+            elif key == "not":
+                self._validate_filter(model, condition)
+            elif key not in model.fields:
+                raise WorkspaceError(f'Field "{key}" does not exist on object "{model.name}"')
+
+    def select(self, name, filter=None, order_by=None):
+        """Matching records in order."""
+        with self.lock:
+            return self._view(name, filter, order_by)[0]
+
+    def _view(self, name, filter, order_by):
+        """(records, {id: position}), cached until the next write so page sweeps sort once."""
+        with self.lock:
+            model = self.model(name)
+            cache_key = (model.name, json.dumps(filter, sort_keys=True), json.dumps(order_by, sort_keys=True))
+            view = self._views.get(cache_key)
+            if view is not None:
+                self._views.move_to_end(cache_key)
+                return view
+            self._validate_filter(model, filter)
+            include_deleted = _mentions(filter, "deletedAt")
+            records = [r for r in model.records.values()
+                       if (include_deleted or not r.get("deletedAt")) and matches(r, filter)]
+            records.sort(key=lambda r: r["id"])
+            for path, direction in reversed(list(_order_terms(order_by))):
+                if path[0] not in model.fields:
+                    raise WorkspaceError(f'Field "{path[0]}" does not exist on object "{model.name}"')
+                descending = direction.startswith("Desc")
+                nulls_first = direction.endswith("NullsFirst")
+                null_rank = int(nulls_first) if descending else int(not nulls_first)
+
+                def key(r, path=path, null_rank=null_rank):
+                    value = _path_value(r, path)
+                    return (null_rank, 0) if value is None else (1 - null_rank, value)
+
+                records.sort(key=key, reverse=descending)
+            view = self._views[cache_key] = (records, {r["id"]: i for i, r in enumerate(records)})
+            while len(self._views) > 64:
+                self._views.popitem(last=False)
+            return view
+
+    def page(self, name, first=None, after=None, filter=None, order_by=None, last=None, before=None):
+        """(records, pageInfo, totalCount) for a connection query."""
+        with self.lock:
+            records, positions = self._view(name, filter, order_by)
+            start, end = 0, len(records)
+            if after:
+                record_id, position = decode_cursor(after)
+                start = positions[record_id] + 1 if record_id in positions else position + 1
+            if before:
+                record_id, position = decode_cursor(before)
+                end = positions[record_id] if record_id in positions else position
+            size = min(first or last or 60, MAX_PAGE_SIZE)
+            if last and not first:
+                start = max(start, end - size)
+            else:
+                end = min(end, start + size)
+            nodes = records[start:end]
+            info = {
+                "hasNextPage": end < len(records),
+                "hasPreviousPage": start > 0,
+                "startCursor": encode_cursor(nodes[0]["id"], start) if nodes else None,
+                "endCursor": encode_cursor(nodes[-1]["id"], end - 1) if nodes else None,
+            }
+            return [(n, encode_cursor(n["id"], start + i)) for i, n in enumerate(nodes)], info, len(records)
+
+    # Seeding and snapshots
+
+    def seed(self, people=0, call_records=0, days=30, seed=None):
+        """Synthetic leads and call records spread over the members and the last `days` days."""
+        rng = random.Random(seed)
+        with self.lock:
+            members = list(self.objects["workspaceMember"].records.values())
+            reps = [snake_value(f"{m['name']['firstName']} {m['name']['lastName']}") for m in members]
+            has_rep = "assignedRep" in self.objects["person"].fields
+            now = datetime.datetime.now(datetime.timezone.utc)
+            for i in range(people):
+                data = {
+                    "name": {"firstName": f"Lead{i}", "lastName": rng.choice(["Smith", "Jones", "Brown", "Lee"])},
+                    "phones": {"primaryPhoneNumber": f"704{rng.randrange(10**7):07d}",
+                               "primaryPhoneCountryCode": "+1"},
+                    "emails": {"primaryEmail": f"lead{i}@example.com"},
+                    "city": rng.choice(["Charlotte", "Raleigh", "Durham", "Columbia"]),
+                    "state": rng.choice(["NC", "NC", "SC"]),
+                    "zipCode": f"{rng.choice([27601, 27603, 28202, 29201]) + rng.randrange(5)}",
+                    "tcpaStatus": rng.choice(["SAFE", "SAFE", "SAFE", "MODERATE", "DANGEROUS", "DNC"]),
+                }
+                if has_rep and reps and rng.random() < 0.7:
+                    data["assignedRep"] = rng.choice(reps)
+                self.create("person", data)
+            for i in range(call_records):
+                member = rng.choice(members)
+                duration = int(rng.expovariate(1 / 60))
+                created = now - datetime.timedelta(seconds=rng.randrange(days * 86400))
+                record = self.create("callRecord", {
+                    "name": f"Call {i}",
+                    "duration": duration,
+                    "disposition": rng.choice(["CONTACT", "CALLBACK", "VOICEMAIL", "NO_ANSWER", "NO_ANSWER",
+                                               "NOT_INTERESTED", "WRONG_NUMBER", "DNC"]),
+                    "xpAwarded": rng.choice([0, 5, 10, 25]),
+                    "wasSubThirty": duration < 30,
+                    "wasTwoPlusMin": duration >= 120,
+                }, actor={"source": "MANUAL", "workspaceMemberId": member["id"],
+                          "name": f"{member['name']['firstName']} {member['name']['lastName']}"})
+                record["createdAt"] = record["updatedAt"] = (
+                    created.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z")
+            self._changed()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "objects": [dict(m.metadata) for m in self.objects.values()],
+                "fields": self.list_fields(),
+                "records": {m.name: list(m.records.values()) for m in self.objects.values()},
+            }
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        workspace = cls.__new__(cls)
+        workspace.lock = threading.RLock()
+        workspace.objects, workspace.plurals, workspace.fields_by_id = {}, {}, {}
+        workspace.version = 0
+        workspace._views = OrderedDict()
+        by_id = {}
+        for metadata in snapshot["objects"]:
+            model = ObjectModel(metadata, {})
+            workspace.objects[metadata["nameSingular"]] = model
+            workspace.plurals[metadata["namePlural"]] = metadata["nameSingular"]
+            by_id[metadata["id"]] = model
+        for field in snapshot["fields"]:
+            model = by_id[field["objectMetadataId"]]
+            model.fields[field["name"]] = field
+            workspace.fields_by_id[field["id"]] = (model, field)
+        for name, records in snapshot["records"].items():
+            workspace.objects[name].records = OrderedDict((r["id"], r) for r in records)
+        return workspace
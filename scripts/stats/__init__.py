@@ -0,0 +1,7 @@
+"""
+Rep call statistics served from local rollups.
+
+Python counterparts of the aggregations in
+apps/ads-dashboard/client/src/lib/twentyStatsApi.ts, computed once from
+Twenty call records instead of in every dashboard tab.
+"""
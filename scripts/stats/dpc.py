@@ -0,0 +1,395 @@
+"""
+Rolling-window DPC/ECR tiers for every rep and day, vectorized.
+
+Ports the tier math of apps/ads-dashboard/client/src/lib/dpcMetrics.ts
+(calculateDPC/DPE/ECR/EAR, getDPCTier, getECRLevel, getDPCTrend,
+needsCoaching) and applies it to whole history matrices at once:
+
+    history = History()
+    history.load_rollup(CallRollup())            # dials and appointments per rep/day
+    history.load_enrollments("enrollments.jsonl")
+    metrics = compute(history, windows=(7, 30, 90))
+    metrics[30].at(rep, day)                     # DPCMetrics-shaped dict
+
+Counts are (rep x day) int64 matrices; a window is a difference of two
+cumulative sums, so a year of 7/30/90-day tiers for every rep is a handful
+of array passes.
+
+Two deliberate differences from the live dashboard, which only ever sees
+one day for one user:
+
+- Ramp (fewer than 25 confirmed enrollments) uses confirmed enrollments to
+  date, like the hook's cumulative counter, not just those in the window.
+- Coaching streaks ("for 7+ days") only count days with dials in the
+  window, so weekends and time off don't trigger coaching.
+"""
+
+import csv
+import datetime
+import json
+import math
+
+import numpy as np
+
+# Efficiency tiers, in code order (EFFICIENCY_TIERS)
+TIERS = ("Building baseline", "Developing", "Satisfactory", "Above Satisfactory", "Elite")
+RAMP, DEVELOPING, SATISFACTORY, ABOVE_SATISFACTORY, ELITE = range(len(TIERS))
+
+DPC_THRESHOLDS = {"ELITE": 30, "ABOVE_SATISFACTORY": 45, "SATISFACTORY": 70}
+ECR_THRESHOLDS = {"HIGH": 85, "ABOVE_SAT": 75, "GOOD": 65}
+RAMP_THRESHOLD = 25
+
+ECR_LEVELS = ("low", "good", "high")
+TRENDS = {-1: "declining", 0: "stable", 1: "improving"}
+
+COACHING_REASONS = (
+    "ECR below 60% for 7+ days - review qualification technique",
+    "DPC above 80 for 7+ days - review opener/engagement",
+    "Zero confirmed enrollments for 2+ days - same-day shadowing needed",
+    "EAR below 10% with 20+ confirmed - review cadence execution",
+)
+
+FIELDS = ("dials", "appointments", "enrollments", "confirmed", "unconfirmed", "declined")
+
+# Enrollment status -> extra counter (every enrollment also counts in "enrollments")
+STATUS_FIELDS = {"confirmed": "confirmed", "unconfirmed": "unconfirmed", "declined": "declined"}
+
+# DailyMetricsRecord column -> history field
+DAILY_COLUMNS = {
+    "dials": "dials",
+    "appointments": "appointments",
+    "enrollments": "enrollments",
+    "confirmedEnrollments": "confirmed",
+    "unconfirmedEnrollments": "unconfirmed",
+    "declinedEnrollments": "declined",
+}
+
+
+def _round(x):
+    # JS Math.round: halves round up
+    return math.floor(x + 0.5)
+
+
+# Scalar ports (one rep, one window) - the reference for the vectorized path
+
+def calculate_dpe(dials, enrollments):
+    return math.inf if enrollments == 0 else _round(dials / enrollments)
+
+
+def calculate_ecr(confirmed, total_enrollments):
+    return 0 if total_enrollments == 0 else _round(confirmed / total_enrollments * 100)
+
+
+def calculate_dpc(dials, confirmed_enrollments):
+    return math.inf if confirmed_enrollments == 0 else _round(dials / confirmed_enrollments)
+
+
+def calculate_ear(appointments, confirmed_enrollments):
+    return 0 if confirmed_enrollments == 0 else _round(appointments / confirmed_enrollments * 100)
+
+
+def get_dpc_tier(dpc, confirmed_enrollments, ecr=0):
+    if confirmed_enrollments < RAMP_THRESHOLD:
+        return TIERS[RAMP]
+    if dpc < DPC_THRESHOLDS["ELITE"] and ecr > ECR_THRESHOLDS["HIGH"]:
+        return TIERS[ELITE]
+    if dpc < DPC_THRESHOLDS["ABOVE_SATISFACTORY"] and ecr > ECR_THRESHOLDS["ABOVE_SAT"]:
+        return TIERS[ABOVE_SATISFACTORY]
+    if dpc < DPC_THRESHOLDS["SATISFACTORY"] and ecr > ECR_THRESHOLDS["GOOD"]:
+        return TIERS[SATISFACTORY]
+    return TIERS[DEVELOPING]
+
+
+def get_ecr_level(ecr):
+    if ecr >= ECR_THRESHOLDS["HIGH"]:
+        return "high"
+    if ecr >= ECR_THRESHOLDS["GOOD"]:
+        return "good"
+    return "low"
+
+
+def get_dpc_trend(current_dpc, previous_dpc):
+    change = (previous_dpc - current_dpc) / previous_dpc * 100 if previous_dpc > 0 else 0
+    if math.isnan(change):  # inf - inf compares false both ways in JS
+        change = 0
+    if change > 5:
+        return "improving"
+    if change < -5:
+        return "declining"
+    return "stable"
+
+
+def build_dpc_metrics(raw, previous_dpc=None, lifetime_confirmed=None):
+    """buildDPCMetrics(); lifetime_confirmed (if given) decides ramp instead of the window."""
+    dpe = calculate_dpe(raw["totalDials"], raw["totalEnrollments"])
+    ecr = calculate_ecr(raw["confirmedEnrollments"], raw["totalEnrollments"])
+    dpc = calculate_dpc(raw["totalDials"], raw["confirmedEnrollments"])
+    ear = calculate_ear(raw["appointments"], raw["confirmedEnrollments"])
+    ramp_count = raw["confirmedEnrollments"] if lifetime_confirmed is None else lifetime_confirmed
+    return {
+        "dpe": dpe,
+        "ecr": ecr,
+        "dpc": dpc,
+        "ear": ear,
+        "dpcTier": get_dpc_tier(dpc, ramp_count, ecr),
+        "ecrLevel": get_ecr_level(ecr),
+        "dpcTrend": get_dpc_trend(dpc, previous_dpc) if previous_dpc is not None else "stable",
+        "rawData": raw,
+        "isRampPeriod": ramp_count < RAMP_THRESHOLD,
+        "rampProgress": min(ramp_count, RAMP_THRESHOLD),
+    }
+
+
+# History loading
+
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+def _day_ordinal(value):
+    """YYYY-MM-DD[...] -> days since 1970-01-01."""
+    return datetime.date.fromisoformat(value[:10]).toordinal() - _EPOCH
+
+
+def _iter_records(path):
+    """Rows of a .jsonl export or a CSV with a header."""
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+
+
+class History:
+    """Per-(rep, day) counters gathered from any mix of sources."""
+
+    def __init__(self):
+        self.reps = []
+        self.names = {}
+        self._index = {}
+        self._parts = {field: [] for field in FIELDS}
+
+    def rep(self, rep_id):
+        index = self._index.get(rep_id)
+        if index is None:
+            index = self._index[rep_id] = len(self.reps)
+            self.reps.append(rep_id)
+        return index
+
+    def add(self, field, reps, days, counts=None):
+        """Add counts (default 1 each) for parallel rep-index and day-ordinal sequences."""
+        reps = np.asarray(reps, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        counts = np.ones(len(reps), np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        self._parts[field].append((reps, days, counts))
+
+    def load_rollup(self, rollup):
+        """Dials and appointments from a stats.rollup.CallRollup."""
+        from .rollup import APPOINTMENT
+
+        reps, days, calls, appts = [], [], [], []
+        for row in rollup.rows():
+            if not row["rep"] or not row["day"]:
+                continue  # API-created records belong to no rep
+            reps.append(self.rep(row["rep"]))
+            days.append(_day_ordinal(row["day"]))
+            calls.append(row["calls"])
+            appts.append(row["calls"] if row["disposition"] == APPOINTMENT else 0)
+        self.add("dials", reps, days, calls)
+        self.add("appointments", reps, days, appts)
+        for rep_id, name in rollup.reps().items():
+            if name:
+                self.names.setdefault(rep_id, name)
+
+    def load_enrollments(self, path):
+        """EnrollmentRecord export (repId, status, enrolledAt), counted on the enrollment day."""
+        reps, days = [], []
+        by_status = {field: ([], []) for field in STATUS_FIELDS.values()}
+        for record in _iter_records(path):
+            if not record.get("repId") or not record.get("enrolledAt"):
+                continue
+            rep, day = self.rep(record["repId"]), _day_ordinal(record["enrolledAt"])
+            reps.append(rep)
+            days.append(day)
+            field = STATUS_FIELDS.get((record.get("status") or "").lower())
+            if field:
+                by_status[field][0].append(rep)
+                by_status[field][1].append(day)
+        self.add("enrollments", reps, days)
+        for field, (field_reps, field_days) in by_status.items():
+            self.add(field, field_reps, field_days)
+        return len(reps)
+
+    def load_daily(self, path):
+        """DailyMetricsRecord rows (date, repId, dials, ... declinedEnrollments)."""
+        columns = {field: ([], [], []) for field in FIELDS}
+        rows = 0
+        for record in _iter_records(path):
+            if not record.get("repId") or not record.get("date"):
+                continue
+            rep, day = self.rep(record["repId"]), _day_ordinal(record["date"])
+            for column, field in DAILY_COLUMNS.items():
+                value = record.get(column)
+                if value not in (None, ""):
+                    columns[field][0].append(rep)
+                    columns[field][1].append(day)
+                    columns[field][2].append(int(float(value)))
+            rows += 1
+        for field, parts in columns.items():
+            self.add(field, *parts)
+        return rows
+
+    def span(self):
+        """(first, last) day ordinals with any data, or None."""
+        days = [d for parts in self._parts.values() for _, d, _ in parts if len(d)]
+        if not days:
+            return None
+        return min(int(d.min()) for d in days), max(int(d.max()) for d in days)
+
+    def matrices(self, first, last):
+        """{field: int64 (reps x days)} for day ordinals first..last inclusive."""
+        shape = (len(self.reps), last - first + 1)
+        out = {}
+        for field, parts in self._parts.items():
+            flat = np.zeros(shape[0] * shape[1], np.int64)
+            for reps, days, counts in parts:
+                keep = (days >= first) & (days <= last)
+                if keep.any():
+                    flat += np.bincount(reps[keep] * shape[1] + (days[keep] - first),
+                                        weights=counts[keep], minlength=flat.size).astype(np.int64)
+            out[field] = flat.reshape(shape)
+        return out
+
+
+# Vectorized window metrics
+
+def rolling_sum(matrix, window):
+    """Sum over the trailing window (day included) at every day, along axis 1."""
+    cumulative = np.zeros((matrix.shape[0], matrix.shape[1] + 1), np.int64)
+    np.cumsum(matrix, axis=1, out=cumulative[:, 1:])
+    ends = np.arange(1, matrix.shape[1] + 1)
+    return cumulative[:, ends] - cumulative[:, np.maximum(ends - window, 0)]
+
+
+def _rate(numerator, denominator, scale, empty):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.floor(numerator / np.maximum(denominator, 1) * scale + 0.5)
+    return np.where(denominator > 0, value, empty)
+
+
+def as_number(x):
+    """Whole-number rate as int, Infinity as float (JSON/CSV friendly)."""
+    return float(x) if math.isinf(x) else int(x)
+
+
+def streaks(mask):
+    """Length of the run of True ending at each day (0 where False), along axis 1."""
+    positions = np.arange(mask.shape[1])
+    last_false = np.where(mask, -1, positions)
+    np.maximum.accumulate(last_false, axis=1, out=last_false)
+    return np.where(mask, positions - last_false, 0)
+
+
+class WindowMetrics:
+    """DPC metrics for every (rep, day) over one trailing window length."""
+
+    def __init__(self, window, reps, first_day, counts, lifetime_confirmed):
+        self.window = window
+        self.reps = reps
+        self.first_day = first_day
+        self._rep_index = {rep: i for i, rep in enumerate(reps)}
+        sums = {field: rolling_sum(matrix, window) for field, matrix in counts.items()}
+        self.dials = sums["dials"]
+        self.appointments = sums["appointments"]
+        self.enrollments = sums["enrollments"]
+        self.confirmed = sums["confirmed"]
+        self.unconfirmed = sums["unconfirmed"]
+        self.declined = sums["declined"]
+        self.lifetime_confirmed = lifetime_confirmed
+
+        self.dpe = _rate(self.dials, self.enrollments, 1, np.inf)
+        self.ecr = _rate(self.confirmed, self.enrollments, 100, 0.0)
+        self.dpc = _rate(self.dials, self.confirmed, 1, np.inf)
+        self.ear = _rate(self.appointments, self.confirmed, 100, 0.0)
+
+        self.ramp = lifetime_confirmed < RAMP_THRESHOLD
+        self.tier = np.select(
+            [self.ramp,
+             (self.dpc < DPC_THRESHOLDS["ELITE"]) & (self.ecr > ECR_THRESHOLDS["HIGH"]),
+             (self.dpc < DPC_THRESHOLDS["ABOVE_SATISFACTORY"]) & (self.ecr > ECR_THRESHOLDS["ABOVE_SAT"]),
+             (self.dpc < DPC_THRESHOLDS["SATISFACTORY"]) & (self.ecr > ECR_THRESHOLDS["GOOD"])],
+            [RAMP, ELITE, ABOVE_SATISFACTORY, SATISFACTORY], DEVELOPING,
+        ).astype(np.uint8)
+        self.ecr_level = np.select(
+            [self.ecr >= ECR_THRESHOLDS["HIGH"], self.ecr >= ECR_THRESHOLDS["GOOD"]], [2, 1], 0,
+        ).astype(np.uint8)
+
+        # Trend against the previous, non-overlapping window (getDPCTrend)
+        self.previous_dpc = np.full_like(self.dpc, np.nan)
+        if window < self.dpc.shape[1]:
+            self.previous_dpc[:, window:] = self.dpc[:, :-window]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change = (self.previous_dpc - self.dpc) / self.previous_dpc * 100
+        change = np.where(self.previous_dpc > 0, change, 0.0)
+        self.trend = np.select([change > 5, change < -5], [1, -1], 0).astype(np.int8)
+
+        # needsCoaching, with consecutiveDays taken from each condition's streak
+        active = self.dials > 0
+        self.coaching = np.stack([
+            streaks(active & (self.ecr < 60)) >= 7,
+            streaks(active & (self.dpc > 80) & ~self.ramp) >= 7,
+            streaks(active & (self.confirmed == 0)) >= 2,
+            (self.ear < 10) & (self.confirmed >= 20),
+        ])
+
+    def day_index(self, day):
+        return _day_ordinal(day) - self.first_day
+
+    def at(self, rep, day):
+        """DPCMetrics-shaped dict (plus coaching) for one rep on one day (YYYY-MM-DD)."""
+        r, d = self._rep_index[rep], self.day_index(day)
+        return self.row(r, d)
+
+    def row(self, r, d):
+        confirmed = int(self.confirmed[r, d])
+        reasons = [COACHING_REASONS[i] for i in range(len(COACHING_REASONS)) if self.coaching[i, r, d]]
+        return {
+            "dpe": as_number(self.dpe[r, d]),
+            "ecr": int(self.ecr[r, d]),
+            "dpc": as_number(self.dpc[r, d]),
+            "ear": int(self.ear[r, d]),
+            "dpcTier": TIERS[self.tier[r, d]],
+            "ecrLevel": ECR_LEVELS[self.ecr_level[r, d]],
+            "dpcTrend": TRENDS[int(self.trend[r, d])],
+            "rawData": {
+                "totalDials": int(self.dials[r, d]),
+                "totalEnrollments": int(self.enrollments[r, d]),
+                "confirmedEnrollments": confirmed,
+                "unconfirmedEnrollments": int(self.unconfirmed[r, d]),
+                "declinedEnrollments": int(self.declined[r, d]),
+                "appointments": int(self.appointments[r, d]),
+            },
+            "isRampPeriod": bool(self.ramp[r, d]),
+            "rampProgress": int(min(self.lifetime_confirmed[r, d], RAMP_THRESHOLD)),
+            "coaching": {"needed": bool(reasons), "reasons": reasons},
+        }
+
+
+def compute(history, windows=(7, 30, 90), end=None):
+    """{window: WindowMetrics} over every day from the first record to end (default: last record)."""
+    span = history.span()
+    if span is None:
+        raise ValueError("no call or enrollment history loaded")
+    first, last = span
+    if end is not None:
+        last = _day_ordinal(end)
+    counts = history.matrices(first, last)
+    lifetime = np.cumsum(counts["confirmed"], axis=1)
+    return {window: WindowMetrics(window, history.reps, first, counts, lifetime) for window in windows}
+
+
+def day_string(ordinal):
+    return datetime.date.fromordinal(ordinal + _EPOCH).isoformat()
@@ -0,0 +1,417 @@
+"""
+Incremental per-rep call-record rollup in SQLite.
+
+getTodayStats() and calculateEfficiencyMetrics() fetch up to 1000 raw
+callRecords per dashboard load and count them in the browser, so busy
+weeks are silently truncated. CallRollup tails callRecords by updatedAt
+instead and keeps one row per (rep, day, disposition):
+
+    rollup = CallRollup()
+    rollup.sync()                        # first run sweeps every record
+    rollup.today_stats(rep)              # same shape as getTodayStats()
+    rollup.efficiency(rep, days_back=7)  # same shape as calculateEfficiencyMetrics()
+
+Each record's contribution is kept by id, so applying a record again is a
+no-op and an edited one (a new disposition, duration or xp) moves its
+counts instead of adding them twice. That makes re-reading safe: each sync
+starts SYNC_OVERLAP seconds before the last updatedAt it saw, to catch
+records committed late with an older timestamp, and also subtracts records
+soft-deleted since. Each page is applied in one transaction together with
+the watermark, so an interrupted sync resumes where it stopped.
+"""
+
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from twenty import get_client
+from twenty.auth import DEFAULT_HOST, verify_token
+from twenty.metadata import CACHE_DIR, workspace_key
+from twenty.pagination import iter_changes, rewind
+
+CALL_FIELDS = (
+    "id createdAt updatedAt duration disposition xpAwarded wasSubThirty wasTwoPlusMin "
+    "createdBy { workspaceMemberId name }"
+)
+
+# Seconds each sync re-reads before its watermark (late commits)
+SYNC_OVERLAP = 300.0
+# Bumped when the file layout or the counting changes; older files are rebuilt on open
+SCHEMA_VERSION = 3
+
+# Dispositions the dashboard counts as connects and appointments
+CONNECT = "CONTACT"
+APPOINTMENT = "CALLBACK"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup (
+    rep TEXT NOT NULL,
+    day TEXT NOT NULL,
+    disposition TEXT NOT NULL,
+    calls INTEGER NOT NULL DEFAULT 0,
+    duration INTEGER NOT NULL DEFAULT 0,
+    xp INTEGER NOT NULL DEFAULT 0,
+    sub_thirty INTEGER NOT NULL DEFAULT 0,
+    two_plus_min INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (rep, day, disposition)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollup_day ON rollup (day);
+CREATE TABLE IF NOT EXISTS reps (
+    rep TEXT PRIMARY KEY,
+    name TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS records (
+    id TEXT PRIMARY KEY,
+    rep TEXT NOT NULL,
+    day TEXT NOT NULL,
+    disposition TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    duration INTEGER NOT NULL,
+    xp INTEGER NOT NULL,
+    sub_thirty INTEGER NOT NULL,
+    two_plus_min INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+UPSERT = """
+INSERT INTO rollup (rep, day, disposition, calls, duration, xp, sub_thirty, two_plus_min)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (rep, day, disposition) DO UPDATE SET
+    calls = calls + excluded.calls,
+    duration = duration + excluded.duration,
+    xp = xp + excluded.xp,
+    sub_thirty = sub_thirty + excluded.sub_thirty,
+    two_plus_min = two_plus_min + excluded.two_plus_min
+"""
+
+
+def record_key(record):
+    """(rep, day, disposition) of a call record; rep is the creator's workspace member id."""
+    rep = (record.get("createdBy") or {}).get("workspaceMemberId") or ""
+    day = (record.get("createdAt") or "")[:10]
+    return rep, day, record.get("disposition") or ""
+
+
+def record_counts(record):
+    """(calls, duration, xp, sub_thirty, two_plus_min) contributed by one record.
+
+    Like twentyStatsApi.ts, only the wasSubThirty/wasTwoPlusMin flags count;
+    a record without them is not derived from its duration.
+    """
+    return (1, int(record.get("duration") or 0), int(record.get("xpAwarded") or 0),
+            int(bool(record.get("wasSubThirty"))), int(bool(record.get("wasTwoPlusMin"))))
+
+
+def _today():
+    # The dashboard buckets by UTC date (toISOString().split('T')[0])
+    return datetime.datetime.now(datetime.timezone.utc).date()
+
+
+class CallRollup:
+    """SQLite rollup of callRecords keyed by (rep, day, disposition)."""
+
+    def __init__(self, client=None, path=None):
+        self.client = client or get_client()
+        self.path = path or os.path.join(
+            CACHE_DIR, f"call-rollup-{workspace_key(self.client.api_key, self.client.base_url)}.sqlite"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+        if self._get_state("version") != SCHEMA_VERSION:
+            self.rebuild()  # counts from before per-record tracking can't be corrected in place
+
+    def _connect(self):
+        """One connection per thread; WAL lets the HTTP handlers read during a sync."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    # State
+
+    def _get_state(self, key, default=None):
+        row = self._connect().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_state(db, key, value):
+        db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    @property
+    def watermark(self):
+        return self._get_state("watermark")
+
+    def status(self):
+        db = self._connect()
+        rows, calls = db.execute("SELECT COUNT(*), COALESCE(SUM(calls), 0) FROM rollup").fetchone()
+        return {
+            "watermark": self.watermark,
+            "lastSync": self._get_state("lastSync"),
+            "records": calls,
+            "rows": rows,
+        }
+
+    # Syncing
+
+    def rebuild(self):
+        with self._sync_lock, self._connect() as db:
+            db.execute("DROP TABLE IF EXISTS boundary")
+            for table in ("rollup", "reps", "records", "state"):
+                db.execute(f"DELETE FROM {table}")
+            self._set_state(db, "version", SCHEMA_VERSION)
+
+    def sync(self, page_size=None, progress=None):
+        """Fold call records created, edited or deleted since the last sync into the rollup.
+
+        Returns the number of new records counted.
+        """
+        with self._sync_lock:
+            return self._sync(page_size, progress)
+
+    def _sync(self, page_size, progress):
+        added = 0
+        since = rewind(self.watermark, SYNC_OVERLAP)
+        for deleted in (False, True) if since else (False,):
+            for nodes in iter_changes("callRecords", CALL_FIELDS, since=since, deleted=deleted,
+                                      page_size=page_size, client=self.client):
+                added += self._apply(nodes, deleted)
+                if progress:
+                    progress(added)
+
+        with self._connect() as db:
+            self._set_state(db, "lastSync", time.time())
+        return added
+
+    def _apply(self, nodes, deleted):
+        """Apply one page and advance its watermark in one transaction. Returns records added."""
+        if not nodes:
+            return 0
+        db = self._connect()
+        ids = [record["id"] for record in nodes]
+        stored = {row[0]: (tuple(row[1:4]), tuple(row[4:])) for row in db.execute(
+            f"SELECT id, rep, day, disposition, calls, duration, xp, sub_thirty, two_plus_min FROM records "
+            f"WHERE id IN ({', '.join('?' * len(ids))})", ids)}
+        totals, names, rows, gone = {}, {}, {}, []
+        added = 0
+
+        def count(key, counts, sign):
+            current = totals.get(key, (0,) * len(counts))
+            totals[key] = tuple(a + sign * b for a, b in zip(current, counts))
+
+        for record in nodes:
+            old = stored.get(record["id"])
+            new = None if deleted else (record_key(record), record_counts(record))
+            if old == new:
+                continue
+            if old:
+                count(*old, -1)
+            if new:
+                count(*new, 1)
+                rows[record["id"]] = new[0] + new[1]
+                added += old is None
+                creator = record.get("createdBy") or {}
+                if creator.get("name"):
+                    names[new[0][0]] = creator["name"]
+            else:
+                gone.append(record["id"])
+
+        # pages come in updatedAt order, so everything before the last one has been read
+        watermark = None if deleted else max(record.get("updatedAt") or "" for record in nodes)
+        with db:
+            db.executemany(UPSERT, [key + counts for key, counts in totals.items()])
+            db.execute("DELETE FROM rollup WHERE calls <= 0")
+            db.executemany("INSERT OR REPLACE INTO reps (rep, name) VALUES (?, ?)", names.items())
+            db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                           [(i,) + row for i, row in rows.items()])
+            db.executemany("DELETE FROM records WHERE id = ?", [(i,) for i in gone])
+            if watermark and watermark > (self.watermark or ""):
+                self._set_state(db, "watermark", watermark)
+        return added
+
+    # Queries
+
+    def rows(self, rep=None, start=None, end=None):
+        """Rollup rows as dicts, optionally for one rep and an inclusive day range."""
+        clauses, params = [], []
+        if rep is not None:
+            clauses.append("rep = ?")
+            params.append(rep)
+        if start:
+            clauses.append("day >= ?")
+            params.append(start)
+        if end:
+            clauses.append("day <= ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self._connect().execute(
+            f"SELECT rep, day, disposition, calls, duration, xp, sub_thirty, two_plus_min "
+            f"FROM rollup {where} ORDER BY day, rep, disposition", params,
+        )
+        columns = [c[0] for c in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def totals(self, rep=None, start=None, end=None):
+        """Counters summed over a rep (or everyone) and an inclusive day range."""
+        totals = {"dials": 0, "connects": 0, "appointments": 0, "duration": 0,
+                  "xp": 0, "subThirty": 0, "twoPlusMin": 0}
+        for row in self.rows(rep, start, end):
+            totals["dials"] += row["calls"]
+            totals["duration"] += row["duration"]
+            totals["xp"] += row["xp"]
+            totals["subThirty"] += row["sub_thirty"]
+            totals["twoPlusMin"] += row["two_plus_min"]
+            if row["disposition"] == CONNECT:
+                totals["connects"] += row["calls"]
+            elif row["disposition"] == APPOINTMENT:
+                totals["appointments"] += row["calls"]
+        return totals
+
+    def today_stats(self, rep=None, day=None):
+        """getTodayStats() for one rep (or everyone when rep is None)."""
+        day = day or _today().isoformat()
+        totals = self.totals(rep, day, day)
+        return {
+            "dials": totals["dials"],
+            "connects": totals["connects"],
+            "appointments": totals["appointments"],
+            "xpEarned": totals["xp"],
+            "callsUnder30s": totals["subThirty"],
+            "callsOver2Min": totals["twoPlusMin"],
+        }
+
+    def efficiency(self, rep, days_back=7):
+        """calculateEfficiencyMetrics() over the last days_back days, today included."""
+        start = (_today() - datetime.timedelta(days=days_back)).isoformat()
+        totals = self.totals(rep, start)
+        connects = totals["connects"]
+        return {
+            "sub30sDropRate": totals["subThirty"] / connects if connects else 0,
+            "callToApptRate": totals["appointments"] / connects if connects else 0,
+            "twoPlusMinRate": totals["twoPlusMin"] / connects if connects else 0,
+        }
+
+    def reps(self):
+        """{workspace member id: display name} for every rep with calls."""
+        return dict(self._connect().execute("SELECT rep, name FROM reps"))
+
+
+class StatsServer:
+    """Small read-only JSON API over a CallRollup.
+
+    GET /stats/today?rep=<workspaceMemberId>[&day=YYYY-MM-DD]
+    GET /stats/efficiency?rep=<workspaceMemberId>[&days=7]
+    GET /stats/rollup[?rep=...][&from=YYYY-MM-DD][&to=YYYY-MM-DD]
+    GET /stats/reps
+    GET /health
+
+    Everything but /health needs the service token (twenty.auth).
+    """
+
+    def __init__(self, rollup, host=DEFAULT_HOST, port=8788, sync_every=30.0, cors_origin=None, token=None):
+        self.rollup = rollup
+        self.host = host
+        self.port = port
+        self.sync_every = sync_every
+        self.cors_origin = cors_origin
+        self.token = token
+        self.server = None
+        self.stop = threading.Event()
+        self.sync_errors = 0
+
+    def _routes(self):
+        rollup = self.rollup
+
+        def one(query, name, default=None):
+            values = query.get(name)
+            return values[0] if values else default
+
+        return {
+            "/stats/today": lambda q: rollup.today_stats(one(q, "rep"), one(q, "day")),
+            "/stats/efficiency": lambda q: rollup.efficiency(one(q, "rep"), int(one(q, "days", 7))),
+            "/stats/rollup": lambda q: rollup.rows(one(q, "rep"), one(q, "from"), one(q, "to")),
+            "/stats/reps": lambda q: rollup.reps(),
+            "/health": lambda q: dict(rollup.status(), syncErrors=self.sync_errors),
+        }
+
+    def _handler(self):
+        routes = self._routes()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _send(self, status, body=None):
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                if server.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", server.cors_origin)
+                if body is not None:
+                    self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_OPTIONS(self):
+                self.send_response(204)
+                if server.cors_origin:
+                    self.send_header("Access-Control-Allow-Origin", server.cors_origin)
+                    self.send_header("Access-Control-Allow-Methods", "GET")
+                    self.send_header("Access-Control-Allow-Headers", "Authorization")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                path = url.path.rstrip("/") or "/"
+                query = parse_qs(url.query)
+                route = routes.get(path)
+                if route is None:
+                    self._send(404, {"error": "not found"})
+                    return
+                if path != "/health" and not verify_token(server.token, self.headers,
+                                                          {k: v[-1] for k, v in query.items()}):
+                    self._send(401, {"error": "missing or wrong token"})
+                    return
+                try:
+                    self._send(200, route(query))
+                except ValueError as e:
+                    self._send(400, {"error": str(e)})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _sync_loop(self):
+        while not self.stop.wait(self.sync_every):
+            try:
+                self.rollup.sync()
+            except Exception as e:  # keep serving the last good rollup
+                self.sync_errors += 1
+                print(f"[WARN] sync failed: {e}")
+
+    def serve(self):
+        """Serve until stop is set, syncing every sync_every seconds."""
+        self.server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        threads = [threading.Thread(target=self.server.serve_forever, daemon=True)]
+        if self.sync_every:
+            threads.append(threading.Thread(target=self._sync_loop, daemon=True))
+        for t in threads:
+            t.start()
+        try:
+            self.stop.wait()
+        finally:
+            self.server.shutdown()
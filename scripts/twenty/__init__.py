@@ -0,0 +1,30 @@
+"""
+Shared Twenty CRM access for the admin scripts in scripts/.
+
+    from twenty import get_client, TwentyError
+
+    client = get_client()
+    data = client.graphql("{ workspaceMembers { edges { node { id } } } }")
+
+The names below are imported on first use, so the standard-library-only
+modules (twenty.gql, twenty.auth) can be used without requests installed;
+the stand-in server relies on that.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "AsyncTwentyClient": ".client", "TwentyClient": ".client", "get_client": ".client",
+    "ConfigError": ".config", "TwentyError": ".errors",
+    "MetadataCache": ".metadata", "get_metadata": ".metadata",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
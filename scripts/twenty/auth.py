@@ -0,0 +1,66 @@
+"""
+Access control for the small HTTP services in scripts/ (CDC cache, search,
+write relay, ...).
+
+They serve person records or accept writes, so they bind to 127.0.0.1 by
+default and expect a shared bearer token on every request but /health:
+
+    Authorization: Bearer <LIDS_SERVICE_TOKEN>
+
+EventSource can't set headers, so ?token=<token> is accepted as well.
+"""
+
+import hmac
+import os
+
+TOKEN_ENV = "LIDS_SERVICE_TOKEN"
+DEFAULT_HOST = "127.0.0.1"
+
+
+def request_token(headers, query=None):
+    """The token a request carries: the Authorization bearer, else ?token=."""
+    auth = headers.get("Authorization") or ""
+    scheme, _, value = auth.partition(" ")
+    if scheme.lower() == "bearer" and value.strip():
+        return value.strip()
+    return (query or {}).get("token")
+
+
+def verify_token(token, headers, query=None):
+    """True when no token is configured or the request carries it."""
+    if not token:
+        return True
+    given = request_token(headers, query)
+    return bool(given) and hmac.compare_digest(given.encode(), token.encode())
+
+
+def add_arguments(parser, webhooks=False):
+    """--host/--token/--no-auth/--cors-origin (and --unsigned-webhooks) for a service's serve command."""
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"interface to bind (default {DEFAULT_HOST}; 0.0.0.0 exposes it to the network)")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"bearer token clients must send ({TOKEN_ENV})")
+    parser.add_argument("--no-auth", action="store_true", help="serve without a token (trusted networks only)")
+    parser.add_argument("--cors-origin", help="dashboard origin allowed to call it from a browser")
+    if webhooks:
+        parser.add_argument("--unsigned-webhooks", action="store_true",
+                            help="accept webhook deliveries without a signing secret")
+
+
+def check_arguments(args, webhooks=False):
+    """Error message when the service would start without the protection it needs, else None."""
+    if not args.token and not args.no_auth:
+        return f"set {TOKEN_ENV} or --token (or pass --no-auth on a trusted network)"
+    if webhooks:
+        return check_secret(args)
+    return None
+
+
+def check_secret(args):
+    """Error message when webhooks would be accepted unsigned without --unsigned-webhooks, else None.
+
+    For listeners that only take webhooks (no token to check).
+    """
+    if not args.secret and not args.unsigned_webhooks:
+        return "set TWENTY_WEBHOOK_SECRET or --secret (or pass --unsigned-webhooks)"
+    return None
@@ -0,0 +1,222 @@
+"""
+Batch independent GraphQL mutations into aliased multi-operation documents.
+
+Each queued Operation becomes one aliased field in a single mutation:
+
+    mutation Batch($v0_0: CreateOneFieldMetadataInput!, $v1_0: ...) {
+        op0: createOneField(input: $v0_0) { id name }
+        op1: createOneField(input: $v1_0) { id name }
+    }
+
+so N independent writes cost ceil(N / batch_size) round-trips. Results and
+errors are mapped back to each operation by alias (GraphQL error paths start
+with the alias). If the server rejects a whole document, the operations in
+it are retried one at a time so a single bad input can't sink its neighbours.
+An operation that comes back without data (data: null after a failed
+non-null field, or a missing alias) is an error whose outcome is unknown:
+it is not retried, since it may already have been applied. For the same
+reason a document that timed out or got a 5xx is not split up and resent
+unless the batch is idempotent (upserts, creates with client-supplied ids).
+Both cases set BatchResult.unknown, so callers can tell "rejected" from
+"may have been applied".
+"""
+
+from . import config
+from .client import get_client
+from .errors import TwentyError
+
+METADATA = "/metadata"
+WORKSPACE = "/graphql"
+
+
+class Operation:
+    """One mutation field to include in a batch.
+
+    args maps argument name -> (GraphQL type, value), e.g.
+    {"input": ("CreateOneFieldMetadataInput!", {"field": {...}})}.
+    """
+
+    def __init__(self, field, args, selection="id", endpoint=WORKSPACE, key=None):
+        self.field = field
+        self.args = args
+        self.selection = selection
+        self.endpoint = endpoint
+        self.key = key
+
+
+class BatchResult:
+    """Outcome of one Operation: data on success, a TwentyError on failure.
+
+    unknown is True when the error leaves open whether the mutation ran.
+    """
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.data = None
+        self.error = None
+        self.unknown = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        state = "ok" if self.ok else f"error={self.error}"
+        return f"<BatchResult {self.operation.field} key={self.operation.key!r} {state}>"
+
+
+def build_document(operations):
+    """Build (query, variables, aliases) for a list of operations."""
+    declarations = []
+    selections = []
+    variables = {}
+    aliases = []
+    for i, op in enumerate(operations):
+        alias = f"op{i}"
+        aliases.append(alias)
+        call_args = []
+        for j, (arg, (gql_type, value)) in enumerate(op.args.items()):
+            var = f"v{i}_{j}"
+            declarations.append(f"${var}: {gql_type}")
+            call_args.append(f"{arg}: ${var}")
+            variables[var] = value
+        args_text = f"({', '.join(call_args)})" if call_args else ""
+        selection = f" {{ {op.selection} }}" if op.selection else ""
+        selections.append(f"  {alias}: {op.field}{args_text}{selection}")
+    header = f"mutation Batch({', '.join(declarations)})" if declarations else "mutation Batch"
+    query = header + " {\n" + "\n".join(selections) + "\n}"
+    return query, variables, aliases
+
+
+class MutationBatch:
+    """Queue operations and send them in aliased documents of batch_size.
+
+        with MutationBatch() as batch:
+            for field in fields:
+                batch.add(create_field(field))
+        for result in batch.results:
+            ...
+    """
+
+    def __init__(self, client=None, batch_size=None, idempotent=False):
+        self.client = client or get_client()
+        self.batch_size = batch_size or config.BATCH_SIZE
+        self.idempotent = idempotent
+        self.pending = []
+        self.results = []
+
+    def add(self, operation):
+        """Queue an operation; its BatchResult is filled in on flush()."""
+        result = BatchResult(operation)
+        self.pending.append(result)
+        self.results.append(result)
+        if sum(1 for r in self.pending if r.operation.endpoint == operation.endpoint) >= self.batch_size:
+            self._flush_endpoint(operation.endpoint)
+        return result
+
+    def flush(self):
+        """Send every queued operation. Returns all results so far."""
+        for endpoint in dict.fromkeys(r.operation.endpoint for r in self.pending):
+            self._flush_endpoint(endpoint)
+        return self.results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.flush()
+
+    def _flush_endpoint(self, endpoint):
+        chunk = [r for r in self.pending if r.operation.endpoint == endpoint]
+        self.pending = [r for r in self.pending if r.operation.endpoint != endpoint]
+        for i in range(0, len(chunk), self.batch_size):
+            self._send(endpoint, chunk[i:i + self.batch_size])
+
+    def _send(self, endpoint, results):
+        query, variables, aliases = build_document([r.operation for r in results])
+        try:
+            body = self.client.execute(query, variables, path=endpoint, idempotent=self.idempotent)
+        except TwentyError as e:
+            self._document_failed(endpoint, results, e)
+            return
+
+        data = body.get("data") or {}
+        by_alias = {}
+        unplaced = []
+        for error in body.get("errors") or []:
+            path = error.get("path") or []
+            if path and path[0] in aliases:
+                by_alias.setdefault(path[0], []).append(error)
+            else:
+                unplaced.append(error)
+
+        if unplaced and not data:
+            self._document_failed(
+                endpoint, results,
+                TwentyError("GraphQL error", status=200, errors=unplaced, payload=body),
+            )
+            return
+
+        for alias, result in zip(aliases, results):
+            errors = by_alias.get(alias)
+            if errors:
+                result.error = TwentyError("GraphQL error", status=200, errors=errors, payload=body)
+            elif data.get(alias) is None:
+                # data: null (a non-null field failed) or a missing alias: the server may
+                # have stopped before running this mutation, or run it and lost its result
+                # (neighbours' errors aren't attached, so already_exists can't match them)
+                result.error = TwentyError(f"{result.operation.field} returned no result; outcome unknown",
+                                           status=200, errors=unplaced)
+                result.unknown = True
+            else:
+                result.data = data[alias]
+
+    def _document_failed(self, endpoint, results, error):
+        if len(results) == 1 or (error.retryable and not self.idempotent):
+            for result in results:
+                result.error = error
+                result.unknown = error.retryable
+            return
+        for result in results:
+            self._send(endpoint, [result])
+
+
+def run_batched(operations, client=None, batch_size=None, idempotent=False):
+    """Send operations in batches and return their BatchResults in order."""
+    batch = MutationBatch(client, batch_size, idempotent)
+    for op in operations:
+        batch.add(op)
+    return batch.flush()
+
+
+# Helpers for the metadata and workflow mutations the scripts use
+
+FIELD_SELECTION = "id name label type"
+
+
+def create_field(field, key=None):
+    """createOneField on the metadata API. field is the FieldMetadata input."""
+    return Operation(
+        "createOneField",
+        {"input": ("CreateOneFieldMetadataInput!", {"field": field})},
+        FIELD_SELECTION, METADATA, key=key or field.get("name"),
+    )
+
+
+def update_field(field_id, update, key=None):
+    """updateOneField on the metadata API."""
+    return Operation(
+        "updateOneField",
+        {"input": ("UpdateOneFieldMetadataInput!", {"id": field_id, "update": update})},
+        FIELD_SELECTION, METADATA, key=key or field_id,
+    )
+
+
+def create_workflow_version_step(step_input, key=None):
+    """createWorkflowVersionStep on the workspace API."""
+    return Operation(
+        "createWorkflowVersionStep",
+        {"input": ("CreateWorkflowVersionStepInput!", step_input)},
+        "id name type settings", WORKSPACE, key=key,
+    )
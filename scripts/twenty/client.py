@@ -0,0 +1,300 @@
+"""
+Pooled, retrying HTTP client for the Twenty CRM REST and GraphQL APIs.
+
+One requests.Session per process keeps TLS connections to the Twenty host
+alive across calls. 429 and 5xx responses (and dropped connections) are
+retried with exponential backoff, honoring Retry-After when the server sends it.
+A POST that timed out, lost its connection or got a 5xx may already have
+been applied, so it is only retried when the caller passes idempotent=True
+(an upsert, a create with client-supplied ids). GraphQL queries count as
+idempotent; mutations don't.
+Each call is recorded in twenty.profile (see --profile).
+"""
+
+import asyncio
+import json as _json
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from . import config
+from .errors import TwentyError
+from .persisted import NOT_FOUND, QueryRegistry, error_codes, extension, hash_accepted, rejects_missing_query
+from .profile import PROFILER, operation_name
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Methods safe to repeat after an ambiguous failure (Twenty's PATCH sets fields)
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "PATCH", "DELETE"}
+_MUTATION = re.compile(r"^(?:\s|#[^\n]*)*mutation\b")
+
+
+def retry_after_seconds(value):
+    """Parse a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def not_sent(error):
+    """True when a requests error happened before the request reached the server."""
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+def is_mutation(query):
+    return bool(_MUTATION.match(query))
+
+
+def _endpoint(url):
+    """graphql, metadata or rest (for grouping profile rows)."""
+    path = url.split("://", 1)[-1].partition("/")[2]
+    return path.split("/", 1)[0].split("?", 1)[0] or "/"
+
+
+class TwentyClient:
+    """Synchronous Twenty client sharing one keep-alive connection pool."""
+
+    def __init__(self, base_url=None, api_key=None, pool_size=None, timeout=None,
+                 max_retries=None, backoff_base=None, backoff_max=None, persisted=None):
+        self.base_url, self.api_key = config.require(base_url, api_key)
+        self.pool_size = pool_size or config.POOL_SIZE
+        self.timeout = timeout or config.TIMEOUT
+        self.max_retries = config.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = config.BACKOFF_BASE if backoff_base is None else backoff_base
+        self.backoff_max = config.BACKOFF_MAX if backoff_max is None else backoff_max
+        self._persisted = persisted
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _backoff(self, attempt, response=None):
+        if response is not None:
+            delay = retry_after_seconds(response.headers.get("Retry-After"))
+            if delay is not None:
+                return min(delay, self.backoff_max)
+        delay = self.backoff_base * (2 ** attempt)
+        return min(delay, self.backoff_max) * random.uniform(0.5, 1.0)
+
+    def request(self, method, path, json=None, params=None, idempotent=None):
+        """Send a request and return the decoded JSON body.
+
+        Retries transient failures, then raises TwentyError. 429s and
+        connections that were never made are always retried; timeouts,
+        dropped connections and 5xx only when the request is idempotent
+        (by default: every method but POST). Every call is recorded in
+        profile.PROFILER.
+        """
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        data = _json.dumps(json).encode() if json is not None else None
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        started = time.perf_counter()
+        attempt = 0
+        status = "error"
+        received = 0
+        try:
+            while True:
+                try:
+                    resp = self.session.request(method, url, data=data, params=params, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt >= self.max_retries or not (idempotent or not_sent(e)):
+                        raise TwentyError(f"{method} {url} failed: {e}", url=url) from e
+                    time.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+
+                status = resp.status_code
+                received += len(resp.content or b"")
+                if resp.status_code in RETRY_STATUSES and attempt < self.max_retries \
+                        and (idempotent or resp.status_code == 429):
+                    time.sleep(self._backoff(attempt, resp))
+                    attempt += 1
+                    continue
+
+                try:
+                    body = resp.json()
+                except ValueError:
+                    body = None
+
+                if not 200 <= resp.status_code < 300:
+                    errors = []
+                    if isinstance(body, dict):
+                        errors = body.get("errors") or body.get("messages") or []
+                        if isinstance(errors, (str, dict)):
+                            errors = [errors]
+                    raise TwentyError(
+                        f"{method} {url} returned {resp.status_code}",
+                        status=resp.status_code, errors=errors, url=url,
+                        payload=body if body is not None else resp.text,
+                    )
+                return body
+        finally:
+            PROFILER.record(
+                operation_name(method, url[len(self.base_url):] if url.startswith(self.base_url) else url, json),
+                _endpoint(url), status, time.perf_counter() - started,
+                bytes_out=len(data or b"") * (attempt + 1), bytes_in=received, retries=attempt,
+            )
+
+    def get(self, path, params=None):
+        return self.request("GET", path, params=params)
+
+    def post(self, path, json=None, idempotent=False):
+        return self.request("POST", path, json=json, idempotent=idempotent)
+
+    def patch(self, path, json=None):
+        return self.request("PATCH", path, json=json)
+
+    def delete(self, path):
+        return self.request("DELETE", path)
+
+    def execute(self, query, variables=None, path="/graphql", idempotent=None):
+        """POST a GraphQL document and return the full response body.
+
+        Unlike graphql(), an errors array in a 200 response is returned to
+        the caller rather than raised, so partial results can be inspected.
+        Queries are retried like GETs; mutations only with idempotent=True.
+        """
+        if idempotent is None:
+            idempotent = not is_mutation(query)
+        payload = {"query": query}
+        if variables:
+            payload["variables"] = variables
+        registry = self.persisted_queries()
+        persisted = registry.lookup(path, query) if registry is not None else None
+        if persisted is None:
+            return self.request("POST", path, json=payload, idempotent=idempotent)
+        return self._execute_persisted(registry, persisted, payload, path, idempotent)
+
+    def persisted_queries(self):
+        """The workspace's QueryRegistry (see twenty.persisted), or None when TWENTY_PERSISTED_QUERIES=off."""
+        if self._persisted is None:
+            self._persisted = False if config.PERSISTED_QUERIES == "off" else QueryRegistry.for_client(self)
+        return None if self._persisted is False else self._persisted
+
+    def _execute_persisted(self, registry, persisted, payload, path, idempotent):
+        """Send a registered document by hash, falling back to its text."""
+        digest, operation = persisted
+        by_hash = {key: value for key, value in payload.items() if key != "query"}
+        by_hash["extensions"] = extension(digest)
+        if operation:
+            by_hash["operationName"] = operation
+        try:
+            body = self.request("POST", path, json=by_hash, idempotent=idempotent)
+        except TwentyError as e:
+            if not rejects_missing_query(e):
+                raise
+            registry.mark(path, False)
+            return self.request("POST", path, json=payload, idempotent=idempotent)
+        if not hash_accepted(body):
+            registry.mark(path, False)
+            return self.request("POST", path, json=payload, idempotent=idempotent)
+        registry.mark(path, True)
+        codes = error_codes(body)
+        if NOT_FOUND in codes or "PersistedQueryNotFound" in codes:
+            # First use since the server's cache was empty: text and hash registers it
+            return self.request("POST", path, json=dict(by_hash, query=payload["query"]), idempotent=idempotent)
+        return body
+
+    def graphql(self, query, variables=None, path="/graphql", idempotent=None):
+        """Execute a GraphQL query/mutation and return its data.
+
+        Raises TwentyError when the response carries an errors array.
+        """
+        body = self.execute(query, variables, path, idempotent)
+        if body.get("errors"):
+            raise TwentyError("GraphQL error", status=200, errors=body["errors"],
+                              url=f"{self.base_url}{path}", payload=body)
+        return body.get("data") or {}
+
+    def metadata(self, query, variables=None):
+        """Execute a query against the /metadata GraphQL endpoint."""
+        return self.graphql(query, variables, path="/metadata")
+
+
+class AsyncTwentyClient:
+    """asyncio front-end over a TwentyClient.
+
+    Calls run on a thread pool sized to the connection pool, so concurrent
+    coroutines share the same keep-alive connections as the sync client.
+    """
+
+    def __init__(self, client=None, concurrency=None):
+        self.client = client or get_client()
+        self.concurrency = concurrency or self.client.pool_size
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._semaphore = None
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, lambda: fn(*args))
+
+    async def request(self, method, path, json=None, params=None, idempotent=None):
+        return await self._run(self.client.request, method, path, json, params, idempotent)
+
+    async def get(self, path, params=None):
+        return await self.request("GET", path, params=params)
+
+    async def post(self, path, json=None, idempotent=False):
+        return await self.request("POST", path, json=json, idempotent=idempotent)
+
+    async def patch(self, path, json=None):
+        return await self.request("PATCH", path, json=json)
+
+    async def execute(self, query, variables=None, path="/graphql", idempotent=None):
+        return await self._run(self.client.execute, query, variables, path, idempotent)
+
+    async def graphql(self, query, variables=None, path="/graphql", idempotent=None):
+        return await self._run(self.client.graphql, query, variables, path, idempotent)
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+_client = None
+
+
+def get_client():
+    """Return the process-wide TwentyClient, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = TwentyClient()
+    return _client
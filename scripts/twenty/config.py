@@ -0,0 +1,41 @@
+"""
+Connection settings shared by every script in scripts/.
+
+Values come from the environment so the same tools can point at a local
+stand-in or another workspace without editing code.
+"""
+
+import os
+
+# Required: there is no default workspace, so a missing key never falls
+# through to production. lids_admin.py can fill both in from a profile.
+API_KEY = os.environ.get("TWENTY_API_KEY")
+BASE_URL = (os.environ.get("TWENTY_BASE_URL") or "").rstrip("/") or None
+
+
+class ConfigError(Exception):
+    """A required connection setting is missing."""
+
+
+def require(base_url=None, api_key=None):
+    """(base_url, api_key), from the arguments or the environment; ConfigError when either is missing."""
+    base_url = base_url or BASE_URL
+    api_key = api_key or API_KEY
+    missing = [name for name, value in (("TWENTY_BASE_URL", base_url), ("TWENTY_API_KEY", api_key)) if not value]
+    if missing:
+        raise ConfigError(f"{' and '.join(missing)} not set: export {'them' if len(missing) > 1 else 'it'} "
+                          f"or run through lids_admin.py with a profile (-w <name>)")
+    return base_url.rstrip("/"), api_key
+
+# Connection pool and retry tuning
+POOL_SIZE = int(os.environ.get("TWENTY_POOL_SIZE", "10"))
+TIMEOUT = float(os.environ.get("TWENTY_TIMEOUT", "30"))
+MAX_RETRIES = int(os.environ.get("TWENTY_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.environ.get("TWENTY_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.environ.get("TWENTY_BACKOFF_MAX", "30"))
+
+# Operations packed into one aliased GraphQL document by twenty.batch
+BATCH_SIZE = int(os.environ.get("TWENTY_BATCH_SIZE", "25"))
+
+# "off" sends every GraphQL document as text, ignoring the persisted query registry
+PERSISTED_QUERIES = os.environ.get("TWENTY_PERSISTED_QUERIES", "auto")
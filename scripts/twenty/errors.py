@@ -0,0 +1,35 @@
+"""
+Error type raised for failed Twenty CRM calls, REST or GraphQL.
+"""
+
+import json
+
+
+class TwentyError(Exception):
+    """A Twenty API call failed.
+
+    status is the HTTP status (None for connection failures), errors is the
+    list of GraphQL/REST error objects returned by the server (if any).
+    """
+
+    def __init__(self, message, status=None, errors=None, url=None, payload=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors or []
+        self.url = url
+        self.payload = payload
+
+    def __str__(self):
+        text = super().__str__()
+        if self.errors:
+            text = f"{text}: {json.dumps(self.errors)}"
+        return text
+
+    @property
+    def already_exists(self):
+        """True when the server rejected a create because the item exists."""
+        return "already exist" in str(self).lower() or "already exist" in str(self.payload).lower()
+
+    @property
+    def retryable(self):
+        return self.status is None or self.status == 429 or self.status >= 500
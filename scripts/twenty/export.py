@@ -0,0 +1,435 @@
+"""
+Parallel, resumable export of Twenty objects to compressed shards.
+
+One cursor over a whole object is slow and, for big workspaces, outlives
+the maintenance window. Instead each object's createdAt span is cut into
+shards of roughly equal size, and shards are paged concurrently, each
+streaming straight to its own file:
+
+    out/
+      manifest.json                  plan, per-shard counts and sha256
+      people/people-000.jsonl.zst
+      people/people-001.jsonl.zst
+      ...
+
+    exporter = Exporter("out", ["people", "callRecords"], fmt="jsonl.zst")
+    exporter.plan(shards=8)
+    exporter.run(workers=8)
+
+Shard boundaries are found by splitting the most populated range at its
+time midpoint (one totalCount query per split). The first shard has no
+lower bound and the last no upper bound, so records created mid-export
+still land somewhere. Boundaries are stored in the manifest, and a re-run
+skips shards already written; an interrupted shard starts over.
+
+Memory stays bounded by workers x (two pages + one Parquet row group).
+"""
+
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .client import get_client
+from .metadata import get_metadata
+from .pagination import iter_pages
+
+FORMATS = ("jsonl.zst", "jsonl.gz", "jsonl", "parquet")
+MANIFEST = "manifest.json"
+ORDER_BY = [{"createdAt": "AscNullsFirst"}, {"id": "AscNullsFirst"}]
+ROW_GROUP_ROWS = 20_000
+
+# Composite field types -> subfields to select
+COMPOSITE_FIELDS = {
+    "FULL_NAME": ("firstName", "lastName"),
+    "EMAILS": ("primaryEmail", "additionalEmails"),
+    "PHONES": ("primaryPhoneNumber", "primaryPhoneCountryCode", "primaryPhoneCallingCode", "additionalPhones"),
+    "ADDRESS": ("addressStreet1", "addressStreet2", "addressCity", "addressState", "addressPostcode",
+                "addressCountry", "addressLat", "addressLng"),
+    "LINKS": ("primaryLinkUrl", "primaryLinkLabel", "secondaryLinks"),
+    "CURRENCY": ("amountMicros", "currencyCode"),
+    "ACTOR": ("source", "workspaceMemberId", "name"),
+    "RICH_TEXT_V2": ("blocknote", "markdown"),
+}
+
+# Parquet column kinds. Anything not listed is a string; JSON-ish values are encoded.
+NUMBER_TYPES = {"NUMBER", "NUMERIC", "POSITION", "RATING"}
+COMPOSITE_KINDS = {"addressLat": "float", "addressLng": "float", "amountMicros": "int",
+                   "additionalEmails": "json", "additionalPhones": "json", "secondaryLinks": "json"}
+
+
+def check_format(fmt):
+    """Raise ImportError early if the format's library is missing."""
+    if fmt == "jsonl.zst":
+        import zstandard  # noqa: F401
+    elif fmt == "parquet":
+        import pyarrow.parquet  # noqa: F401
+    elif fmt not in FORMATS:
+        raise ValueError(f"unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+
+
+# Field selection
+
+def exported_fields(object_fields):
+    """[(name, type)] of the active, selectable fields of an object, id first."""
+    out = []
+    for name, field in object_fields.items():
+        if field.get("isActive") is False:
+            continue
+        if field.get("type") == "RELATION":
+            join = (field.get("settings") or {}).get("joinColumnName")
+            if join:
+                out.append((join, "UUID"))
+            continue
+        if field.get("type") in ("MORPH_RELATION", "TS_VECTOR"):
+            continue
+        out.append((name, field.get("type")))
+    out.sort(key=lambda f: (f[0] != "id", f[0]))
+    return out
+
+
+def projection(fields):
+    parts = []
+    for name, field_type in fields:
+        sub = COMPOSITE_FIELDS.get(field_type)
+        parts.append(f"{name} {{ {' '.join(sub)} }}" if sub else name)
+    return " ".join(parts)
+
+
+# Time helpers
+
+def parse_time(value):
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def format_time(moment):
+    return moment.astimezone(datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def range_filter(start, end):
+    clauses = []
+    if start:
+        clauses.append({"createdAt": {"gte": start}})
+    if end:
+        clauses.append({"createdAt": {"lt": end}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"and": clauses}
+
+
+# Writers
+
+class JsonlWriter:
+    """One JSON object per line, optionally zstd or gzip compressed."""
+
+    def __init__(self, path, codec=None, level=6):
+        self._raw = open(path, "wb")
+        if codec == "zst":
+            import zstandard
+            self._stream = zstandard.ZstdCompressor(level=level).stream_writer(self._raw, closefd=False)
+        elif codec == "gz":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=level, mtime=0)
+        else:
+            self._stream = None
+
+    def write(self, records):
+        data = "".join(json.dumps(r, separators=(",", ":"), ensure_ascii=False) + "\n" for r in records)
+        (self._stream or self._raw).write(data.encode())
+
+    def close(self):
+        if self._stream is not None:
+            self._stream.close()
+        self._raw.close()
+
+
+def parquet_columns(fields):
+    """[(column, (field, subfield or None), kind)]; composites are flattened to field_subfield."""
+    columns = []
+    for name, field_type in fields:
+        if field_type in COMPOSITE_FIELDS:
+            for sub in COMPOSITE_FIELDS[field_type]:
+                columns.append((f"{name}_{sub}", (name, sub), COMPOSITE_KINDS.get(sub, "string")))
+        elif field_type in NUMBER_TYPES:
+            columns.append((name, (name, None), "float"))
+        elif field_type == "BOOLEAN":
+            columns.append((name, (name, None), "bool"))
+        elif field_type in ("MULTI_SELECT", "ARRAY"):
+            columns.append((name, (name, None), "list"))
+        else:
+            columns.append((name, (name, None), "string"))
+    return columns
+
+
+def _column_value(value, kind):
+    if value is None:
+        return None
+    if kind == "float":
+        return float(value)
+    if kind == "int":
+        return int(value)
+    if kind == "bool":
+        return bool(value)
+    if kind == "list":
+        return [str(v) for v in value]
+    if kind == "json" or isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return str(value)
+
+
+class ParquetWriter:
+    """Typed Parquet with composite fields flattened; rows buffered one row group at a time."""
+
+    def __init__(self, path, fields, row_group_rows=ROW_GROUP_ROWS):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        kinds = {"string": pa.string(), "float": pa.float64(), "int": pa.int64(), "bool": pa.bool_(),
+                 "json": pa.string(), "list": pa.list_(pa.string())}
+        self._pa = pa
+        self.columns = parquet_columns(fields)
+        self.schema = pa.schema([(name, kinds[kind]) for name, _, kind in self.columns])
+        self.row_group_rows = row_group_rows
+        self._rows = []
+        self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+
+    def write(self, records):
+        self._rows.extend(records)
+        if len(self._rows) >= self.row_group_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        data = {}
+        for name, (field, sub), kind in self.columns:
+            values = (r.get(field) for r in self._rows)
+            if sub is not None:
+                values = ((v or {}).get(sub) for v in values)
+            data[name] = [_column_value(v, kind) for v in values]
+        self._writer.write_table(self._pa.Table.from_pydict(data, schema=self.schema))
+        self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Exporter:
+    """Plans and runs a sharded export into one directory (see module docstring)."""
+
+    def __init__(self, out_dir, connections, fmt="jsonl.zst", client=None, meta=None, page_size=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (expected one of {', '.join(FORMATS)})")
+        self.out_dir = out_dir
+        self.connections = list(connections)
+        self.fmt = fmt
+        self.client = client or get_client()
+        self.meta = meta
+        self.page_size = page_size
+        self.path = os.path.join(out_dir, MANIFEST)
+        self._lock = threading.Lock()
+        self.manifest = self._load()
+
+    # Manifest
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        if manifest.get("format") != self.fmt:
+            raise ValueError(f"{self.path} is a {manifest.get('format')} export; use a new directory for {self.fmt}")
+        return manifest
+
+    def save(self):
+        with self._lock:
+            os.makedirs(self.out_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.out_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp, self.path)
+
+    # Planning
+
+    def _object_fields(self, connection):
+        meta = self.meta or get_metadata()
+        for name, obj in meta.objects().items():
+            if obj.get("namePlural") == connection:
+                return name, exported_fields(meta.fields(name))
+        raise ValueError(f"no object with plural name {connection!r}")
+
+    def _count(self, connection, type_name, start=None, end=None, direction=None):
+        """(totalCount, createdAt of the first node in `direction` order or None)."""
+        query = (
+            f"query Count($filter: {type_name}FilterInput, $orderBy: [{type_name}OrderByInput]) {{\n"
+            f"  {connection}(first: 1, filter: $filter, orderBy: $orderBy) {{\n"
+            f"    totalCount edges {{ node {{ createdAt }} }}\n"
+            f"  }}\n"
+            f"}}"
+        )
+        variables = {"filter": range_filter(start, end)}
+        if direction:
+            variables["orderBy"] = [{"createdAt": direction}]
+        page = self.client.graphql(query, variables).get(connection) or {}
+        edges = page.get("edges") or []
+        return page.get("totalCount") or 0, (edges[0]["node"].get("createdAt") if edges else None)
+
+    def _split(self, connection, type_name, shards):
+        """Greedy halving of the most populated range until there are `shards` ranges."""
+        total, first = self._count(connection, type_name, direction="AscNullsFirst")
+        _, last = self._count(connection, type_name, direction="DescNullsLast")
+        ranges = [[None, None, total]]
+        if not first or not last or total == 0:
+            return ranges, total
+        lower = parse_time(first)
+        upper = parse_time(last) + datetime.timedelta(milliseconds=1)
+        min_rows = self.page_size or 60
+        while len(ranges) < shards:
+            ranges.sort(key=lambda r: -r[2])
+            start, end, count = ranges[0]
+            lo = parse_time(start) if start else lower
+            hi = parse_time(end) if end else upper
+            middle = lo + (hi - lo) / 2
+            middle = middle.replace(microsecond=middle.microsecond // 1000 * 1000)
+            if count < 2 * min_rows or middle <= lo:
+                break
+            split = format_time(middle)
+            left, _ = self._count(connection, type_name, start, split)
+            ranges[0:1] = [[start, split, left], [split, end, count - left]]
+        ranges.sort(key=lambda r: (r[0] is not None, r[0] or ""))
+        return ranges, total
+
+    def plan(self, shards=8):
+        """Create the manifest (or keep the existing one) and return it."""
+        if self.manifest is not None:
+            missing = [c for c in self.connections if c not in self.manifest["objects"]]
+            if not missing:
+                return self.manifest
+        else:
+            self.manifest = {
+                "format": self.fmt,
+                "baseUrl": self.client.base_url,
+                "startedAt": format_time(datetime.datetime.now(datetime.timezone.utc)),
+                "finishedAt": None,
+                "objects": {},
+            }
+            missing = self.connections
+        for connection in missing:
+            name, fields = self._object_fields(connection)
+            type_name = name[0].upper() + name[1:]
+            ranges, total = self._split(connection, type_name, shards)
+            self.manifest["objects"][connection] = {
+                "object": name,
+                "fields": [list(f) for f in fields],
+                "totalCount": total,
+                "shards": [
+                    {"index": i, "from": start, "to": end, "estimated": count,
+                     "file": f"{connection}/{connection}-{i:03d}.{self.fmt}", "status": "pending"}
+                    for i, (start, end, count) in enumerate(ranges)
+                ],
+            }
+        self.save()
+        return self.manifest
+
+    # Running
+
+    def pending(self):
+        """[(connection, shard)] not yet written (or whose file has gone missing)."""
+        out = []
+        for connection in self.connections:
+            for shard in self.manifest["objects"][connection]["shards"]:
+                path = os.path.join(self.out_dir, shard["file"])
+                if shard["status"] == "done" and os.path.exists(path) and os.path.getsize(path) == shard["bytes"]:
+                    continue
+                out.append((connection, shard))
+        return out
+
+    def _writer(self, path, fields):
+        if self.fmt == "parquet":
+            return ParquetWriter(path, fields)
+        return JsonlWriter(path, codec=self.fmt.partition(".")[2] or None)
+
+    def export_shard(self, connection, shard, progress=None):
+        entry = self.manifest["objects"][connection]
+        fields = [tuple(f) for f in entry["fields"]]
+        type_name = entry["object"][0].upper() + entry["object"][1:]
+        path = os.path.join(self.out_dir, shard["file"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        started = time.time()
+        records = 0
+        writer = self._writer(path + ".part", fields)
+        try:
+            for nodes, _ in iter_pages(connection, projection(fields), filter=range_filter(shard["from"], shard["to"]),
+                                       order_by=ORDER_BY, page_size=self.page_size, client=self.client,
+                                       type_name=type_name):
+                writer.write(nodes)
+                records += len(nodes)
+                if progress:
+                    progress(connection, shard, len(nodes))
+        finally:
+            writer.close()
+        os.replace(path + ".part", path)
+        with self._lock:
+            shard.update(status="done", records=records, bytes=os.path.getsize(path), sha256=file_digest(path),
+                         seconds=round(time.time() - started, 2))
+        self.save()
+        return shard
+
+    def run(self, workers=8, progress=None):
+        """Export every pending shard; returns [(connection, shard, error)] for failures."""
+        failures = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(self.export_shard, c, s, progress): (c, s) for c, s in self.pending()}
+            for future in as_completed(futures):
+                connection, shard = futures[future]
+                try:
+                    future.result()
+                except Exception as e:  # keep the other shards going; the manifest shows what's left
+                    with self._lock:
+                        shard.update(status="failed", error=str(e))
+                    self.save()
+                    failures.append((connection, shard, e))
+        if not failures and not self.pending():
+            self.manifest["finishedAt"] = format_time(datetime.datetime.now(datetime.timezone.utc))
+            self.save()
+        return failures
+
+    def summary(self):
+        """{connection: (records written, totalCount at plan time, shards done, shards)}."""
+        out = {}
+        for connection in self.connections:
+            entry = self.manifest["objects"][connection]
+            done = [s for s in entry["shards"] if s["status"] == "done"]
+            out[connection] = (sum(s["records"] for s in done), entry["totalCount"], len(done), len(entry["shards"]))
+        return out
+
+
+def verify(out_dir):
+    """[(file, problem)] for shards whose size or sha256 no longer match the manifest."""
+    with open(os.path.join(out_dir, MANIFEST)) as f:
+        manifest = json.load(f)
+    problems = []
+    for entry in manifest["objects"].values():
+        for shard in entry["shards"]:
+            path = os.path.join(out_dir, shard["file"])
+            if shard["status"] != "done":
+                problems.append((shard["file"], shard["status"]))
+            elif not os.path.exists(path):
+                problems.append((shard["file"], "missing"))
+            elif file_digest(path) != shard["sha256"]:
+                problems.append((shard["file"], "checksum mismatch"))
+    return problems
@@ -0,0 +1,316 @@
+"""
+Minimal GraphQL document parser, shared by the stand-in server (standin/)
+and the offline query checks (twenty.introspection).
+
+Covers what the scripts and dashboards send: named or anonymous
+query/mutation operations, variables with defaults, aliases, arguments
+(every literal kind), nested selections, named fragments and inline
+fragments. Directives are parsed and ignored; validation against a
+schema is the caller's (resolvers in the stand-in, SchemaSnapshot here).
+Standard library only, so the stand-in runs without requests.
+
+    document = parse(text)
+    operation = document.operation(name)          # Operation
+    args = operation.arguments(field, variables)  # literal + variable values resolved
+"""
+
+import json
+import re
+
+
+class GraphQLSyntaxError(ValueError):
+    pass
+
+
+class Variable:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class EnumValue(str):
+    """Bare enum literal (AscNullsFirst, NULL, ...); behaves as its name."""
+
+
+class Field:
+    __slots__ = ("alias", "name", "args", "selections")
+
+    def __init__(self, alias, name, args, selections):
+        self.alias = alias
+        self.name = name
+        self.args = args
+        self.selections = selections
+
+    @property
+    def key(self):
+        return self.alias or self.name
+
+
+class FragmentSpread:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class InlineFragment:
+    __slots__ = ("type_condition", "selections")
+
+    def __init__(self, type_condition, selections):
+        self.type_condition = type_condition
+        self.selections = selections
+
+
+class Operation:
+    def __init__(self, kind, name, variables, selections, document):
+        self.kind = kind              # "query" or "mutation"
+        self.name = name
+        self.variables = variables    # name -> (type, default)
+        self.selections = selections
+        self.document = document
+
+    def resolve_variables(self, provided):
+        values = {}
+        for name, (type_text, default) in self.variables.items():
+            if provided and name in provided:
+                values[name] = provided[name]
+            elif default is not _MISSING:
+                values[name] = value_of(default, {})
+            elif type_text.endswith("!"):
+                raise GraphQLSyntaxError(f'Variable "${name}" of required type "{type_text}" was not provided.')
+            else:
+                values[name] = None
+        return values
+
+    def fields(self, selections=None, type_name=None):
+        """Flatten fragments into the Fields of a selection set, in order."""
+        for selection in self.selections if selections is None else selections:
+            if isinstance(selection, Field):
+                yield selection
+            elif isinstance(selection, FragmentSpread):
+                fragment = self.document.fragments.get(selection.name)
+                if fragment is None:
+                    raise GraphQLSyntaxError(f'Unknown fragment "{selection.name}".')
+                if type_name is None or fragment[0] in (None, type_name):
+                    yield from self.fields(fragment[1], type_name)
+            elif type_name is None or selection.type_condition in (None, type_name):
+                yield from self.fields(selection.selections, type_name)
+
+
+class Document:
+    def __init__(self):
+        self.operations = []
+        self.fragments = {}   # name -> (type condition, selections)
+
+    def operation(self, name=None):
+        if name:
+            for op in self.operations:
+                if op.name == name:
+                    return op
+            raise GraphQLSyntaxError(f'Unknown operation named "{name}".')
+        if len(self.operations) != 1:
+            raise GraphQLSyntaxError("Must provide operation name if query contains multiple operations.")
+        return self.operations[0]
+
+
+_MISSING = object()
+
+_TOKEN = re.compile(r"""
+    (?P<skip>[\s,﻿]+|\#[^\n]*)
+  | (?P<spread>\.\.\.)
+  | (?P<punct>[!$&()\[\]{}:=@|])
+  | (?P<block>\"\"\"(?:\\\"\"\"|(?!\"\"\").)*\"\"\")
+  | (?P<string>"(?:\\.|[^"\\\n])*")
+  | (?P<number>-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?)
+  | (?P<name>[_A-Za-z][_0-9A-Za-z]*)
+""", re.VERBOSE | re.DOTALL)
+
+
+def _tokens(text):
+    position = 0
+    tokens = []
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            raise GraphQLSyntaxError(f"Syntax Error: Unexpected character {text[position]!r} at {position}.")
+        kind = match.lastgroup
+        if kind != "skip":
+            tokens.append((kind, match.group(kind)))
+        position = match.end()
+    tokens.append(("eof", None))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text):
+        self.tokens = _tokens(text)
+        self.index = 0
+
+    def peek(self, value=None):
+        kind, text = self.tokens[self.index]
+        return text if value is None else text == value and kind in ("punct", "name", "spread")
+
+    def next(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def expect(self, value):
+        kind, text = self.next()
+        if text != value:
+            raise GraphQLSyntaxError(f'Syntax Error: Expected "{value}", found {text or "<EOF>"!r}.')
+
+    def name(self):
+        kind, text = self.next()
+        if kind != "name":
+            raise GraphQLSyntaxError(f"Syntax Error: Expected Name, found {text or '<EOF>'!r}.")
+        return text
+
+    def document(self):
+        document = Document()
+        while self.tokens[self.index][0] != "eof":
+            if self.peek("{"):
+                document.operations.append(Operation("query", None, {}, self.selection_set(), document))
+            elif self.peek() in ("query", "mutation", "subscription"):
+                kind = self.next()[1]
+                name = self.name() if self.tokens[self.index][0] == "name" else None
+                variables = self.variable_definitions() if self.peek("(") else {}
+                self.directives()
+                document.operations.append(Operation(kind, name, variables, self.selection_set(), document))
+            elif self.peek("fragment"):
+                self.next()
+                name = self.name()
+                self.expect("on")
+                type_condition = self.name()
+                self.directives()
+                document.fragments[name] = (type_condition, self.selection_set())
+            else:
+                raise GraphQLSyntaxError(f"Syntax Error: Unexpected {self.peek()!r}.")
+        if not document.operations:
+            raise GraphQLSyntaxError("Syntax Error: document has no operations.")
+        return document
+
+    def variable_definitions(self):
+        self.expect("(")
+        variables = {}
+        while not self.peek(")"):
+            self.expect("$")
+            name = self.name()
+            self.expect(":")
+            type_text = self.type_reference()
+            default = _MISSING
+            if self.peek("="):
+                self.next()
+                default = self.value(const=True)
+            self.directives()
+            variables[name] = (type_text, default)
+        self.expect(")")
+        return variables
+
+    def type_reference(self):
+        if self.peek("["):
+            self.next()
+            inner = self.type_reference()
+            self.expect("]")
+            text = f"[{inner}]"
+        else:
+            text = self.name()
+        if self.peek("!"):
+            self.next()
+            text += "!"
+        return text
+
+    def directives(self):
+        while self.peek("@"):
+            self.next()
+            self.name()
+            if self.peek("("):
+                self.arguments()
+
+    def selection_set(self):
+        self.expect("{")
+        selections = []
+        while not self.peek("}"):
+            if self.tokens[self.index][0] == "spread":
+                self.next()
+                if self.peek("on"):
+                    self.next()
+                    type_condition = self.name()
+                    self.directives()
+                    selections.append(InlineFragment(type_condition, self.selection_set()))
+                elif self.peek("{") or self.peek("@"):
+                    self.directives()
+                    selections.append(InlineFragment(None, self.selection_set()))
+                else:
+                    selections.append(FragmentSpread(self.name()))
+                    self.directives()
+                continue
+            alias, name = None, self.name()
+            if self.peek(":"):
+                self.next()
+                alias, name = name, self.name()
+            args = self.arguments() if self.peek("(") else {}
+            self.directives()
+            selections.append(Field(alias, name, args, self.selection_set() if self.peek("{") else None))
+        self.expect("}")
+        return selections
+
+    def arguments(self):
+        self.expect("(")
+        args = {}
+        while not self.peek(")"):
+            name = self.name()
+            self.expect(":")
+            args[name] = self.value()
+        self.expect(")")
+        return args
+
+    def value(self, const=False):
+        kind, text = self.next()
+        if kind == "punct" and text == "$" and not const:
+            return Variable(self.name())
+        if kind == "number":
+            return float(text) if any(c in text for c in ".eE") else int(text)
+        if kind == "string":
+            return json.loads(text)
+        if kind == "block":
+            return text[3:-3].replace('\\"""', '"""')
+        if kind == "name":
+            return {"true": True, "false": False, "null": None}.get(text, EnumValue(text))
+        if text == "[":
+            items = []
+            while not self.peek("]"):
+                items.append(self.value(const))
+            self.next()
+            return items
+        if text == "{":
+            fields = {}
+            while not self.peek("}"):
+                name = self.name()
+                self.expect(":")
+                fields[name] = self.value(const)
+            self.next()
+            return fields
+        raise GraphQLSyntaxError(f"Syntax Error: Unexpected {text or '<EOF>'!r}.")
+
+
+def parse(text):
+    return _Parser(text).document()
+
+
+def value_of(node, variables):
+    """Resolve a parsed argument value against the operation's variables."""
+    if isinstance(node, Variable):
+        return variables.get(node.name)
+    if isinstance(node, EnumValue):
+        return str(node)
+    if isinstance(node, list):
+        return [value_of(item, variables) for item in node]
+    if isinstance(node, dict):
+        return {k: value_of(v, variables) for k, v in node.items()}
+    return node
+
+
+def arguments(field, variables):
+    return {name: value_of(node, variables) for name, node in field.args.items()}
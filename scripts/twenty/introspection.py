@@ -0,0 +1,354 @@
+"""
+Schema snapshots from GraphQL introspection, for offline checks.
+
+One introspection query per endpoint captures every type, field, argument
+and enum value. Saved per workspace under TWENTY_CACHE_DIR, the snapshot
+answers schema questions without another request:
+
+    snapshot = SchemaSnapshot.load_default()          # None before the first fetch
+    snapshot = SchemaSnapshot.fetch().save()          # one request
+    snapshot.validate(query_text)                     # [] or error messages
+    snapshot.projection("Person", ["name", "phones.primaryPhoneNumber"])
+    old.diff(new)                                     # schema drift, computed locally
+
+validate() parses documents with twenty.gql (the stand-in uses it too),
+which covers everything the scripts send. It checks fields, arguments,
+variable types, input object literals and leaf/object selections; value
+coercion is left to the server.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from .client import get_client
+from .gql import EnumValue, Field, FragmentSpread, GraphQLSyntaxError, Variable, parse
+from .metadata import CACHE_DIR, workspace_key
+
+ENDPOINTS = {"graphql": "/graphql", "metadata": "/metadata"}
+
+INTROSPECTION_QUERY = """
+query Introspection {
+  __schema {
+    queryType { name }
+    mutationType { name }
+    subscriptionType { name }
+    types { ...FullType }
+  }
+}
+fragment FullType on __Type {
+  kind name
+  fields(includeDeprecated: true) { name args { ...InputValue } type { ...TypeRef } isDeprecated }
+  inputFields { ...InputValue }
+  interfaces { ...TypeRef }
+  enumValues(includeDeprecated: true) { name isDeprecated }
+  possibleTypes { ...TypeRef }
+}
+fragment InputValue on __InputValue { name type { ...TypeRef } defaultValue }
+fragment TypeRef on __Type {
+  kind name
+  ofType { kind name ofType { kind name ofType { kind name ofType { kind name ofType { kind name } } } } }
+}
+"""
+
+LEAF_KINDS = ("SCALAR", "ENUM")
+INPUT_KINDS = ("SCALAR", "ENUM", "INPUT_OBJECT")
+
+
+def type_text(ref):
+    """Introspection type ref -> GraphQL notation ("[PersonCreateInput!]!")."""
+    if ref is None:
+        return "?"
+    if ref.get("kind") == "NON_NULL":
+        return type_text(ref.get("ofType")) + "!"
+    if ref.get("kind") == "LIST":
+        return f"[{type_text(ref.get('ofType'))}]"
+    return ref.get("name") or "?"
+
+
+def named_type(ref):
+    """Innermost type name of a (possibly wrapped) type ref."""
+    while ref is not None and ref.get("kind") in ("NON_NULL", "LIST"):
+        ref = ref.get("ofType")
+    return ref.get("name") if ref else None
+
+
+def _base_name(text):
+    return text.strip("[]!")
+
+
+def snapshot_path(endpoint="/graphql", client=None):
+    client = client or get_client()
+    return os.path.join(CACHE_DIR, f"schema-{workspace_key(client.api_key, client.base_url)}-"
+                                   f"{endpoint.strip('/')}.json")
+
+
+class SchemaSnapshot:
+    """The introspected schema of one endpoint."""
+
+    def __init__(self, schema, endpoint="/graphql", fetched_at=0, path=None):
+        self.schema = schema
+        self.endpoint = endpoint
+        self.fetched_at = fetched_at
+        self.path = path
+        self.types = {t["name"]: t for t in schema.get("types") or []}
+        self._fields = {name: {f["name"]: f for f in t.get("fields") or []} for name, t in self.types.items()}
+        self._inputs = {name: {f["name"]: f for f in t.get("inputFields") or []} for name, t in self.types.items()}
+
+    # Loading and persistence
+
+    @classmethod
+    def fetch(cls, client=None, endpoint="/graphql"):
+        client = client or get_client()
+        data = client.graphql(INTROSPECTION_QUERY, path=endpoint)
+        return cls(data.get("__schema") or {}, endpoint, time.time(), snapshot_path(endpoint, client))
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            saved = json.load(f)
+        return cls(saved["schema"], saved.get("endpoint", "/graphql"), saved.get("fetchedAt", 0), path)
+
+    @classmethod
+    def load_default(cls, endpoint="/graphql", client=None):
+        """The saved snapshot for the configured workspace, or None."""
+        try:
+            return cls.load(snapshot_path(endpoint, client))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, path=None):
+        self.path = path or self.path or snapshot_path(self.endpoint)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"endpoint": self.endpoint, "fetchedAt": self.fetched_at, "digest": self.digest,
+                       "schema": self.schema}, f)
+        os.replace(tmp, self.path)
+        return self
+
+    @property
+    def digest(self):
+        """Content hash of the types, ignoring their order."""
+        canonical = json.dumps(sorted(self.schema.get("types") or [], key=lambda t: t["name"]), sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+    # Lookups
+
+    def type(self, name):
+        return self.types.get(name)
+
+    def field(self, type_name, field_name):
+        return self._fields.get(type_name, {}).get(field_name)
+
+    def fields(self, type_name):
+        return self._fields.get(type_name, {})
+
+    def root(self, kind):
+        """Root type name for "query" or "mutation" (None if the schema has none)."""
+        return ((self.schema.get(f"{kind}Type") or {}).get("name"))
+
+    def kind(self, type_name):
+        return (self.types.get(type_name) or {}).get("kind")
+
+    # Drift
+
+    def diff(self, other):
+        """[(symbol, description)] turning this schema into other: + added, - removed, ~ changed."""
+        changes = []
+        for name in sorted(self.types.keys() - other.types.keys()):
+            changes.append(("-", f"type {name}"))
+        for name in sorted(other.types.keys() - self.types.keys()):
+            changes.append(("+", f"type {name} ({other.types[name]['kind']})"))
+        for name in sorted(self.types.keys() & other.types.keys()):
+            old, new = self.types[name], other.types[name]
+            if old["kind"] != new["kind"]:
+                changes.append(("~", f"type {name}: {old['kind']} -> {new['kind']}"))
+                continue
+            for label, before, after in (("", self._fields[name], other._fields[name]),
+                                         ("input ", self._inputs[name], other._inputs[name])):
+                for field in sorted(before.keys() - after.keys()):
+                    changes.append(("-", f"{label}{name}.{field}"))
+                for field in sorted(after.keys() - before.keys()):
+                    changes.append(("+", f"{label}{name}.{field}: {type_text(after[field]['type'])}"))
+                for field in sorted(before.keys() & after.keys()):
+                    was, now = type_text(before[field]["type"]), type_text(after[field]["type"])
+                    if was != now:
+                        changes.append(("~", f"{label}{name}.{field}: {was} -> {now}"))
+                    old_args = {a["name"]: type_text(a["type"]) for a in before[field].get("args") or []}
+                    new_args = {a["name"]: type_text(a["type"]) for a in after[field].get("args") or []}
+                    if old_args != new_args:
+                        changes.append(("~", f"{label}{name}.{field} arguments: {_args_text(old_args)} -> "
+                                             f"{_args_text(new_args)}"))
+            old_values = {v["name"] for v in old.get("enumValues") or []}
+            new_values = {v["name"] for v in new.get("enumValues") or []}
+            for value in sorted(old_values - new_values):
+                changes.append(("-", f"enum {name}.{value}"))
+            for value in sorted(new_values - old_values):
+                changes.append(("+", f"enum {name}.{value}"))
+        return changes
+
+    # Validation
+
+    def validate(self, text):
+        """Error messages for a GraphQL document against this schema ([] when it checks out)."""
+        try:
+            document = parse(text)
+        except GraphQLSyntaxError as e:
+            return [str(e)]
+        errors = []
+        for operation in document.operations:
+            root = self.root(operation.kind)
+            label = operation.name or f"anonymous {operation.kind}"
+            if root is None or root not in self.types:
+                errors.append(f"{label}: schema has no {operation.kind} type")
+                continue
+            declared = {}
+            for name, (declared_type, _) in operation.variables.items():
+                declared[name] = declared_type
+                if self.kind(_base_name(declared_type)) not in INPUT_KINDS:
+                    errors.append(f"{label}: variable ${name} has unknown input type {declared_type}")
+            used = set()
+            self._check_selections(operation, operation.selections, root, label, declared, used, errors, set())
+            for name in sorted(declared.keys() - used):
+                errors.append(f"{label}: variable ${name} is never used")
+        return errors
+
+    def _check_selections(self, operation, selections, type_name, path, declared, used, errors, fragments):
+        parent = self.types.get(type_name)
+        for selection in selections:
+            if isinstance(selection, FragmentSpread):
+                if selection.name in fragments:
+                    continue
+                fragment = operation.document.fragments.get(selection.name)
+                if fragment is None:
+                    errors.append(f"{path}: unknown fragment {selection.name}")
+                    continue
+                condition, body = fragment
+                self._check_selections(operation, body, condition or type_name, f"{path}...{selection.name}",
+                                       declared, used, errors, fragments | {selection.name})
+                continue
+            if not isinstance(selection, Field):  # inline fragment
+                condition = selection.type_condition or type_name
+                if condition not in self.types:
+                    errors.append(f"{path}: unknown type {condition} in inline fragment")
+                    continue
+                self._check_selections(operation, selection.selections, condition, f"{path}...on {condition}",
+                                       declared, used, errors, fragments)
+                continue
+
+            where = f"{path}.{selection.key}"
+            if selection.name == "__typename":
+                continue
+            if selection.name in ("__schema", "__type"):
+                self._mark_variables(selection.args, used)
+                continue
+            field = self.field(type_name, selection.name)
+            if field is None:
+                errors.append(f'{where}: Cannot query field "{selection.name}" on type "{type_name}"'
+                              + ("" if parent else " (unknown type)"))
+                continue
+            self._check_arguments(selection, field, where, declared, used, errors)
+            target = named_type(field["type"])
+            if self.kind(target) in LEAF_KINDS:
+                if selection.selections:
+                    errors.append(f"{where}: {type_text(field['type'])} is a leaf and takes no selection")
+            elif not selection.selections:
+                errors.append(f"{where}: {type_text(field['type'])} needs a selection of subfields")
+            else:
+                self._check_selections(operation, selection.selections, target, where, declared, used, errors,
+                                       fragments)
+
+    def _check_arguments(self, selection, field, where, declared, used, errors):
+        defined = {a["name"]: a for a in field.get("args") or []}
+        for name, value in selection.args.items():
+            arg = defined.get(name)
+            if arg is None:
+                errors.append(f'{where}: unknown argument "{name}"')
+                continue
+            self._check_value(value, arg["type"], f"{where}({name})", declared, used, errors)
+        for name, arg in defined.items():
+            required = (arg["type"] or {}).get("kind") == "NON_NULL" and arg.get("defaultValue") is None
+            if required and name not in selection.args:
+                errors.append(f'{where}: missing required argument "{name}" ({type_text(arg["type"])})')
+
+    def _check_value(self, value, ref, where, declared, used, errors):
+        expected = named_type(ref)
+        if isinstance(value, Variable):
+            used.add(value.name)
+            declared_type = declared.get(value.name)
+            if declared_type is None:
+                errors.append(f"{where}: variable ${value.name} is not declared")
+            elif _base_name(declared_type) != expected:
+                errors.append(f"{where}: variable ${value.name} is {declared_type}, expected {type_text(ref)}")
+            return
+        kind = self.kind(expected)
+        if isinstance(value, list):
+            inner = ref
+            while inner and inner.get("kind") == "NON_NULL":
+                inner = inner.get("ofType")
+            item = inner.get("ofType") if inner and inner.get("kind") == "LIST" else ref
+            for element in value:
+                self._check_value(element, item, where, declared, used, errors)
+        elif isinstance(value, dict):
+            if kind != "INPUT_OBJECT":
+                errors.append(f"{where}: object given for {type_text(ref)}")
+                return
+            inputs = self._inputs.get(expected, {})
+            for name, inner in value.items():
+                if name not in inputs:
+                    errors.append(f'{where}: "{name}" is not a field of {expected}')
+                else:
+                    self._check_value(inner, inputs[name]["type"], f"{where}.{name}", declared, used, errors)
+        elif isinstance(value, EnumValue) and kind == "ENUM":
+            values = {v["name"] for v in self.types[expected].get("enumValues") or []}
+            if str(value) not in values:
+                errors.append(f"{where}: {value} is not a value of {expected}")
+
+    @staticmethod
+    def _mark_variables(value, used):
+        if isinstance(value, Variable):
+            used.add(value.name)
+        elif isinstance(value, dict):
+            for inner in value.values():
+                SchemaSnapshot._mark_variables(inner, used)
+        elif isinstance(value, list):
+            for inner in value:
+                SchemaSnapshot._mark_variables(inner, used)
+
+    # Projections
+
+    def projection(self, type_name, paths):
+        """(selection text, [paths not in the schema]) for the given field paths of a type.
+
+        A path naming an object field ("phones") selects that object's leaf
+        fields; dotted paths ("phones.primaryPhoneNumber") select only what
+        they name. Leaves are emitted in the order given, deduplicated.
+        """
+        tree, missing = {}, []
+        for path in paths:
+            node, current, ok = tree, type_name, True
+            parts = path.split(".")
+            for part in parts:
+                field = self.field(current, part)
+                if field is None:
+                    missing.append(path)
+                    ok = False
+                    break
+                current = named_type(field["type"])
+                node = node.setdefault(part, {})
+            if ok and not node and self.kind(current) not in LEAF_KINDS:
+                for name, field in self.fields(current).items():
+                    if self.kind(named_type(field["type"])) in LEAF_KINDS:
+                        node[name] = {}
+        return _selection_text(tree), missing
+
+
+def _args_text(args):
+    return "(" + ", ".join(f"{k}: {v}" for k, v in sorted(args.items())) + ")"
+
+
+def _selection_text(tree):
+    return " ".join(f"{name} {{ {_selection_text(sub)} }}" if sub else name for name, sub in tree.items())
@@ -0,0 +1,190 @@
+"""
+On-disk cache of Twenty object and field metadata.
+
+Scripts used to download the whole /rest/metadata/objects or /fields list
+just to find one ID, or hard-code UUIDs. MetadataCache stores both lists per
+workspace under TWENTY_CACHE_DIR and indexes them for O(1) lookups:
+
+    meta = get_metadata()
+    person_id = meta.object_id("person")
+    field = meta.field("person", "assignedRep")
+
+The cache refreshes when older than TWENTY_METADATA_TTL seconds, or once
+per process when a lookup misses (the item may have been created since).
+Call invalidate() after a script changes the schema.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import time
+from urllib.parse import urlparse
+
+from . import config
+from .client import get_client
+
+CACHE_DIR = os.environ.get(
+    "TWENTY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "lids")
+)
+TTL = float(os.environ.get("TWENTY_METADATA_TTL", "3600"))
+
+
+def workspace_key(api_key=None, base_url=None):
+    """Identify the workspace an API key belongs to.
+
+    Uses the workspaceId claim of the key's JWT payload, falling back to a
+    hash of the key for opaque tokens.
+    """
+    base_url, api_key = config.require(base_url, api_key)
+    host = urlparse(base_url).netloc or "default"
+    try:
+        payload = api_key.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        workspace = claims["workspaceId"]
+    except (IndexError, KeyError, ValueError):
+        workspace = hashlib.sha1(api_key.encode()).hexdigest()[:16]
+    return f"{host}-{workspace}"
+
+
+def _records(body, key):
+    """Pull the record list out of a REST metadata response."""
+    if isinstance(body, list):
+        return body, {}
+    data = body.get("data", body)
+    return data.get(key, []), body.get("pageInfo") or data.get("pageInfo") or {}
+
+
+class MetadataCache:
+    """Objects and fields for one workspace, persisted to disk."""
+
+    def __init__(self, client=None, path=None, ttl=None):
+        self.client = client or get_client()
+        self.ttl = TTL if ttl is None else ttl
+        self.path = path or os.path.join(
+            CACHE_DIR, f"metadata-{workspace_key(self.client.api_key, self.client.base_url)}.json"
+        )
+        self.fetched_at = 0
+        self._refreshed = False
+        self._objects = {}
+        self._objects_by_id = {}
+        self._fields = {}
+        self._fields_by_id = {}
+        self._load()
+
+    # Loading and persistence
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._index(snapshot.get("objects", []), snapshot.get("fields", []))
+        self.fetched_at = snapshot.get("fetchedAt", 0)
+
+    def _save(self, objects, fields):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump({"fetchedAt": self.fetched_at, "objects": objects, "fields": fields}, f)
+        os.replace(tmp, self.path)
+
+    def _index(self, objects, fields):
+        self._objects = {o.get("nameSingular"): o for o in objects}
+        self._objects_by_id = {o.get("id"): o for o in objects}
+        self._fields_by_id = {f.get("id"): f for f in fields}
+        self._fields = {}
+        for f in fields:
+            obj = self._objects_by_id.get(f.get("objectMetadataId"))
+            if obj:
+                self._fields[(obj.get("nameSingular"), f.get("name"))] = f
+
+    def _fetch_all(self, path, key):
+        records = []
+        params = {}
+        while True:
+            body = self.client.get(path, params=params or None)
+            page, page_info = _records(body, key)
+            records.extend(page)
+            if not page_info.get("hasNextPage") or not page_info.get("endCursor"):
+                return records
+            params = {"starting_after": page_info["endCursor"]}
+
+    def refresh(self):
+        """Download objects and fields and rewrite the cache file."""
+        objects = self._fetch_all("/rest/metadata/objects", "objects")
+        fields = self._fetch_all("/rest/metadata/fields", "fields")
+        # Objects embed their fields; they're stored separately and only once
+        objects = [{k: v for k, v in o.items() if k != "fields"} for o in objects]
+        self.fetched_at = time.time()
+        self._refreshed = True
+        self._index(objects, fields)
+        self._save(objects, fields)
+
+    def invalidate(self):
+        """Drop the cache so the next lookup re-downloads metadata."""
+        self.fetched_at = 0
+        self._refreshed = False
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @property
+    def stale(self):
+        return time.time() - self.fetched_at > self.ttl
+
+    def _lookup(self, index, key):
+        if self.stale:
+            self.refresh()
+        hit = index().get(key)
+        if hit is None and not self._refreshed:
+            self.refresh()
+            hit = index().get(key)
+        return hit
+
+    # Lookups
+
+    def object(self, name_singular):
+        return self._lookup(lambda: self._objects, name_singular)
+
+    def object_id(self, name_singular):
+        obj = self.object(name_singular)
+        return obj.get("id") if obj else None
+
+    def object_by_id(self, object_id):
+        return self._lookup(lambda: self._objects_by_id, object_id)
+
+    def field(self, object_name, field_name):
+        return self._lookup(lambda: self._fields, (object_name, field_name))
+
+    def field_id(self, object_name, field_name):
+        field = self.field(object_name, field_name)
+        return field.get("id") if field else None
+
+    def field_by_id(self, field_id):
+        return self._lookup(lambda: self._fields_by_id, field_id)
+
+    def fields(self, object_name):
+        """All fields of an object, keyed by field name."""
+        if self.stale:
+            self.refresh()
+        return {name: f for (obj, name), f in self._fields.items() if obj == object_name}
+
+    def objects(self):
+        if self.stale:
+            self.refresh()
+        return dict(self._objects)
+
+
+_metadata = None
+
+
+def get_metadata():
+    """Return the process-wide MetadataCache for the configured workspace."""
+    global _metadata
+    if _metadata is None:
+        _metadata = MetadataCache()
+    return _metadata
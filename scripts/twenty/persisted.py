@@ -0,0 +1,152 @@
+"""
+Persisted GraphQL queries: registered documents are sent by hash.
+
+query_registry.py validates the documents the scripts send against a
+schema snapshot (twenty.introspection) and records them here, per
+workspace. TwentyClient.execute() then sends a registered document as its
+sha256 hash in the Automatic Persisted Queries format:
+
+    {"operationName": "Page", "variables": {...},
+     "extensions": {"persistedQuery": {"version": 1, "sha256Hash": "..."}}}
+
+If the server hasn't seen the hash yet it answers PERSISTED_QUERY_NOT_FOUND
+and the client resends the text once with the hash, which registers it
+there. If the server doesn't support persisted queries at all, the
+endpoint is marked unsupported in the registry file and later requests go
+out as text, as before. Documents that aren't registered are always sent
+as text.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+VERSION = 1
+NOT_FOUND = "PERSISTED_QUERY_NOT_FOUND"
+NOT_SUPPORTED = "PERSISTED_QUERY_NOT_SUPPORTED"
+# How servers without persisted queries reject a request that has no query text
+_NO_QUERY = re.compile(r"must provide (a )?query|no operations|GRAPHQL_PARSE_FAILED|PersistedQueryNotSupported",
+                       re.IGNORECASE)
+_OPERATION = re.compile(r"^\s*(?:query|mutation|subscription)\s+([_A-Za-z]\w*)")
+
+
+def query_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def extension(digest):
+    return {"persistedQuery": {"version": VERSION, "sha256Hash": digest}}
+
+
+def error_codes(body):
+    """Error codes and messages of a GraphQL response body."""
+    out = set()
+    errors = body.get("errors") if isinstance(body, dict) else None
+    for error in errors or []:
+        if isinstance(error, dict):
+            out.add(str((error.get("extensions") or {}).get("code") or ""))
+            out.add(str(error.get("message") or ""))
+    return out
+
+
+def hash_accepted(body):
+    """Whether a 2xx answer to a hash-only request shows the endpoint takes persisted queries.
+
+    Only data or PERSISTED_QUERY_NOT_FOUND counts; a server without support
+    may answer 200 with an error asking for the query text.
+    """
+    if not isinstance(body, dict):
+        return False
+    codes = error_codes(body)
+    if NOT_SUPPORTED in codes or "PersistedQueryNotSupported" in codes or any(_NO_QUERY.search(c) for c in codes):
+        return False
+    return NOT_FOUND in codes or "PersistedQueryNotFound" in codes or "data" in body
+
+
+def rejects_missing_query(error):
+    """True when a TwentyError says the server needs the query text (no persisted query support)."""
+    return error.status == 400 and bool(_NO_QUERY.search(f"{error} {error.payload}"))
+
+
+def registry_path(api_key=None, base_url=None):
+    from .metadata import CACHE_DIR, workspace_key
+
+    return os.path.join(CACHE_DIR, f"persisted-queries-{workspace_key(api_key, base_url)}.json")
+
+
+class QueryRegistry:
+    """Validated documents by hash, and which endpoints accept persisted queries."""
+
+    def __init__(self, path):
+        self.path = path
+        self.queries = {}     # hash -> {name, endpoint, operation, query, schema, registered}
+        self.endpoints = {}   # endpoint -> {"supported": True/False/None, "checked": time}
+        self._by_text = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def for_client(cls, client):
+        return cls(registry_path(client.api_key, client.base_url))
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.queries = saved.get("queries") or {}
+        self.endpoints = saved.get("endpoints") or {}
+        self._by_text = {(q["endpoint"], q["query"]): digest for digest, q in self.queries.items()}
+
+    def save(self):
+        with self._lock:
+            snapshot = {"queries": self.queries, "endpoints": self.endpoints}
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(snapshot, f, indent=1)
+            os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def register(self, name, endpoint, text, schema=None):
+        """Record a validated document; returns its hash."""
+        digest = query_hash(text)
+        match = _OPERATION.match(re.sub(r"#[^\n]*", "", text))
+        self.queries[digest] = {
+            "name": name, "endpoint": endpoint, "operation": match.group(1) if match else None,
+            "query": text, "schema": schema, "registered": time.time(),
+        }
+        self._by_text[(endpoint, text)] = digest
+        return digest
+
+    def replace(self, entries):
+        """Keep exactly these (name, endpoint, text, schema) entries."""
+        self.queries, self._by_text = {}, {}
+        return [self.register(*entry) for entry in entries]
+
+    def lookup(self, endpoint, text):
+        """(hash, operation name) to send instead of text, or None."""
+        if self.supported(endpoint) is False:
+            return None
+        digest = self._by_text.get((endpoint, text))
+        return (digest, self.queries[digest]["operation"]) if digest else None
+
+    def supported(self, endpoint):
+        return (self.endpoints.get(endpoint) or {}).get("supported")
+
+    def mark(self, endpoint, supported):
+        """Record whether an endpoint takes persisted queries (saved only when it changes)."""
+        if self.supported(endpoint) is supported:
+            return
+        self.endpoints[endpoint] = {"supported": supported, "checked": time.time()}
+        try:
+            self.save()
+        except OSError:
+            pass  # read-only cache: keep the answer for this process only
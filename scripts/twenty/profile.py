@@ -0,0 +1,299 @@
+"""
+Per-request instrumentation of Twenty calls, and the --profile flag.
+
+TwentyClient.request() records every call (operation, endpoint, status,
+bytes out/in, latency including retries, retry count) into PROFILER.
+Recording is always on and costs a lock and a bisect per request.
+Scripts expose it with --profile:
+
+    python scripts/reconcile_schema.py --apply --profile                        # table on exit
+    python scripts/reconcile_schema.py --apply --profile-out run.json           # + JSON
+    python scripts/reassign_leads.py ... --profile-out /var/lib/node_exporter/textfile/lids.prom
+
+Operations are GraphQL operation names (or the first root field of an
+anonymous document), e.g. "Page" or "createPeople", and
+"METHOD /rest/path" for REST, with record ids collapsed to ":id".
+
+In argparse scripts:
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+
+Scripts that read sys.argv directly call profile.enable(*profile.from_argv()).
+"""
+
+import atexit
+import bisect
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+# Latency bucket upper bounds in seconds (Prometheus le=), +Inf implied
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0, 30.0, 60.0)
+
+_OPERATION = re.compile(r"^\s*(?:query|mutation|subscription)\s+([_A-Za-z]\w*)")
+_ROOT_FIELD = re.compile(r"{\s*(?:[_A-Za-z]\w*\s*:\s*)?([_A-Za-z]\w*)")
+_ID_SEGMENT = re.compile(r"/(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|\d+)(?=/|$)", re.I)
+
+
+def operation_name(method, path, payload=None):
+    """Label a request: the GraphQL operation for /graphql and /metadata, else METHOD path."""
+    path = path.split("?", 1)[0]
+    if isinstance(payload, dict) and isinstance(payload.get("query"), str):
+        query = re.sub(r"#[^\n]*", "", payload["query"])
+        match = _OPERATION.match(query) or _ROOT_FIELD.search(query)
+        if match:
+            return match.group(1)
+    if isinstance(payload, dict) and payload.get("operationName"):
+        return payload["operationName"]  # persisted query sent by hash
+    return f"{method} {_ID_SEGMENT.sub('/:id', path)}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with exact count, sum and max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def cumulative(self):
+        """[(le, count)] including +Inf, as Prometheus expects."""
+        out, total = [], 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+
+class Stats:
+    """Everything recorded for one (operation, endpoint)."""
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statuses = {}
+        self.retries = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+
+    @property
+    def errors(self):
+        return sum(n for status, n in self.statuses.items() if not str(status).startswith("2"))
+
+
+class Profiler:
+    """Thread-safe registry of per-operation Stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = time.time()
+            self.stats = {}
+
+    def record(self, operation, endpoint, status, seconds, bytes_out=0, bytes_in=0, retries=0):
+        with self._lock:
+            stats = self.stats.get((operation, endpoint))
+            if stats is None:
+                stats = self.stats[(operation, endpoint)] = Stats()
+            stats.latency.observe(seconds)
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.retries += retries
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+
+    def _sorted(self):
+        with self._lock:
+            return sorted(self.stats.items(), key=lambda item: -item[1].latency.sum)
+
+    def table(self):
+        rows = self._sorted()
+        if not rows:
+            return "No Twenty requests recorded."
+        header = (f"{'operation':<34} {'endpoint':<9} {'calls':>6} {'err':>4} {'retry':>5} "
+                  f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'total s':>8} {'KB out':>8} {'KB in':>9}")
+        lines = [header, "-" * len(header)]
+        totals = Stats()
+        for (operation, endpoint), s in rows:
+            lines.append(
+                f"{operation[:34]:<34} {endpoint[:9]:<9} {s.latency.count:>6} {s.errors:>4} {s.retries:>5} "
+                f"{s.latency.quantile(0.5) * 1000:>8.1f} {s.latency.quantile(0.95) * 1000:>8.1f} "
+                f"{s.latency.max * 1000:>8.1f} {s.latency.sum:>8.2f} "
+                f"{s.bytes_out / 1024:>8.1f} {s.bytes_in / 1024:>9.1f}"
+            )
+            totals.latency.count += s.latency.count
+            totals.latency.sum += s.latency.sum
+            totals.retries += s.retries
+            totals.bytes_out += s.bytes_out
+            totals.bytes_in += s.bytes_in
+            for status, n in s.statuses.items():
+                totals.statuses[status] = totals.statuses.get(status, 0) + n
+        lines.append("-" * len(header))
+        lines.append(
+            f"{'total':<34} {'':<9} {totals.latency.count:>6} {totals.errors:>4} {totals.retries:>5} "
+            f"{'':>8} {'':>8} {'':>8} {totals.latency.sum:>8.2f} "
+            f"{totals.bytes_out / 1024:>8.1f} {totals.bytes_in / 1024:>9.1f}"
+        )
+        lines.append(f"wall {time.time() - self.started:.2f}s; request time above overlaps when calls run concurrently")
+        return "\n".join(lines)
+
+    def to_json(self):
+        return {
+            "startedAt": self.started,
+            "seconds": round(time.time() - self.started, 3),
+            "operations": [
+                {
+                    "operation": operation,
+                    "endpoint": endpoint,
+                    "calls": s.latency.count,
+                    "statuses": {str(k): v for k, v in s.statuses.items()},
+                    "retries": s.retries,
+                    "bytesOut": s.bytes_out,
+                    "bytesIn": s.bytes_in,
+                    "seconds": {
+                        "sum": round(s.latency.sum, 6), "max": round(s.latency.max, 6),
+                        "p50": round(s.latency.quantile(0.5), 6), "p95": round(s.latency.quantile(0.95), 6),
+                        "p99": round(s.latency.quantile(0.99), 6),
+                    },
+                    "buckets": [["+Inf" if le == float("inf") else le, n] for le, n in s.latency.cumulative()],
+                }
+                for (operation, endpoint), s in self._sorted()
+            ],
+        }
+
+    def to_prometheus(self, job=None):
+        job = job or _script_name()
+
+        def labels(operation, endpoint, **extra):
+            pairs = {"job": job, "operation": operation, "endpoint": endpoint, **extra}
+            return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs.items()) + "}"
+
+        rows = self._sorted()
+        out = [
+            "# HELP twenty_request_duration_seconds Twenty API call latency, retries included.",
+            "# TYPE twenty_request_duration_seconds histogram",
+        ]
+        for (operation, endpoint), s in rows:
+            for le, n in s.latency.cumulative():
+                out.append(f"twenty_request_duration_seconds_bucket"
+                           f"{labels(operation, endpoint, le='+Inf' if le == float('inf') else f'{le:g}')} {n}")
+            out.append(f"twenty_request_duration_seconds_sum{labels(operation, endpoint)} {s.latency.sum:.6f}")
+            out.append(f"twenty_request_duration_seconds_count{labels(operation, endpoint)} {s.latency.count}")
+        out += ["# HELP twenty_requests_total Twenty API calls by final status.",
+                "# TYPE twenty_requests_total counter"]
+        for (operation, endpoint), s in rows:
+            for status, n in sorted(s.statuses.items(), key=lambda item: str(item[0])):
+                out.append(f"twenty_requests_total{labels(operation, endpoint, status=status)} {n}")
+        out += ["# HELP twenty_request_retries_total Retried Twenty API attempts.",
+                "# TYPE twenty_request_retries_total counter"]
+        out += [f"twenty_request_retries_total{labels(o, e)} {s.retries}" for (o, e), s in rows]
+        out += ["# HELP twenty_request_bytes_total Twenty API payload bytes.",
+                "# TYPE twenty_request_bytes_total counter"]
+        for (operation, endpoint), s in rows:
+            out.append(f"twenty_request_bytes_total{labels(operation, endpoint, direction='out')} {s.bytes_out}")
+            out.append(f"twenty_request_bytes_total{labels(operation, endpoint, direction='in')} {s.bytes_in}")
+        return "\n".join(out) + "\n"
+
+    def write(self, path):
+        """JSON, or the Prometheus text format when path ends in .prom."""
+        text = self.to_prometheus() if path.endswith(".prom") else json.dumps(self.to_json(), indent=2)
+        # node_exporter reads textfiles at any moment, so replace atomically
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+PROFILER = Profiler()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _script_name():
+    name = sys.argv[0].rsplit("/", 1)[-1] if sys.argv and sys.argv[0] else "python"
+    return name[:-3] if name.endswith(".py") else name
+
+
+# --profile
+
+def add_argument(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="print a per-operation table of Twenty calls on exit")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="also write the profile as JSON, or Prometheus text if PATH ends in .prom")
+
+
+def from_argv(argv=None):
+    """Remove --profile and --profile-out PATH from argv (default sys.argv); returns (profile, path)."""
+    argv = sys.argv if argv is None else argv
+    enabled, path = False, None
+    i = 0
+    while i < len(argv):
+        if argv[i] == "--profile":
+            enabled = True
+            del argv[i]
+        elif argv[i] == "--profile-out" and i + 1 < len(argv):
+            path = argv[i + 1]
+            del argv[i:i + 2]
+        elif argv[i].startswith("--profile-out="):
+            path = argv[i].split("=", 1)[1]
+            del argv[i]
+        else:
+            i += 1
+    return enabled, path
+
+
+def report(*paths):
+    print()
+    print(PROFILER.table())
+    for path in paths:
+        PROFILER.write(path)
+        print(f"Profile written to {path}")
+
+
+_report_paths = None
+
+
+def enable(profile, path=None):
+    """Report on interpreter exit when --profile or --profile-out was given.
+
+    Safe to call once per step of a lids_admin.py pipeline: there is one
+    report at exit, written to every path given.
+    """
+    global _report_paths
+    if not (profile or path):
+        return
+    if _report_paths is None:
+        _report_paths = []
+        atexit.register(lambda: report(*_report_paths))
+    if path and path not in _report_paths:
+        _report_paths.append(path)
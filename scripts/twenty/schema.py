@@ -0,0 +1,335 @@
+"""
+Declarative schema reconciler: diff a workspace against a spec, then apply.
+
+The spec (see scripts/workspace_schema.py) lists objects, fields, relations
+and workflows, plus retired workflows whose active versions should be
+deactivated. plan() fetches current metadata once and returns only the
+changes needed; apply() runs them as a dependency DAG:
+
+    objects  ->  fields  ->  relations
+    workflows, retired workflows (independent)
+
+Each layer's metadata writes are sent as aliased batch documents, and
+non-batchable changes (workflows) run concurrently on a thread pool.
+Nothing is ever deleted (retired workflows are only deactivated); type
+changes are reported for manual follow-up.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from .batch import METADATA, MutationBatch, Operation, create_field, update_field
+from .client import get_client
+from .errors import TwentyError
+from .metadata import get_metadata
+
+# Field attributes compared when deciding whether to update
+UPDATABLE = ("label", "description", "icon")
+
+WORKFLOWS_QUERY = "{ workflows { edges { node { id name } } } }"
+ACTIVE_VERSIONS_QUERY = """
+query ActiveWorkflowVersions($filter: WorkflowVersionFilterInput) {
+    workflowVersions(filter: $filter) { edges { node { id workflowId } } }
+}
+"""
+DEACTIVATE_VERSION = """
+mutation DeactivateWorkflowVersion($workflowVersionId: UUID!) {
+    deactivateWorkflowVersion(workflowVersionId: $workflowVersionId)
+}
+"""
+
+
+def normalize_field(entry):
+    """Accept either a field dict or an add_twenty_fields-style tuple."""
+    if isinstance(entry, dict):
+        return dict(entry)
+    name, label, field_type, description, icon = entry
+    return {"name": name, "label": label, "type": field_type,
+            "description": description, "icon": icon}
+
+
+def _option_key(options):
+    return [(o.get("value"), o.get("label"), o.get("color"), o.get("position")) for o in options or []]
+
+
+class Change:
+    """One planned change and its dependencies (keys of other changes)."""
+
+    def __init__(self, key, action, summary, deps=(), operation=None, run=None):
+        self.key = key
+        self.action = action        # "create", "update", "deactivate" or "manual"
+        self.summary = summary
+        self.deps = set(deps)
+        self.operation = operation  # state -> twenty.batch.Operation
+        self.run = run              # state -> None, for non-batchable changes
+        self.error = None
+
+    @property
+    def symbol(self):
+        return {"create": "+", "update": "~", "deactivate": "-", "manual": "!"}[self.action]
+
+    def __repr__(self):
+        return f"{self.symbol} {self.summary}"
+
+
+class Plan:
+    def __init__(self, changes):
+        self.changes = changes
+
+    @property
+    def actionable(self):
+        return [c for c in self.changes if c.action != "manual"]
+
+    def __bool__(self):
+        return bool(self.changes)
+
+    def layers(self):
+        """Group actionable changes into dependency layers (Kahn's algorithm)."""
+        pending = {c.key: c for c in self.actionable}
+        layers = []
+        while pending:
+            ready = [c for c in pending.values() if not (c.deps & pending.keys())]
+            if not ready:
+                raise ValueError(f"Dependency cycle in plan: {sorted(pending)}")
+            layers.append(ready)
+            for c in ready:
+                del pending[c.key]
+        return layers
+
+    def summary(self):
+        counts = {}
+        for c in self.changes:
+            counts[c.action] = counts.get(c.action, 0) + 1
+        return (f"Plan: {counts.get('create', 0)} to create, {counts.get('update', 0)} to update, "
+                f"{counts.get('deactivate', 0)} to deactivate, {counts.get('manual', 0)} need manual changes")
+
+    def print(self):
+        if not self.changes:
+            print("No changes. Workspace matches the spec.")
+            return
+        print(self.summary())
+        for c in self.changes:
+            print(f"  {c}")
+
+
+class State:
+    """Object IDs known during apply (existing plus newly created)."""
+
+    def __init__(self, meta):
+        self.meta = meta
+        self.created_objects = {}
+
+    def object_id(self, name):
+        return self.created_objects.get(name) or self.meta.object_id(name)
+
+
+class Reconciler:
+    def __init__(self, spec, client=None, meta=None, option_sources=None, workers=4):
+        self.spec = spec
+        self.client = client or get_client()
+        self.meta = meta or get_metadata()
+        self.option_sources = option_sources or {}
+        self.workers = workers
+
+    # Planning
+
+    def _existing_workflows(self):
+        """{name: id}"""
+        data = self.client.graphql(WORKFLOWS_QUERY)
+        return {e["node"]["name"]: e["node"]["id"] for e in data.get("workflows", {}).get("edges", [])}
+
+    def _active_versions(self, workflow_ids):
+        """{workflow id: [active version ids]}"""
+        if not workflow_ids:
+            return {}
+        data = self.client.graphql(ACTIVE_VERSIONS_QUERY, {
+            "filter": {"workflowId": {"in": list(workflow_ids)}, "status": {"eq": "ACTIVE"}}})
+        out = {}
+        for e in data.get("workflowVersions", {}).get("edges", []):
+            out.setdefault(e["node"]["workflowId"], []).append(e["node"]["id"])
+        return out
+
+    def plan(self):
+        self.meta.refresh()
+        existing_objects = self.meta.objects()
+        changes = []
+
+        for obj in self.spec.get("objects", []):
+            name = obj["nameSingular"]
+            if name in existing_objects:
+                continue
+            if obj.get("standard"):
+                changes.append(Change(f"object:{name}", "manual", f"standard object {name} is missing"))
+                continue
+            changes.append(Change(
+                f"object:{name}", "create", f"object {name}",
+                operation=lambda state, obj=obj: self._create_object(obj),
+            ))
+
+        for object_name, entries in self.spec.get("fields", {}).items():
+            for entry in entries:
+                changes.extend(self._plan_field(object_name, normalize_field(entry), existing_objects))
+
+        for rel in self.spec.get("relations", []):
+            changes.extend(self._plan_relation(rel, existing_objects))
+
+        workflows = self.spec.get("workflows", [])
+        retired = self.spec.get("retired_workflows", [])
+        if workflows or retired:
+            existing = self._existing_workflows()
+            for wf in workflows:
+                if wf["name"] not in existing:
+                    changes.append(Change(
+                        f"workflow:{wf['name']}", "create", f'workflow "{wf["name"]}"',
+                        run=lambda state, wf=wf: self._create_workflow(wf),
+                    ))
+            active = self._active_versions(existing[name] for name in retired if name in existing)
+            for name in retired:
+                versions = active.get(existing.get(name), [])
+                if versions:
+                    changes.append(Change(
+                        f"workflow:{name}", "deactivate", f'retired workflow "{name}" ({len(versions)} active)',
+                        run=lambda state, versions=versions: self._deactivate_versions(versions),
+                    ))
+
+        return Plan(changes)
+
+    def _object_deps(self, names, existing_objects):
+        return [f"object:{n}" for n in names if n not in existing_objects]
+
+    def _plan_field(self, object_name, field, existing_objects):
+        key = f"field:{object_name}.{field['name']}"
+        label = f"field {object_name}.{field['name']} ({field['type']})"
+        current = self.meta.fields(object_name).get(field["name"]) if object_name in existing_objects else None
+
+        if current is None:
+            return [Change(
+                key, "create", label, deps=self._object_deps([object_name], existing_objects),
+                operation=lambda state: create_field(self._field_input(state, object_name, field)),
+            )]
+
+        if current.get("type") != field["type"]:
+            return [Change(key, "manual", f"{label}: type is {current.get('type')} (delete and recreate by hand)")]
+
+        update = {k: field[k] for k in UPDATABLE if k in field and current.get(k) != field[k]}
+        options = field.get("options")
+        if isinstance(options, list) and _option_key(current.get("options")) != _option_key(options):
+            update["options"] = options
+        if not update:
+            return []
+        diffs = ", ".join(
+            f"options ({len(current.get('options') or [])} -> {len(options)})" if k == "options"
+            else f"{k} {current.get(k)!r} -> {v!r}"
+            for k, v in update.items()
+        )
+        return [Change(key, "update", f"field {object_name}.{field['name']}: {diffs}",
+                       operation=lambda state: update_field(current["id"], update))]
+
+    def _plan_relation(self, rel, existing_objects):
+        source, target = rel["object"], rel["target"]
+        key = f"relation:{source}.{rel['name']}"
+        if source in existing_objects and rel["name"] in self.meta.fields(source):
+            return []
+        field = {
+            "name": rel["name"], "label": rel["label"], "type": "RELATION",
+            "icon": rel.get("icon"), "description": rel.get("description"),
+        }
+        deps = self._object_deps([source, target], existing_objects)
+
+        def operation(state):
+            field_input = self._field_input(state, source, field)
+            field_input["relationCreationPayload"] = {
+                "type": rel.get("relationType", "MANY_TO_ONE"),
+                "targetObjectMetadataId": state.object_id(target),
+                "targetFieldLabel": rel.get("targetFieldLabel", rel["label"]),
+                "targetFieldIcon": rel.get("targetFieldIcon", rel.get("icon")),
+            }
+            return create_field(field_input)
+
+        return [Change(key, "create", f"relation {source}.{rel['name']} -> {target}", deps=deps,
+                       operation=operation)]
+
+    # Change builders
+
+    def _field_input(self, state, object_name, field):
+        field_input = {k: v for k, v in field.items() if v is not None}
+        field_input["objectMetadataId"] = state.object_id(object_name)
+        source = field.get("options")
+        if isinstance(source, str):
+            field_input["options"] = self.option_sources[source]()
+        return field_input
+
+    def _create_object(self, obj):
+        object_input = {k: v for k, v in obj.items() if k != "standard"}
+        return Operation(
+            "createOneObject", {"input": ("CreateOneObjectInput!", {"object": object_input})},
+            "id nameSingular", METADATA, key=obj["nameSingular"],
+        )
+
+    def _create_workflow(self, wf):
+        workflow = self.client.graphql(
+            "mutation CreateWorkflow($data: WorkflowCreateInput!) { createWorkflow(data: $data) { id } }",
+            {"data": {"name": wf["name"]}},
+        )["createWorkflow"]
+        self.client.graphql(
+            "mutation CreateWorkflowVersion($data: WorkflowVersionCreateInput!) "
+            "{ createWorkflowVersion(data: $data) { id } }",
+            {"data": {
+                "name": wf.get("version", "v1"),
+                "workflow": {"connect": {"id": workflow["id"]}},
+                "trigger": wf["trigger"],
+                "steps": wf.get("steps", []),
+            }},
+        )
+
+    def _deactivate_versions(self, version_ids):
+        for version_id in version_ids:
+            self.client.graphql(DEACTIVATE_VERSION, {"workflowVersionId": version_id}, idempotent=True)
+
+    # Applying
+
+    def apply(self, plan):
+        """Run the plan layer by layer. Returns the list of failed changes."""
+        state = State(self.meta)
+        failed = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for layer in plan.layers():
+                runnable = []
+                for c in layer:
+                    if c.deps & failed:
+                        c.error = TwentyError(f"skipped: depends on {', '.join(sorted(c.deps & failed))}")
+                        failed.add(c.key)
+                    else:
+                        runnable.append(c)
+
+                batched = [c for c in runnable if c.operation]
+                futures = {pool.submit(c.run, state): c for c in runnable if c.run}
+                if batched:
+                    self._apply_batched(batched, state)
+                for future, c in futures.items():
+                    try:
+                        future.result()
+                    except TwentyError as e:
+                        c.error = e
+
+                for c in runnable:
+                    if c.error is not None:
+                        failed.add(c.key)
+                    print(f"  {'[FAIL]' if c.error else '[OK]'} {c}" + (f" - {c.error}" if c.error else ""))
+
+        self.meta.invalidate()
+        return [c for c in plan.actionable if c.key in failed]
+
+    def _apply_batched(self, changes, state):
+        batch = MutationBatch(self.client)
+        results = []
+        for c in changes:
+            try:
+                results.append((c, batch.add(c.operation(state))))
+            except (TwentyError, KeyError) as e:
+                c.error = e if isinstance(e, TwentyError) else TwentyError(f"unknown option source {e}")
+        batch.flush()
+        for c, result in results:
+            if not result.ok:
+                c.error = result.error
+            elif result.operation.field == "createOneObject":
+                state.created_objects[result.data["nameSingular"]] = result.data["id"]
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Run a local Twenty stand-in (standin/) for offline integration and load tests.
+
+    python scripts/twenty_standin.py                             # schema applied, 200 people
+    python scripts/twenty_standin.py --people 50000 --call-records 200000
+    python scripts/twenty_standin.py --latency 0.08 --jitter 0.04 --throttle-rate 0.05
+    python scripts/twenty_standin.py --bare                      # standard objects only, no custom schema
+    python scripts/twenty_standin.py --snapshot ws.json          # load a saved workspace
+    python scripts/twenty_standin.py --persisted-queries         # accept documents sent by hash
+
+    TWENTY_API_KEY=test TWENTY_BASE_URL=http://127.0.0.1:8790 python scripts/reconcile_schema.py
+
+Counters are printed every --report-every seconds and on exit, and are
+served at /_standin/stats; faults can be changed while running by
+POSTing JSON to /_standin/faults.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+
+from standin import StandinServer, Workspace
+
+
+def build_workspace(args):
+    if args.snapshot:
+        with open(args.snapshot) as f:
+            return Workspace.from_snapshot(json.load(f))
+    workspace = Workspace(schema=not args.bare)
+    workspace.seed(people=args.people, call_records=args.call_records, days=args.days, seed=args.seed)
+    return workspace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Twenty CRM stand-in server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8790)
+    parser.add_argument("--api-key", help="only accept this bearer token (default: any)")
+    parser.add_argument("--bare", action="store_true", help="skip the workspace_schema SPEC objects and fields")
+    parser.add_argument("--people", type=int, default=200)
+    parser.add_argument("--call-records", type=int, default=0)
+    parser.add_argument("--days", type=int, default=30, help="spread call records over this many days")
+    parser.add_argument("--seed", type=int, help="random seed for data and faults")
+    parser.add_argument("--snapshot", help="load the workspace from a /_standin/snapshot JSON file")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="+/- seconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests failed with --error-status")
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument("--max-rps", type=float, help="429 above this many requests per second")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429s")
+    parser.add_argument("--persisted-queries", action="store_true",
+                        help="accept Automatic Persisted Queries (documents sent by sha256 hash)")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between counter lines (0 = off)")
+    args = parser.parse_args()
+
+    started = time.time()
+    workspace = build_workspace(args)
+    sizes = {m.plural: len(m.records) for m in workspace.objects.values() if m.records}
+    print(f"Workspace ready in {time.time() - started:.1f}s: "
+          + ", ".join(f"{n:,} {name}" for name, n in sizes.items()))
+
+    server = StandinServer(workspace, host=args.host, port=args.port, api_key=args.api_key,
+                           latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           error_status=args.error_status, throttle_rate=args.throttle_rate,
+                           max_rps=args.max_rps, retry_after=args.retry_after, seed=args.seed,
+                           persisted_queries=args.persisted_queries)
+    try:
+        server.start()
+    except OSError as e:
+        print(f"[ERROR] Cannot listen on {args.host}:{args.port}: {e}")
+        return 1
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    print(f"Twenty stand-in on {server.url} (graphql, metadata, rest); counters at {server.url}/_standin/stats")
+    while not stop.wait(args.report_every or None):
+        print(f"  {server.counters.line()}")
+
+    server.stop()
+    print(json.dumps(server.counters.snapshot(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""
+Twenty CRM workspace schema as code.
+
+Single source of truth for the custom objects, fields, relations and
+workflows the LIDS apps depend on. Apply it with:
+
+    python scripts/reconcile_schema.py          # print the plan
+    python scripts/reconcile_schema.py --apply  # make the changes
+
+Plain fields use the same (name, label, type, description, icon) tuples as
+add_twenty_fields.py; anything richer is a dict.
+"""
+
+# Objects. "standard" objects ship with Twenty and are never created.
+OBJECTS = [
+    {"nameSingular": "person", "standard": True},
+    {"nameSingular": "workspaceMember", "standard": True},
+    {
+        "nameSingular": "studioContentItem", "namePlural": "studioContentItems",
+        "labelSingular": "Studio Content Item", "labelPlural": "Studio Content Items",
+        "icon": "IconPhoto",
+    },
+    {
+        "nameSingular": "studioWeeklyPlan", "namePlural": "studioWeeklyPlans",
+        "labelSingular": "Studio Weekly Plan", "labelPlural": "Studio Weekly Plans",
+        "icon": "IconCalendarEvent",
+    },
+    {
+        "nameSingular": "marketingProgression", "namePlural": "marketingProgressions",
+        "labelSingular": "Marketing Progression", "labelPlural": "Marketing Progressions",
+        "icon": "IconTrendingUp",
+    },
+]
+
+FIELDS = {
+    "person": [
+        {
+            "name": "assignedRep", "label": "Assigned Rep", "type": "SELECT",
+            "icon": "IconUserCheck", "description": "Sales Rep assigned to this lead",
+            # Options track workspace members; see sync_rep_options.py
+            "options": "workspaceMembers",
+        },
+    ],
+    "studioContentItem": [
+        ("contentType", "Content Type", "TEXT", "video, image, text, carousel", "IconPhoto"),
+        ("status", "Status", "TEXT", "idea, planned, scripted, assets, editing, review, scheduled, posted", "IconProgress"),
+        ("scheduledDate", "Scheduled Date", "DATE_TIME", "When this content is scheduled to post", "IconCalendarEvent"),
+        ("postedDate", "Posted Date", "DATE_TIME", "When this content was posted", "IconCalendarCheck"),
+        ("script", "Script", "TEXT", "Content script or body text", "IconFileText"),
+        ("caption", "Caption", "TEXT", "Social media caption", "IconMessage"),
+        ("hashtags", "Hashtags", "TEXT", "Comma-separated hashtags", "IconHash"),
+        ("museNotes", "MUSE Notes", "TEXT", "Why this content fits the strategy", "IconSparkles"),
+        ("workflowStep", "Workflow Step", "NUMBER", "Current step in TikTok workflow (1-8)", "IconListNumbers"),
+        ("assignedTo", "Assigned To", "TEXT", "leigh, sarai, or muse", "IconUser"),
+        ("postizPostId", "Postiz Post ID", "TEXT", "Postiz API post ID", "IconLink"),
+    ],
+    "studioWeeklyPlan": [
+        ("weekStart", "Week Start", "DATE_TIME", "Monday of the week", "IconCalendarEvent"),
+        ("weekEnd", "Week End", "DATE_TIME", "Sunday of the week", "IconCalendarEvent"),
+        ("suggestions", "Suggestions", "TEXT", "JSON array of content suggestions", "IconSparkles"),
+        ("plannedCount", "Planned Count", "NUMBER", "Number of planned items", "IconListNumbers"),
+        ("completedCount", "Completed Count", "NUMBER", "Number of completed items", "IconCheck"),
+    ],
+    "marketingProgression": [
+        ("email", "Email", "TEXT", "User email", "IconMail"),
+        ("totalXp", "Total XP", "NUMBER", "Cumulative experience points", "IconStar"),
+        ("currentLevel", "Current Level", "NUMBER", "Calculated from XP", "IconTrendingUp"),
+        ("rank", "Rank", "TEXT", "content-creator-1 through marketing-lead", "IconMedal"),
+        ("badges", "Badges", "TEXT", "JSON array of badge IDs", "IconAward"),
+        ("streakDays", "Streak Days", "NUMBER", "Consecutive activity days", "IconFlame"),
+        ("lastActivityDate", "Last Activity Date", "DATE_TIME", "Last activity timestamp", "IconCalendarEvent"),
+        ("longestStreak", "Longest Streak", "NUMBER", "Best streak achieved", "IconTrophy"),
+        ("postsPublished", "Posts Published", "NUMBER", "Total posts published", "IconShare"),
+        ("videosCreated", "Videos Created", "NUMBER", "Total videos created", "IconVideo"),
+        ("totalEngagement", "Total Engagement", "NUMBER", "likes + comments + shares", "IconHeart"),
+        ("coursesCompleted", "Courses Completed", "TEXT", "JSON array of course IDs", "IconCertificate"),
+        ("titles", "Titles", "TEXT", "JSON array of earned titles", "IconCrown"),
+        ("activeTitle", "Active Title", "TEXT", "Currently displayed title", "IconBadge"),
+    ],
+}
+
+# RELATION fields to system objects (workspaceMember) cannot be created via
+# the API, which is why assignedRep is a SELECT. Custom-object relations go here:
+# {"object": ..., "name": ..., "label": ..., "target": ..., "relationType": "MANY_TO_ONE"}
+RELATIONS = []
+
+WORKFLOWS = []
+
+# Workflows the reconciler deactivates where they are still active. Lead
+# auto-assignment used to be a person.created workflow (one execution per
+# record); it now runs out of band in assign_worker.py.
+RETIRED_WORKFLOWS = ["Auto-assign leads to uploader"]
+
+SPEC = {
+    "objects": OBJECTS,
+    "fields": FIELDS,
+    "relations": RELATIONS,
+    "workflows": WORKFLOWS,
+    "retired_workflows": RETIRED_WORKFLOWS,
+}
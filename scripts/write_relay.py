@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Write-coalescing relay for call notes and activities (relay/).
+
+    python scripts/write_relay.py serve                           # :8791, flush 60 at a time or every 2s
+    python scripts/write_relay.py serve --batch-size 100 --max-wait 5
+    python scripts/write_relay.py status                          # queue depth, failures
+    python scripts/write_relay.py flush                           # send what is queued, then exit
+    python scripts/write_relay.py requeue                         # retry writes Twenty rejected
+
+    curl -XPOST localhost:8791/calls -H "Authorization: Bearer $LIDS_SERVICE_TOKEN" \\
+         -H 'Idempotency-Key: <tab>:<call id>' \\
+         -d '{"name": "Jane Doe", "duration": 95, "disposition": "callback", "xpAwarded": 10, "leadId": "..."}'
+
+Writes are acknowledged (202, with the Twenty id they will get) once they
+are committed locally; stopping the relay flushes what is queued, and
+anything still unsent is picked up on the next start. Every write needs
+LIDS_SERVICE_TOKEN (or --token) as a bearer token, and the relay binds to
+127.0.0.1 unless --host says otherwise.
+"""
+
+import argparse
+import json
+import signal
+import sys
+
+from relay import Flusher, RelayServer, WriteQueue
+from twenty import auth, profile
+from twenty.metadata import workspace_key
+
+
+def cmd_serve(args):
+    problem = auth.check_arguments(args)
+    if problem:
+        print(f"[ERROR] {problem}")
+        return 1
+    queue = WriteQueue.for_workspace(workspace_key())
+    flusher = Flusher(queue, batch_size=args.batch_size, max_wait=args.max_wait, keep=args.keep_hours * 3600)
+    server = RelayServer(queue, flusher, host=args.host, port=args.port, cors_origin=args.cors_origin,
+                         token=args.token)
+
+    def stop(signum, frame):
+        server.stop.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    status = queue.status()
+    print(f"Relaying to Twenty on http://{args.host}:{args.port}/ (batches of {args.batch_size}, "
+          f"every {args.max_wait:g}s; {status['pending']} pending from last run, queue {queue.path})")
+    server.serve()
+    print(f"[DONE] {json.dumps(dict(queue.status(), **flusher.counts))}")
+    queue.close()
+    return 0
+
+
+def cmd_flush(args):
+    queue = WriteQueue.for_workspace(workspace_key())
+    flusher = Flusher(queue, batch_size=args.batch_size)
+    written = flusher.flush()
+    status = queue.status()
+    print(f"[DONE] {written} written, {status['pending']} pending, {status['failed']} failed")
+    queue.close()
+    return 1 if status["pending"] or status["failed"] else 0
+
+
+def cmd_status(args):
+    queue = WriteQueue.for_workspace(workspace_key())
+    print(json.dumps(dict(queue.status(), path=queue.path, failures=queue.failures(args.limit)), indent=2))
+    queue.close()
+    return 0
+
+
+def cmd_requeue(args):
+    queue = WriteQueue.for_workspace(workspace_key())
+    print(f"[DONE] {queue.requeue(args.object)} failed write(s) queued again")
+    queue.close()
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durable, batching write relay in front of Twenty.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("serve", help="accept writes over HTTP and flush them to Twenty")
+    auth.add_arguments(p)
+    p.add_argument("--port", type=int, default=8791)
+    p.add_argument("--batch-size", type=int, default=60, help="records per create mutation (and early-flush size)")
+    p.add_argument("--max-wait", type=float, default=2.0, help="seconds a write may wait for a batch to fill")
+    p.add_argument("--keep-hours", type=float, default=24.0, help="keep sent writes this long for idempotency")
+    p.set_defaults(fn=cmd_serve)
+
+    p = sub.add_parser("flush", help="send queued writes now and exit")
+    p.add_argument("--batch-size", type=int, default=60)
+    p.set_defaults(fn=cmd_flush)
+
+    p = sub.add_parser("status", help="queue depth and recent failures")
+    p.add_argument("--limit", type=int, default=20, help="failures to show")
+    p.set_defaults(fn=cmd_status)
+
+    p = sub.add_parser("requeue", help="queue failed writes again")
+    p.add_argument("--object", help="only this plural object name")
+    p.set_defaults(fn=cmd_requeue)
+
+    profile.add_argument(parser)
+    args = parser.parse_args()
+    profile.enable(args.profile, args.profile_out)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())